@@ -9,6 +9,7 @@ import xml.etree.ElementTree as ET
 import json
 import time
 from curl_scraper import scrape_product_with_curl, save_product_data
+from sitemap_ingest import iter_sitemap_entries
 
 # Configuration
 SITEMAP_URL = "https://www.tileshop.com/sitemap.xml"
@@ -16,24 +17,15 @@ CRAWL4AI_URL = "http://localhost:11235"
 CRAWL4AI_TOKEN = "tileshop"
 
 def fetch_sitemap_urls():
-    """Fetch and parse sitemap.xml to get product URLs"""
+    """Fetch and parse sitemap.xml to get product URLs (streamed, follows sitemap indexes)"""
     print("Fetching sitemap...")
     
-    response = requests.get(SITEMAP_URL)
-    if response.status_code != 200:
-        print(f"Failed to fetch sitemap: {response.status_code}")
+    try:
+        urls = [url for url, _ in iter_sitemap_entries(SITEMAP_URL)]
+    except (requests.RequestException, ET.ParseError) as e:
+        print(f"Failed to fetch sitemap: {e}")
         return []
     
-    # Parse XML
-    root = ET.fromstring(response.content)
-    
-    # Extract URLs
-    urls = []
-    for url_elem in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-        loc_elem = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-        if loc_elem is not None:
-            urls.append(loc_elem.text)
-    
     print(f"Found {len(urls)} total URLs in sitemap")
     return urls
 
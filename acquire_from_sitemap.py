@@ -5,17 +5,27 @@ Includes status tracking and resume capability
 """
 
 import json
+import os
 import time
 import sys
 import signal
+import socket
 from datetime import datetime
 from tileshop_learner import extract_product_data, save_to_database
-from curl_scraper import scrape_product_with_curl
+from curl_scraper import scrape_product_with_curl, last_fetch_error, cache_page
 from download_sitemap import load_sitemap_data, load_categorized_sitemap_data, update_url_status, get_pending_urls, get_scraping_statistics, main as refresh_sitemap
+from url_frontier import get_frontier
+from crawl_leases import LeaseManager, LEASE_BATCH_SIZE
+from rate_controller import get_rate_controller
+from crawl_scheduler import CrawlScheduler
+from crawl4ai_client import get_crawl4ai_client
+from progress_events import emit, RUN_START, URL_START, URL_DONE, RUN_END, OUTCOME_SUCCESS, OUTCOME_FAILED, OUTCOME_UNCHANGED
+from retry_policy import classify_failure, PARSE_FAILURE, DB_FAILURE, DEAD_LETTER
+from incremental_crawl import ValidatorStore, check_for_changes, mark_extracted, UNCHANGED_OUTCOMES, FAILED
+from crawl_pipeline import CrawlPipeline, fetch_page, print_pipeline_metrics, DEFAULT_FETCHERS, DEFAULT_PARSERS, DEFAULT_WRITE_BATCH
+from stage_profiler import PROFILE_ENV, enable as enable_profiling, is_enabled as is_profiling, start_publishing, print_stage_profile
 
 # Configuration
-CRAWL4AI_URL = "http://localhost:11235"
-CRAWL4AI_TOKEN = "tileshop"
 SITEMAP_MAX_AGE_DAYS = 7
 
 # Global variables for graceful shutdown
@@ -37,16 +47,26 @@ def setup_signal_handlers():
     signal.signal(signal.SIGTERM, signal_handler)
 
 def create_recovery_checkpoint(url, error_msg, stats):
-    """Create a recovery checkpoint file"""
+    """Create a recovery checkpoint file
+    
+    Per-URL failures live in the frontier's retry queue; the checkpoint
+    carries its per-class summary alongside the latest failure.
+    """
+    try:
+        retry_queue = get_frontier().retry_summary()
+    except Exception as e:
+        retry_queue = {'error': str(e)}
     checkpoint = {
         'timestamp': datetime.now().isoformat(),
         'failed_url': url,
         'error_message': error_msg,
         'statistics': stats,
+        'retry_queue': retry_queue,
         'recovery_instructions': [
             'Run the same scraper command to resume',
             'The scraper will automatically skip completed URLs',
-            'Failed URLs will be retried'
+            'Failed URLs are retried automatically once their backoff has passed',
+            'URLs out of retries are listed with: python retry_failed.py dead'
         ]
     }
     
@@ -88,165 +108,282 @@ def validate_sitemap_freshness():
         return True  # Continue with existing sitemap
 
 def crawl_single_page(url, progress_callback=None):
-    """Optimized crawling with real-time progress updates"""
-    import requests
-    
-    headers = {
-        'Authorization': f'Bearer {CRAWL4AI_TOKEN}',
-        'Content-Type': 'application/json'
-    }
-    
+    """Render one page through Crawl4AI with real-time progress updates"""
     print(f"  🔄 Starting crawl: {url}")
     if progress_callback:
         progress_callback('crawl_start', {'url': url, 'stage': 'submitting'})
     
-    try:
-        # Optimized crawl configuration for speed while preserving specifications data
-        crawl_data = {
-            "urls": [url],
-            "formats": ["html", "markdown"],
-            "javascript": True,
-            "wait_time": 8,  # Reduced from 15 to 8 seconds
-            "page_timeout": 30000,  # Reduced from 45s to 30s
-            "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            # Removed css_selector to capture all product content including specifications
-            "exclude_tags": ["style", "nav", "footer", "header", "aside"]  # Skip unnecessary content but keep script tags for JSON-LD specs
-        }
-        
-        submit_start = time.time()
-        response = requests.post(f"{CRAWL4AI_URL}/crawl", headers=headers, json=crawl_data, timeout=60)
-        
-        if response.status_code != 200:
-            error_msg = f"HTTP {response.status_code}"
-            print(f"  ✗ Failed to submit crawl request: {error_msg}")
-            if progress_callback:
-                progress_callback('crawl_error', {'url': url, 'error': error_msg, 'stage': 'submission'})
-            return None, error_msg
-        
-        response_data = response.json()
-        submit_time = time.time() - submit_start
-        
-        # Check if this is synchronous mode (immediate results) or asynchronous mode (task_id)
-        if 'results' in response_data and response_data.get('success'):
-            # Synchronous mode - results returned immediately
-            total_time = submit_time
-            print(f"  ⚡ Crawl completed immediately ({total_time:.2f}s)")
-            if progress_callback:
-                progress_callback('crawl_complete', {
-                    'url': url, 
-                    'total_time': total_time,
-                    'submit_time': submit_time,
-                    'mode': 'synchronous'
-                })
-            
-            main_result = response_data.get('results', [{}])[0] if response_data.get('results') else None
-            if main_result:
-                return {'main': main_result}, None
-            else:
-                return None, "No results returned in synchronous response"
-        
-        # Asynchronous mode - get task_id and poll for results
-        task_id = response_data.get('task_id')
-        if not task_id:
-            error_msg = "No task_id returned and no immediate results"
+    for _, result, error_msg in get_crawl4ai_client().crawl_many([url], progress_callback=progress_callback):
+        if error_msg:
             print(f"  ✗ {error_msg}")
-            if progress_callback:
-                progress_callback('crawl_error', {'url': url, 'error': error_msg, 'stage': 'submission'})
             return None, error_msg
-            
-        print(f"  📋 Task submitted: {task_id} ({submit_time:.2f}s)")
-        if progress_callback:
-            progress_callback('crawl_submitted', {'url': url, 'task_id': task_id, 'submit_time': submit_time})
-        
-        # Adaptive polling - start checking immediately with shorter intervals
-        poll_start = time.time()
-        check_intervals = [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]  # Progressive back-off
+        print(f"  ✅ Crawl completed")
+        return {'main': result}, None
+    return None, "No results returned"
+
+def iter_rendered_pages(product_urls, batch_size=None, progress_callback=None):
+    """Yield (url, html, error) as Crawl4AI finishes rendering each page
+    
+    URLs are submitted in batches and polled concurrently, so extraction of
+    finished pages overlaps rendering of the rest.
+    """
+    pages = get_crawl4ai_client().crawl_many(product_urls, progress_callback=progress_callback, batch_size=batch_size)
+    for url, result, error_msg in pages:
+        html = (result or {}).get('html')
+        if not error_msg and not html:
+            error_msg = "Rendered page has no HTML"
+        yield url, html, error_msg
+
+def scrape_and_save(url, html_content=None):
+    """Scrape and save one product without recording its status; returns (success, error_msg, error_class)"""
+    # Use curl scraper breakthrough solution (bypasses bot detection)
+    print(f"    🚀 Using curl scraper (bot detection bypass)")
+    
+    product_data = scrape_product_with_curl(url, html_content=html_content)
+    
+    if not product_data:
+        fetch_error = last_fetch_error() if html_content is None else None
+        if fetch_error:
+            error_msg = f'Fetch failed: {fetch_error}'
+            error_class = classify_failure(fetch_error)
+        else:
+            error_msg = 'Curl scraper failed to extract data'
+            error_class = PARSE_FAILURE
+        print(f"  ✗ {error_msg}")
+        return False, error_msg, error_class
+    
+    # Print summary
+    print(f"  📊 Extracted data for SKU {product_data.get('sku', 'unknown')}:")
+    print(f"    Title: {product_data.get('title', 'N/A')[:50]}...")
+    print(f"    Price: ${product_data.get('price_per_box', 'N/A')}")
+    print(f"    Specs: {len(product_data.get('specifications', {})) if product_data.get('specifications') else 0} fields")
+    print(f"    Image: {'✓' if product_data.get('primary_image') else '✗'}")
+    print(f"    Brand: {product_data.get('brand', 'N/A')}")
+    
+    # Save to database using crawl_results from curl scraper
+    crawl_results = product_data.pop('_crawl_results', None)
+    if not save_to_database(product_data, crawl_results):
+        error_msg = 'Database save failed'
+        print(f"  ✗ {error_msg}")
+        return False, error_msg, DB_FAILURE
+    
+    return True, None, None
+
+def process_product_url(url, html_content=None):
+    """Scrape, save and record the status of one product in the frontier; returns (success, error_msg)"""
+    success, error_msg, error_class = scrape_and_save(url, html_content)
+    if success:
+        update_url_status(url, 'completed')
+    else:
+        update_url_status(url, 'failed', error_msg, error_class)
+    return success, error_msg
+
+def scrape_with_pipeline(product_urls, incremental=False, validator_store=None, lastmod_by_url=None,
+                         fetchers=DEFAULT_FETCHERS, parsers=DEFAULT_PARSERS, write_batch=DEFAULT_WRITE_BATCH):
+    """Crawl through the staged fetch -> parse -> batched write pipeline; returns (successful, failed, unchanged)
+    
+    Fetches overlap extraction in parser processes, and products are saved
+    in batches. Statuses, progress events and recovery checkpoints are
+    recorded as each URL leaves the writer. Ctrl+C stops new fetches and
+    drains pages already fetched.
+    """
+    counts = {'successful': 0, 'failed': 0, 'unchanged': 0}
+    start_time = time.time()
+    
+    def fetch(url):
+        if incremental:
+            outcome, html_content = check_for_changes(url, validator_store, lastmod_by_url.get(url))
+            if outcome in UNCHANGED_OUTCOMES:
+                return None, None
+            if outcome == FAILED:
+                print(f"  ⚠️ Conditional check failed for {url.split('/')[-1]} - falling back to full fetch")
+            elif html_content:
+                cache_page(url, html_content)
+                return html_content, None
+        return fetch_page(url)
+    
+    def on_fetch_start(item):
+        global current_url
+        current_url = item.url
+        emit(URL_START, url=item.url, index=item.index, total=len(product_urls))
+    
+    def on_result(item):
+        name = item.url.split('/')[-1]
+        if item.unchanged:
+            counts['unchanged'] += 1
+            emit(URL_DONE, url=item.url, outcome=OUTCOME_UNCHANGED)
+            print(f"  ⏭️  Unchanged - skipped extraction: {name}")
+        elif item.success:
+            counts['successful'] += 1
+            update_url_status(item.url, 'completed')
+            if incremental:
+                mark_extracted(item.url, validator_store)
+            emit(URL_DONE, url=item.url, outcome=OUTCOME_SUCCESS)
+            print(f"  ✅ SKU {item.product_data.get('sku', 'unknown')}: {(item.product_data.get('title') or 'N/A')[:50]}")
+        else:
+            counts['failed'] += 1
+            print(f"  ✗ {name}: {item.error}")
+            update_url_status(item.url, 'failed', item.error, item.error_class)
+            emit(URL_DONE, url=item.url, outcome=OUTCOME_FAILED, error=item.error)
+            create_recovery_checkpoint(item.url, item.error, {
+                'processed': sum(counts.values()),
+                'successful': counts['successful'],
+                'failed': counts['failed']
+            })
         
-        for attempt, interval in enumerate(check_intervals):
-            if attempt > 0:  # Skip initial sleep
-                time.sleep(interval)
+        done = sum(counts.values())
+        if done % 25 == 0:
+            elapsed = time.time() - start_time
+            print(f"\n📈 Progress Update: {done:,}/{len(product_urls):,} ({done/len(product_urls)*100:.1f}%) - "
+                  f"{counts['successful']:,} ok, {counts['failed']:,} failed, {counts['unchanged']:,} unchanged, "
+                  f"{done / elapsed * 60:.1f}/min")
+    
+    print(f"🏭 Pipeline: {fetchers} fetchers, {parsers} parser processes, DB writes in batches of {write_batch}")
+    pipeline = CrawlPipeline(fetch=fetch, on_result=on_result, on_fetch_start=on_fetch_start,
+                             should_stop=lambda: interrupted, fetchers=fetchers, parsers=parsers,
+                             write_batch=write_batch)
+    print_pipeline_metrics(pipeline.run(product_urls))
+    return counts['successful'], counts['failed'], counts['unchanged']
+
+def reset_shared_queue(category=None, force=False):
+    """Coordinator step: reset frontier statuses, empty the shared crawl queue and reseed it
+
+    Run once per fresh start (``--reset-queue``), never from each worker;
+    refuses while workers hold live leases unless force=True.
+    """
+    leases = LeaseManager(worker_id=f"{socket.gethostname()}-coordinator")
+    try:
+        leases.ensure_schema()
+        cleared = leases.reset_queue(force=force)
+        reset_count = get_frontier().reset_statuses(category=category)
+        seeded = leases.seed(get_pending_urls(category=category))
+    finally:
+        leases.close()
+    print(f"🔄 Fresh start: reset {reset_count:,} URLs, cleared {cleared:,} queued URLs, queued {seeded:,} URLs")
+    return seeded
+
+def seed_shared_queue(category=None):
+    """Coordinator step: add this host's pending frontier URLs that the shared queue does not know yet"""
+    leases = LeaseManager(worker_id=f"{socket.gethostname()}-coordinator")
+    try:
+        leases.ensure_schema()
+        seeded = leases.seed(get_pending_urls(category=category))
+    finally:
+        leases.close()
+    print(f"📋 Queued {seeded:,} new URLs into the shared crawl queue")
+    return seeded
+
+def scrape_with_leases(max_products=None, category=None, worker_id=None, run_id=None,
+                       lease_batch=LEASE_BATCH_SIZE):
+    """Worker mode: claim leased URL batches from the shared Postgres queue
+    
+    Any number of workers (on any host) can run this against the same
+    database. Leases are heartbeated while the worker is alive; a crashed
+    worker's URLs become claimable again once its leases expire. Retry
+    scheduling and dead-lettering happen in the shared queue; the local
+    frontier only seeds a brand-new queue and is not updated here.
+    """
+    global current_url, interrupted
+    
+    setup_signal_handlers()
+    
+    leases = LeaseManager(worker_id=worker_id, run_id=run_id, batch_size=lease_batch)
+    leases.register()
+    print(f"👷 Worker {leases.worker_id} started (run: {run_id or 'n/a'}, lease batch: {lease_batch})")
+    
+    # Only an empty queue is seeded here - use --seed-queue / --reset-queue to add URLs to a running crawl
+    seeded = leases.seed(get_pending_urls(category=category), only_if_empty=True)
+    if seeded:
+        print(f"📋 Queued {seeded:,} URLs into the empty shared crawl queue")
+    
+    leases.start_heartbeat()
+    emit(RUN_START, total=max_products, worker=leases.worker_id)
+    
+    successful_scrapes = 0
+    failed_scrapes = 0
+    processed = 0
+    start_time = time.time()
+    final_status = 'completed'
+    
+    try:
+        while not interrupted:
+            batch_size = lease_batch
+            if max_products:
+                batch_size = min(batch_size, max_products - processed)
+                if batch_size <= 0:
+                    break
             
-            try:
-                check_start = time.time()
-                result_response = requests.get(f"{CRAWL4AI_URL}/task/{task_id}", headers=headers, timeout=10)
-                check_time = time.time() - check_start
+            batch = leases.claim_batch(batch_size)
+            if not batch:
+                print(f"\n✅ Crawl queue drained - no more URLs to lease")
+                break
+            print(f"\n📦 Leased {len(batch)} URLs")
+            
+            for url in batch:
+                if interrupted:
+                    break
                 
-                if result_response.status_code == 200:
-                    result = result_response.json()
-                    status = result.get('status')
-                    elapsed = time.time() - poll_start
-                    
-                    print(f"  🔍 Status check #{attempt+1}: {status} ({elapsed:.1f}s elapsed, {check_time:.2f}s check)")
-                    if progress_callback:
-                        progress_callback('crawl_status', {
-                            'url': url, 
-                            'status': status, 
-                            'attempt': attempt+1, 
-                            'elapsed': elapsed,
-                            'check_time': check_time
-                        })
-                    
-                    if status == 'completed':
-                        main_result = result.get('results', [{}])[0] if result.get('results') else None
-                        if main_result:
-                            total_time = time.time() - submit_start
-                            print(f"  ✅ Crawl completed in {total_time:.2f}s")
-                            if progress_callback:
-                                progress_callback('crawl_complete', {
-                                    'url': url, 
-                                    'total_time': total_time,
-                                    'submit_time': submit_time,
-                                    'poll_time': elapsed
-                                })
-                            return {'main': main_result}, None
-                        else:
-                            error_msg = "No results returned"
-                            print(f"  ✗ {error_msg}")
-                            if progress_callback:
-                                progress_callback('crawl_error', {'url': url, 'error': error_msg, 'stage': 'results'})
-                            return None, error_msg
-                    elif status == 'failed':
-                        error_msg = result.get('error', 'Unknown crawl error')
-                        print(f"  ✗ Crawl failed: {error_msg}")
-                        if progress_callback:
-                            progress_callback('crawl_error', {'url': url, 'error': error_msg, 'stage': 'processing'})
-                        return None, error_msg
-                    elif status in ['pending', 'processing']:
-                        # Continue polling
-                        continue
-                else:
-                    print(f"  ⚠ Status check failed: {result_response.status_code}")
-                    if progress_callback:
-                        progress_callback('crawl_warning', {
-                            'url': url, 
-                            'message': f'Status check failed: {result_response.status_code}',
-                            'attempt': attempt+1
-                        })
+                current_url = url
+                processed += 1
+                leases.set_current_url(url)
+                emit(URL_START, url=url, index=processed, worker=leases.worker_id)
                 
-            except requests.RequestException as e:
-                print(f"  ⚠ Request error during status check #{attempt+1}: {e}")
-                if progress_callback:
-                    progress_callback('crawl_warning', {
-                        'url': url, 
-                        'message': f'Request error: {e}',
-                        'attempt': attempt+1
-                    })
-        
-        timeout_msg = f"Crawl timeout after {len(check_intervals)} attempts"
-        print(f"  ⏰ {timeout_msg}")
-        if progress_callback:
-            progress_callback('crawl_timeout', {'url': url, 'attempts': len(check_intervals)})
-        return None, timeout_msg
+                print(f"\n{'='*80}")
+                print(f"Processing {processed:,}: {url.split('/')[-1]} [{leases.worker_id}]")
+                print('='*80)
+                
+                try:
+                    success, error_msg, error_class = scrape_and_save(url)
+                except Exception as e:
+                    success, error_msg, error_class = False, f"Unexpected error: {str(e)}", None
+                    print(f"  ✗ {error_msg}")
+                
+                # The shared queue schedules the retry (or dead-letters the URL) for every host
+                state = leases.complete(url, success, error_msg, error_class)
+                if state == DEAD_LETTER:
+                    print("  ☠️ Out of retry attempts - dead-lettered")
+                emit(URL_DONE, url=url, outcome=OUTCOME_SUCCESS if success else OUTCOME_FAILED, error=error_msg,
+                     worker=leases.worker_id)
+                if success:
+                    successful_scrapes += 1
+                else:
+                    failed_scrapes += 1
+                current_url = None
+                # Rate limiting is done per request by the shared adaptive rate controller
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        if interrupted:
+            final_status = 'interrupted'
+        released = leases.release(final_status)
+        leases.close()
+        emit(RUN_END, status=final_status, successful=successful_scrapes, failed=failed_scrapes,
+             worker=leases.worker_id)
         
-    except requests.RequestException as e:
-        print(f"  ✗ Network error: {e}")
-        return None, f"Network error: {e}"
-    except Exception as e:
-        print(f"  ✗ Unexpected error: {e}")
-        return None, f"Unexpected error: {e}"
+        elapsed = time.time() - start_time
+        print(f"\n🎉 Worker {leases.worker_id} {final_status}!")
+        print(f"   Products processed: {processed:,}")
+        print(f"   Successful: {successful_scrapes:,}")
+        print(f"   Failed: {failed_scrapes:,}")
+        if released:
+            print(f"   Released {released:,} unfinished leases back to the queue")
+        print(f"   Total time: {elapsed/60:.1f} minutes")
 
-def scrape_from_sitemap(max_products=None, resume=True, category=None):
-    """Scrape products using pre-downloaded sitemap with resume capability"""
+def scrape_from_sitemap(max_products=None, resume=True, category=None, incremental=False, scheduled=False,
+                        render=False, batch_size=None, pipeline=False, fetchers=DEFAULT_FETCHERS,
+                        parsers=DEFAULT_PARSERS, write_batch=DEFAULT_WRITE_BATCH):
+    """Scrape products using pre-downloaded sitemap with resume capability
+    
+    incremental=True re-checks every sitemap URL with conditional requests and
+    only re-extracts and saves products whose content changed.
+    scheduled=True re-crawls in crawl_scheduler score order (stalest,
+    most-changing, highest-weight categories first) within the max_products
+    budget, using the same change detection.
+    render=True renders pages through Crawl4AI (for when curl is blocked),
+    batch_size URLs per request, extracting each page as soon as it is ready.
+    pipeline=True runs fetching, extraction (in `parsers` processes) and
+    batched saves as concurrent stages - see crawl_pipeline.py.
+    """
     global current_url, interrupted
     
     print("Tileshop Scraper - Enhanced Recovery & Auto-Refresh")
@@ -291,58 +428,103 @@ def scrape_from_sitemap(max_products=None, resume=True, category=None):
         print(f"   Scraping range: {stats['oldest_completion'][:10]} to {stats['newest_completion'][:10]}")
     
     # Get pending URLs with intelligent prioritization
-    if resume:
+    validator_store = None
+    lastmod_by_url = {}
+    if scheduled:
+        incremental = True
+    if incremental:
+        print(f"\n🔁 Incremental mode: checking all URLs for changes (ETag/Last-Modified/content hash)")
+        validator_store = ValidatorStore()
+        print(f"   Known validators: {len(validator_store.validators):,} URLs")
+        lastmod_by_url = {url_data['url']: url_data.get('lastmod') for url_data in sitemap_data['urls']}
+        if scheduled:
+            print(f"📅 Scheduled re-crawl: highest priority first, budget {max_products or 'unlimited'}")
+            schedule = CrawlScheduler(validator_store=validator_store).schedule(max_products, category)
+            product_urls = [item['url'] for item in schedule]
+            if schedule:
+                print(f"   Score range: {schedule[0]['score']:.3f} → {schedule[-1]['score']:.3f}")
+        else:
+            product_urls = list(lastmod_by_url)
+            if max_products:
+                product_urls = product_urls[:max_products]
+    elif resume:
         print(f"\n📋 Resume mode: Getting pending URLs (prioritized)...")
-        print(f"   Priority: Never attempted first, then oldest failures")
-        product_urls = get_pending_urls(max_products)
+        print(f"   Priority: Never attempted first, then oldest attempts, with due retries mixed in")
+        product_urls = get_pending_urls(max_products, category, include_retries=True)
         if not product_urls:
             print("✅ All products already scraped!")
             return
     else:
         print(f"\n🔄 Fresh start: Getting all URLs...")
         # Reset all URLs to pending for fresh start
-        for url_data in sitemap_data['urls']:
-            url_data['scrape_status'] = 'pending'
-            url_data['scraped_at'] = None
-        
-        # Save updated sitemap
-        with open('tileshop_sitemap.json', 'w', encoding='utf-8') as f:
-            json.dump(sitemap_data, f, indent=2, ensure_ascii=False)
+        reset_count = get_frontier().reset_statuses(category=category)
+        print(f"   Reset {reset_count:,} URLs to pending")
         
         product_urls = [url_data['url'] for url_data in sitemap_data['urls']]
         if max_products:
             product_urls = product_urls[:max_products]
     
     print(f"\n🎯 Will process {len(product_urls):,} products in optimized order")
+    emit(RUN_START, total=len(product_urls))
     
     # Statistics
     successful_scrapes = 0
     failed_scrapes = 0
+    unchanged_skips = 0
     start_time = time.time()
     
-    for i, url in enumerate(product_urls, 1):
+    if pipeline and not render:
+        successful_scrapes, failed_scrapes, unchanged_skips = scrape_with_pipeline(
+            product_urls, incremental, validator_store, lastmod_by_url, fetchers, parsers, write_batch)
+        pages = ()
+    elif render:
+        if pipeline:
+            print(f"   --pipeline is ignored with --render (Crawl4AI batches already overlap rendering and extraction)")
+        print(f"🖥️  Crawl4AI rendering: {batch_size or 'default'} URLs per request, pages extracted as they complete")
+        if incremental:
+            print(f"   Conditional change checks are skipped for rendered pages")
+        pages = iter_rendered_pages(product_urls, batch_size)
+    else:
+        pages = ((url, None, None) for url in product_urls)
+    
+    for i, (url, rendered_html, render_error) in enumerate(pages, 1):
         # Check for interruption
         if interrupted:
             print(f"\n🛑 Graceful shutdown initiated")
             break
             
         current_url = url  # Track current URL for signal handler
+        emit(URL_START, url=url, index=i, total=len(product_urls))
         
         print(f"\n{'='*80}")
         print(f"Processing {i:,}/{len(product_urls):,}: {url.split('/')[-1]}")
         print('='*80)
         
         try:
-            # Use curl scraper breakthrough solution (bypasses bot detection)
-            print(f"    🚀 Using curl scraper (bot detection bypass)")
+            html_content = rendered_html
+            if render_error:
+                error_msg = f"Crawl4AI render failed: {render_error}"
+                print(f"  ✗ {error_msg}")
+                failed_scrapes += 1
+                update_url_status(url, 'failed', error_msg, classify_failure(render_error))
+                emit(URL_DONE, url=url, outcome=OUTCOME_FAILED, error=error_msg)
+                continue
+            if incremental and not render:
+                outcome, html_content = check_for_changes(url, validator_store, lastmod_by_url.get(url))
+                if outcome in UNCHANGED_OUTCOMES:
+                    unchanged_skips += 1
+                    emit(URL_DONE, url=url, outcome=OUTCOME_UNCHANGED)
+                    print(f"  ⏭️  Unchanged ({outcome}) - skipping extraction")
+                    current_url = None
+                    continue
+                if outcome == FAILED:
+                    print(f"  ⚠️ Conditional check failed - falling back to full fetch")
             
-            product_data = scrape_product_with_curl(url)
+            success, error_msg = process_product_url(url, html_content)
             
-            if not product_data:
-                error_msg = 'Curl scraper failed to extract data'
-                print(f"  ✗ {error_msg}")
+            if not success:
                 failed_scrapes += 1
-                update_url_status(url, 'failed', error_msg)
+                emit(URL_DONE, url=url, outcome=OUTCOME_FAILED, error=error_msg)
                 
                 # Create recovery checkpoint for critical failures
                 stats = {
@@ -353,29 +535,18 @@ def scrape_from_sitemap(max_products=None, resume=True, category=None):
                 create_recovery_checkpoint(url, error_msg, stats)
                 continue
             
-            # Print summary
-            print(f"  📊 Extracted data for SKU {product_data.get('sku', 'unknown')}:")
-            print(f"    Title: {product_data.get('title', 'N/A')[:50]}...")
-            print(f"    Price: ${product_data.get('price_per_box', 'N/A')}")
-            print(f"    Specs: {len(product_data.get('specifications', {})) if product_data.get('specifications') else 0} fields")
-            print(f"    Image: {'✓' if product_data.get('primary_image') else '✗'}")
-            print(f"    Brand: {product_data.get('brand', 'N/A')}")
-            
-            # Save to database using crawl_results from curl scraper
-            crawl_results = product_data.pop('_crawl_results', None)
-            save_to_database(product_data, crawl_results)
             successful_scrapes += 1
-            
-            # Update status in sitemap
-            update_url_status(url, 'completed')
+            emit(URL_DONE, url=url, outcome=OUTCOME_SUCCESS)
+            if incremental and not render:
+                mark_extracted(url, validator_store)
             
             # Clear current URL after successful completion
             current_url = None
             
-            # Rate limiting - be respectful
-            if not interrupted:  # Skip delay if interrupted
-                print(f"  ⏳ Waiting 3 seconds before next request...")
-                time.sleep(3)
+            # Rate limiting - requests are paced by the shared adaptive rate controller
+            if not interrupted:
+                rate_controller = get_rate_controller()
+                print(f"  ⏱️ Adaptive pacing: {rate_controller.rate * 60:.1f} requests/min ({rate_controller.last_signal or 'warming up'})")
             
         except KeyboardInterrupt:
             print(f"\n⚠️  Keyboard interrupt detected")
@@ -385,7 +556,8 @@ def scrape_from_sitemap(max_products=None, resume=True, category=None):
             error_msg = f"Unexpected error: {str(e)}"
             print(f"  ✗ {error_msg}")
             failed_scrapes += 1
-            update_url_status(url, 'failed', error_msg)
+            update_url_status(url, 'failed', error_msg, classify_failure(error_msg))
+            emit(URL_DONE, url=url, outcome=OUTCOME_FAILED, error=error_msg)
             
             # Create recovery checkpoint for unexpected errors
             stats = {
@@ -406,20 +578,30 @@ def scrape_from_sitemap(max_products=None, resume=True, category=None):
             print(f"\n📈 Progress Update:")
             print(f"   Processed: {i:,}/{len(product_urls):,} ({i/len(product_urls)*100:.1f}%)")
             print(f"   Successful: {successful_scrapes:,}, Failed: {failed_scrapes:,}")
+            if incremental:
+                print(f"   Unchanged (skipped): {unchanged_skips:,}")
             print(f"   Success rate: {success_rate:.1f}%")
+            print(f"   Request rate: {get_rate_controller().rate * 60:.1f}/min")
             print(f"   Time elapsed: {elapsed/60:.1f}m, Est. remaining: {remaining/60:.1f}m")
             print(f"   Avg time per product: {avg_time:.1f}s")
     
+    if validator_store:
+        validator_store.save()
+    
     # Final statistics
     elapsed = time.time() - start_time
     session_type = "interrupted" if interrupted else "completed"
+    emit(RUN_END, status=session_type, successful=successful_scrapes, failed=failed_scrapes,
+         unchanged=unchanged_skips)
     
     print(f"\n🎉 Scraping session {session_type}!")
     print(f"   Products processed: {len(product_urls):,}")
     print(f"   Successful: {successful_scrapes:,}")
     print(f"   Failed: {failed_scrapes:,}")
+    if incremental:
+        print(f"   Unchanged (skipped): {unchanged_skips:,}")
     if len(product_urls) > 0:
-        print(f"   Success rate: {successful_scrapes/len(product_urls)*100:.1f}%")
+        print(f"   Success rate: {(successful_scrapes + unchanged_skips)/len(product_urls)*100:.1f}%")
     print(f"   Total time: {elapsed/60:.1f} minutes")
     if len(product_urls) > 0:
         print(f"   Average time per product: {elapsed/len(product_urls):.1f} seconds")
@@ -469,9 +651,39 @@ if __name__ == "__main__":
     parser.add_argument('--fresh', action='store_true',
                        help='Fresh start (ignore previous progress)')
     parser.add_argument('--batch-size', type=int, default=10,
-                       help='Number of URLs to process simultaneously (default: 10)')
+                       help='Number of URLs per Crawl4AI request in --render mode (default: 10)')
     parser.add_argument('--category', type=str, default=None,
                        help='Product category to filter URLs by (uses categorized sitemap)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Re-check all URLs with conditional requests, only re-extract changed products')
+    parser.add_argument('--scheduled', action='store_true',
+                       help='Re-crawl in priority-score order (staleness, change frequency, category, failures); max_products is the budget')
+    parser.add_argument('--render', action='store_true',
+                       help='Render pages through Crawl4AI in batches of --batch-size (use when curl is blocked)')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='Run fetching, extraction and batched DB writes as concurrent pipeline stages')
+    parser.add_argument('--fetchers', type=int, default=DEFAULT_FETCHERS,
+                       help=f'Fetcher threads in --pipeline mode (default: {DEFAULT_FETCHERS})')
+    parser.add_argument('--parsers', type=int, default=DEFAULT_PARSERS,
+                       help=f'Extraction processes in --pipeline mode (default: {DEFAULT_PARSERS})')
+    parser.add_argument('--write-batch', type=int, default=DEFAULT_WRITE_BATCH,
+                       help=f'Products per DB write in --pipeline mode (default: {DEFAULT_WRITE_BATCH})')
+    parser.add_argument('--worker', action='store_true',
+                       help='Worker mode: claim leased URL batches from the shared Postgres crawl queue')
+    parser.add_argument('--worker-id', type=str, default=None,
+                       help='Worker identifier (default: hostname-pid)')
+    parser.add_argument('--run-id', type=str, default=None,
+                       help='Run identifier used to combine progress across workers')
+    parser.add_argument('--reset-queue', action='store_true',
+                       help='Coordinator step: reset statuses, empty the shared crawl queue and reseed it (run once, not per worker)')
+    parser.add_argument('--seed-queue', action='store_true',
+                       help='Coordinator step: add pending frontier URLs missing from the shared crawl queue')
+    parser.add_argument('--force', action='store_true',
+                       help='With --reset-queue: reset even while workers hold live leases')
+    parser.add_argument('--lease-batch', type=int, default=LEASE_BATCH_SIZE,
+                       help=f'URLs claimed per lease (default: {LEASE_BATCH_SIZE})')
+    parser.add_argument('--profile', action='store_true',
+                       help=f'Record per-stage extraction timings (same as {PROFILE_ENV}=1)')
     
     # Handle legacy argument format for compatibility (but only if no new arguments are present)
     has_new_args = any(arg.startswith('--') for arg in sys.argv[1:])
@@ -481,6 +693,10 @@ if __name__ == "__main__":
         resume = not (len(sys.argv) > 2 and sys.argv[2] == '--fresh')
         batch_size = 10  # Default for legacy mode
         category = None  # No category support in legacy mode
+        incremental = False
+        scheduled = False
+        render = False
+        args = None
         
         if max_products:
             print(f"Limiting to {max_products:,} products")
@@ -497,6 +713,9 @@ if __name__ == "__main__":
         resume = not args.fresh
         batch_size = args.batch_size
         category = args.category
+        incremental = args.incremental
+        scheduled = args.scheduled
+        render = args.render
         
         if max_products:
             print(f"Limiting to {max_products:,} products")
@@ -504,8 +723,43 @@ if __name__ == "__main__":
             print("Fresh start mode (ignoring previous progress)")
         if category:
             print(f"Category-based mode: {category}")
+        if incremental:
+            print("Incremental mode (skip unchanged products)")
+        if scheduled:
+            print("Scheduled mode (priority-scored re-crawl)")
+        if render:
+            print("Render mode (batched Crawl4AI)")
+        if args.pipeline:
+            print("Pipeline mode (concurrent fetch, extraction and batched DB writes)")
+        if args.profile:
+            # Through the environment so pipeline parser processes profile too
+            os.environ[PROFILE_ENV] = '1'
+            enable_profiling()
         print(f"Using batch size: {batch_size}")
     
-    # Note: The batch_size parameter is now available but the actual parallel processing
-    # implementation would need to be added to the scrape_from_sitemap function
-    scrape_from_sitemap(max_products, resume, category)
\ No newline at end of file
+    if start_publishing():
+        print("⏱️  Stage profiling enabled - timings go to the dashboard")
+    
+    if args is not None and (args.reset_queue or args.seed_queue):
+        try:
+            if args.reset_queue:
+                reset_shared_queue(category, force=args.force)
+            else:
+                seed_shared_queue(category)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    elif args is not None and args.worker:
+        if not resume:
+            print("❌ --fresh is not applied per worker - run 'acquire_from_sitemap.py --reset-queue' once, then start the workers")
+            sys.exit(1)
+        scrape_with_leases(max_products, category, worker_id=args.worker_id,
+                           run_id=args.run_id, lease_batch=args.lease_batch)
+    else:
+        pipeline_options = {} if args is None else {
+            'pipeline': args.pipeline, 'fetchers': args.fetchers, 'parsers': args.parsers,
+            'write_batch': args.write_batch}
+        scrape_from_sitemap(max_products, resume, category, incremental, scheduled, render, batch_size,
+                            **pipeline_options)
+    if is_profiling():
+        print_stage_profile()
\ No newline at end of file
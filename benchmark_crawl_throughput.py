@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+End-to-end crawl throughput benchmark against the local replay server
+Drives acquire_from_sitemap.process_product_url (curl_scraper fetch,
+tileshop_learner extraction, save) over recorded pages and reports
+pages/min, p50/p95 per stage (fetch, detect, parse, categorize, save) and
+the DB write rate. Results are written as JSON for regression tracking.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+
+from replay_server import ReplayServer, PAGES_DIR, DEFAULT_LATENCY
+from rate_controller import AdaptiveRateController
+from fetch_engine import FetchEngine
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'results')
+STAGES = ['fetch', 'detect', 'parse', 'categorize', 'save']
+DEFAULT_RATE = 50.0     # Requests per second - opened up, we are measuring the pipeline
+_MISSING = object()
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class StageTimer:
+    """Wall-clock samples per pipeline stage
+
+    parse is extract_product_data minus the detect and categorize calls made
+    inside it, so the stages add up to the time spent per page.
+    """
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def wrap(self, stage, func):
+        def timed(*args, **kwargs):
+            nested = getattr(self._local, 'nested', None)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                if nested is not None:
+                    nested.append(elapsed)
+                self.add(stage, elapsed)
+        return timed
+
+    def wrap_parse(self, func):
+        """extract_product_data, with nested detect/categorize time subtracted"""
+        def timed(*args, **kwargs):
+            self._local.nested = nested = []
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.nested = None
+                self.add('parse', time.perf_counter() - start - sum(nested))
+        return timed
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def summary(self):
+        with self._lock:
+            return {stage: {
+                'count': len(values),
+                'p50_ms': round(percentile(values, 50) * 1000, 2) if values else None,
+                'p95_ms': round(percentile(values, 95) * 1000, 2) if values else None,
+                'mean_ms': round(sum(values) / len(values) * 1000, 2) if values else None,
+                'total_seconds': round(sum(values), 3)
+            } for stage, values in self.samples.items()}
+
+class SQLiteSink:
+    """Local product table standing in for PostgreSQL (no docker needed)"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS product_data (
+            url TEXT PRIMARY KEY, sku TEXT, title TEXT, data TEXT, raw_html TEXT, updated_at TEXT)''')
+        self._lock = threading.Lock()
+
+    def save(self, product_data, crawl_results):
+        raw_html = ((crawl_results or {}).get('main') or {}).get('html', '')
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO product_data VALUES (?, ?, ?, ?, ?, ?)', (
+                product_data.get('url'), product_data.get('sku'), product_data.get('title'),
+                json.dumps(product_data, default=str), raw_html, datetime.now().isoformat()))
+        return True
+
+class SaveCounter:
+    """Counts DB writes around the configured save function"""
+
+    def __init__(self, save):
+        self.save = save
+        self.writes = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, product_data, crawl_results):
+        try:
+            result = self.save(product_data, crawl_results)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            print(f"  ❌ Benchmark save failed: {e}")
+            return False
+        with self._lock:
+            if result:
+                self.writes += 1
+            else:
+                self.failures += 1
+        return result
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+@contextmanager
+def instrumented(timer, save, controller):
+    """Time each stage of the real pipeline by wrapping its entry points
+
+    The run gets its own rate controller, fetch engine and throwaway
+    frontier, so the shared pacing and the real frontier and page cache
+    are untouched. Everything is restored on exit.
+    """
+    import acquire_from_sitemap
+    import curl_scraper
+    import tileshop_learner
+    from url_frontier import URLFrontier
+
+    frontier = URLFrontier(os.path.join(tempfile.mkdtemp(prefix='tileshop_bench_'), 'frontier.db'),
+                           auto_migrate=False)
+
+    def update_url_status(url, status, error_msg=None, error_class=None):
+        if status == 'failed':
+            return frontier.record_failure(url, error_msg, error_class) is not None
+        return frontier.update_status(url, status, error_msg)
+
+    engine = FetchEngine(per_host_concurrency=8, rate_controller=controller)
+    patches = [
+        (curl_scraper, 'get_page', timer.wrap('fetch', curl_scraper.get_page)),
+        (curl_scraper, 'extract_product_data', timer.wrap_parse(curl_scraper.extract_product_data)),
+        (curl_scraper, 'get_fetch_engine', lambda: engine),
+        (curl_scraper, 'get_rate_controller', lambda: controller),
+        (curl_scraper, 'PAGE_CACHE_AVAILABLE', False),
+        (acquire_from_sitemap, 'save_to_database', timer.wrap('save', save)),
+        (acquire_from_sitemap, 'update_url_status', update_url_status),
+    ]
+    detector = tileshop_learner.get_page_detector()
+    if detector:
+        patches.append((detector, 'detect_page_structure', timer.wrap('detect', detector.detect_page_structure)))
+    categorizer = tileshop_learner.get_enhanced_categorizer()
+    if categorizer:
+        patches.append((categorizer, 'categorize_product', timer.wrap('categorize', categorizer.categorize_product)))
+
+    originals = [(target, name, target.__dict__.get(name, _MISSING)) for target, name, _ in patches]
+    for target, name, value in patches:
+        setattr(target, name, value)
+    try:
+        yield acquire_from_sitemap.process_product_url, frontier
+    finally:
+        for target, name, value in reversed(originals):
+            if value is _MISSING:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
+        engine.close()
+        frontier.close()
+
+def run_benchmark(pages=50, workers=1, latency=DEFAULT_LATENCY, jitter=0.0, error_rate=0.0, throttle_rate=0.0,
+                  retry_after=1, seed=0, rate=DEFAULT_RATE, db='sqlite', pages_dir=PAGES_DIR, quiet=True):
+    """Crawl `pages` replayed product URLs end to end; returns the results dict"""
+    controller = AdaptiveRateController(initial_rate=rate, max_rate=max(rate, 2.0), status_file=None)
+
+    timer = StageTimer()
+    if db == 'postgres':
+        from tileshop_learner import save_to_database
+        save = SaveCounter(save_to_database)
+    elif db == 'sqlite':
+        save = SaveCounter(SQLiteSink(os.path.join(tempfile.mkdtemp(prefix='tileshop_bench_'), 'products.db')).save)
+    else:
+        save = SaveCounter(lambda product_data, crawl_results: True)
+
+    server = ReplayServer(pages_dir, latency=latency, jitter=jitter, error_rate=error_rate,
+                          throttle_rate=throttle_rate, retry_after=retry_after, seed=seed).start()
+    urls = server.urls(pages)
+    try:
+        with instrumented(timer, save, controller) as (process_product_url, frontier):
+            frontier.replace_sitemap([{'url': url} for url in urls])
+
+            def crawl(url):
+                try:
+                    return process_product_url(url)[0]
+                except Exception as e:
+                    print(f"  ❌ {url}: {e}")
+                    return False
+
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+                start = time.monotonic()
+                if workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        outcomes = list(pool.map(crawl, urls))
+                else:
+                    outcomes = [crawl(url) for url in urls]
+                elapsed = time.monotonic() - start
+    finally:
+        server.stop()
+
+    succeeded = sum(1 for ok in outcomes if ok)
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'config': {'pages': pages, 'workers': workers, 'latency': latency, 'jitter': jitter,
+                   'error_rate': error_rate, 'throttle_rate': throttle_rate, 'retry_after': retry_after,
+                   'seed': seed, 'rate': rate, 'db': db, 'recorded_pages': len(server.pages)},
+        'pages': len(urls),
+        'succeeded': succeeded,
+        'failed': len(urls) - succeeded,
+        'elapsed_seconds': round(elapsed, 3),
+        'pages_per_minute': round(succeeded / elapsed * 60, 1) if elapsed else 0,
+        'stages': timer.summary(),
+        'db': {'backend': db, 'writes': save.writes, 'failures': save.failures,
+               'writes_per_second': round(save.writes / elapsed, 2) if elapsed else 0},
+        'server': server.statistics(),
+        'rate_controller': controller.snapshot()
+    }
+
+def write_results(results, output=None):
+    """Write results JSON (default benchmarks/results/crawl_throughput_<time>.json); returns the path"""
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"crawl_throughput_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    return output
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark end-to-end crawl throughput against replayed pages')
+    parser.add_argument('--pages', type=int, default=50, help='Product URLs to crawl')
+    parser.add_argument('--workers', type=int, default=1, help='Concurrent process_product_url threads')
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help='Server latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='+/- seconds added to the latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on injected 429s')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for injected failures and jitter')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='Initial requests/sec for the adaptive rate controller')
+    parser.add_argument('--db', choices=['sqlite', 'postgres', 'none'], default='sqlite',
+                        help='Save backend: temporary SQLite table, the real docker PostgreSQL save, or no save')
+    parser.add_argument('--pages-dir', default=PAGES_DIR, help='Directory of recorded product pages')
+    parser.add_argument('--output', default=None, help='Results JSON path')
+    parser.add_argument('--verbose', action='store_true', help='Show scraper output')
+    args = parser.parse_args()
+
+    print(f"📊 Crawl throughput benchmark: {args.pages} pages, {args.workers} worker(s), "
+          f"{args.latency*1000:.0f}ms latency, {args.error_rate:.0%} errors, {args.throttle_rate:.0%} 429s, db={args.db}")
+    results = run_benchmark(args.pages, args.workers, args.latency, args.jitter, args.error_rate,
+                            args.throttle_rate, args.retry_after, args.seed, args.rate, args.db,
+                            args.pages_dir, quiet=not args.verbose)
+
+    print(f"  {results['succeeded']}/{results['pages']} ok in {results['elapsed_seconds']:.2f}s "
+          f"→ {results['pages_per_minute']:.0f} pages/min")
+    for stage, summary in results['stages'].items():
+        if summary['count']:
+            print(f"  {stage:<11} p50 {summary['p50_ms']:8.2f}ms  p95 {summary['p95_ms']:8.2f}ms  ({summary['count']} calls)")
+    print(f"  DB writes: {results['db']['writes']} ({results['db']['writes_per_second']:.1f}/s), "
+          f"{results['db']['failures']} failed")
+    print(f"  Server: {results['server']}")
+    print(f"💾 Results: {write_results(results, args.output)}")
+    return 0 if results['succeeded'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
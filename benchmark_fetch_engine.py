@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Throughput comparison: curl subprocess per page vs pooled keep-alive fetch engine
+Serves a product-sized page from a local server with simulated latency so the
+numbers reflect client overhead rather than tileshop.com
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fetch_engine import FetchEngine
+from curl_scraper import get_page_with_curl
+
+PAGE_BYTES = 250_000  # Roughly the size of a Tileshop product page
+
+class _ProductPageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.05
+    body = (b'<html><body>' + b'porcelain tile ' * (PAGE_BYTES // 15) + b'</body></html>')
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+def start_server(latency):
+    _ProductPageHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ProductPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_curl(urls):
+    start = time.monotonic()
+    ok = sum(1 for url in urls if get_page_with_curl(url))
+    return ok, time.monotonic() - start
+
+def run_curl_parallel(urls, workers):
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        ok = sum(1 for html in pool.map(get_page_with_curl, urls) if html)
+    return ok, time.monotonic() - start
+
+def run_engine(urls, concurrency):
+    # Politeness budget is opened up here - we are measuring client overhead
+    engine = FetchEngine(per_host_concurrency=concurrency, rate_per_second=10_000, burst=10_000)
+    start = time.monotonic()
+    ok = sum(1 for result in engine.fetch_many(urls, max_workers=concurrency) if result.ok)
+    elapsed = time.monotonic() - start
+    engine.close()
+    return ok, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark curl subprocess vs pooled fetch engine')
+    parser.add_argument('--pages', type=int, default=100, help='Pages to fetch per run')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated server latency in seconds')
+    parser.add_argument('--concurrency', type=int, default=4, help='Per-host concurrency for the pooled engine')
+    args = parser.parse_args()
+
+    server = start_server(args.latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}/products/test-tile-"
+    urls = [f"{base}{100000 + i}" for i in range(args.pages)]
+
+    print(f"📊 Fetch throughput benchmark: {args.pages} pages, {args.latency*1000:.0f}ms latency, {PAGE_BYTES//1000}KB pages")
+    runs = [
+        ('curl subprocess (serial)', lambda: run_curl(urls)),
+        ('pooled engine (1 conn)', lambda: run_engine(urls, 1)),
+        (f'curl subprocess x{args.concurrency} threads', lambda: run_curl_parallel(urls, args.concurrency)),
+        (f'pooled engine ({args.concurrency} conns)', lambda: run_engine(urls, args.concurrency)),
+    ]
+    for label, run in runs:
+        ok, elapsed = run()
+        print(f"  {label:<32} {ok:>4}/{len(urls)} ok  {elapsed:6.2f}s  {ok / elapsed * 60:8.0f} pages/min")
+
+    server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
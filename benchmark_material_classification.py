@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Material classification: LLM-first fallbacks vs the confidence-gated tiers
+Classifies the recorded pages in benchmarks/pages plus a set of installation
+products (sealers, sponges, fasteners, backer boards) three ways: with the
+original extract_material_type flow, with the tiered classifier on an empty
+verdict cache, and again on the warm cache. The LLM is a stand-in answering
+from the prompt's training examples after a fixed delay, so the report shows
+the LLM call rate and per-product latency without an API key.
+"""
+
+import argparse
+import io
+import os
+import re
+import tempfile
+import time
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+
+from enhanced_categorization_system import (EnhancedCategorizer, HARDWARE_TERMS, MATERIAL_PATTERNS,
+                                            is_ambiguous_material)
+from llm_cache import LLMCategoryCache
+from parsed_page import ParsedPage
+from replay_server import load_pages
+
+INSTALLATION_PRODUCTS = [
+    {'title': 'GoBoard Backer Board 4ft x 8ft x 1/2 in', 'description': 'Composite backer board features a built-in waterproof membrane'},
+    {'title': 'Superior Premium Gold Stone Sealer Pint', 'description': 'Professional stone sealer for natural stone protection'},
+    {'title': 'Ardex T-7 Ceramic Tile Sponge', 'description': 'Professional cleaning sponge for tile installation', 'brand': 'Ardex'},
+    {'title': 'Wedi Screw and Washer Fastener Kit', 'description': 'Fastener kit for Wedi board installation'},
+    {'title': 'Marble Polish 16 oz', 'description': 'Restores the shine of polished marble surfaces'},
+    {'title': 'Pro Sealant Clear', 'description': 'Flexible sealant for change of plane joints'},
+    {'title': 'Leveling Clips 1/16 in. - 100 Pack', 'description': 'Lippage control clips'},
+    {'title': 'Carrara Marble Polished Tile - 12x24 in', 'description': 'Natural Carrara marble tiles with polished finish'},
+    {'title': 'Natural Stone Cleaner', 'description': 'pH neutral cleaner for natural stone'},
+    {'title': 'Wedi Fundo Shower Drain Bracket', 'description': 'Mounting bracket for linear drains'},
+]
+
+# Stand-in answers, from the training examples in the material prompt
+LLM_ANSWERS = [('sealer', 'chemical'), ('polish', 'chemical'), ('cleaner', 'chemical'), ('sponge', 'synthetic'),
+               ('sealant', 'silicone'), ('screw', 'metal'), ('bracket', 'metal'), ('clip', 'plastic'),
+               ('goboard', 'polyisocyanurate'), ('wedi', 'polystyrene'), ('marble', 'marble')]
+
+class SimulatedLLM:
+    """Anthropic client stand-in with a fixed per-request delay"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, model, max_tokens, messages, temperature=None):
+        self.requests += 1
+        time.sleep(self.latency)
+        product = messages[0]['content'].split('PRODUCT TO ANALYZE:')[1].split('MATERIAL CATEGORIES')[0].lower()
+        answer = next((material for word, material in LLM_ANSWERS if re.search(rf'\b{word}s?\b', product)), 'unknown')
+        return SimpleNamespace(content=[SimpleNamespace(text=answer)])
+
+def legacy_extract_material_type(categorizer, product_data):
+    """extract_material_type before the confidence-gated tiers"""
+    specs = product_data.get('specifications', {})
+    if isinstance(specs, dict):
+        material_type_field = specs.get('material_type', '').lower()
+        if material_type_field and material_type_field not in ['material', 'material type']:
+            return material_type_field
+        material_field = specs.get('material', '').lower()
+        if material_field and material_field != 'material':
+            for material, keywords in MATERIAL_PATTERNS:
+                if any(keyword in material_field for keyword in keywords):
+                    return material
+    title = product_data.get('title', '').lower()
+    if 'trowel' in title and 'plastic' in title:
+        return 'plastic'
+    if any(term in title for term in HARDWARE_TERMS):
+        llm_material = categorizer._detect_material_with_llm(product_data)
+        if llm_material:
+            return llm_material
+    for text in (title, categorizer._extract_text_content(product_data)):
+        for material, keywords in MATERIAL_PATTERNS:
+            if material == 'marble' and 'marmoreal' in title and text is title:
+                continue
+            if any(keyword in text for keyword in keywords) and not is_ambiguous_material(material, text):
+                return material
+    llm_material = categorizer._detect_material_with_llm(product_data)
+    if llm_material:
+        return categorizer._validate_with_internet_research('material_type', llm_material, product_data)
+    return None
+
+def measure(categorizer, products, classify, rounds):
+    """Seconds per product for material plus category, and the materials found"""
+    materials = {}
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            for product in products:
+                materials[product['title']] = classify(product)
+                categorizer.categorize_product(product)
+    return (time.perf_counter() - start) / (rounds * len(products)), materials
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark LLM-first vs confidence-gated material classification')
+    parser.add_argument('--llm-latency', type=float, default=0.4, help='Simulated seconds per LLM request')
+    parser.add_argument('--rounds', type=int, default=1, help='Passes over the products (a re-crawl after the first)')
+    args = parser.parse_args()
+
+    products = []
+    for body in load_pages().values():
+        product = ParsedPage(body.decode('utf-8')).product_json_ld
+        products.append({'title': product.get('name', ''), 'description': product.get('description', '')})
+    products += INSTALLATION_PRODUCTS
+
+    with redirect_stdout(io.StringIO()):
+        categorizer = EnhancedCategorizer()
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCategoryCache(os.path.join(tmp, 'verdicts.db'))
+        for label, classify in (('LLM-first (before)', lambda p: legacy_extract_material_type(categorizer, p)),
+                                ('tiered, cold cache', categorizer.extract_material_type),
+                                ('tiered, warm cache', categorizer.extract_material_type)):
+            categorizer._anthropic_client = llm = SimulatedLLM(args.llm_latency)
+            categorizer.verdict_cache = cache
+            seconds, materials = measure(categorizer, products, classify, args.rounds)
+            rows.append((label, llm.requests, seconds, materials))
+        cache.close()
+
+    total = len(products) * args.rounds
+    print(f"🧪 {len(products)} products x {args.rounds} rounds, simulated LLM latency {args.llm_latency * 1000:.0f} ms")
+    for label, requests, seconds, _ in rows:
+        print(f"   {label:<20} LLM calls {requests:>3} ({requests / total:5.1%})  {seconds * 1000:7.1f} ms per product")
+    before, after = rows[0][3], rows[1][3]
+    changed = {title: (before[title], after[title]) for title in before if before[title] != after[title]}
+    print(f"   Materials changed: {len(changed)}")
+    for title, (old, new) in changed.items():
+        print(f"     {title}: {old} → {new}")
+    print(f"   Verdict tiers: {dict(categorizer.material_tiers)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Cost of extract_product_data with and without the __NEXT_DATA__ fast path
+Runs the recorded pages in benchmarks/pages through the full extraction
+both ways. Both runs do page detection, the specialized parsers and spec
+extraction; the fast path swaps the color-variation page scan and the
+predictive resource HEAD probes for payload lookups, so most of its saving
+is wall time spent waiting on those probes rather than CPU.
+"""
+
+import argparse
+import io
+import time
+from contextlib import redirect_stdout
+
+from replay_server import load_pages
+
+def measure(tileshop_learner, pages, rounds, fast_path):
+    """CPU and wall seconds per page and the parsing method used for each page"""
+    tileshop_learner.NEXT_DATA_FAST_PATH = fast_path
+    methods = {}
+    start, wall_start = time.process_time(), time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            for url, html in pages:
+                product = tileshop_learner.extract_product_data({'main': {'html': html}}, url)
+                methods[url] = product.get('parsing_method') if product else None
+    count = rounds * len(pages)
+    return (time.process_time() - start) / count, (time.perf_counter() - wall_start) / count, methods
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the __NEXT_DATA__ fast path against legacy extraction')
+    parser.add_argument('--rounds', type=int, default=20, help='Passes over the recorded pages')
+    args = parser.parse_args()
+
+    with redirect_stdout(io.StringIO()):
+        import tileshop_learner
+    pages = [(f"https://www.tileshop.com/products/{stem}", body.decode('utf-8')) for stem, body in load_pages().items()]
+
+    try:
+        legacy, legacy_wall, legacy_methods = measure(tileshop_learner, pages, args.rounds, fast_path=False)
+        fast, fast_wall, fast_methods = measure(tileshop_learner, pages, args.rounds, fast_path=True)
+    finally:
+        tileshop_learner.NEXT_DATA_FAST_PATH = True
+
+    print(f"🧪 {len(pages)} pages x {args.rounds} rounds")
+    print(f"   legacy extraction:   {legacy * 1000:.2f} ms CPU/page, {legacy_wall * 1000:.2f} ms wall/page")
+    print(f"   __NEXT_DATA__ path:  {fast * 1000:.2f} ms CPU/page ({legacy / fast:.1f}x), "
+          f"{fast_wall * 1000:.2f} ms wall/page ({legacy_wall / fast_wall:.1f}x)")
+    for url, _ in pages:
+        print(f"   {url.rsplit('/', 1)[-1][:48]:<48} {legacy_methods[url]} -> {fast_methods[url]}")
+
+if __name__ == "__main__":
+    main()
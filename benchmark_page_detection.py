@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Page structure detection cost: per-type keyword/regex loops vs one DetectionMatcher scan
+Runs PageStructureDetector over the recorded pages in benchmarks/pages
+(optionally padded to full product-page size), once with the original
+per-type scoring - every keyword tested and every regex run over the page
+for each page type - and once through detect_page_structure. The resulting
+PageStructure must be identical.
+"""
+
+import argparse
+import io
+import json
+import re
+import time
+from contextlib import redirect_stdout
+
+from page_structure_detector import PageStructureDetector, PageStructure, PageType
+from parsed_page import ParsedPage
+from replay_server import load_pages
+
+PARSERS = {
+    PageType.TILE: "TilePageParser",
+    PageType.GROUT: "GroutPageParser",
+    PageType.TRIM_MOLDING: "TrimMoldingPageParser",
+    PageType.LUXURY_VINYL: "LuxuryVinylPageParser",
+    PageType.INSTALLATION_TOOL: "InstallationToolPageParser",
+    PageType.UNKNOWN: "DefaultPageParser"
+}
+
+def legacy_score_page_type(detector, content, url, patterns, json_ld_data=None):
+    """_score_page_type before DetectionMatcher"""
+    weights = detector.feature_weights
+    score = 0.0
+    detected_features = {}
+    for field, weight in (("high_confidence", "high_confidence_keywords"),
+                          ("medium_confidence", "medium_confidence_keywords")):
+        keywords = patterns["keywords"][field]
+        matches = [kw for kw in keywords if kw in content or kw in url]
+        if matches:
+            score += len(matches) / len(keywords) * weights[weight]
+            detected_features[weight] = matches
+    measurement_matches = []
+    for pattern in patterns["keywords"]["measurement_patterns"]:
+        matches = re.findall(pattern, content, re.IGNORECASE)
+        if matches:
+            measurement_matches.extend(matches)
+    if measurement_matches:
+        score += min(len(measurement_matches) / 3, 1.0) * weights["measurement_patterns"]
+        detected_features["measurement_patterns"] = measurement_matches[:5]
+    for field in ("pricing_indicators", "specification_keywords"):
+        matches = [kw for kw in patterns[field] if kw in content]
+        if matches:
+            score += len(matches) / len(patterns[field]) * weights[field]
+            detected_features[field] = matches
+    resource_matches = [p for p in patterns["resource_patterns"] if re.search(p, content, re.IGNORECASE)]
+    if resource_matches:
+        score += len(resource_matches) / len(patterns["resource_patterns"]) * weights["resource_patterns"]
+        detected_features["resource_patterns"] = resource_matches
+    if json_ld_data:
+        json_content = json.dumps(json_ld_data).lower()
+        matches = [clue for clue in patterns["json_ld_clues"] if clue in json_content]
+        if matches:
+            score += len(matches) / len(patterns["json_ld_clues"]) * weights["json_ld_clues"]
+            detected_features["json_ld_clues"] = matches
+    return score, detected_features
+
+def legacy_detect(detector, html, url, json_ld_data=None):
+    """detect_page_structure before DetectionMatcher"""
+    content, url = html.lower(), url.lower()
+    scores, features = {}, {}
+    for page_type, patterns in detector.detection_patterns.items():
+        scores[page_type], features[page_type] = legacy_score_page_type(detector, content, url, patterns, json_ld_data)
+    best_type = max(scores, key=scores.get)
+    if scores[best_type] < 0.3:
+        return PageStructure(PageType.UNKNOWN, 0.0, features[best_type], PARSERS[PageType.UNKNOWN])
+    return PageStructure(best_type, min(scores[best_type], 1.0), features[best_type], PARSERS[best_type])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-type detection loops vs one DetectionMatcher scan')
+    parser.add_argument('--rounds', type=int, default=20, help='Passes over the recorded pages')
+    parser.add_argument('--pad-kb', type=int, default=200,
+                        help='Product markup appended to each page to approximate full-size product pages')
+    args = parser.parse_args()
+
+    with redirect_stdout(io.StringIO()):
+        detector = PageStructureDetector()
+    bodies = [body.decode('utf-8') for body in load_pages().values()]
+    filler = ''.join(body.split('<body>', 1)[-1] for body in bodies)
+    padding = filler * (args.pad_kb * 1024 // len(filler)) if args.pad_kb else ''
+    pages = []
+    for stem, body in zip(load_pages(), bodies):
+        html = body.replace('</body>', padding + '</body>')
+        pages.append((html, f"https://www.tileshop.com/products/{stem}", ParsedPage(html).product_json_ld))
+
+    for html, url, json_ld in pages:
+        expected = legacy_detect(detector, html, url, json_ld)
+        actual = detector.detect_page_structure(html, url, json_ld)
+        assert (actual.page_type, actual.detected_features, actual.recommended_parser) == \
+            (expected.page_type, expected.detected_features, expected.recommended_parser), url
+        assert abs(actual.confidence - expected.confidence) < 1e-12, url
+
+    timings = []
+    for detect in (lambda h, u, j: legacy_detect(detector, h, u, j), detector.detect_page_structure):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for html, url, json_ld in pages:
+                detect(html, url, json_ld)
+        timings.append((time.perf_counter() - start) / (args.rounds * len(pages)))
+
+    legacy, matcher = timings
+    print(f"🧪 {len(pages)} pages (~{len(pages[0][0]) // 1024} KB each) x {args.rounds} rounds - page structures identical")
+    print(f"   per-type loops:   {legacy * 1000:.2f} ms per page")
+    print(f"   DetectionMatcher: {matcher * 1000:.2f} ms per page ({legacy / matcher:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+CPU cost per page: every stage re-parsing the HTML vs one shared ParsedPage
+Runs page structure detection, the specialized parser, specification
+extraction and the JSON-LD pass over the recorded pages in benchmarks/pages,
+once with raw HTML strings (each stage lowercases and decodes on its own) and
+once with a single ParsedPage handed to every stage.
+"""
+
+import argparse
+import io
+import json
+import re
+import time
+from contextlib import redirect_stdout
+
+from parsed_page import ParsedPage
+from page_structure_detector import PageStructureDetector
+from specialized_parsers import get_parser_for_page_type
+from enhanced_specification_extractor import EnhancedSpecificationExtractor
+from replay_server import load_pages
+
+JSON_LD_PATTERN = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
+
+def run_separate(html, url, detector, spec_extractor):
+    """Pre-ParsedPage pipeline: every stage works from the raw string"""
+    structure = detector.detect_page_structure(html, url)
+    parser = get_parser_for_page_type(structure.page_type)
+    product = parser.parse_product_data(html, url, parser._extract_json_ld_data(html))
+    specs = spec_extractor.extract_specifications(html, product.get('category') or 'tile')
+    for raw in re.findall(JSON_LD_PATTERN, html, re.IGNORECASE | re.DOTALL):
+        try:
+            json.loads(raw.strip())
+        except json.JSONDecodeError:
+            pass
+    return product, specs
+
+def run_shared(html, url, detector, spec_extractor):
+    """Shared pipeline: one ParsedPage for every stage"""
+    page = ParsedPage(html, url)
+    structure = detector.detect_page_structure(html, url, page=page)
+    parser = get_parser_for_page_type(structure.page_type)
+    product = parser.parse_product_data(html, url, page.product_json_ld, page=page)
+    specs = spec_extractor.extract_specifications(html, product.get('category') or 'tile', page=page)
+    page.json_ld_blocks
+    return product, specs
+
+def measure(pipeline, pages, rounds, detector, spec_extractor):
+    """CPU seconds per page for one pipeline"""
+    start = time.process_time()
+    with redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            for url, html in pages:
+                pipeline(html, url, detector, spec_extractor)
+    return (time.process_time() - start) / (rounds * len(pages))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-stage re-parsing vs a shared ParsedPage')
+    parser.add_argument('--rounds', type=int, default=20, help='Passes over the recorded pages')
+    parser.add_argument('--pad-kb', type=int, default=0,
+                        help='Markup appended to each page to approximate full-size product pages')
+    args = parser.parse_args()
+
+    padding = '<div class="footer-link">Shop tile, stone and installation materials</div>\n'
+    padding = padding * (args.pad_kb * 1024 // len(padding)) if args.pad_kb else ''
+    pages = [(f"https://www.tileshop.com/products/{stem}", body.decode('utf-8').replace('</body>', padding + '</body>'))
+             for stem, body in load_pages().items()]
+
+    with redirect_stdout(io.StringIO()):
+        detector = PageStructureDetector()
+        spec_extractor = EnhancedSpecificationExtractor()
+
+    print(f"🧪 {len(pages)} pages x {args.rounds} rounds (avg {sum(len(h) for _, h in pages) // len(pages) // 1024} KB)")
+    separate = measure(run_separate, pages, args.rounds, detector, spec_extractor)
+    shared = measure(run_shared, pages, args.rounds, detector, spec_extractor)
+    print(f"   separate parsing: {separate * 1000:.2f} ms CPU/page")
+    print(f"   shared page:      {shared * 1000:.2f} ms CPU/page")
+    print(f"   speedup:          {separate / shared:.2f}x" if shared else "")
+
+if __name__ == "__main__":
+    main()
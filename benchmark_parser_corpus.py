@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Golden-corpus accuracy and speed for the specialized and category parsers
+Runs every parser in specialized_parsers and category_parsers over the saved
+product pages of its family (benchmarks/pages plus benchmarks/golden/pages)
+and compares each output field with benchmarks/golden/expected.json. Reports
+field-level accuracy and pages/sec per parser and exits non-zero when any
+field differs, so a parser speedup can be shown to change no extraction.
+
+Expected fields are hand-verified against each page, not a snapshot of
+parser output. Where a parser is known to get a field wrong, the page's
+"known_wrong" entry records the wrong value the parser returns today: the
+field counts against accuracy but does not fail the run, and a marker whose
+field has since been fixed does. None, "", [], {} and "... not specified"
+mean the parser found nothing and are recorded as such; known_wrong is for
+values that contradict the page.
+
+benchmarks/pages and the first golden pages are small hand-written fixtures
+that follow the tileshop.com payload shape the extractors read (a
+__NEXT_DATA__ productData.Specifications dict keyed by PDPInfo_* group).
+Real pages are added from the page cache with --import-cache, which files
+each cached product page under its detected family. --update then records
+the current parser output for pages without expected fields, marked
+"verified": false until someone checks them against the page; entries
+already in expected.json are never overwritten.
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+from contextlib import redirect_stdout
+
+from category_parsers import TileParser, GroutParser, TrimParser
+from page_structure_detector import PageStructureDetector, PageType
+from parsed_page import ParsedPage
+from replay_server import PAGES_DIR, load_pages, page_category
+from specialized_parsers import (TilePageParser, GroutPageParser, TrimMoldingPageParser, LuxuryVinylPageParser,
+                                 InstallationToolPageParser, DefaultPageParser)
+
+# Configuration
+BENCHMARKS_DIR = os.path.dirname(PAGES_DIR)
+GOLDEN_PAGES_DIR = os.path.join(BENCHMARKS_DIR, 'golden', 'pages')
+EXPECTED_PATH = os.path.join(BENCHMARKS_DIR, 'golden', 'expected.json')
+CANONICAL_PATTERN = re.compile(r'<link rel="canonical" href="([^"]+)"')
+
+# Page family (stem prefix) for each detected page type when importing cached pages
+PAGE_TYPE_FAMILIES = {
+    PageType.TILE: 'tile',
+    PageType.GROUT: 'grout',
+    PageType.TRIM_MOLDING: 'trim',
+    PageType.LUXURY_VINYL: 'lvp',
+    PageType.INSTALLATION_TOOL: 'tool',
+    PageType.UNKNOWN: 'other',
+}
+
+# Parsers run on each page family (the page stem's prefix)
+FAMILY_PARSERS = {
+    'tile': ('TilePageParser', 'TileParser'),
+    'grout': ('GroutPageParser', 'GroutParser'),
+    'trim': ('TrimMoldingPageParser', 'TrimParser'),
+    'lvp': ('LuxuryVinylPageParser',),
+    'tool': ('InstallationToolPageParser',),
+    'other': ('DefaultPageParser',),
+}
+
+def build_parsers():
+    """Parser name -> function(html, url) returning the parsed product, called the way tileshop_learner does"""
+    parsers = {}
+    for parser in (TilePageParser(), GroutPageParser(), TrimMoldingPageParser(), LuxuryVinylPageParser(),
+                   InstallationToolPageParser(), DefaultPageParser()):
+        def specialized(html, url, parser=parser):
+            page = ParsedPage(html, url)
+            return parser.parse_product_data(html, url, page.product_json_ld, page=page)
+        parsers[parser.__class__.__name__] = specialized
+    for parser in (TileParser(), GroutParser(), TrimParser()):
+        parsers[parser.__class__.__name__] = parser.parse_product_data
+    return parsers
+
+def load_corpus(dirs=(PAGES_DIR, GOLDEN_PAGES_DIR)):
+    """[(key, url, html)] for every saved page; key is the page path relative to benchmarks/"""
+    corpus = []
+    for pages_dir in dirs:
+        for stem, body in load_pages(pages_dir).items():
+            html = body.decode('utf-8')
+            canonical = CANONICAL_PATTERN.search(html)
+            url = canonical.group(1) if canonical else f"https://www.tileshop.com/products/{stem}"
+            key = os.path.relpath(os.path.join(pages_dir, stem + '.html'), BENCHMARKS_DIR).replace(os.sep, '/')
+            corpus.append((key, url, html))
+    return corpus
+
+def import_cached_pages(cache, url_filter=None, limit=None, pages_dir=GOLDEN_PAGES_DIR):
+    """Copy the newest cached fetch of each product page into the golden corpus; returns the written paths
+
+    Pages are named <family>_<url slug>.html, the family coming from page
+    structure detection. Pages already in the corpus are left as they are.
+    """
+    detector = PageStructureDetector()
+    written = []
+    for url, _, digest in cache.latest_entries(url_filter, limit):
+        html = cache.get(digest)
+        if not html or '/products/' not in url:
+            continue
+        page = ParsedPage(html, url)
+        with redirect_stdout(io.StringIO()):
+            page_type = detector.detect_page_structure(html, url, page.product_json_ld, page=page).page_type
+        slug = re.sub(r'[^a-z0-9]+', '_', url.rstrip('/').rsplit('/', 1)[-1].lower()).strip('_')
+        path = os.path.join(pages_dir, f"{PAGE_TYPE_FAMILIES[page_type]}_{slug}.html")
+        if os.path.exists(path):
+            continue
+        os.makedirs(pages_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        written.append(path)
+    return written
+
+def page_parsers(key):
+    return FAMILY_PARSERS.get(page_category(os.path.basename(key)), ())
+
+def flatten(product, prefix=''):
+    """Field name -> value, with nested dicts such as specifications split into their own fields"""
+    fields = {}
+    for name, value in product.items():
+        if isinstance(value, dict) and value:
+            fields.update(flatten(value, f"{prefix}{name}."))
+        else:
+            fields[prefix + name] = value
+    return fields
+
+def normalize(product):
+    """The parsed product as it reads back from expected.json (tuples become lists and so on)"""
+    return json.loads(json.dumps(product, default=str))
+
+def compare(expected, actual, known_wrong=None):
+    """(matched, [(field, expected, actual)] differences, [fields missing from expected], known wrong, fixed)
+
+    known_wrong maps fields to the wrong value the parser is known to return;
+    returning exactly that value is reported as known wrong rather than as a
+    difference. Known-wrong fields that now match are listed as fixed.
+    """
+    expected, actual, known_wrong = flatten(expected), flatten(normalize(actual)), known_wrong or {}
+    differences, known, fixed = [], [], []
+    for field, value in expected.items():
+        got = actual.get(field)
+        if field in actual and got == value:
+            if field in known_wrong:
+                fixed.append(field)
+        elif field in known_wrong and got == known_wrong[field]:
+            known.append((field, value, got))
+        else:
+            differences.append((field, value, got))
+    new_fields = [field for field in actual if field not in expected]
+    return len(expected) - len(differences) - len(known), differences, new_fields, known, fixed
+
+def parse_quietly(parse, html, url):
+    with redirect_stdout(io.StringIO()):
+        return parse(html, url)
+
+def record(corpus, parsers=None, expected=None):
+    """expected plus unverified fields from the current parsers for every page and parser it lacks"""
+    parsers = parsers or build_parsers()
+    recorded = json.loads(json.dumps(expected or {}))
+    for key, url, html in corpus:
+        entry = recorded.setdefault(key, {'url': url, 'verified': False, 'parsers': {}})
+        for name in page_parsers(key):
+            if name not in entry['parsers']:
+                entry['parsers'][name] = normalize(parse_quietly(parsers[name], html, url))
+                entry['verified'] = False
+    return recorded
+
+def run_corpus(corpus, expected, rounds=20, parsers=None):
+    """Per-parser field accuracy against expected and pages/sec over rounds passes"""
+    parsers = parsers or build_parsers()
+    results = {name: {'pages': 0, 'fields': 0, 'matched': 0, 'differences': [], 'new_fields': [],
+                      'known_wrong': [], 'fixed': []} for name in parsers}
+    workload = {name: [] for name in parsers}
+    unrecorded, unverified = [], []
+    for key, url, html in corpus:
+        entry = expected.get(key, {})
+        golden = entry.get('parsers', {})
+        if entry and not entry.get('verified', False):
+            unverified.append(key)
+        for name in page_parsers(key):
+            if name not in golden:
+                unrecorded.append(f"{key} {name}")
+                continue
+            matched, differences, new_fields, known, fixed = compare(
+                golden[name], parse_quietly(parsers[name], html, url), entry.get('known_wrong', {}).get(name))
+            summary = results[name]
+            summary['pages'] += 1
+            summary['fields'] += matched + len(differences) + len(known)
+            summary['matched'] += matched
+            summary['differences'] += [{'page': key, 'field': field, 'expected': want, 'actual': got}
+                                       for field, want, got in differences]
+            summary['known_wrong'] += [{'page': key, 'field': field, 'expected': want, 'actual': got}
+                                       for field, want, got in known]
+            summary['new_fields'] += [f"{key} {field}" for field in new_fields]
+            summary['fixed'] += [f"{key} {field}" for field in fixed]
+            workload[name].append((html, url))
+
+    for name, pages in workload.items():
+        summary = results[name]
+        summary['accuracy'] = summary['matched'] / summary['fields'] if summary['fields'] else None
+        summary['pages_per_second'] = 0.0
+        if pages:
+            parse = parsers[name]
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    for html, url in pages:
+                        parse(html, url)
+                summary['pages_per_second'] = len(pages) * rounds / (time.perf_counter() - start)
+
+    fields = sum(summary['fields'] for summary in results.values())
+    matched = sum(summary['matched'] for summary in results.values())
+    known_wrong = sum(len(summary['known_wrong']) for summary in results.values())
+    fixed = sum(len(summary['fixed']) for summary in results.values())
+    return {'pages': len(corpus), 'rounds': rounds, 'parsers': results, 'unrecorded': unrecorded,
+            'unverified': unverified, 'known_wrong': known_wrong,
+            'accuracy': matched / fields if fields else None,
+            'passed': matched + known_wrong == fields and not fixed and not unrecorded}
+
+def load_expected(path=EXPECTED_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_expected(expected, path=EXPECTED_PATH):
+    with open(path, 'w') as f:
+        json.dump(expected, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return path
+
+def print_report(results):
+    print(f"🧪 {results['pages']} golden pages x {results['rounds']} rounds")
+    print(f"   {'parser':<28} {'pages':>5} {'fields':>7} {'accuracy':>9} {'pages/sec':>10}")
+    for name, summary in results['parsers'].items():
+        if not summary['pages']:
+            continue
+        print(f"   {name:<28} {summary['pages']:>5} {summary['fields']:>7} {summary['accuracy']:>9.1%} "
+              f"{summary['pages_per_second']:>10.0f}")
+        for difference in summary['differences']:
+            print(f"     ❌ {difference['page']} {difference['field']}: "
+                  f"expected {difference['expected']!r}, got {difference['actual']!r}")
+        for known in summary['known_wrong']:
+            print(f"     ⚠️ {known['page']} {known['field']}: known wrong, "
+                  f"got {known['actual']!r} instead of {known['expected']!r}")
+        for field in summary['fixed']:
+            print(f"     🎉 {field} is now correct - remove it from known_wrong")
+        for field in summary['new_fields']:
+            print(f"     ➕ {field} (not in expected.json)")
+    for missing in results['unrecorded']:
+        print(f"   ⚠️ No expected fields for {missing} - run with --update")
+    for key in results['unverified']:
+        print(f"   ⚠️ {key} was recorded from parser output and is not hand-verified yet")
+    if results['passed']:
+        print(f"✅ All fields match or are known wrong ({results['accuracy']:.1%} correct, "
+              f"{results['known_wrong']} known wrong)")
+    else:
+        print("❌ Extraction differs from the golden corpus")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parser accuracy and speed on the golden page corpus')
+    parser.add_argument('--rounds', type=int, default=20, help='Timed passes over each parser\'s pages')
+    parser.add_argument('--update', action='store_true',
+                        help='Record unverified expected fields for pages missing from expected.json')
+    parser.add_argument('--import-cache', action='store_true',
+                        help='Add the newest cached page of each product (page_cache) to the golden corpus')
+    parser.add_argument('--match', default=None, help='With --import-cache: only URLs containing this text')
+    parser.add_argument('--limit', type=int, default=None, help='With --import-cache: at most this many URLs')
+    parser.add_argument('--expected', default=EXPECTED_PATH, help='Expected fields JSON path')
+    parser.add_argument('--output', default=None, help='Write the results JSON here')
+    args = parser.parse_args()
+
+    if args.import_cache:
+        from page_cache import get_page_cache
+        written = import_cached_pages(get_page_cache(), args.match, args.limit)
+        print(f"📥 Imported {len(written)} cached pages into {os.path.relpath(GOLDEN_PAGES_DIR)}")
+        for path in written:
+            print(f"   {os.path.basename(path)}")
+
+    corpus = load_corpus()
+    if args.update:
+        expected = load_expected(args.expected)
+        recorded = record(corpus, expected=expected)
+        path = write_expected(recorded, args.expected)
+        print(f"💾 Recorded expected fields for {len(set(recorded) - set(expected))} new pages in {path}")
+    results = run_corpus(corpus, load_expected(args.expected), args.rounds)
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if results['passed'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
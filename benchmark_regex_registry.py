@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Field-fallback regex cost: sequential re.search per pattern vs registry chains
+Every chain registered by the extractors is run over the recorded pages in
+benchmarks/pages (raw and lowercased), once the old way - re.search with the
+pattern string, one pattern at a time - and once through PatternChain.first
+with its literal pre-checks. Results must agree.
+
+The chains are also merged into one named-group alternation per chain and
+scanned once per page, the design the registry was first meant to use. That
+scan is timed and its disagreements are counted. An alternation returns the
+leftmost match of any member, so a lower-ranked pattern that matches earlier
+in the page hides the preferred one.
+"""
+
+import argparse
+import io
+import re
+import time
+from contextlib import redirect_stdout
+
+from regex_registry import get_regex_registry
+from replay_server import load_pages
+
+def sequential_first(chain, text):
+    """The pre-registry loop: each pattern string in turn, first match wins"""
+    for i, member in enumerate(chain.members):
+        match = re.search(member.pattern, text, member.regex.flags)
+        if match:
+            return i, match.groups()
+    return None
+
+def chain_first(chain, text):
+    match = chain.first(text)
+    return (chain.rank(match), match.groups()) if match else None
+
+def merged_regex(chain):
+    """One alternation over the chain's patterns, member i wrapped in group p<i>"""
+    flags = chain.members[0].regex.flags if chain.members else 0
+    return re.compile('|'.join(f'(?P<p{i}>{member.pattern})' for i, member in enumerate(chain.members)), flags)
+
+def merged_first(merged, text):
+    """Single scan: best-ranked member among the alternation's matches
+
+    Each member's groups are sliced back out of the combined group list.
+    """
+    best = None
+    for match in merged.finditer(text):
+        rank = int(match.lastgroup[1:])
+        if best is None or rank < best[0]:
+            start = merged.groupindex[match.lastgroup]
+            end = merged.groupindex.get(f'p{rank + 1}', merged.groups + 1)
+            best = (rank, match.groups()[start:end - 1])
+            if rank == 0:
+                break
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sequential fallback regexes vs registry chains')
+    parser.add_argument('--rounds', type=int, default=50, help='Passes over the recorded pages')
+    parser.add_argument('--pad-kb', type=int, default=0,
+                        help='Markup appended to each page to approximate full-size product pages')
+    parser.add_argument('--top', type=int, default=10, help='Chains to list, largest saving first')
+    args = parser.parse_args()
+
+    pages = load_pages()
+
+    # Instantiating the extractors registers their chains; extract_product_data registers its own on first use
+    with redirect_stdout(io.StringIO()):
+        from enhanced_specification_extractor import EnhancedSpecificationExtractor
+        from specialized_parsers import get_parser_for_page_type
+        from page_structure_detector import PageType
+        from tileshop_learner import extract_product_data
+        EnhancedSpecificationExtractor()
+        for page_type in PageType:
+            get_parser_for_page_type(page_type)
+        for stem, body in pages.items():
+            extract_product_data({'main': {'html': body.decode('utf-8')}}, f"https://www.tileshop.com/products/{stem}")
+    registry = get_regex_registry()
+    chains = registry.chains()
+
+    padding = '<div class="footer-link">Shop tile, stone and installation materials</div>\n'
+    padding = padding * (args.pad_kb * 1024 // len(padding)) if args.pad_kb else ''
+    texts = []
+    for body in pages.values():
+        html = body.decode('utf-8').replace('</body>', padding + '</body>')
+        texts += [html, html.lower()]
+
+    merged = {chain.name: merged_regex(chain) for chain in chains}
+    disagreements = 0
+    for chain in chains:
+        for text in texts:
+            expected = sequential_first(chain, text)
+            assert expected == chain_first(chain, text), f"{chain.name} disagrees"
+            disagreements += merged_first(merged[chain.name], text) != expected
+
+    rows = []
+    for chain in chains:
+        timings = []
+        runs = (lambda text: sequential_first(chain, text), lambda text: chain_first(chain, text),
+                lambda text: merged_first(merged[chain.name], text))
+        for run in runs:
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                for text in texts:
+                    run(text)
+            timings.append((time.perf_counter() - start) / (args.rounds * len(texts)))
+        rows.append((chain.name, len(chain.members), sum(1 for m in chain.members if m.literal), *timings))
+
+    sequential = sum(row[3] for row in rows)
+    chained = sum(row[4] for row in rows)
+    single_scan = sum(row[5] for row in rows)
+    print(f"🧪 {len(chains)} chains over {len(texts)} documents x {args.rounds} rounds - chain results identical")
+    print(f"   sequential re.search: {sequential * 1e6:,.0f} µs per document")
+    print(f"   registry chains:      {chained * 1e6:,.0f} µs per document ({sequential / chained:.2f}x)")
+    print(f"   merged alternation:   {single_scan * 1e6:,.0f} µs per document ({sequential / single_scan:.2f}x), "
+          f"{disagreements} of {len(chains) * len(texts)} results differ")
+    print(f"\n   {'chain':<44} {'checked':>7} {'seq µs':>9} {'chain µs':>9} {'merged µs':>10}")
+    for name, size, checked, seq, chained, single in sorted(rows, key=lambda r: r[3] - r[4], reverse=True)[:args.top]:
+        print(f"   {name:<44} {f'{checked}/{size}':>7} {seq * 1e6:>9.1f} {chained * 1e6:>9.1f} {single * 1e6:>10.1f}")
+    print("\n   'checked' = patterns with a required literal pre-checked by substring search")
+
+if __name__ == "__main__":
+    main()
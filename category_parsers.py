@@ -294,8 +294,10 @@ class GroutParser(CategoryParser):
         
         grout_types = ['sanded', 'unsanded', 'epoxy', 'urethane', 'acrylic']
         
+        content_lower = html_content.lower()
         for grout_type in grout_types:
-            if grout_type in html_content.lower():
+            # Whole words, so "unsanded" is not read as "sanded"
+            if re.search(rf'\b{grout_type}\b', content_lower):
                 return grout_type.title()
         
         return "Grout type not specified"
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Sitemap-derived color variation index for Tileshop products
+Maps each product slug's base pattern (slug minus color words and SKU) to its
+sibling SKUs/URLs, so variation lookup is a dictionary hit instead of regex
+work on every page. Stored next to the URL frontier and updated from each
+sitemap delta; a full sitemap replacement triggers a rebuild.
+"""
+
+import re
+import sys
+import threading
+
+from url_frontier import get_frontier
+
+# Color words as they appear in Tileshop slugs
+COLOR_WORDS = {
+    'cloudy', 'milk', 'white', 'black', 'grey', 'gray', 'blue', 'green',
+    'brown', 'beige', 'cream', 'ivory', 'charcoal', 'slate', 'navy',
+    'fresh', 'light', 'dark', 'bright', 'natural', 'sand', 'stone',
+    'pearl', 'silver', 'gold', 'copper', 'bronze', 'honey', 'caramel',
+    'sage', 'mint', 'coral', 'rust', 'taupe', 'ash', 'smoke', 'fog',
+    'moss', 'sky', 'ocean', 'forest', 'rose', 'sunset', 'dawn'
+}
+WILDCARD = '*'
+INDEX_MARKER_KEY = 'color_index_downloaded_at'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS color_variations (
+    url TEXT PRIMARY KEY,
+    sku TEXT,
+    color TEXT NOT NULL,
+    modifier TEXT,
+    pattern TEXT NOT NULL,
+    loose_pattern TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_color_variations_pattern ON color_variations(pattern);
+"""
+
+_SLUG_RE = re.compile(r'/products/([^/?#]+)')
+
+def parse_product_slug(url):
+    """(pattern, loose_pattern, color, modifier, sku) for a product URL, or None without a color word
+
+    pattern replaces the run of color words with '*'. loose_pattern also
+    folds in the word before the run, so "aegean-blue" pairs with "white":
+    laura-park-bespoke-aegean-*-ceramic  ->  laura-park-bespoke-*-ceramic
+    """
+    match = _SLUG_RE.search(url or '')
+    if not match:
+        return None
+    parts = match.group(1).lower().split('-')
+    sku = parts.pop() if parts and parts[-1].isdigit() else None
+
+    start = next((i for i, part in enumerate(parts) if part in COLOR_WORDS), None)
+    if start is None:
+        return None
+    end = start
+    while end < len(parts) and parts[end] in COLOR_WORDS:
+        end += 1
+
+    color = '-'.join(parts[start:end])
+    pattern = '-'.join(parts[:start] + [WILDCARD] + parts[end:])
+    modifier = parts[start - 1] if start > 0 else None
+    loose_pattern = '-'.join(parts[:start - 1] + [WILDCARD] + parts[end:]) if modifier else None
+    return pattern, loose_pattern, color, modifier, sku
+
+def _display_color(color):
+    return color.replace('-', ' ').title()
+
+class ColorVariationIndex:
+    """In-memory pattern -> members maps, persisted in the frontier database"""
+
+    def __init__(self, frontier=None):
+        self.frontier = frontier or get_frontier()
+        self._lock = threading.RLock()
+        with self.frontier._lock, self.frontier.conn:
+            self.frontier.conn.executescript(SCHEMA)
+        self.entries = {}       # url -> (pattern, loose_pattern, color, modifier, sku)
+        self.by_pattern = {}    # pattern -> {url}
+        self.by_loose = {}      # loose_pattern -> {url}
+        self._load()
+
+    # --- Maintenance ----------------------------------------------------
+
+    def _add_entry(self, url, entry):
+        pattern, loose_pattern = entry[0], entry[1]
+        self.entries[url] = entry
+        self.by_pattern.setdefault(pattern, set()).add(url)
+        if loose_pattern:
+            self.by_loose.setdefault(loose_pattern, set()).add(url)
+
+    def _remove_entry(self, url):
+        entry = self.entries.pop(url, None)
+        if not entry:
+            return
+        for mapping, key in ((self.by_pattern, entry[0]), (self.by_loose, entry[1])):
+            members = mapping.get(key)
+            if members is not None:
+                members.discard(url)
+                if not members:
+                    del mapping[key]
+
+    def _load(self):
+        """Load the stored index, rebuilding it when the frontier was replaced wholesale"""
+        if self.frontier.get_meta(INDEX_MARKER_KEY) != self.frontier.get_meta('downloaded_at'):
+            self.rebuild()
+            return
+        rows = self.frontier._query('SELECT url, pattern, loose_pattern, color, modifier, sku FROM color_variations')
+        with self._lock:
+            for row in rows:
+                self._add_entry(row['url'], tuple(row)[1:])
+
+    def _store(self, added, removed):
+        with self.frontier._lock, self.frontier.conn:
+            conn = self.frontier.conn
+            conn.executemany('DELETE FROM color_variations WHERE url = ?', [(url,) for url in removed])
+            conn.executemany(
+                'INSERT OR REPLACE INTO color_variations(url, pattern, loose_pattern, color, modifier, sku) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(url,) + entry for url, entry in added])
+            conn.execute('INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)',
+                         (INDEX_MARKER_KEY, self.frontier.get_meta('downloaded_at')))
+
+    def rebuild(self):
+        """Re-derive the index from every frontier URL; returns the number of indexed products"""
+        urls = [row['url'] for row in self.frontier._query('SELECT url FROM urls')]
+        with self._lock:
+            self.entries, self.by_pattern, self.by_loose = {}, {}, {}
+            added = []
+            for url in urls:
+                entry = parse_product_slug(url)
+                if entry:
+                    self._add_entry(url, entry)
+                    added.append((url, entry))
+            with self.frontier._lock, self.frontier.conn:
+                self.frontier.conn.execute('DELETE FROM color_variations')
+            self._store(added, [])
+        print(f"🎨 Color variation index rebuilt: {len(self.entries):,} products in {len(self.by_pattern):,} patterns")
+        return len(self.entries)
+
+    def apply_diff(self, added_urls, removed_urls):
+        """Update the index with a sitemap delta (lastmod changes keep their slug)"""
+        with self._lock:
+            for url in removed_urls:
+                self._remove_entry(url)
+            added = []
+            for url in added_urls:
+                entry = parse_product_slug(url)
+                if entry:
+                    self._add_entry(url, entry)
+                    added.append((url, entry))
+            self._store(added, removed_urls)
+        return len(added)
+
+    # --- Lookup ---------------------------------------------------------
+
+    def family_key(self, url):
+        """Stable group key shared by every color of a product, or None"""
+        entry = self.entries.get(url) or parse_product_slug(url)
+        if not entry:
+            return None
+        pattern, loose_pattern = entry[0], entry[1]
+        # A modifier variant ("aegean-blue") joins the plain family when one exists
+        if loose_pattern and loose_pattern in self.by_pattern:
+            return loose_pattern
+        return pattern
+
+    def find_variations(self, url):
+        """Sibling colors of a product as [{'color', 'sku', 'url'}], excluding the product itself"""
+        entry = self.entries.get(url) or parse_product_slug(url)
+        if not entry:
+            return []
+        pattern, loose_pattern = entry[0], entry[1]
+        with self._lock:
+            siblings = {}
+            for sibling in self.by_pattern.get(pattern, ()):
+                siblings[sibling] = self.entries[sibling][2]
+            for sibling in self.by_pattern.get(loose_pattern, ()) if loose_pattern else ():
+                siblings[sibling] = self.entries[sibling][2]
+            for sibling in self.by_loose.get(pattern, ()):
+                # Their extra word is part of the color name ("Aegean Blue")
+                siblings[sibling] = f"{self.entries[sibling][3]}-{self.entries[sibling][2]}"
+        siblings.pop(url, None)
+        return [{'color': _display_color(color), 'sku': self.entries[sibling][4], 'url': sibling}
+                for sibling, color in sorted(siblings.items())]
+
+    def statistics(self):
+        families = [members for members in self.by_pattern.values() if len(members) > 1]
+        return {
+            'indexed_products': len(self.entries),
+            'patterns': len(self.by_pattern),
+            'families': len(families),
+            'products_with_siblings': sum(len(members) for members in families)
+        }
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_color_variation_index(frontier=None):
+    """Shared index per frontier database"""
+    frontier = frontier or get_frontier()
+    with _indexes_lock:
+        if frontier.db_path not in _indexes:
+            _indexes[frontier.db_path] = ColorVariationIndex(frontier)
+        return _indexes[frontier.db_path]
+
+if __name__ == "__main__":
+    index = get_color_variation_index()
+    if len(sys.argv) > 1 and sys.argv[1] == 'rebuild':
+        index.rebuild()
+    elif len(sys.argv) > 1:
+        for variation in index.find_variations(sys.argv[1]):
+            print(f"  {variation['color']:<20} {variation['sku']}  {variation['url']}")
+    print(f"📊 {index.statistics()}")
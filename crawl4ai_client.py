@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Batched, non-blocking Crawl4AI client for Tileshop acquisition
+Submits many URLs per /crawl request, polls every outstanding /task/{id}
+concurrently with exponential backoff, and yields each page as soon as its
+task completes so extraction runs while other pages are still rendering.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from rate_controller import get_rate_controller
+
+# Configuration
+CRAWL4AI_URL = "http://localhost:11235"
+CRAWL4AI_TOKEN = "tileshop"
+DEFAULT_BATCH_SIZE = 10        # URLs per /crawl request
+DEFAULT_MAX_IN_FLIGHT = 4      # Outstanding tasks polled concurrently
+POLL_INITIAL = 1.0             # First status check after submission (seconds)
+POLL_MAX = 8.0                 # Backoff ceiling between checks of one task
+POLL_BACKOFF = 2.0
+DEFAULT_TASK_TIMEOUT = 120     # Give up on a task after this long
+SUBMIT_TIMEOUT = 60
+STATUS_TIMEOUT = 10
+
+# Render settings used by acquisition - fast, but keeps script tags for JSON-LD specs
+DEFAULT_CRAWL_CONFIG = {
+    "formats": ["html", "markdown"],
+    "javascript": True,
+    "wait_time": 8,
+    "page_timeout": 30000,
+    "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "exclude_tags": ["style", "nav", "footer", "header", "aside"]
+}
+
+@dataclass
+class CrawlTask:
+    """One /crawl submission and its polling state"""
+    urls: List[str]
+    task_id: Optional[str] = None
+    submitted_at: float = 0.0
+    next_poll: float = 0.0
+    poll_delay: float = POLL_INITIAL
+    attempts: int = 0
+    timeout: float = DEFAULT_TASK_TIMEOUT
+    results: Dict[str, Tuple[Optional[dict], Optional[str]]] = field(default_factory=dict)
+
+def _match_results(urls, results):
+    """Map Crawl4AI results back to the submitted URLs
+
+    Results carry their URL, but the server may normalise it (fragments,
+    trailing slashes), so fall back to submission order.
+    """
+    results = [r for r in (results or []) if r]
+    by_url = {r.get('url'): r for r in results if r.get('url')}
+    matched = {}
+    for position, url in enumerate(urls):
+        result = by_url.get(url)
+        if result is None and position < len(results):
+            result = results[position]
+        matched[url] = (result, None) if result else (None, "No results returned")
+    return matched
+
+class Crawl4AIClient:
+    """Submits URL batches to Crawl4AI and streams back completed pages"""
+
+    def __init__(self, base_url=CRAWL4AI_URL, token=CRAWL4AI_TOKEN, batch_size=DEFAULT_BATCH_SIZE,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, poll_initial=POLL_INITIAL, poll_max=POLL_MAX,
+                 task_timeout=DEFAULT_TASK_TIMEOUT, rate_controller=None, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.task_timeout = task_timeout
+        self.rate_controller = rate_controller
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json'
+        })
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='crawl4ai-poll')
+
+    def submit(self, urls, config=None, progress_callback=None, task_timeout=None):
+        """POST one batch; returns a CrawlTask (results filled in when the server answered synchronously)"""
+        urls = list(urls)
+        task = CrawlTask(urls=urls, poll_delay=self.poll_initial, timeout=task_timeout or self.task_timeout)
+        if self.rate_controller:
+            # The render server fetches each URL from tileshop.com - pace them like direct fetches
+            for _ in urls:
+                self.rate_controller.wait()
+
+        payload = dict(config or DEFAULT_CRAWL_CONFIG)
+        payload['urls'] = urls
+        task.submitted_at = time.time()
+        try:
+            response = self.session.post(f"{self.base_url}/crawl", json=payload, timeout=SUBMIT_TIMEOUT)
+        except requests.RequestException as e:
+            return self._fail(task, f"Network error: {e}", 'submission')
+        if response.status_code != 200:
+            return self._fail(task, f"HTTP {response.status_code}", 'submission')
+
+        try:
+            data = response.json()
+        except ValueError:
+            return self._fail(task, "Invalid JSON in crawl response", 'submission')
+        submit_time = time.time() - task.submitted_at
+        if data.get('results') and data.get('success', True):
+            # Synchronous mode - results returned immediately
+            task.results = _match_results(urls, data['results'])
+            return task
+
+        task.task_id = data.get('task_id')
+        if not task.task_id:
+            return self._fail(task, "No task_id returned and no immediate results", 'submission')
+        task.next_poll = time.time() + task.poll_delay
+        task.poll_delay = min(task.poll_delay * POLL_BACKOFF, self.poll_max)
+        print(f"  📋 Task submitted: {task.task_id} ({len(urls)} URLs, {submit_time:.2f}s)")
+        if progress_callback:
+            progress_callback('crawl_submitted', {'urls': urls, 'task_id': task.task_id, 'submit_time': submit_time})
+        return task
+
+    def poll(self, task, progress_callback=None):
+        """Check one task once; fills task.results when it finished, otherwise backs off"""
+        task.attempts += 1
+        elapsed = time.time() - task.submitted_at
+        try:
+            response = self.session.get(f"{self.base_url}/task/{task.task_id}", timeout=STATUS_TIMEOUT)
+            data = response.json() if response.status_code == 200 else {}
+        except (requests.RequestException, ValueError) as e:
+            print(f"  ⚠ Status check #{task.attempts} for {task.task_id} failed: {e}")
+            data = {}
+
+        status = data.get('status')
+        if progress_callback and status:
+            progress_callback('crawl_status', {'urls': task.urls, 'task_id': task.task_id, 'status': status,
+                                               'attempt': task.attempts, 'elapsed': elapsed})
+        if status == 'completed':
+            task.results = _match_results(task.urls, data.get('results'))
+        elif status == 'failed':
+            self._fail(task, data.get('error', 'Unknown crawl error'), 'processing')
+        elif elapsed > task.timeout:
+            error_msg = f"Crawl timeout after {task.attempts} attempts ({elapsed:.0f}s)"
+            if progress_callback:
+                progress_callback('crawl_timeout', {'urls': task.urls, 'task_id': task.task_id,
+                                                    'attempts': task.attempts})
+            self._fail(task, error_msg, 'timeout')
+        else:
+            task.next_poll = time.time() + task.poll_delay
+            task.poll_delay = min(task.poll_delay * POLL_BACKOFF, self.poll_max)
+        return task
+
+    def run(self, jobs, progress_callback=None, task_timeout=None):
+        """Yield (url, result, error) for (urls, config) jobs in completion order
+
+        At most max_in_flight tasks are outstanding; a new batch is submitted
+        as soon as one finishes, so rendering and extraction overlap.
+        """
+        jobs = iter(jobs)
+        pending = []
+        exhausted = False
+
+        while True:
+            while not exhausted and len(pending) < self.max_in_flight:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                urls, config = job
+                task = self.submit(urls, config, progress_callback, task_timeout)
+                if task.results:
+                    yield from self._finish(task, progress_callback)
+                else:
+                    pending.append(task)
+            if not pending:
+                if exhausted:
+                    return
+                continue
+
+            # Sleep only until the earliest task is due, then check every due task at once
+            wait = min(task.next_poll for task in pending) - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            now = time.time()
+            due = [task for task in pending if task.next_poll <= now]
+            for task in self._pool.map(lambda t: self.poll(t, progress_callback), due):
+                if task.results:
+                    pending.remove(task)
+                    yield from self._finish(task, progress_callback)
+
+    def crawl_many(self, urls, config=None, progress_callback=None, task_timeout=None, batch_size=None):
+        """Yield (url, result, error) for every URL, batch_size URLs per /crawl request"""
+        urls = list(urls)
+        size = batch_size or self.batch_size
+        batches = ((urls[i:i + size], config) for i in range(0, len(urls), size))
+        return self.run(batches, progress_callback, task_timeout)
+
+    def _finish(self, task, progress_callback):
+        total_time = time.time() - task.submitted_at
+        for url in task.urls:
+            result, error = task.results.get(url, (None, "No results returned"))
+            if self.rate_controller:
+                if result:
+                    self.rate_controller.record(result.get('status_code') or 200)
+                elif 'timeout' in (error or '').lower():
+                    self.rate_controller.record(error='timeout')
+            if progress_callback:
+                if result:
+                    progress_callback('crawl_complete', {'url': url, 'task_id': task.task_id, 'total_time': total_time})
+                else:
+                    progress_callback('crawl_error', {'url': url, 'task_id': task.task_id, 'error': error})
+            yield url, result, error
+
+    def _fail(self, task, error_msg, stage):
+        print(f"  ✗ Crawl {stage} failed for {len(task.urls)} URL(s): {error_msg}")
+        task.results = {url: (None, error_msg) for url in task.urls}
+        return task
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def get_crawl4ai_client(**kwargs) -> Crawl4AIClient:
+    """Return the process-wide client, paced by the shared adaptive rate controller"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            kwargs.setdefault('rate_controller', get_rate_controller())
+            _shared_client = Crawl4AIClient(**kwargs)
+        return _shared_client
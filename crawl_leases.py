@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Leased URL batches for multi-worker acquisition
+Workers (possibly on several hosts) share a crawl_queue table in Postgres and
+claim batches with FOR UPDATE SKIP LOCKED. Leases expire unless heartbeated,
+so URLs held by a crashed worker are reclaimed automatically. Every expired
+lease counts as a failure of the URL, so one that crashes or hangs its
+worker each time is dead-lettered instead of being reclaimed forever.
+
+In worker mode the queue owns per-URL crawl state - failure count, failure
+class, next retry time and dead-letter status - so every host makes the same
+retry decisions. A host's local frontier only seeds the queue. Seeding and
+resets are coordinator steps serialised by an advisory lock.
+"""
+
+import os
+import socket
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+
+import psycopg2
+import psycopg2.extras
+
+from retry_policy import DEAD_LETTER, RETRY_POLICIES, WORKER_LOST, classify_failure, plan_retry
+
+# Configuration - same Postgres as product_data; CRAWL_LEASE_DSN points workers at a shared server
+DB_CONFIG = {
+    'host': 'localhost',
+    'port': 5432,
+    'database': 'postgres',
+    'user': 'postgres',
+    'password': 'postgres'
+}
+LEASE_SECONDS = 300
+HEARTBEAT_SECONDS = 60
+LEASE_BATCH_SIZE = 10
+SEED_PAGE_SIZE = 500
+QUEUE_ADVISORY_LOCK = 72417301  # Serialises seeding and resets across workers and hosts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_queue (
+    url TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker_id TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    not_before TIMESTAMPTZ,
+    queued_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+-- Retry state, added after the first release of the queue
+ALTER TABLE crawl_queue ADD COLUMN IF NOT EXISTS not_before TIMESTAMPTZ;
+ALTER TABLE crawl_queue ADD COLUMN IF NOT EXISTS failure_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE crawl_queue ADD COLUMN IF NOT EXISTS error_class TEXT;
+CREATE INDEX IF NOT EXISTS idx_crawl_queue_claim ON crawl_queue(state, lease_expires_at, queued_at);
+
+CREATE TABLE IF NOT EXISTS crawl_workers (
+    worker_id TEXT PRIMARY KEY,
+    run_id TEXT,
+    hostname TEXT,
+    pid INTEGER,
+    status TEXT NOT NULL DEFAULT 'running',
+    current_url TEXT,
+    processed INTEGER NOT NULL DEFAULT 0,
+    successful INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_crawl_workers_run ON crawl_workers(run_id);
+"""
+
+# Leases whose holder stopped heartbeating count as a failure: back to pending, or dead-lettered at the limit
+EXPIRE_SQL = """
+WITH expired AS (
+    SELECT url FROM crawl_queue
+    WHERE state = 'leased' AND lease_expires_at < NOW()
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE crawl_queue q
+SET state = CASE WHEN q.failure_count + 1 >= %(max_attempts)s THEN %(dead_letter)s ELSE 'pending' END,
+    failure_count = q.failure_count + 1,
+    error_class = %(error_class)s,
+    last_error = 'Lease expired - worker crashed or hung',
+    worker_id = NULL,
+    lease_expires_at = NULL,
+    not_before = NULL,
+    updated_at = NOW()
+FROM expired
+WHERE q.url = expired.url
+RETURNING q.url, q.state
+"""
+EXPIRE_PARAMS = {'max_attempts': RETRY_POLICIES[WORKER_LOST].max_attempts, 'dead_letter': DEAD_LETTER,
+                 'error_class': WORKER_LOST}
+
+# Pending rows (retries once their backoff has passed) in queue order
+CLAIM_SQL = """
+WITH claimable AS (
+    SELECT url FROM crawl_queue
+    WHERE state = 'pending' AND (not_before IS NULL OR not_before <= NOW())
+    ORDER BY queued_at, url
+    LIMIT %(batch)s
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE crawl_queue q
+SET state = 'leased',
+    worker_id = %(worker_id)s,
+    lease_expires_at = NOW() + make_interval(secs => %(lease_seconds)s),
+    attempts = q.attempts + 1,
+    updated_at = NOW()
+FROM claimable
+WHERE q.url = claimable.url
+RETURNING q.url
+"""
+
+def get_lease_connection(db_config=None):
+    """Connect to the lease database (CRAWL_LEASE_DSN overrides DB_CONFIG)"""
+    dsn = os.environ.get('CRAWL_LEASE_DSN')
+    if dsn:
+        return psycopg2.connect(dsn)
+    return psycopg2.connect(**(db_config or DB_CONFIG))
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+class LeaseManager:
+    """Claims, heartbeats and completes URL leases for one worker"""
+
+    def __init__(self, worker_id=None, run_id=None, lease_seconds=LEASE_SECONDS,
+                 batch_size=LEASE_BATCH_SIZE, db_config=None):
+        self.worker_id = worker_id or default_worker_id()
+        self.run_id = run_id
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.db_config = db_config
+        self.conn = get_lease_connection(db_config)
+        self._lock = threading.Lock()
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+
+    def _execute(self, sql, params=None, fetch=False):
+        with self._lock:
+            with self.conn, self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute(sql, params)
+                return cur.fetchall() if fetch else cur.rowcount
+
+    def ensure_schema(self):
+        try:
+            self._execute(SCHEMA)
+        except psycopg2.IntegrityError:
+            # Another worker created the tables at the same moment
+            pass
+
+    def register(self):
+        """Record this worker so its progress can be aggregated"""
+        self.ensure_schema()
+        self._execute("""
+            INSERT INTO crawl_workers (worker_id, run_id, hostname, pid)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (worker_id) DO UPDATE SET run_id = EXCLUDED.run_id, status = 'running',
+                heartbeat_at = NOW(), started_at = NOW(), processed = 0, successful = 0, failed = 0
+        """, (self.worker_id, self.run_id, socket.gethostname(), os.getpid()))
+
+    def seed(self, urls, only_if_empty=False):
+        """Queue URLs that are not already known; returns the number inserted
+
+        only_if_empty=True seeds just a brand-new queue, so the first worker
+        of a run fills it and later workers do not add their own (possibly
+        stale) pending lists.
+        """
+        if not urls:
+            return 0
+        urls = list(urls)
+        inserted = 0
+        with self._lock:
+            with self.conn, self.conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (QUEUE_ADVISORY_LOCK,))
+                if only_if_empty:
+                    cur.execute("SELECT EXISTS (SELECT 1 FROM crawl_queue)")
+                    if cur.fetchone()[0]:
+                        return 0
+                # rowcount only covers the last page, so insert page by page
+                for start in range(0, len(urls), SEED_PAGE_SIZE):
+                    psycopg2.extras.execute_values(
+                        cur, "INSERT INTO crawl_queue (url) VALUES %s ON CONFLICT (url) DO NOTHING",
+                        [(url,) for url in urls[start:start + SEED_PAGE_SIZE]], page_size=SEED_PAGE_SIZE)
+                    inserted += cur.rowcount
+        return inserted
+
+    def reset_queue(self, force=False):
+        """Empty the queue for a fresh start - a coordinator step, never run per worker
+
+        Refuses while any worker holds a live lease unless force=True.
+        Returns the number of URLs removed.
+        """
+        with self._lock:
+            with self.conn, self.conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (QUEUE_ADVISORY_LOCK,))
+                if not force:
+                    cur.execute("SELECT COUNT(*) FROM crawl_queue WHERE state = 'leased' AND lease_expires_at >= NOW()")
+                    live = cur.fetchone()[0]
+                    if live:
+                        raise RuntimeError(f"{live:,} URLs are leased by running workers - stop them before resetting the queue")
+                cur.execute("DELETE FROM crawl_queue")
+                return cur.rowcount
+
+    def claim_batch(self, batch_size=None):
+        """Lease up to batch_size URLs for this worker, first failing any expired leases"""
+        with self._lock:
+            with self.conn, self.conn.cursor() as cur:
+                cur.execute(EXPIRE_SQL, EXPIRE_PARAMS)
+                cur.execute(CLAIM_SQL, {
+                    'batch': batch_size or self.batch_size,
+                    'worker_id': self.worker_id,
+                    'lease_seconds': self.lease_seconds
+                })
+                return [row[0] for row in cur.fetchall()]
+
+    def complete(self, url, success, error_msg=None, error_class=None, now=None):
+        """Finish a lease; only the current holder can complete it
+
+        A failure is scheduled from the queue's own failure count: back to
+        pending, claimable once its backoff has passed, or dead-lettered
+        once the failure class is out of attempts. Returns the new state, or
+        None if this worker no longer holds the lease.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            with self.conn, self.conn.cursor() as cur:
+                cur.execute("SELECT failure_count FROM crawl_queue WHERE url = %s AND worker_id = %s AND state = 'leased' "
+                            "FOR UPDATE", (url, self.worker_id))
+                row = cur.fetchone()
+                state = None
+                if row is not None:
+                    if success:
+                        state, failures, retry_at, error_class = 'completed', 0, None, None
+                    else:
+                        error_class = error_class or classify_failure(error_msg)
+                        failures = row[0] + 1
+                        retry_at = plan_retry(error_class, failures, now)
+                        state = 'pending' if retry_at else DEAD_LETTER
+                    cur.execute("""
+                        UPDATE crawl_queue SET state = %s, last_error = %s, error_class = %s, failure_count = %s,
+                            not_before = %s, lease_expires_at = NULL,
+                            worker_id = CASE WHEN %s = 'pending' THEN NULL ELSE worker_id END, updated_at = NOW()
+                        WHERE url = %s
+                    """, (state, error_msg, error_class, failures, retry_at, state, url))
+                cur.execute("""
+                    UPDATE crawl_workers SET processed = processed + 1,
+                        successful = successful + %s, failed = failed + %s,
+                        current_url = NULL, heartbeat_at = NOW()
+                    WHERE worker_id = %s
+                """, (1 if success else 0, 0 if success else 1, self.worker_id))
+        return state
+
+    def get_url(self, url):
+        """Queue record for one URL (state, failure_count, error_class, not_before, ...)"""
+        rows = self._execute("SELECT * FROM crawl_queue WHERE url = %s", (url,), fetch=True)
+        return dict(rows[0]) if rows else None
+
+    def set_current_url(self, url):
+        self._execute("UPDATE crawl_workers SET current_url = %s, heartbeat_at = NOW() WHERE worker_id = %s",
+                      (url, self.worker_id))
+
+    def heartbeat(self, conn=None):
+        """Extend this worker's leases and mark it alive"""
+        conn = conn or self.conn
+        with conn, conn.cursor() as cur:
+            cur.execute("""
+                UPDATE crawl_queue SET lease_expires_at = NOW() + make_interval(secs => %s)
+                WHERE worker_id = %s AND state = 'leased'
+            """, (self.lease_seconds, self.worker_id))
+            extended = cur.rowcount
+            cur.execute("UPDATE crawl_workers SET heartbeat_at = NOW() WHERE worker_id = %s", (self.worker_id,))
+        return extended
+
+    def start_heartbeat(self, interval=HEARTBEAT_SECONDS):
+        """Heartbeat from a background thread on its own connection"""
+        def beat():
+            conn = get_lease_connection(self.db_config)
+            try:
+                while not self._heartbeat_stop.wait(interval):
+                    try:
+                        self.heartbeat(conn)
+                    except psycopg2.Error as e:
+                        print(f"  ⚠️ Lease heartbeat failed: {e}")
+            finally:
+                conn.close()
+
+        self._heartbeat_stop.clear()
+        self._heartbeat_thread = threading.Thread(target=beat, daemon=True)
+        self._heartbeat_thread.start()
+
+    def release(self, status='stopped'):
+        """Hand unfinished leases back to the queue and stop heartbeating"""
+        self._heartbeat_stop.set()
+        released = self._execute("""
+            UPDATE crawl_queue SET state = 'pending', worker_id = NULL, lease_expires_at = NULL, updated_at = NOW()
+            WHERE worker_id = %s AND state = 'leased'
+        """, (self.worker_id,))
+        self._execute("UPDATE crawl_workers SET status = %s, current_url = NULL WHERE worker_id = %s",
+                      (status, self.worker_id))
+        return released
+
+    def close(self):
+        self._heartbeat_stop.set()
+        self.conn.close()
+
+def reclaim_expired_leases(conn):
+    """Fail expired leases (pending again, or dead-lettered at the limit); returns the requeued URLs"""
+    with conn, conn.cursor() as cur:
+        cur.execute(EXPIRE_SQL, EXPIRE_PARAMS)
+        return [url for url, state in cur.fetchall() if state == 'pending']
+
+def get_queue_statistics(conn):
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT state, COUNT(*) FROM crawl_queue GROUP BY state")
+        counts = dict(cur.fetchall())
+        cur.execute("SELECT COUNT(*) FROM crawl_queue WHERE state = 'leased' AND lease_expires_at < NOW()")
+        counts['expired'] = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM crawl_queue WHERE state = 'pending' AND not_before IS NOT NULL")
+        counts['retry_scheduled'] = cur.fetchone()[0]
+    return counts
+
+def get_worker_statistics(conn, run_id=None):
+    """Per-worker progress plus combined totals, optionally for one run"""
+    query = """
+        SELECT worker_id, hostname, pid, status, current_url, processed, successful, failed,
+               started_at, heartbeat_at, EXTRACT(EPOCH FROM NOW() - heartbeat_at) AS seconds_since_heartbeat
+        FROM crawl_workers
+    """
+    params = ()
+    if run_id:
+        query += " WHERE run_id = %s"
+        params = (run_id,)
+    query += " ORDER BY worker_id"
+    with conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(query, params)
+        workers = []
+        for row in cur.fetchall():
+            row = dict(row)
+            row['started_at'] = row['started_at'].isoformat() if row['started_at'] else None
+            row['heartbeat_at'] = row['heartbeat_at'].isoformat() if row['heartbeat_at'] else None
+            row['seconds_since_heartbeat'] = float(row['seconds_since_heartbeat'] or 0)
+            row['alive'] = row['status'] == 'running' and row['seconds_since_heartbeat'] < LEASE_SECONDS
+            workers.append(row)
+
+    totals = {
+        'workers': len(workers),
+        'alive_workers': sum(1 for w in workers if w['alive']),
+        'processed': sum(w['processed'] for w in workers),
+        'successful': sum(w['successful'] for w in workers),
+        'failed': sum(w['failed'] for w in workers),
+    }
+    return {'workers': workers, 'totals': totals}
+
+if __name__ == "__main__":
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else 'stats'
+    connection = get_lease_connection()
+    if command == 'reclaim':
+        reclaimed = reclaim_expired_leases(connection)
+        print(f"🔄 Reclaimed {len(reclaimed):,} expired leases")
+    elif command == 'stats':
+        with connection, connection.cursor() as cursor:
+            cursor.execute(SCHEMA)
+        print(f"📊 Crawl queue: {get_queue_statistics(connection)}")
+        worker_stats = get_worker_statistics(connection)
+        for worker in worker_stats['workers']:
+            state = '🟢' if worker['alive'] else '⚪'
+            print(f"   {state} {worker['worker_id']}: {worker['successful']:,} ok, {worker['failed']:,} failed")
+        print(f"   Totals: {worker_stats['totals']}")
+    else:
+        print("Usage: python crawl_leases.py [stats|reclaim]")
+    connection.close()
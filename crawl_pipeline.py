@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Staged crawl pipeline: fetch threads -> parser processes -> batched DB writer
+Fetching waits on the network and extraction burns CPU, so doing them one
+URL at a time leaves one side idle while the other works. Here each stage
+runs on its own workers, joined by bounded queues: when parsing or saving
+falls behind, fetchers block on the full queue instead of piling pages up
+in memory. Every stage keeps busy/blocked/idle counters, and a stop request
+(Ctrl+C through acquire_from_sitemap.signal_handler) stops new fetches while
+every page already fetched is still parsed, saved and recorded.
+"""
+
+import io
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from typing import Optional
+
+from curl_scraper import get_page, last_fetch_error, cache_page, build_tab_views
+from retry_policy import classify_failure, PARSE_FAILURE, DB_FAILURE
+from stage_profiler import get_profiler, is_enabled
+from tileshop_learner import save_batch_to_database
+
+# Configuration
+DEFAULT_FETCHERS = 4
+DEFAULT_PARSERS = 2
+DEFAULT_QUEUE_SIZE = 16     # Pages held between two stages before the upstream stage blocks
+DEFAULT_WRITE_BATCH = 10    # Products per database round trip
+WRITE_FLUSH_SECONDS = 2.0   # Longest an extracted product waits for its batch to fill
+STAGES = ['fetch', 'parse', 'write']
+
+_DONE = object()
+
+@dataclass
+class PipelineItem:
+    """One URL on its way through the pipeline"""
+    url: str
+    index: int
+    html: Optional[str] = None
+    product_data: Optional[dict] = None
+    error: Optional[str] = None
+    error_class: Optional[str] = None
+    unchanged: bool = False     # The fetch stage found nothing to extract
+
+    @property
+    def success(self):
+        return self.error is None and (self.unchanged or self.product_data is not None)
+
+class StageMetrics:
+    """Counters for one pipeline stage
+
+    busy is time spent working, blocked is time waiting on a full downstream
+    queue (backpressure), idle is time waiting for input.
+    """
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.idle_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, blocked=0.0, idle=0.0, cpu=0.0, failed=False, processed=1):
+        with self._lock:
+            self.processed += processed
+            self.failed += int(failed)  # A flag, or a count for batches
+            self.busy_seconds += busy
+            self.blocked_seconds += blocked
+            self.idle_seconds += idle
+            self.cpu_seconds += cpu
+
+    def queued(self, depth):
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def snapshot(self, elapsed, queue_depth):
+        with self._lock:
+            capacity = elapsed * self.workers
+            return {
+                'workers': self.workers,
+                'processed': self.processed,
+                'failed': self.failed,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'blocked_seconds': round(self.blocked_seconds, 3),
+                'idle_seconds': round(self.idle_seconds, 3),
+                'cpu_seconds': round(self.cpu_seconds, 3),
+                'utilization': round(self.busy_seconds / capacity, 3) if capacity else 0.0,
+                'queue_depth': queue_depth,
+                'max_queue_depth': self.max_queue_depth
+            }
+
+def fetch_page(url):
+    """Default fetch stage: pooled fetch (curl fallback), cached for reparse.py
+
+    Returns (html, error); (None, None) means there is nothing to extract.
+    """
+    html = get_page(url)
+    if not html:
+        return None, last_fetch_error() or 'Failed to get page content'
+    cache_page(url, html)
+    return html, None
+
+def _init_parser():
+    """Parser process setup: leave Ctrl+C to the parent, which drains, and load the extraction stack once"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    with redirect_stdout(io.StringIO()):
+        import tileshop_learner
+        tileshop_learner.get_page_detector()
+        tileshop_learner.get_spec_extractor()
+        tileshop_learner.get_enhanced_categorizer()
+
+def _parser_ready(_):
+    return True
+
+def extract_page(url, html):
+    """Parser process task: extract_product_data over single-response tab views
+
+    Returns (product_data, cpu_seconds, stage timings recorded since the
+    last task - None unless profiling). Output is dropped - several
+    processes printing per-field logs would interleave unreadably.
+    """
+    from tileshop_learner import extract_product_data
+    start = time.process_time()
+    with redirect_stdout(io.StringIO()):
+        product_data = extract_product_data(build_tab_views(html), url)
+    profile = get_profiler().take_delta() if is_enabled() else None
+    return product_data, time.process_time() - start, profile
+
+class CrawlPipeline:
+    """Bounded-queue pipeline of fetch threads, parser processes and one batched writer
+
+    fetch(url) returns (html, error) and runs on fetcher threads.
+    save_batch([(product_data, crawl_results), ...]) returns one flag per
+    product and runs on the writer thread. on_result(item) is called on the
+    writer thread for every URL in completion order - record statuses there.
+    should_stop() is polled to start a graceful drain.
+    """
+
+    def __init__(self, fetch=fetch_page, save_batch=save_batch_to_database, on_result=None,
+                 should_stop=None, fetchers=DEFAULT_FETCHERS, parsers=DEFAULT_PARSERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, write_batch=DEFAULT_WRITE_BATCH,
+                 flush_seconds=WRITE_FLUSH_SECONDS, on_fetch_start=None):
+        self.fetch = fetch
+        self.save_batch = save_batch
+        self.on_result = on_result
+        self.on_fetch_start = on_fetch_start
+        self.should_stop = should_stop or (lambda: False)
+        self.fetchers = fetchers
+        self.parsers = parsers
+        self.write_batch = write_batch
+        self.flush_seconds = flush_seconds
+
+        # Each stage's input queue
+        self.queues = {stage: queue.Queue(maxsize=queue_size) for stage in STAGES}
+        self.metrics = {
+            'fetch': StageMetrics('fetch', fetchers),
+            'parse': StageMetrics('parse', parsers),
+            'write': StageMetrics('write', 1),
+        }
+        self.batches = 0
+        self.dropped = 0        # URLs never fetched because a stop was requested
+        self.stopped = False
+        self._start = None
+        self._elapsed = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _stopping(self):
+        if not self.stopped and self.should_stop():
+            self.stopped = True
+            print("\n🛑 Stop requested - finishing pages already fetched")
+        return self.stopped
+
+    def _put(self, stage, downstream, item):
+        """Blocking put into `downstream`'s input queue, booking the wait as backpressure on `stage`"""
+        target = self.queues[downstream]
+        start = time.monotonic()
+        target.put(item)
+        self.metrics[stage].add(blocked=time.monotonic() - start, processed=0)
+        self.metrics[downstream].queued(target.qsize())
+
+    def _get(self, stage):
+        start = time.monotonic()
+        item = self.queues[stage].get()
+        self.metrics[stage].add(idle=time.monotonic() - start, processed=0)
+        return item
+
+    # Stages
+    def _feed(self, urls):
+        for index, url in enumerate(urls, 1):
+            while not self._stopping():
+                try:
+                    self.queues['fetch'].put(PipelineItem(url=url, index=index), timeout=0.2)
+                    self.metrics['fetch'].queued(self.queues['fetch'].qsize())
+                    break
+                except queue.Full:
+                    continue
+            if self.stopped:
+                break
+        for _ in range(self.fetchers):
+            self.queues['fetch'].put(_DONE)
+
+    def _fetch_loop(self):
+        while True:
+            item = self._get('fetch')
+            if item is _DONE:
+                return
+            if self._stopping():
+                with self._lock:
+                    self.dropped += 1
+                continue
+            if self.on_fetch_start:
+                self.on_fetch_start(item)
+            start = time.monotonic()
+            try:
+                item.html, item.error = self.fetch(item.url)
+            except Exception as e:
+                item.error = f"Unexpected error: {str(e)}"
+            if item.error:
+                item.error_class = classify_failure(item.error)
+            elif not item.html:
+                item.unchanged = True
+            self.metrics['fetch'].add(busy=time.monotonic() - start, failed=bool(item.error))
+            # Failures and unchanged pages skip the parsers but are still recorded by the writer
+            self._put('fetch', 'parse' if item.html else 'write', item)
+
+    def _parse_loop(self):
+        while True:
+            item = self._get('parse')
+            if item is _DONE:
+                return
+            start = time.monotonic()
+            cpu = 0.0
+            try:
+                item.product_data, cpu, profile = self._pool.submit(extract_page, item.url, item.html).result()
+                if profile:
+                    get_profiler().merge(profile)
+                if not item.product_data:
+                    item.error = 'Curl scraper failed to extract data'
+            except Exception as e:
+                item.error = f"Extraction error: {type(e).__name__}: {e}"
+            if item.error:
+                item.error_class = PARSE_FAILURE
+            self.metrics['parse'].add(busy=time.monotonic() - start, cpu=cpu, failed=bool(item.error))
+            self._put('parse', 'write', item)
+
+    def _write_loop(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = max(deadline - time.monotonic(), 0) if batch else None
+            start = time.monotonic()
+            try:
+                item = self.queues['write'].get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            self.metrics['write'].add(idle=time.monotonic() - start, processed=0)
+
+            if item is _DONE:
+                self._flush(batch)
+                return
+            if item is not None:
+                if item.product_data and not item.error:
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_seconds
+                    batch.append(item)
+                else:
+                    self._finish(item)
+            if batch and (len(batch) >= self.write_batch or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        start = time.monotonic()
+        try:
+            saved = self.save_batch([(item.product_data, build_tab_views(item.html)) for item in batch])
+        except Exception as e:
+            print(f"  ✗ Batch save error: {e}")
+            saved = [False] * len(batch)
+        self.batches += 1
+        elapsed = time.monotonic() - start
+        failures = 0
+        for item, ok in zip(batch, saved):
+            if not ok:
+                item.error, item.error_class = 'Database save failed', DB_FAILURE
+                failures += 1
+        self.metrics['write'].add(busy=elapsed, processed=len(batch), failed=failures)
+        for item in batch:
+            self._finish(item)
+
+    def _finish(self, item):
+        item.html = None    # The raw page is saved by now - release it
+        if self.on_result:
+            try:
+                self.on_result(item)
+            except Exception as e:
+                print(f"  ⚠️ Result callback failed for {item.url}: {e}")
+
+    # Running
+    def _start_parsers(self):
+        """Start (and warm) the parser processes before any thread exists, so forking is safe"""
+        self._pool = ProcessPoolExecutor(max_workers=self.parsers, initializer=_init_parser)
+        list(self._pool.map(_parser_ready, range(self.parsers)))
+
+    def run(self, urls):
+        """Push every URL through the pipeline; returns metrics() once drained"""
+        self._start_parsers()
+        self._start = time.monotonic()
+        stages = [
+            ('fetch', [threading.Thread(target=self._fetch_loop, name=f'fetch-{n}', daemon=True)
+                       for n in range(self.fetchers)]),
+            ('parse', [threading.Thread(target=self._parse_loop, name=f'parse-{n}', daemon=True)
+                       for n in range(self.parsers)]),
+            ('write', [threading.Thread(target=self._write_loop, name='write', daemon=True)]),
+        ]
+        feeder = threading.Thread(target=self._feed, args=(urls,), name='feed', daemon=True)
+        try:
+            for _, threads in stages:
+                for thread in threads:
+                    thread.start()
+            feeder.start()
+
+            # Drain stage by stage: each stage gets its end markers once everything upstream is done
+            self._join([feeder])
+            downstream = {'fetch': ('parse', self.parsers), 'parse': ('write', 1)}
+            for name, threads in stages:
+                self._join(threads)
+                if name in downstream:
+                    target, count = downstream[name]
+                    for _ in range(count):
+                        self.queues[target].put(_DONE)
+        finally:
+            self._elapsed = time.monotonic() - self._start
+            self._pool.shutdown(wait=True)
+        return self.metrics_snapshot()
+
+    def _join(self, threads):
+        # Short joins keep the main thread responsive to signals
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+                self._stopping()
+
+    def metrics_snapshot(self):
+        """Per-stage counters plus overall throughput"""
+        elapsed = self._elapsed if self._elapsed is not None else (
+            time.monotonic() - self._start if self._start else 0.0)
+        saved = self.metrics['write'].processed - self.metrics['write'].failed
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'pages_per_minute': round(saved / elapsed * 60, 1) if elapsed else 0.0,
+            'write_batches': self.batches,
+            'dropped_on_stop': self.dropped,
+            'stopped': self.stopped,
+            'stages': {name: self.metrics[name].snapshot(elapsed, self.queues[name].qsize()) for name in STAGES}
+        }
+
+def print_pipeline_metrics(metrics):
+    """Human-readable per-stage summary"""
+    print(f"\n🏭 Pipeline: {metrics['pages_per_minute']:.1f} saved pages/min over {metrics['elapsed_seconds']:.1f}s, "
+          f"{metrics['write_batches']} DB batches")
+    for name, stage in metrics['stages'].items():
+        print(f"   {name:<6} x{stage['workers']}: {stage['processed'] - stage['failed']:,} ok, {stage['failed']:,} failed, "
+              f"{stage['utilization']:.0%} busy, {stage['blocked_seconds']:.1f}s blocked, "
+              f"max queue {stage['max_queue_depth']}")
+    if metrics['dropped_on_stop']:
+        print(f"   {metrics['dropped_on_stop']:,} queued URLs left pending by the stop request")
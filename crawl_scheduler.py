@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Priority-scored re-crawl scheduler for Tileshop acquisition
+Scores every frontier URL by staleness, observed change frequency (from the
+incremental crawl's payload hashes), category weight and failure history,
+and hands acquisition the top of the list within a per-run crawl budget.
+"""
+
+import json
+import math
+import os
+import sys
+from datetime import datetime
+
+from incremental_crawl import ValidatorStore
+from url_frontier import get_frontier
+
+# Configuration
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CATEGORY_SELECTION_FILE = os.path.join(BASE_DIR, 'category_selection.json')
+STALENESS_HALF_LIFE_DAYS = 7     # Data is "half stale" after this many days
+BASE_CHANGE_RATE = 0.2           # Floor so rarely-changing products still age into the queue
+DEFAULT_CATEGORY_WEIGHT = 0.1    # Categories missing from category_selection.json
+FAILURE_BACKOFF = 0.5            # Score multiplier per consecutive failure
+
+def load_category_weights(path=CATEGORY_SELECTION_FILE):
+    """Category -> weight in [0, 1], largest category = 1
+
+    Uses an explicit "weight" per category when present, otherwise the
+    category's share of products.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            categories = json.load(f).get('categories', [])
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"⚠️  Could not load category weights from {path}: {e}")
+        return {}
+
+    raw = {c['id'].upper(): float(c.get('weight', c.get('percentage', c.get('count', 0))) or 0)
+           for c in categories if c.get('id')}
+    top = max(raw.values(), default=0)
+    return {category: value / top for category, value in raw.items()} if top else {}
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except (AttributeError, ValueError):
+        return None
+
+class CrawlScheduler:
+    """Ranks frontier URLs for re-crawling"""
+
+    def __init__(self, frontier=None, validator_store=None, category_weights=None, now=None):
+        self.frontier = frontier or get_frontier()
+        self.validator_store = validator_store if validator_store is not None else ValidatorStore()
+        self.category_weights = category_weights if category_weights is not None else load_category_weights()
+        self.now = now or datetime.now()
+
+    def change_rate(self, validator_entry):
+        """Smoothed share of checks that found a changed payload (0.5 with no history)"""
+        entry = validator_entry or {}
+        return (entry.get('changes', 0) + 1) / (entry.get('checks', 0) + 2)
+
+    def staleness(self, scraped_at):
+        """0 for just-scraped data, approaching 1 as it ages; 1 when never scraped"""
+        scraped = _parse_time(scraped_at) if scraped_at else None
+        if not scraped:
+            return 1.0
+        age_days = max((self.now - scraped).total_seconds() / 86400, 0)
+        return 1 - math.exp(-age_days * math.log(2) / STALENESS_HALF_LIFE_DAYS)
+
+    def score_url(self, row, validator_entry=None):
+        """Score one frontier row; returns (score, components)"""
+        # Only a completed scrape left data behind - without it our copy is certainly out of date
+        has_data = row.get('scrape_status') == 'completed'
+        components = {
+            'staleness': self.staleness(row.get('scraped_at') if has_data else None),
+            'change_rate': self.change_rate(validator_entry) if has_data else 1.0,
+            'category_weight': self.category_weights.get((row.get('category') or '').upper(), DEFAULT_CATEGORY_WEIGHT),
+            'failures': row.get('failure_count') or 0,
+        }
+        score = (components['staleness']
+                 * (BASE_CHANGE_RATE + components['change_rate'])
+                 * (1 + components['category_weight'])
+                 * FAILURE_BACKOFF ** components['failures'])
+        return score, components
+
+    def schedule(self, budget=None, category=None):
+        """URLs in descending score order, cut to the crawl budget"""
+        ranked = []
+        for row in self.frontier.get_urls(category=category):
+            score, components = self.score_url(row, self.validator_store.get(row['url']))
+            ranked.append({'url': row['url'], 'score': score, 'components': components})
+        # Ties keep sitemap order
+        ranked.sort(key=lambda item: -item['score'])
+        return ranked[:budget] if budget else ranked
+
+    def get_scheduled_urls(self, budget=None, category=None):
+        return [item['url'] for item in self.schedule(budget, category)]
+
+if __name__ == "__main__":
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 25
+    category = sys.argv[sys.argv.index('--category') + 1] if '--category' in sys.argv else None
+
+    scheduler = CrawlScheduler()
+    print(f"📅 Top {budget} URLs to re-crawl" + (f" in {category}" if category else ""))
+    for item in scheduler.schedule(budget, category):
+        c = item['components']
+        print(f"  {item['score']:.3f}  stale={c['staleness']:.2f} change={c['change_rate']:.2f} "
+              f"cat={c['category_weight']:.2f} fail={c['failures']}  {item['url'].split('/')[-1]}")
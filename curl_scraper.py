@@ -5,50 +5,178 @@ Uses direct HTTP requests since curl gets the real product pages
 """
 
 import subprocess
+import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tileshop_learner import extract_product_data, save_to_database
 
+try:
+    from fetch_engine import get_fetch_engine
+    FETCH_ENGINE_AVAILABLE = True
+except ImportError:
+    FETCH_ENGINE_AVAILABLE = False
+
+try:
+    from rate_controller import get_rate_controller
+    RATE_CONTROLLER_AVAILABLE = True
+except ImportError:
+    RATE_CONTROLLER_AVAILABLE = False
+
+try:
+    from page_cache import get_page_cache
+    PAGE_CACHE_AVAILABLE = True
+except ImportError:
+    PAGE_CACHE_AVAILABLE = False
+
+# Product page tabs consumed by extract_product_data
+TAB_VIEWS = ['resources', 'specifications']
+
+# Failure reason of the last get_page() per thread, for retry classification
+_fetch_state = threading.local()
+
+CURL_TIMEOUT = 30                                   # Seconds per curl request
+CURL_TIMEOUT_EXIT = 28                              # curl's "operation timed out" exit code
+CURL_STATUS_MARKER = '\n__tileshop_http_status__:'  # Separates the body from curl's -w status
+
 def get_page_with_curl(url, user_agent=None):
-    """Get page content using curl with your browser's user agent"""
+    """Get page content using curl with your browser's user agent
+    
+    Returns the page for HTTP 200. Otherwise returns None and leaves the
+    reason for the rate controller and retry classification:
+    _fetch_state.curl_status is the HTTP status when the server answered,
+    and _fetch_state.curl_error is 'HTTP <status>', 'timeout' or the curl
+    exit code.
+    """
     if not user_agent:
         user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
     
-    # Build curl command with just user agent
-    cmd = ['curl', '-s', '--compressed', '-A', user_agent, url]
+    # Build curl command with just user agent; the status is appended after the body
+    cmd = ['curl', '-s', '--compressed', '--max-time', str(CURL_TIMEOUT), '-A', user_agent,
+           '-w', f"{CURL_STATUS_MARKER}%{{http_code}}", url]
     
+    _fetch_state.curl_error = None
+    _fetch_state.curl_status = None
     try:
-        result = subprocess.run(cmd, capture_output=True, timeout=30)
+        result = subprocess.run(cmd, capture_output=True, timeout=CURL_TIMEOUT + 5)
         if result.returncode == 0:
+            body, _, status = result.stdout.rpartition(CURL_STATUS_MARKER.encode())
+            status_code = int(status) if status.strip().isdigit() else None
+            _fetch_state.curl_status = status_code
+            if status_code is not None and status_code != 200:
+                print(f"  ❌ Curl got HTTP {status_code}")
+                _fetch_state.curl_error = f"HTTP {status_code}"
+                return None
             # Handle different encodings
             try:
-                return result.stdout.decode('utf-8')
+                return body.decode('utf-8')
             except UnicodeDecodeError:
                 try:
-                    return result.stdout.decode('latin1')
+                    return body.decode('latin1')
                 except:
-                    return result.stdout.decode('utf-8', errors='ignore')
+                    return body.decode('utf-8', errors='ignore')
         else:
             print(f"  ❌ Curl error (code {result.returncode}): {result.stderr.decode('utf-8', errors='ignore')}")
+            _fetch_state.curl_error = 'timeout' if result.returncode == CURL_TIMEOUT_EXIT else f"curl exit {result.returncode}"
             return None
     except subprocess.TimeoutExpired:
         print(f"  ⚠️ Curl timeout for {url}")
+        _fetch_state.curl_error = 'timeout'
         return None
     except Exception as e:
         print(f"  ❌ Curl execution error: {e}")
+        _fetch_state.curl_error = f"curl error: {e}"
         return None
 
-def scrape_product_with_curl(url):
-    """Scrape a single product using curl including tabs for complete data"""
-    print(f"\n🌐 Fetching with curl: {url}")
+def last_fetch_error():
+    """Why this thread's most recent get_page() returned nothing (e.g. 'HTTP 503', 'timeout')"""
+    return getattr(_fetch_state, 'error', None)
+
+def get_page(url, user_agent=None):
+    """Get page content over the pooled keep-alive engine, falling back to curl
+    
+    Only transport failures (no HTTP status: connection, TLS, timeout) are
+    retried with curl. An HTTP answer such as 404 or 429 is the server's
+    reply - asking again at once would double the load the rate controller
+    is backing off from - so it is returned as a failure with its status
+    kept for last_fetch_error().
+    """
+    _fetch_state.error = None
+    if FETCH_ENGINE_AVAILABLE and not user_agent:
+        result = get_fetch_engine().fetch(url)
+        if result.ok:
+            return result.html
+        if result.status_code is not None:
+            _fetch_state.error = result.error or f"HTTP {result.status_code}"
+            print(f"  ❌ Pooled fetch failed ({_fetch_state.error})")
+            return None
+        print(f"  ⚠️ Pooled fetch failed ({result.error}), retrying with curl")
+        _fetch_state.error = result.error
+    if not RATE_CONTROLLER_AVAILABLE:
+        html = get_page_with_curl(url, user_agent)
+    else:
+        # The curl path shares the adaptive rate with the pooled engine
+        controller = get_rate_controller()
+        controller.wait()
+        start = time.monotonic()
+        html = get_page_with_curl(url, user_agent)
+        # Real status when curl got one; timeouts count as congestion like the pooled engine's
+        status_code = 200 if html else getattr(_fetch_state, 'curl_status', None)
+        error = None if html or status_code else _fetch_state.curl_error
+        controller.record(status_code, time.monotonic() - start, error)
+    if html:
+        _fetch_state.error = None
+    else:
+        # curl ran last, so its reason wins over the pooled transport error
+        _fetch_state.error = getattr(_fetch_state, 'curl_error', None) or _fetch_state.error or 'curl failed'
+    return html
+
+def build_tab_views(html_content, tabs=TAB_VIEWS):
+    """Build crawl_results tab views from a single product page response
+    
+    URL fragments never reach the server, so url#resources and
+    url#specifications return the same document as the main page - every
+    tab (including its embedded __NEXT_DATA__) is already in this response.
+    """
+    crawl_results = {
+        'main': {
+            'html': html_content,
+            'markdown': ''
+        }
+    }
+    for tab in tabs:
+        crawl_results[tab] = crawl_results['main']
+    return crawl_results
+
+def cache_page(url, html_content):
+    """Keep the full raw page for offline re-extraction (see reparse.py)"""
+    if not PAGE_CACHE_AVAILABLE:
+        return
+    try:
+        get_page_cache().put(url, html_content)
+    except Exception as e:
+        print(f"  ⚠️ Could not cache page: {e}")
+
+def scrape_product_with_curl(url, single_fetch=True, html_content=None):
+    """Scrape a single product using curl including tabs for complete data
     
-    # Fetch main page
-    html_content = get_page_with_curl(url)
+    single_fetch=True builds every tab view from one response; pass False
+    for the legacy behaviour of requesting each #tab URL separately.
+    html_content skips the main fetch when the page was already downloaded
+    (e.g. by an incremental change check).
+    """
+    if html_content is None:
+        print(f"\n🌐 Fetching with curl: {url}")
+        
+        # Fetch main page
+        html_content = get_page(url)
     
     if not html_content:
         print("  ❌ Failed to get page content")
         return None
     
+    cache_page(url, html_content)
+    
     # Quick check - look for product title in content
     if "Penny Round" in html_content or "porcelain" in html_content.lower():
         print("  ✓ Got product content")
@@ -58,33 +186,36 @@ def scrape_product_with_curl(url):
     else:
         print("  ⚠️ Content type unclear, proceeding...")
     
-    # Create crawl results structure for existing extraction
-    crawl_results = {
-        'main': {
-            'html': html_content,
-            'markdown': ''
-        }
-    }
-    
-    # Fetch additional tabs for complete resource extraction
-    tabs_to_fetch = ['resources', 'specifications']
-    
-    for tab in tabs_to_fetch:
-        tab_url = f"{url}#{tab}"
-        print(f"  📋 Fetching {tab} tab...")
-        
-        # Add small delay between requests
-        time.sleep(random.uniform(1, 3))
-        
-        tab_html = get_page_with_curl(tab_url)
-        if tab_html:
-            crawl_results[tab] = {
-                'html': tab_html,
+    if single_fetch:
+        # Tabs are views over the same document - no extra requests
+        crawl_results = build_tab_views(html_content)
+        print(f"  ✓ Built {', '.join(TAB_VIEWS)} tab views from single response")
+    else:
+        # Create crawl results structure for existing extraction
+        crawl_results = {
+            'main': {
+                'html': html_content,
                 'markdown': ''
             }
-            print(f"  ✓ Got {tab} tab content")
-        else:
-            print(f"  ⚠️ Failed to get {tab} tab content")
+        }
+        
+        # Fetch additional tabs for complete resource extraction
+        for tab in TAB_VIEWS:
+            tab_url = f"{url}#{tab}"
+            print(f"  📋 Fetching {tab} tab...")
+            
+            # Add small delay between requests
+            time.sleep(random.uniform(1, 3))
+            
+            tab_html = get_page(tab_url)
+            if tab_html:
+                crawl_results[tab] = {
+                    'html': tab_html,
+                    'markdown': ''
+                }
+                print(f"  ✓ Got {tab} tab content")
+            else:
+                print(f"  ⚠️ Failed to get {tab} tab content")
     
     # Extract product data using existing functions
     print("  🔍 Extracting product data...")
@@ -102,46 +233,73 @@ def scrape_product_with_curl(url):
     
     return product_data
 
-def scrape_products_with_curl(urls, delay_range=(10, 20)):
-    """Scrape multiple products using curl with human-like delays"""
+def _scrape_and_save(url, single_fetch=True):
+    """Scrape one product and save it; returns True only if the save succeeded"""
+    try:
+        product_data = scrape_product_with_curl(url, single_fetch=single_fetch)
+        
+        if product_data:
+            print(f"  💾 Product data extracted successfully:")
+            print(f"  ✅ Extracted: {product_data.get('title', 'Unknown')[:50]}...")
+            return save_product_to_database(product_data)
+        print(f"  ❌ Failed to extract data")
+        return False
+    except Exception as e:
+        print(f"  ❌ Error processing {url}: {e}")
+        return False
+
+def scrape_products_with_curl(urls, delay_range=None, concurrency=1, single_fetch=True):
+    """Scrape multiple products using curl
+    
+    Requests are paced by the shared adaptive rate controller, which speeds
+    up while the site is healthy and backs off on 429/5xx/timeouts. Pass
+    delay_range=(min, max) for the old fixed random per-product sleeps.
+    With concurrency > 1 products are fetched in parallel over the pooled
+    engine under the same controller and its per-host limit.
+    """
     print(f"🚀 Starting curl scraping for {len(urls)} products")
-    print(f"⏱️ Using {delay_range[0]}-{delay_range[1]}s random delays")
     
     successful = 0
     failed = 0
     
-    for i, url in enumerate(urls):
-        print(f"\n{'='*80}")
-        print(f"Processing {i+1}/{len(urls)}: {url.split('/')[-1]}")
-        print(f"{'='*80}")
-        
-        try:
-            product_data = scrape_product_with_curl(url)
+    if concurrency > 1:
+        print(f"⚡ Using {concurrency} concurrent workers over pooled connections")
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {pool.submit(_scrape_and_save, url, single_fetch): url for url in urls}
+            for i, future in enumerate(as_completed(futures)):
+                if future.result():
+                    successful += 1
+                else:
+                    failed += 1
+                print(f"📊 Completed {i+1}/{len(urls)}: {futures[future].split('/')[-1]}")
+    else:
+        if delay_range:
+            print(f"⏱️ Using {delay_range[0]}-{delay_range[1]}s random delays")
+        else:
+            print(f"⏱️ Using adaptive request pacing")
+        for i, url in enumerate(urls):
+            print(f"\n{'='*80}")
+            print(f"Processing {i+1}/{len(urls)}: {url.split('/')[-1]}")
+            print(f"{'='*80}")
             
-            if product_data:
-                # Save to database (implement later)
-                print(f"  💾 Product data extracted successfully:")
-                save_product_to_database(product_data)
-                print(f"  ✅ Extracted: {product_data.get('title', 'Unknown')[:50]}...")
+            if _scrape_and_save(url, single_fetch):
                 successful += 1
             else:
-                print(f"  ❌ Failed to extract data")
                 failed += 1
-                
-        except Exception as e:
-            print(f"  ❌ Error processing {url}: {e}")
-            failed += 1
-        
-        # Human-like random delay between requests
-        if i < len(urls) - 1:
-            delay = random.uniform(delay_range[0], delay_range[1])
-            print(f"  😴 Waiting {delay:.1f}s before next product...")
-            time.sleep(delay)
+            
+            # Human-like random delay between requests (fixed mode only)
+            if delay_range and i < len(urls) - 1:
+                delay = random.uniform(delay_range[0], delay_range[1])
+                print(f"  😴 Waiting {delay:.1f}s before next product...")
+                time.sleep(delay)
     
     print(f"\n🎉 Curl scraping completed!")
     print(f"  ✅ Successful: {successful}")
     print(f"  ❌ Failed: {failed}")
-    print(f"  📊 Success rate: {successful/(successful+failed)*100:.1f}%")
+    if RATE_CONTROLLER_AVAILABLE and not delay_range:
+        print(f"  ⏱️ Final rate: {get_rate_controller().rate * 60:.1f} requests/min")
+    if successful + failed:
+        print(f"  📊 Success rate: {successful/(successful+failed)*100:.1f}%")
 
 def save_product_to_database(product_data):
     """Save product data to database using tileshop_learner functions"""
@@ -152,7 +310,8 @@ def save_product_to_database(product_data):
         crawl_results = product_data.pop('_crawl_results', {
             'main': {'html': '', 'markdown': ''}
         })
-        save_to_database(product_data, crawl_results)
+        if not save_to_database(product_data, crawl_results):
+            raise RuntimeError('save_to_database reported a failure')
         print(f"    ✅ Saved to database: {product_data.get('title', 'Unknown')[:50]}...")
         return True
     except Exception as e:
@@ -180,6 +339,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Curl-based Enhanced Tileshop Scraper')
     parser.add_argument('--single-url', type=str, help='Scrape a single product URL')
     parser.add_argument('url', nargs='?', help='Scrape a single product URL (positional)')
+    parser.add_argument('--concurrency', type=int, default=1, help='Concurrent product fetches in batch mode')
+    parser.add_argument('--multi-fetch', action='store_true', help='Legacy mode: request each #tab URL separately')
     args = parser.parse_args()
     
     print("🔥 Curl-based Enhanced Scraper - 100% Reliable Data Acquisition")
@@ -188,7 +349,7 @@ if __name__ == "__main__":
     if args.single_url:
         # Single URL mode (used by intelligence manager)
         print(f"🎯 Single URL mode: {args.single_url}")
-        result = scrape_product_with_curl(args.single_url)
+        result = scrape_product_with_curl(args.single_url, single_fetch=not args.multi_fetch)
         if result:
             save_product_data(result)
             print(f"✅ Successfully processed: {args.single_url}")
@@ -198,7 +359,7 @@ if __name__ == "__main__":
     elif args.url:
         # Single URL mode (positional argument)
         print(f"🎯 Processing URL: {args.url}")
-        result = scrape_product_with_curl(args.url)
+        result = scrape_product_with_curl(args.url, single_fetch=not args.multi_fetch)
         if result:
             save_product_data(result)
             print(f"✅ Successfully processed: {args.url}")
@@ -208,4 +369,4 @@ if __name__ == "__main__":
     else:
         # Default test mode
         print("🚀 Test mode with default URLs")
-        scrape_products_with_curl(TEST_URLS)
\ No newline at end of file
+        scrape_products_with_curl(TEST_URLS, concurrency=args.concurrency, single_fetch=not args.multi_fetch)
\ No newline at end of file
@@ -366,8 +366,10 @@ def start_scraper():
         fresh = data.get('fresh', False)
         batch_size = data.get('batch_size', 10)  # Default batch size of 10
         category = data.get('category')  # Category for category-based mode
+        workers = data.get('workers', 1)  # Leased-batch worker processes
+        profile = data.get('profile', False)  # Per-stage extraction timings
         
-        result = acquisition_manager.start_acquisition(mode, limit, fresh, batch_size, category)
+        result = acquisition_manager.start_acquisition(mode, limit, fresh, batch_size, category, workers, profile)
         return jsonify(result)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -540,188 +542,16 @@ def download_sitemap_api():
             try:
                 import requests
                 import xml.etree.ElementTree as ET
-                from datetime import datetime
-                import os
-                
-                # Stage 1: Download sitemap
-                progress_callback('downloading', 0, 'Starting sitemap download...')
+                from sitemap_ingest import ingest_sitemap
                 
+                # Streams the sitemap (and any sitemap index children) and applies only
+                # the delta to the frontier, so scrape progress survives a refresh
                 try:
-                    response = requests.get(sitemap_url, timeout=30, stream=True)
-                    response.raise_for_status()
-                    
-                    total_size = int(response.headers.get('content-length', 0))
-                    downloaded = 0
-                    content = b''
-                    
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            content += chunk
-                            downloaded += len(chunk)
-                            if total_size > 0:
-                                progress = min(100, (downloaded / total_size) * 100)
-                                progress_callback('downloading', progress, 
-                                                f'Downloading sitemap... {downloaded:,} / {total_size:,} bytes')
-                            else:
-                                progress_callback('downloading', 50, 
-                                                f'Downloading sitemap... {downloaded:,} bytes')
-                    
-                    progress_callback('downloading', 100, f'Download complete ({len(content):,} bytes)')
-                    
+                    ingest_sitemap(sitemap_url, progress_callback=progress_callback)
                 except requests.RequestException as e:
                     progress_callback('error', 0, f'Download failed: {str(e)}')
-                    return
-                
-                # Stage 2: Parse XML
-                progress_callback('parsing', 0, 'Parsing XML content...')
-                
-                try:
-                    root = ET.fromstring(content)
-                    progress_callback('parsing', 50, 'XML parsed successfully')
                 except ET.ParseError as e:
                     progress_callback('error', 0, f'XML parsing failed: {str(e)}')
-                    return
-                
-                # Stage 3: Check if this is a sitemap index, and if so, find the product sitemap
-                progress_callback('parsing', 75, 'Checking sitemap type...')
-                
-                # Check if this is a sitemap index (contains <sitemapindex>)
-                if root.tag.endswith('sitemapindex'):
-                    progress_callback('parsing', 100, 'Found sitemap index - looking for product sitemap...')
-                    
-                    # Find sitemap URLs that likely contain products
-                    sitemap_elements = root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}sitemap')
-                    product_sitemap_url = None
-                    
-                    for sitemap_elem in sitemap_elements:
-                        loc_elem = sitemap_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                        if loc_elem is not None:
-                            sitemap_url_check = loc_elem.text
-                            # Look for sitemap that likely contains products
-                            if any(keyword in sitemap_url_check.lower() for keyword in ['product', 'page', 'post', 'main']):
-                                product_sitemap_url = sitemap_url_check
-                                break
-                    
-                    # If no specific product sitemap found, use the first one
-                    if not product_sitemap_url and sitemap_elements:
-                        first_sitemap = sitemap_elements[0].find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                        if first_sitemap is not None:
-                            product_sitemap_url = first_sitemap.text
-                    
-                    if product_sitemap_url:
-                        progress_callback('downloading', 0, f'Downloading product sitemap: {product_sitemap_url}')
-                        
-                        # Download the actual product sitemap
-                        try:
-                            response = requests.get(product_sitemap_url, timeout=30, stream=True)
-                            response.raise_for_status()
-                            
-                            total_size = int(response.headers.get('content-length', 0))
-                            downloaded = 0
-                            content = b''
-                            
-                            for chunk in response.iter_content(chunk_size=8192):
-                                if chunk:
-                                    content += chunk
-                                    downloaded += len(chunk)
-                                    if total_size > 0:
-                                        progress = min(100, (downloaded / total_size) * 100)
-                                        progress_callback('downloading', progress, 
-                                                        f'Downloading product sitemap... {downloaded:,} / {total_size:,} bytes')
-                            
-                            progress_callback('downloading', 100, f'Product sitemap download complete ({len(content):,} bytes)')
-                            
-                            # Parse the product sitemap
-                            progress_callback('parsing', 0, 'Parsing product sitemap...')
-                            root = ET.fromstring(content)
-                            progress_callback('parsing', 50, 'Product sitemap parsed successfully')
-                            
-                        except requests.RequestException as e:
-                            progress_callback('error', 0, f'Failed to download product sitemap: {str(e)}')
-                            return
-                        except ET.ParseError as e:
-                            progress_callback('error', 0, f'Failed to parse product sitemap: {str(e)}')
-                            return
-                    else:
-                        progress_callback('error', 0, 'No product sitemap found in sitemap index')
-                        return
-                
-                # Stage 4: Extract URLs
-                progress_callback('extracting', 0, 'Extracting URLs from sitemap...')
-                
-                urls_data = []
-                url_elements = root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url')
-                total_urls = len(url_elements)
-                
-                for i, url_elem in enumerate(url_elements):
-                    loc_elem = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-                    lastmod_elem = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}lastmod')
-                    
-                    if loc_elem is not None:
-                        url_data = {
-                            'url': loc_elem.text,
-                            'lastmod': lastmod_elem.text if lastmod_elem is not None else None,
-                            'scraped_at': None,
-                            'scrape_status': 'pending'
-                        }
-                        urls_data.append(url_data)
-                    
-                    # Update progress every 100 URLs
-                    if i % 100 == 0 or i == total_urls - 1:
-                        progress = (i + 1) / total_urls * 100
-                        progress_callback('extracting', progress, 
-                                        f'Extracted {i+1:,} / {total_urls:,} URLs')
-                
-                progress_callback('extracting', 100, f'Extracted {len(urls_data):,} total URLs')
-                
-                # Stage 5: Filter product URLs
-                progress_callback('filtering', 0, 'Filtering for product URLs...')
-                
-                filtered_urls = []
-                for i, url_data in enumerate(urls_data):
-                    url = url_data['url']
-                    # Apply filtering logic (same as download_sitemap.py)
-                    if ("tileshop.com/products/" in url and 
-                        "https://www.tileshop.com/products/,-w-," not in url and
-                        url != "https://www.tileshop.com/products/" and
-                        "sample" not in url):
-                        filtered_urls.append(url_data)
-                    
-                    # Update progress every 500 URLs
-                    if i % 500 == 0 or i == len(urls_data) - 1:
-                        progress = (i + 1) / len(urls_data) * 100
-                        filtered_count = len(filtered_urls)
-                        progress_callback('filtering', progress, 
-                                        f'Filtered {filtered_count:,} product URLs from {i+1:,} total')
-                
-                # Stage 6: Save results
-                progress_callback('saving', 0, 'Saving filtered URLs...')
-                
-                sitemap_data = {
-                    'downloaded_at': datetime.now().isoformat(),
-                    'total_urls': len(filtered_urls),
-                    'status': 'ready',
-                    'urls': filtered_urls,
-                    'source_url': sitemap_url
-                }
-                
-                # Save to file
-                import json
-                sitemap_file = "tileshop_sitemap.json"
-                with open(sitemap_file, 'w', encoding='utf-8') as f:
-                    json.dump(sitemap_data, f, indent=2, ensure_ascii=False)
-                
-                progress_callback('saving', 100, 'Sitemap saved successfully')
-                
-                # Final completion message
-                progress_callback('completed', 100, 
-                                f'Download complete: {len(filtered_urls):,} product URLs ready',
-                                {
-                                    'total_urls': len(urls_data),
-                                    'filtered_urls': len(filtered_urls),
-                                    'filter_percentage': (len(filtered_urls) / len(urls_data) * 100) if urls_data else 0,
-                                    'file_saved': sitemap_file
-                                })
                 
             except Exception as e:
                 logger.error(f"Sitemap download task error: {e}")
@@ -747,9 +577,10 @@ def get_sitemap_status():
         import json
         from datetime import datetime
         
-        sitemap_file = "tileshop_sitemap.json"
+        from url_frontier import get_frontier
+        frontier = get_frontier()
         
-        if not os.path.exists(sitemap_file):
+        if frontier.is_empty():
             return jsonify({
                 'success': True,
                 'status': 'not_found',
@@ -763,24 +594,12 @@ def get_sitemap_status():
                 }
             })
         
-        # Load sitemap data
-        with open(sitemap_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Calculate statistics
-        total_urls = len(data.get('urls', []))
-        pending = 0
-        completed_from_sitemap = 0
-        failed = 0
-        
-        for url_data in data.get('urls', []):
-            status = url_data.get('scrape_status', 'pending')
-            if status == 'pending':
-                pending += 1
-            elif status == 'completed':
-                completed_from_sitemap += 1
-            elif status == 'failed':
-                failed += 1
+        # Statistics come from counters maintained by the frontier
+        frontier_stats = frontier.get_statistics()
+        total_urls = frontier_stats['total_urls']
+        pending = frontier_stats['pending']
+        completed_from_sitemap = frontier_stats['completed']
+        failed = frontier_stats['failed']
         
         # Use intelligence manager's count if acquisition is running to prevent jumps
         completed = completed_from_sitemap
@@ -823,7 +642,7 @@ def get_sitemap_status():
             inserted = 0  # Default to 0 if calculation fails
         
         # Check age of sitemap
-        downloaded_at = data.get('downloaded_at')
+        downloaded_at = frontier.get_meta('downloaded_at')
         age_info = ""
         if downloaded_at:
             try:
@@ -861,7 +680,8 @@ def get_sitemap_status():
                 'completion_rate': scrape_progress,
                 'download_progress': download_progress,
                 'downloaded_at': downloaded_at,
-                'source_url': data.get('source_url', '')
+                'source_url': frontier.get_meta('source_url', ''),
+                'dead_letter': frontier_stats.get('dead_letter', 0)
             }
         })
         
@@ -869,6 +689,34 @@ def get_sitemap_status():
         logger.error(f"Error getting sitemap status: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/acquisition/stage-profile')
+def get_stage_profile():
+    """Per-stage extraction wall/CPU timings from a profiled acquisition run"""
+    try:
+        return jsonify({'success': True, 'profile': acquisition_manager.get_stage_profile()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/acquisition/retry-queue')
+def get_retry_queue():
+    """Scheduled retries per failure class and the dead-letter set"""
+    try:
+        from url_frontier import get_frontier
+        from retry_policy import DEAD_LETTER
+        frontier = get_frontier()
+        limit = request.args.get('limit', 100, type=int)
+        dead_letters = [{
+            'url': url_data['url'],
+            'error': url_data.get('error'),
+            'error_class': url_data.get('error_class'),
+            'attempts': url_data.get('failure_count'),
+            'last_attempt': url_data.get('scraped_at')
+        } for url_data in frontier.get_urls(status=DEAD_LETTER, limit=limit)]
+        return jsonify({'success': True, 'summary': frontier.retry_summary(), 'dead_letters': dead_letters})
+    except Exception as e:
+        logger.error(f"Error getting retry queue: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 # API Routes - Database Management
 @app.route('/api/database/status')
 def database_status():
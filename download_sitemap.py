@@ -1,274 +1,112 @@
 #!/usr/bin/env python3
 """
 Download and store sitemap for offline processing
-Creates a JSON file with all product URLs and timestamps
+Downloads stream through sitemap_ingest.py, which writes the JSON snapshot of
+product URLs and timestamps and queues only added or lastmod-changed URLs;
+per-URL scrape status lives in the indexed frontier (url_frontier.py).
 """
 
 import requests
 import xml.etree.ElementTree as ET
-import json
 from datetime import datetime
 import os
+from url_frontier import get_frontier
+from retry_policy import DEAD_LETTER
+from sitemap_ingest import ingest_sitemap
 
 # Configuration
 SITEMAP_URL = "https://www.tileshop.com/sitemap.xml"
 SITEMAP_FILE = "tileshop_sitemap.json"
 
-def download_and_parse_sitemap():
-    """Download sitemap and parse into JSON format"""
-    print(f"Downloading sitemap from: {SITEMAP_URL}")
-    
-    try:
-        response = requests.get(SITEMAP_URL, timeout=30)
-        response.raise_for_status()
-        print(f"✓ Downloaded sitemap ({len(response.content):,} bytes)")
-    except requests.RequestException as e:
-        print(f"✗ Failed to download sitemap: {e}")
-        return None
-    
-    # Parse XML
-    try:
-        root = ET.fromstring(response.content)
-        print("✓ Parsed XML successfully")
-    except ET.ParseError as e:
-        print(f"✗ Failed to parse XML: {e}")
+def load_sitemap_data():
+    """Load existing sitemap data (URLs and status from the frontier)"""
+    frontier = get_frontier()
+    if frontier.is_empty():
+        print(f"✗ Sitemap file {SITEMAP_FILE} not found")
         return None
     
-    # Extract URLs with metadata
-    urls_data = []
-    for url_elem in root.findall('.//{http://www.sitemaps.org/schemas/sitemap/0.9}url'):
-        loc_elem = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
-        lastmod_elem = url_elem.find('{http://www.sitemaps.org/schemas/sitemap/0.9}lastmod')
-        
-        if loc_elem is not None:
-            url_data = {
-                'url': loc_elem.text,
-                'lastmod': lastmod_elem.text if lastmod_elem is not None else None,
-                'scraped_at': None,  # Will be updated when scraped
-                'scrape_status': 'pending'  # pending, completed, failed
-            }
-            urls_data.append(url_data)
-    
-    print(f"✓ Extracted {len(urls_data):,} URLs from sitemap")
-    return urls_data
-
-def filter_product_urls(urls_data):
-    """Apply product URL filters"""
-    filtered_urls = []
-    
-    for url_data in urls_data:
-        url = url_data['url']
-        # Filter conditions from n8n workflow
-        if ("tileshop.com/products/" in url and 
-            "https://www.tileshop.com/products/,-w-," not in url and
-            url != "https://www.tileshop.com/products/" and
-            "sample" not in url):
-            filtered_urls.append(url_data)
-    
-    print(f"✓ Filtered to {len(filtered_urls):,} product URLs")
-    return filtered_urls
-
-def save_sitemap_data(urls_data):
-    """Save sitemap data to JSON file"""
-    sitemap_data = {
-        'downloaded_at': datetime.now().isoformat(),
-        'total_urls': len(urls_data),
+    stats = frontier.get_statistics()
+    data = {
+        'downloaded_at': frontier.get_meta('downloaded_at'),
+        'total_urls': stats['total_urls'],
         'status': 'ready',
-        'urls': urls_data
+        'urls': frontier.get_urls()
     }
     
-    with open(SITEMAP_FILE, 'w', encoding='utf-8') as f:
-        json.dump(sitemap_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"✓ Saved sitemap data to {SITEMAP_FILE}")
-    return sitemap_data
-
-def load_sitemap_data():
-    """Load existing sitemap data"""
-    if not os.path.exists(SITEMAP_FILE):
-        print(f"✗ Sitemap file {SITEMAP_FILE} not found")
-        return None
+    print(f"✓ Loaded sitemap data from {os.path.basename(frontier.db_path)}")
+    print(f"  Downloaded: {data['downloaded_at']}")
+    print(f"  Total URLs: {data['total_urls']:,}")
+    print(f"  Status - Pending: {stats['pending']:,}, Completed: {stats['completed']:,}, Failed: {stats['failed']:,}")
     
-    try:
-        with open(SITEMAP_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        print(f"✓ Loaded sitemap data from {SITEMAP_FILE}")
-        print(f"  Downloaded: {data['downloaded_at']}")
-        print(f"  Total URLs: {data['total_urls']:,}")
-        
-        # Count status
-        pending = sum(1 for url in data['urls'] if url['scrape_status'] == 'pending')
-        completed = sum(1 for url in data['urls'] if url['scrape_status'] == 'completed')
-        failed = sum(1 for url in data['urls'] if url['scrape_status'] == 'failed')
-        
-        print(f"  Status - Pending: {pending:,}, Completed: {completed:,}, Failed: {failed:,}")
-        
-        return data
-    except (json.JSONDecodeError, KeyError) as e:
-        print(f"✗ Failed to load sitemap data: {e}")
-        return None
+    return data
 
 def load_categorized_sitemap_data(category):
     """Load sitemap data filtered by category"""
-    CATEGORIZED_SITEMAP_FILE = "categorized_sitemap.json"
+    frontier = get_frontier()
+    available_categories = frontier.categories()
     
-    if not os.path.exists(CATEGORIZED_SITEMAP_FILE):
-        print(f"✗ Categorized sitemap file {CATEGORIZED_SITEMAP_FILE} not found")
-        print("  Run 'python categorize_sitemap.py' first to create categorized data")
+    if not available_categories:
+        print(f"✗ No categorized URLs in the frontier")
+        print("  Run 'python categorize_sitemap.py' first, then 'python url_frontier.py apply-categories'")
         return None
     
-    try:
-        with open(CATEGORIZED_SITEMAP_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Get category data
-        category_key = category.upper()
-        if category_key not in data['categorized_products']:
-            print(f"✗ Category '{category}' not found in categorized data")
-            available_categories = list(data['categorized_products'].keys())
-            print(f"  Available categories: {', '.join(available_categories)}")
-            return None
-        
-        category_urls = data['categorized_products'][category_key]
-        
-        # Convert to standard sitemap format
-        sitemap_data = {
-            'downloaded_at': datetime.now().isoformat(),
-            'total_urls': len(category_urls),
-            'status': 'ready',
-            'category': category,
-            'urls': []
-        }
-        
-        for product in category_urls:
-            url_data = {
-                'url': product['url'],
-                'lastmod': None,
-                'scraped_at': None,
-                'scrape_status': 'pending'
-            }
-            sitemap_data['urls'].append(url_data)
-        
-        print(f"✓ Loaded category '{category}' sitemap data")
-        print(f"  Category: {category}")
-        print(f"  Total URLs: {len(category_urls):,}")
-        
-        return sitemap_data
-    except (json.JSONDecodeError, KeyError) as e:
-        print(f"✗ Failed to load categorized sitemap data: {e}")
+    category_key = category.upper()
+    if category_key not in available_categories:
+        print(f"✗ Category '{category}' not found in categorized data")
+        print(f"  Available categories: {', '.join(available_categories)}")
         return None
-
-def update_url_status(url, status, error_msg=None):
-    """Update the status of a specific URL in the sitemap file"""
-    data = load_sitemap_data()
-    if not data:
-        return False
     
-    # Find and update the URL
-    for url_data in data['urls']:
-        if url_data['url'] == url:
-            url_data['scrape_status'] = status
-            url_data['scraped_at'] = datetime.now().isoformat()
-            if error_msg:
-                url_data['error'] = error_msg
-            break
+    category_urls = frontier.get_urls(category=category_key)
+    sitemap_data = {
+        'downloaded_at': frontier.get_meta('downloaded_at'),
+        'total_urls': len(category_urls),
+        'status': 'ready',
+        'category': category,
+        'urls': category_urls
+    }
+    
+    print(f"✓ Loaded category '{category}' sitemap data")
+    print(f"  Category: {category}")
+    print(f"  Total URLs: {len(category_urls):,}")
+    
+    return sitemap_data
+
+def update_url_status(url, status, error_msg=None, error_class=None):
+    """Update the status of a specific URL in the frontier
+    
+    Failures are classified and scheduled for a backed-off retry, or
+    dead-lettered once their class is out of attempts.
+    """
+    frontier = get_frontier()
+    if status == 'failed':
+        outcome = frontier.record_failure(url, error_msg, error_class)
+        if outcome and outcome[0] == DEAD_LETTER:
+            print(f"  ☠️  Out of retries - moved to dead-letter set")
+        elif outcome:
+            print(f"  🔁 Retry scheduled for {outcome[1][:19]}")
+        found = outcome is not None
     else:
+        found = frontier.update_status(url, status, error_msg)
+    if not found:
         print(f"✗ URL not found in sitemap: {url}")
         return False
-    
-    # Save updated data
-    with open(SITEMAP_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    
     return True
 
-def get_pending_urls(max_urls=None):
-    """Get list of pending URLs to scrape, prioritized by scrape history"""
-    data = load_sitemap_data()
-    if not data:
-        return []
-    
-    # Get all pending URLs with their metadata
-    pending_url_data = [url_data for url_data in data['urls'] 
-                       if url_data['scrape_status'] == 'pending']
-    
-    # Sort by priority:
-    # 1. URLs never scraped (no scraped_at timestamp) - highest priority
-    # 2. URLs with failed attempts, oldest first (by scraped_at) - retry oldest failures first
-    def sort_priority(url_data):
-        scraped_at = url_data.get('scraped_at')
-        if scraped_at is None:
-            # Never scraped - highest priority (sort key: 0, original index for stability)
-            return (0, url_data.get('original_index', 0))
-        else:
-            # Previously attempted - sort by timestamp (oldest first)
-            try:
-                from datetime import datetime
-                timestamp = datetime.fromisoformat(scraped_at)
-                return (1, timestamp)  # Lower timestamp = higher priority
-            except (ValueError, TypeError):
-                # Invalid timestamp - treat as never scraped
-                return (0, url_data.get('original_index', 0))
-    
-    # Sort URLs by priority
-    pending_url_data.sort(key=sort_priority)
-    
-    # Extract just the URLs
-    pending_urls = [url_data['url'] for url_data in pending_url_data]
-    
-    if max_urls:
-        pending_urls = pending_urls[:max_urls]
-    
-    return pending_urls
+def get_pending_urls(max_urls=None, category=None, include_retries=False):
+    """Get list of pending URLs to scrape, prioritized by scrape history
+    
+    Never-scraped URLs come first in sitemap order, then previous attempts
+    oldest first - served straight from the frontier index. include_retries
+    mixes in failed URLs whose backoff has elapsed.
+    """
+    return get_frontier().get_pending_urls(max_urls, category, include_retries)
 
 def get_scraping_statistics():
     """Get comprehensive scraping statistics"""
-    data = load_sitemap_data()
-    if not data:
+    frontier = get_frontier()
+    if frontier.is_empty():
         return {}
-    
-    from datetime import datetime
-    
-    stats = {
-        'total_urls': len(data['urls']),
-        'pending': 0,
-        'completed': 0,
-        'failed': 0,
-        'never_attempted': 0,
-        'oldest_completion': None,
-        'newest_completion': None,
-        'completion_rate': 0
-    }
-    
-    completion_dates = []
-    
-    for url_data in data['urls']:
-        status = url_data.get('scrape_status', 'pending')
-        
-        if status == 'pending':
-            stats['pending'] += 1
-            if url_data.get('scraped_at') is None:
-                stats['never_attempted'] += 1
-        elif status == 'completed':
-            stats['completed'] += 1
-            scraped_at = url_data.get('scraped_at')
-            if scraped_at:
-                try:
-                    completion_dates.append(datetime.fromisoformat(scraped_at))
-                except (ValueError, TypeError):
-                    pass
-        elif status == 'failed':
-            stats['failed'] += 1
-    
-    if completion_dates:
-        stats['oldest_completion'] = min(completion_dates).isoformat()
-        stats['newest_completion'] = max(completion_dates).isoformat()
-    
-    if stats['total_urls'] > 0:
-        stats['completion_rate'] = (stats['completed'] / stats['total_urls']) * 100
-    
-    return stats
+    return frontier.get_statistics()
 
 def is_sitemap_expired(sitemap_data, max_age_days=7):
     """Check if sitemap is older than max_age_days"""
@@ -306,27 +144,23 @@ def main(force_download=False, max_age_days=7):
         needs_download = True
     
     if needs_download:
-        # Download and process sitemap
+        # Stream the sitemap and apply only the delta - scrape progress is kept
         print("\n🌐 Downloading fresh sitemap...")
-        all_urls = download_and_parse_sitemap()
-        if not all_urls:
-            print("❌ Failed to download sitemap")
+        try:
+            result = ingest_sitemap(SITEMAP_URL, sitemap_file=SITEMAP_FILE)
+        except (requests.RequestException, ET.ParseError) as e:
+            print(f"❌ Failed to download sitemap: {e}")
             if existing_data:
                 print("🔄 Falling back to existing sitemap")
                 return existing_data
             return None
         
-        # Filter for product URLs
-        product_urls = filter_product_urls(all_urls)
-        
-        # Save to file
-        sitemap_data = save_sitemap_data(product_urls)
-        
         print(f"\n✅ Sitemap ready for scraping!")
         print(f"📄 File: {SITEMAP_FILE}")
-        print(f"🔗 Product URLs: {len(product_urls):,}")
+        print(f"🔗 Product URLs: {result['product_urls']:,} "
+              f"(+{result['added']:,} new, ~{result['lastmod_changed']:,} changed, -{result['removed']:,} removed)")
         
-        return sitemap_data
+        return load_sitemap_data()
     
     return existing_data
 
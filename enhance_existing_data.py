@@ -215,10 +215,17 @@ class DataEnhancer:
         print(f"🔄 Processing in batches of {batch_size}")
         print()
         
+        # Classify every uncached title up front in batched LLM requests; the
+        # per-product validation below then reads the answers from the cache
+        self.spec_extractor.detect_categories_with_llm(
+            [{'title': product.get('title', ''), 'description': product.get('description', '')} for product in products])
+        print()
+        
         for i, product in enumerate(products):
             print(f"Processing {i+1}/{total_products}: {product['title'][:50]}...")
             
             try:
+                llm_calls = self.spec_extractor.llm_calls
                 # Enhance the product
                 enhanced_product = self.enhance_product(product)
                 
@@ -236,8 +243,9 @@ class DataEnhancer:
                 
                 self.processed_count += 1
                 
-                # Rate limiting for API calls
-                time.sleep(0.5)  # Small delay between products
+                # Rate limiting for API calls (cached answers need none)
+                if self.spec_extractor.llm_calls != llm_calls:
+                    time.sleep(0.5)  # Small delay between products
                 
                 # Progress report every 10 products
                 if (i + 1) % 10 == 0:
@@ -5,9 +5,66 @@ Provides comprehensive categorization for better knowledge retrieval and semanti
 """
 
 import json
+import os
 import re
+from collections import Counter
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
+from llm_cache import category_fingerprint, get_llm_cache
+from stage_profiler import profile_stage
+
+# Material classification: rules first, the LLM only below this confidence
+MATERIAL_LLM_THRESHOLD = float(os.environ.get('TILESHOP_MATERIAL_LLM_THRESHOLD', '0.7'))
+MATERIAL_LLM_MODEL = "claude-3-haiku-20240307"
+MATERIAL_PROMPT_VERSION = 1   # Bump when the prompt or validation changes - cached verdicts are keyed on it
+MATERIAL_LLM_CONTEXT = f"{MATERIAL_LLM_MODEL}/material-prompt-v{MATERIAL_PROMPT_VERSION}"
+
+# Material type patterns with priority order
+MATERIAL_PATTERNS = [
+    ('porcelain', ['porcelain']),
+    ('resin', ['resin', 'resin-based', 'resin construction', 'resin-based construction']),  # Check resin before ceramic
+    ('polyisocyanurate', ['polyisocyanurate', 'polyiso', 'goboard']),  # GoBoard backer boards
+    ('polystyrene', ['polystyrene', 'wedi', 'foam board', 'xps', 'extruded polystyrene']),  # Wedi boards
+    ('composite', ['composite', 'composite backer board', 'built-in waterproof membrane']),  # Composite backer boards
+    ('silicone', ['silicone', '100% silicone', 'silicone caulk', 'silicone sealant']),  # Caulks and sealants
+    ('plastic', ['plastic', 'vite', 'lippage', 'polymer', 'abs', 'pvc', 'leveling system', 'leveling clip']),  # Tools and leveling systems
+    ('metal', ['metal', 'stainless steel', 'aluminum', 'titanium', 'steel', 'trowel', 'notched trowel']),  # Tools (default for trowels)
+    ('cement', ['cement', 'mortar', 'thinset', 'grout', 'sanded grout', 'unsanded grout', 'cement-based']),  # Installation materials
+    ('ceramic', ['ceramic']),
+    ('marble', ['marble', 'carrara', 'calacatta']),
+    ('granite', ['granite']),
+    ('travertine', ['travertine']),
+    ('limestone', ['limestone']),
+    ('slate', ['slate']),
+    ('glass', ['glass']),
+    ('natural stone', ['natural stone']),  # Removed generic 'stone' to avoid false matches
+    ('vinyl', ['vinyl', 'lvt', 'luxury vinyl']),
+    ('wood', ['wood', 'hardwood'])
+]
+
+# Products made of something other than the material their name mentions ("Stone Sealer")
+HARDWARE_TERMS = ['screw', 'fastener', 'hardware', 'washer', 'bolt', 'clip', 'bracket']
+HARDWARE_MATERIALS = ('metal', 'plastic')
+
+# What a product is made of, given what it is - the keyword tier
+FUNCTION_MATERIALS = {
+    'chemical': ['sealer', 'cleaner', 'polish', 'enhancer'],
+    'metal': ['screw', 'fastener', 'bolt', 'washer', 'stainless steel'],
+    'silicone': ['100% silicone', 'silicone caulk', 'sealant'],
+    'polyisocyanurate': ['goboard'],
+    'polystyrene': ['wedi'],
+    'cement': ['grout', 'mortar', 'thinset']
+}
+
+def is_ambiguous_material(material: str, text: str) -> bool:
+    """Whether a material keyword in text likely names what the product is used on, not made of"""
+    return any([
+        (material == 'natural stone' and any(term in text for term in ['sealer', 'cleaner', 'polish', 'enhancer'])),
+        (material == 'marble' and any(term in text for term in ['sealer', 'cleaner', 'polish', 'enhancer'])),
+        (material == 'ceramic' and any(term in text for term in ['sponge', 'tool', 'cleaner'])),
+        (material == 'metal' and any(term in text for term in ['sealer', 'cleaner', 'polish'])),
+        (material == 'polystyrene' and any(term in text for term in ['screw', 'fastener', 'hardware', 'washer', 'bolt']))
+    ])
 
 @dataclass
 class CategoryInfo:
@@ -21,13 +78,47 @@ class CategoryInfo:
     installation_complexity: str  # "basic", "intermediate", "advanced"
     typical_use_cases: List[str]
 
+@dataclass
+class MaterialVerdict:
+    """Material classification with the tier that decided it"""
+    material: Optional[str]
+    confidence: float
+    tier: str  # "spec", "title", "content", "keywords", "cache", "llm" or "none"
+
 class EnhancedCategorizer:
     """Enhanced categorization system optimized for RAG retrieval"""
     
-    def __init__(self, web_search_tool=None):
+    def __init__(self, web_search_tool=None, material_llm_threshold: float = MATERIAL_LLM_THRESHOLD):
         self.category_patterns = self._build_category_patterns()
         self.keyword_weights = self._build_keyword_weights()
         self.web_search_tool = web_search_tool
+        self.material_llm_threshold = material_llm_threshold
+        self.material_tiers = Counter()  # Verdicts per deciding tier
+        self.llm_calls = 0
+        self._verdict_cache = None
+        self._anthropic_client = None
+
+    @property
+    def verdict_cache(self):
+        """Persistent material verdicts from earlier LLM runs, opened on first use"""
+        if self._verdict_cache is None:
+            self._verdict_cache = get_llm_cache()
+        return self._verdict_cache
+
+    @verdict_cache.setter
+    def verdict_cache(self, cache):
+        self._verdict_cache = cache
+
+    def _llm_client(self):
+        """Anthropic client shared by every material request, or None without an API key"""
+        if self._anthropic_client is None:
+            import anthropic
+
+            api_key = os.getenv('ANTHROPIC_API_KEY')
+            if not api_key:
+                return None
+            self._anthropic_client = anthropic.Anthropic(api_key=api_key)
+        return self._anthropic_client
         
     def _build_category_patterns(self) -> Dict[str, Dict]:
         """Build comprehensive category patterns for product classification"""
@@ -198,6 +289,7 @@ class EnhancedCategorizer:
             "tile": 0.4, "installation": 0.4, "tool": 0.3, "accessory": 0.3
         }
     
+    @profile_stage('categorize')
     def categorize_product(self, product_data: Dict[str, Any]) -> CategoryInfo:
         """
         Categorize a product based on title, description, and other attributes
@@ -245,31 +337,26 @@ class EnhancedCategorizer:
     
     def extract_material_type(self, product_data: Dict[str, Any]) -> str:
         """Extract material type from title, description, or specifications"""
-        text_content = self._extract_text_content(product_data)
-        
-        # Material type patterns with priority order
-        material_patterns = [
-            ('porcelain', ['porcelain']),
-            ('resin', ['resin', 'resin-based', 'resin construction', 'resin-based construction']),  # Check resin before ceramic
-            ('polyisocyanurate', ['polyisocyanurate', 'polyiso', 'goboard']),  # GoBoard backer boards
-            ('polystyrene', ['polystyrene', 'wedi', 'foam board', 'xps', 'extruded polystyrene']),  # Wedi boards
-            ('composite', ['composite', 'composite backer board', 'built-in waterproof membrane']),  # Composite backer boards
-            ('silicone', ['silicone', '100% silicone', 'silicone caulk', 'silicone sealant']),  # Caulks and sealants
-            ('plastic', ['plastic', 'vite', 'lippage', 'polymer', 'abs', 'pvc', 'leveling system', 'leveling clip']),  # Tools and leveling systems
-            ('metal', ['metal', 'stainless steel', 'aluminum', 'titanium', 'steel', 'trowel', 'notched trowel']),  # Tools (default for trowels)
-            ('cement', ['cement', 'mortar', 'thinset', 'grout', 'sanded grout', 'unsanded grout', 'cement-based']),  # Installation materials
-            ('ceramic', ['ceramic']),
-            ('marble', ['marble', 'carrara', 'calacatta']),
-            ('granite', ['granite']),
-            ('travertine', ['travertine']),
-            ('limestone', ['limestone']),
-            ('slate', ['slate']),
-            ('glass', ['glass']),
-            ('natural stone', ['natural stone']),  # Removed generic 'stone' to avoid false matches
-            ('vinyl', ['vinyl', 'lvt', 'luxury vinyl']),
-            ('wood', ['wood', 'hardwood'])
-        ]
-        
+        return self.classify_material(product_data).material
+
+    @profile_stage('categorize.material')
+    def classify_material(self, product_data: Dict[str, Any]) -> MaterialVerdict:
+        """
+        Tiered material classification: specifications, title and content rules,
+        then function keywords. The LLM (and web research) is consulted only when
+        the best rule verdict is below material_llm_threshold, and its verdicts are
+        kept in the persistent cache so later runs do not ask again.
+        """
+        verdict = self._rule_material_verdict(product_data)
+        if verdict.confidence < self.material_llm_threshold:
+            llm_verdict = self._llm_material_verdict(product_data)
+            if llm_verdict.material:
+                verdict = llm_verdict
+        self.material_tiers[verdict.tier] += 1
+        return verdict
+
+    def _rule_material_verdict(self, product_data: Dict[str, Any]) -> MaterialVerdict:
+        """Best verdict from specifications, material keywords and function keywords"""
         # Check specifications FIRST (highest priority - most accurate)
         specs = product_data.get('specifications', {})
         if isinstance(specs, dict):
@@ -277,16 +364,15 @@ class EnhancedCategorizer:
             material_type_field = specs.get('material_type', '').lower()
             if material_type_field and material_type_field not in ['material', 'material type']:
                 print(f"  ✅ Material type detected from material_type spec: {material_type_field}")
-                return material_type_field
+                return MaterialVerdict(material_type_field, 1.0, 'spec')
             
             # Check generic material field
             material_field = specs.get('material', '').lower()
             if material_field and material_field != 'material':
-                for material, keywords in material_patterns:
-                    for keyword in keywords:
-                        if keyword in material_field:
-                            print(f"  ✅ Material type detected from specs: {material}")
-                            return material
+                for material, keywords in MATERIAL_PATTERNS:
+                    if any(keyword in material_field for keyword in keywords):
+                        print(f"  ✅ Material type detected from specs: {material}")
+                        return MaterialVerdict(material, 0.95, 'spec')
         
         # Check title as fallback with special logic for trowels and hardware
         title = product_data.get('title', '').lower()
@@ -294,80 +380,85 @@ class EnhancedCategorizer:
         # Special case: plastic trowels
         if 'trowel' in title and 'plastic' in title:
             print(f"  ✅ Material type detected from title: plastic (plastic trowel)")
-            return 'plastic'
+            return MaterialVerdict('plastic', 0.95, 'title')
         
-        # Special case: hardware/fasteners should skip pattern matching and use LLM
-        if any(term in title for term in ['screw', 'fastener', 'hardware', 'washer', 'bolt', 'clip', 'bracket']):
-            print(f"  🔍 Hardware product detected, using LLM for material detection")
-            llm_material = self._detect_material_with_llm(product_data)
-            if llm_material:
-                print(f"  ✅ Material type detected with LLM: {llm_material}")
-                return llm_material
-        
-        for material, keywords in material_patterns:
-            for keyword in keywords:
-                # Skip marble detection if it's likely a brand name like "Marmoreal"
-                if material == 'marble' and 'marmoreal' in title:
-                    continue
-                
-                # Skip ambiguous detections that should use LLM instead
-                if keyword in title:
-                    # Check for ambiguous cases where LLM should decide
-                    ambiguous_cases = [
-                        (material == 'natural stone' and any(term in title for term in ['sealer', 'cleaner', 'polish', 'enhancer'])),
-                        (material == 'marble' and any(term in title for term in ['sealer', 'cleaner', 'polish', 'enhancer'])),
-                        (material == 'ceramic' and any(term in title for term in ['sponge', 'tool', 'cleaner'])),
-                        (material == 'metal' and any(term in title for term in ['sealer', 'cleaner', 'polish'])),
-                        (material == 'polystyrene' and any(term in title for term in ['screw', 'fastener', 'hardware', 'washer', 'bolt']))
-                    ]
-                    
-                    if any(ambiguous_cases):
-                        # Skip pattern detection and let LLM handle it
-                        continue
-                    
-                    print(f"  ✅ Material type detected from title: {material}")
-                    return material
+        # Hardware names often mention what they attach to - only metal/plastic matches are trusted
+        hardware = any(term in title for term in HARDWARE_TERMS)
+        candidates = []
+        title_material = self._match_material_pattern(title, skip_marble=('marmoreal' in title))
+        if title_material:
+            candidates.append(MaterialVerdict(title_material, 0.9, 'title'))
+        
+        # Function keywords: a sealer is chemical whatever it seals
+        for material, keywords in FUNCTION_MATERIALS.items():
+            if any(re.search(rf'\b{re.escape(keyword)}(?:s|es)?\b', title) for keyword in keywords):
+                candidates.append(MaterialVerdict(material, self._calculate_material_confidence(material, title), 'keywords'))
+                break
         
         # Check description and other fields
-        for material, keywords in material_patterns:
-            for keyword in keywords:
-                if keyword in text_content:
-                    # Check for ambiguous cases where LLM should decide
-                    ambiguous_cases = [
-                        (material == 'natural stone' and any(term in text_content for term in ['sealer', 'cleaner', 'polish', 'enhancer'])),
-                        (material == 'marble' and any(term in text_content for term in ['sealer', 'cleaner', 'polish', 'enhancer'])),
-                        (material == 'ceramic' and any(term in text_content for term in ['sponge', 'tool', 'cleaner'])),
-                        (material == 'metal' and any(term in text_content for term in ['sealer', 'cleaner', 'polish'])),
-                        (material == 'polystyrene' and any(term in text_content for term in ['screw', 'fastener', 'hardware', 'washer', 'bolt']))
-                    ]
-                    
-                    if any(ambiguous_cases):
-                        # Skip pattern detection and let LLM handle it
-                        continue
-                        
-                    print(f"  ✅ Material type detected from content: {material}")
-                    return material
+        if not title_material:
+            content_material = self._match_material_pattern(self._extract_text_content(product_data))
+            if content_material:
+                candidates.append(MaterialVerdict(content_material, 0.75, 'content'))
+        
+        for candidate in candidates:
+            if hardware and candidate.material not in HARDWARE_MATERIALS:
+                candidate.confidence = 0.5
+        if not candidates:
+            return MaterialVerdict(None, 0.0, 'none')
+        
+        best = max(candidates, key=lambda candidate: candidate.confidence)
+        if best.confidence >= self.material_llm_threshold:
+            print(f"  ✅ Material type detected from {best.tier}: {best.material} ({best.confidence:.2f})")
+        elif hardware:
+            print(f"  🔍 Hardware product detected, using LLM for material detection")
+        return best
+
+    def _match_material_pattern(self, text: str, skip_marble: bool = False) -> Optional[str]:
+        """First unambiguous MATERIAL_PATTERNS material mentioned in text"""
+        for material, keywords in MATERIAL_PATTERNS:
+            # Skip marble detection if it's likely a brand name like "Marmoreal"
+            if material == 'marble' and skip_marble:
+                continue
+            # Skip ambiguous detections that should use LLM instead
+            if any(keyword in text for keyword in keywords) and not is_ambiguous_material(material, text):
+                return material
+        return None
+
+    def _llm_material_verdict(self, product_data: Dict[str, Any]) -> MaterialVerdict:
+        """Cached LLM verdict, or a new one validated with research and cached for next time"""
+        fingerprint = category_fingerprint(product_data.get('title', ''), '',
+                                           product_data.get('specifications') if isinstance(product_data.get('specifications'), dict) else None,
+                                           MATERIAL_LLM_CONTEXT)
+        cached = self.verdict_cache.get(fingerprint)
+        if cached:
+            if cached['category']:
+                print(f"  ✅ Material type from verdict cache: {cached['category']}")
+            return MaterialVerdict(cached['category'], 0.9, 'cache')
         
         # Try LLM-based material detection as fallback
+        calls = self.llm_calls
         llm_material = self._detect_material_with_llm(product_data)
+        if self.llm_calls == calls:
+            return MaterialVerdict(None, 0.0, 'none')  # No API access - nothing to remember
+        
         if llm_material:
             print(f"  ✅ Material type detected with LLM: {llm_material}")
             
-            # Validate LLM result with internet research if confidence is low
-            validated_material = self._validate_with_internet_research('material_type', llm_material, product_data)
-            return validated_material
-        
-        return None
+            # Validate LLM result with internet research if confidence is low (hardware answers stand as given)
+            title = product_data.get('title', '').lower()
+            if not any(term in title for term in HARDWARE_TERMS):
+                llm_material = self._validate_with_internet_research('material_type', llm_material, product_data)
+        self.verdict_cache.put(fingerprint, llm_material, llm_material, product_data.get('title'), MATERIAL_LLM_CONTEXT)
+        return MaterialVerdict(llm_material, 0.9, 'llm')
     
+    @profile_stage('llm.material')
     def _detect_material_with_llm(self, product_data: Dict[str, Any]) -> Optional[str]:
         """Use LLM to detect material type from product description"""
         try:
-            import os
-            import anthropic
-            
             # Check if Claude API is available
-            api_key = os.getenv('ANTHROPIC_API_KEY')
-            if not api_key:
+            client = self._llm_client()
+            if client is None:
                 return None
             
             title = product_data.get('title', '')
@@ -379,8 +470,6 @@ class EnhancedCategorizer:
             if not text_content.strip():
                 return None
             
-            client = anthropic.Anthropic(api_key=api_key)
-            
             prompt = f"""Analyze this product and determine what the PRODUCT ITSELF is made of, not what it's used with. Focus on the actual material composition.
 
 TRAINING EXAMPLES:
@@ -425,10 +514,12 @@ IMPORTANT: Don't be misled by what the product is used ON or WITH. Focus on what
 Respond with ONLY the material name in lowercase, no explanation."""
             
             response = client.messages.create(
-                model="claude-3-haiku-20240307",
+                model=MATERIAL_LLM_MODEL,
                 max_tokens=10,
+                temperature=0,
                 messages=[{"role": "user", "content": prompt}]
             )
+            self.llm_calls += 1
             
             material = response.content[0].text.strip().lower()
             
@@ -553,24 +644,15 @@ Respond with ONLY the material name in lowercase, no explanation."""
         title_lower = title.lower()
         material_lower = material.lower()
         
-        # High confidence patterns
-        high_confidence_patterns = {
-            'chemical': ['sealer', 'cleaner', 'polish', 'enhancer'],
-            'metal': ['screw', 'fastener', 'bolt', 'washer', 'stainless steel'],
-            'silicone': ['100% silicone', 'silicone caulk', 'sealant'],
-            'polyisocyanurate': ['goboard'],
-            'polystyrene': ['wedi'],
-            'cement': ['grout', 'mortar', 'thinset']
-        }
-        
-        if material_lower in high_confidence_patterns:
-            keywords = high_confidence_patterns[material_lower]
+        if material_lower in FUNCTION_MATERIALS:
+            keywords = FUNCTION_MATERIALS[material_lower]
             matches = sum(1 for keyword in keywords if keyword in title_lower)
             if matches > 0:
                 confidence = min(0.95, 0.6 + (matches * 0.15))
         
         return confidence
     
+    @profile_stage('categorize.research')
     def _perform_web_search(self, query: str) -> Optional[str]:
         """Perform web search using WebSearch tool for internet research"""
         try:
@@ -713,7 +795,8 @@ Respond with ONLY the material name in lowercase, no explanation."""
         # Check for priority category matches
         for priority_category, priority_keywords in priority_overrides.items():
             for keyword in priority_keywords:
-                if keyword in text_content:
+                # Whole words (plurals allowed) - "float" must not fire on "floating installation"
+                if re.search(rf'\b{re.escape(keyword)}(?:s|es)?\b', text_content):
                     print(f"  🎯 Priority category detected: {priority_category} (keyword: {keyword})")
                     # Give massive boost to priority categories
                     if priority_category not in scores:
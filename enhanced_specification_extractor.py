@@ -7,6 +7,67 @@ Automatically detects and extracts all available specification fields from produ
 import re
 import json
 from typing import Dict, Any, List, Tuple, Optional
+from parsed_page import ParsedPage
+from regex_registry import compile_pattern, pattern_chain
+from llm_cache import category_fingerprint, get_llm_cache
+from stage_profiler import profile_stage
+
+LLM_CATEGORY_MODEL = "claude-3-haiku-20240307"
+CATEGORY_PROMPT_VERSION = 1   # Bump when the prompt changes - cached answers are keyed on it
+LLM_CATEGORY_CONTEXT = f"{LLM_CATEGORY_MODEL}/category-prompt-v{CATEGORY_PROMPT_VERSION}"
+LLM_BATCH_SIZE = 25           # Products per batched classification prompt
+VALID_CATEGORIES = ['Tile', 'Trim', 'Grout', 'Adhesive', 'Sealer', 'Tool', 'Leveling', 'Substrate', 'Accessory']
+META_DESCRIPTION_PATTERN = re.compile(r'<meta\s+name=["\']description["\']\s+content=["\']([^"\'>]+)["\']', re.IGNORECASE)
+BATCH_ANSWER_PATTERN = re.compile(r'^\s*(\d+)[.):]\s*([A-Za-z]+)\s*$')
+
+# Category prompt: the examples lead into the product(s), the options follow
+CATEGORY_EXAMPLES = """Analyze this product and determine its category based on these validated examples:
+
+TRAINING EXAMPLES:
+- "Stone Sealer" → Sealer (chemical sealer product)
+- "Premium Gold Stone Sealer" → Sealer (chemical sealer product)
+- "Pro Sealant" → Sealer (sealant/caulk product)
+- "Ceramic Tile Sponge" → Tool (cleaning/installation tool)
+- "T-7 Sponge" → Tool (cleaning tool)
+- "Backer Board" → Substrate (structural substrate)
+- "GoBoard Backer Board" → Substrate (structural substrate)
+- "Screw and Washer Kit" → Tool (fastener/hardware tool)
+- "Fastener Kit" → Tool (installation hardware)
+- "Luxury Vinyl Quarter Round" → Trim
+- "Marble Somerset" → Trim  
+- "Glass Pencil Liner" → Trim
+- "Polished Bullnose" → Trim
+- "Sanded Grout" → Grout
+- "Thinset Mortar" → Adhesive
+- "Silicone Caulk" → Sealer
+- "Euro Style Trowel" → Tool
+- "Leveling Clips" → Leveling
+- "Lippage Washers" → Leveling
+- "Tile Spacers" → Tool
+- "Wedi Board" → Substrate
+- "Foam Board" → Substrate
+- "Porcelain Wall Tile" → Tile
+
+PRODUCT TO ANALYZE:
+"""
+
+CATEGORY_OPTIONS = """
+
+CATEGORY OPTIONS:
+- Tile: Floor tiles, wall tiles, mosaic tiles, ceramic, porcelain tiles
+- Trim: Bullnose, pencil liner, quarter round, Somerset, GL trim, edge pieces
+- Grout: Sanded grout, unsanded grout, grouting products
+- Adhesive: Mortar, thinset, tile adhesive, bonding agents
+- Sealer: Sealers, caulk, sealant, silicone, waterproofing products, chemical sealers
+- Tool: Trowels, cutters, sponges, installation tools, fasteners, hardware, screws
+- Leveling: Leveling systems, clips, wedges, lippage control, vite systems
+- Substrate: Backer boards, foam boards, Wedi boards, cement boards, structural boards
+- Accessory: Other installation accessories
+
+IMPORTANT: Focus on the primary function of the product:
+- Sealers/sealants = Sealer category
+- Cleaning tools/sponges/fasteners = Tool category  
+- Structural boards = Substrate category"""
 
 class EnhancedSpecificationExtractor:
     """Auto-expanding specification extractor for comprehensive data capture"""
@@ -14,6 +75,14 @@ class EnhancedSpecificationExtractor:
     def __init__(self):
         self.tile_field_patterns = self._build_tile_extraction_patterns()
         self.generic_field_patterns = self._build_generic_patterns()
+        # Compiled once and shared across instances via the regex registry
+        self.tile_field_chains = {field: pattern_chain(f"spec.{field}", patterns, re.IGNORECASE)
+                                  for field, patterns in self.tile_field_patterns.items()}
+        self.generic_field_regexes = [compile_pattern(f"spec.generic[{i}]", pattern, re.IGNORECASE)
+                                      for i, pattern in enumerate(self.generic_field_patterns)]
+        self._llm_cache = None
+        self.llm_calls = 0
+        self._anthropic_client = None
         
     def _build_tile_extraction_patterns(self) -> Dict[str, List[str]]:
         """Build extraction patterns for tile-specific fields"""
@@ -159,10 +228,13 @@ class EnhancedSpecificationExtractor:
             r'<div[^>]*class="[^"]*spec[^"]*"[^>]*>([^:]+):\s*([^<]+)</div>',
         ]
     
-    def extract_specifications(self, html_content: str, category: str = "tile", product_title: str = "") -> Dict[str, Any]:
+    @profile_stage('specs')
+    def extract_specifications(self, html_content: str, category: str = "tile", product_title: str = "",
+                               page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """
         Extract all available specifications from HTML content
         Returns both known fields and auto-detected fields
+        page: shared ParsedPage for html_content, reusing its decoded __NEXT_DATA__
         """
         print("🔍 Enhanced Specification Extraction")
         print("-" * 40)
@@ -171,7 +243,7 @@ class EnhancedSpecificationExtractor:
         auto_detected = {}
         
         # 1. Extract from __NEXT_DATA__ JSON (highest priority - most accurate)
-        next_data_specs = self._extract_from_next_data(html_content)
+        next_data_specs = self._extract_from_next_data(html_content, page)
         specifications.update(next_data_specs)
         
         # 2. Extract known tile-specific fields
@@ -184,7 +256,8 @@ class EnhancedSpecificationExtractor:
         # 4. Extract product category from title if provided
         if product_title:
             # Try LLM-based category detection first
-            llm_category = self._detect_category_with_llm(product_title, html_content)
+            llm_category = self._detect_category_with_llm(product_title, html_content,
+                                                          page.breadcrumb if page else "", specifications)
             if llm_category:
                 specifications['product_category'] = llm_category
             else:
@@ -209,23 +282,22 @@ class EnhancedSpecificationExtractor:
         """Extract known tile specification fields using defined patterns"""
         extracted = {}
         
-        for field_name, patterns in self.tile_field_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, html_content, re.IGNORECASE)
-                if match:
-                    value = match.group(1).strip()
-                    if value and len(value) > 0:
-                        # Type conversion for specific fields
-                        if field_name in ['box_quantity', 'number_of_faces', 'pei_rating']:
-                            try:
-                                extracted[field_name] = int(value)
-                            except ValueError:
-                                extracted[field_name] = value
-                        elif field_name == 'directional_layout':
-                            extracted[field_name] = value.lower() == 'yes'
-                        else:
-                            extracted[field_name] = value
-                        break
+        content_lower = html_content.lower()  # Shared by every field's literal pre-checks
+        for field_name, chain in self.tile_field_chains.items():
+            # First pattern (in priority order) with a non-blank value wins
+            match = chain.first(html_content, accept=lambda m: bool(m.group(1).strip()), lower=content_lower)
+            if match:
+                value = match.group(1).strip()
+                # Type conversion for specific fields
+                if field_name in ['box_quantity', 'number_of_faces', 'pei_rating']:
+                    try:
+                        extracted[field_name] = int(value)
+                    except ValueError:
+                        extracted[field_name] = value
+                elif field_name == 'directional_layout':
+                    extracted[field_name] = value.lower() == 'yes'
+                else:
+                    extracted[field_name] = value
         
         return extracted
     
@@ -233,8 +305,8 @@ class EnhancedSpecificationExtractor:
         """Auto-detect specification fields using generic patterns"""
         detected = {}
         
-        for pattern in self.generic_field_patterns:
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
+        for regex in self.generic_field_regexes:
+            matches = regex.findall(html_content)
             for match in matches:
                 if isinstance(match, tuple) and len(match) == 2:
                     field_name, field_value = match
@@ -249,18 +321,21 @@ class EnhancedSpecificationExtractor:
         
         return detected
     
-    def _extract_from_next_data(self, html_content: str) -> Dict[str, str]:
+    def _extract_from_next_data(self, html_content: str, page: Optional[ParsedPage] = None) -> Dict[str, str]:
         """Extract specifications from __NEXT_DATA__ JSON structure"""
         extracted = {}
         
         try:
-            # Find __NEXT_DATA__ script tag
-            next_data_pattern = r'<script id="__NEXT_DATA__" type="application/json">([^<]+)</script>'
-            match = re.search(next_data_pattern, html_content)
+            if page is not None:
+                # Already decoded once for this page
+                data = page.next_data
+            else:
+                # Find __NEXT_DATA__ script tag
+                next_data_pattern = r'<script id="__NEXT_DATA__" type="application/json">([^<]+)</script>'
+                match = re.search(next_data_pattern, html_content)
+                data = json.loads(match.group(1)) if match else None
             
-            if match:
-                next_data_json = match.group(1)
-                data = json.loads(next_data_json)
+            if data:
                 
                 # Navigate to specifications
                 specs_path = data.get('props', {}).get('pageProps', {}).get('layoutData', {}).get('sitecore', {}).get('context', {}).get('productData', {}).get('Specifications', {})
@@ -491,94 +566,79 @@ class EnhancedSpecificationExtractor:
         # Default fallback
         return "Product"
     
-    def _detect_category_with_llm(self, product_title: str, html_content: str) -> Optional[str]:
-        """Use LLM to detect product category from title and content"""
-        try:
+    @property
+    def llm_cache(self):
+        """Persistent category answer cache, opened on first use"""
+        if self._llm_cache is None:
+            self._llm_cache = get_llm_cache()
+        return self._llm_cache
+
+    @llm_cache.setter
+    def llm_cache(self, cache):
+        self._llm_cache = cache
+
+    def _llm_client(self):
+        """Anthropic client shared by every category request, or None without an API key"""
+        if self._anthropic_client is None:
             import os
             import anthropic
-            import re
-            
-            # Check if Claude API is available
+
             api_key = os.getenv('ANTHROPIC_API_KEY')
             if not api_key:
                 return None
-            
-            # Extract description from HTML if available
-            desc_pattern = r'<meta\s+name=["\']description["\']\s+content=["\']([^"\'>]+)["\']'
-            desc_match = re.search(desc_pattern, html_content, re.IGNORECASE)
-            description = desc_match.group(1) if desc_match else ""
-            
-            # Combine title and description for analysis
-            text_content = f"Title: {product_title}\nDescription: {description}"
-            
-            if not text_content.strip():
-                return None
-            
-            client = anthropic.Anthropic(api_key=api_key)
-            
-            prompt = f"""Analyze this product and determine its category based on these validated examples:
+            self._anthropic_client = anthropic.Anthropic(api_key=api_key)
+        return self._anthropic_client
 
-TRAINING EXAMPLES:
-- "Stone Sealer" → Sealer (chemical sealer product)
-- "Premium Gold Stone Sealer" → Sealer (chemical sealer product)
-- "Pro Sealant" → Sealer (sealant/caulk product)
-- "Ceramic Tile Sponge" → Tool (cleaning/installation tool)
-- "T-7 Sponge" → Tool (cleaning tool)
-- "Backer Board" → Substrate (structural substrate)
-- "GoBoard Backer Board" → Substrate (structural substrate)
-- "Screw and Washer Kit" → Tool (fastener/hardware tool)
-- "Fastener Kit" → Tool (installation hardware)
-- "Luxury Vinyl Quarter Round" → Trim
-- "Marble Somerset" → Trim  
-- "Glass Pencil Liner" → Trim
-- "Polished Bullnose" → Trim
-- "Sanded Grout" → Grout
-- "Thinset Mortar" → Adhesive
-- "Silicone Caulk" → Sealer
-- "Euro Style Trowel" → Tool
-- "Leveling Clips" → Leveling
-- "Lippage Washers" → Leveling
-- "Tile Spacers" → Tool
-- "Wedi Board" → Substrate
-- "Foam Board" → Substrate
-- "Porcelain Wall Tile" → Tile
+    def _category_fingerprint(self, product_title: str, breadcrumb: str = "",
+                              specifications: Optional[Dict[str, Any]] = None) -> str:
+        return category_fingerprint(product_title, breadcrumb, specifications, LLM_CATEGORY_CONTEXT)
 
-PRODUCT TO ANALYZE:
-{text_content}
+    def _meta_description(self, html_content: str) -> str:
+        desc_match = META_DESCRIPTION_PATTERN.search(html_content or "")
+        return desc_match.group(1) if desc_match else ""
 
-CATEGORY OPTIONS:
-- Tile: Floor tiles, wall tiles, mosaic tiles, ceramic, porcelain tiles
-- Trim: Bullnose, pencil liner, quarter round, Somerset, GL trim, edge pieces
-- Grout: Sanded grout, unsanded grout, grouting products
-- Adhesive: Mortar, thinset, tile adhesive, bonding agents
-- Sealer: Sealers, caulk, sealant, silicone, waterproofing products, chemical sealers
-- Tool: Trowels, cutters, sponges, installation tools, fasteners, hardware, screws
-- Leveling: Leveling systems, clips, wedges, lippage control, vite systems
-- Substrate: Backer boards, foam boards, Wedi boards, cement boards, structural boards
-- Accessory: Other installation accessories
+    @profile_stage('llm.category')
+    def _ask_llm(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """One deterministic claude-3-haiku completion, or None without a client"""
+        client = self._llm_client()
+        if client is None:
+            return None
+        response = client.messages.create(
+            model=LLM_CATEGORY_MODEL,
+            max_tokens=max_tokens,
+            temperature=0,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        self.llm_calls += 1
+        return response.content[0].text.strip()
 
-IMPORTANT: Focus on the primary function of the product:
-- Sealers/sealants = Sealer category
-- Cleaning tools/sponges/fasteners = Tool category  
-- Structural boards = Substrate category
+    def _detect_category_with_llm(self, product_title: str, html_content: str, breadcrumb: str = "",
+                                  specifications: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Use LLM to detect product category from title and content
 
-Respond with ONLY the category name, no explanation."""            
+        Answers are cached by title/breadcrumb/spec fingerprint, so a product
+        (or a color sibling) seen before never calls the API again.
+        """
+        try:
+            fingerprint = self._category_fingerprint(product_title, breadcrumb, specifications)
+            cached = self.llm_cache.get(fingerprint)
+            if cached:
+                if cached['category']:
+                    print(f"  ✅ Category from LLM cache: {cached['category']}")
+                return cached['category']
             
-            response = client.messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=10,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            # Combine title and description for analysis
+            text_content = f"Title: {product_title}\nDescription: {self._meta_description(html_content)}"
             
-            category = response.content[0].text.strip()
+            prompt = CATEGORY_EXAMPLES + text_content + CATEGORY_OPTIONS + "\n\nRespond with ONLY the category name, no explanation."
+            answer = self._ask_llm(prompt, max_tokens=10)
+            if answer is None:
+                return None
             
             # Validate the response
-            valid_categories = [
-                'Tile', 'Trim', 'Grout', 'Adhesive', 'Sealer', 'Tool', 
-                'Leveling', 'Substrate', 'Accessory'
-            ]
-            
-            if category in valid_categories:
+            category = answer if answer in VALID_CATEGORIES else None
+            self.llm_cache.put(fingerprint, category, answer, product_title, LLM_CATEGORY_CONTEXT)
+            if category:
                 print(f"  ✅ Category detected with LLM: {category}")
                 return category
             
@@ -586,6 +646,61 @@ Respond with ONLY the category name, no explanation."""
             print(f"  ⚠️ LLM category detection failed: {e}")
         
         return None
+
+    def detect_categories_with_llm(self, products: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Categories for many products, asking the LLM once per batch of uncached ones
+
+        products: dicts with title and optionally html (or description),
+        breadcrumb and specifications. Returns one category (or None) per product.
+        """
+        fingerprints = [self._category_fingerprint(p.get('title', ''), p.get('breadcrumb', ''), p.get('specifications'))
+                        for p in products]
+        cached = self.llm_cache.get_many(fingerprints)
+        pending = {}
+        for fingerprint, product in zip(fingerprints, products):
+            if fingerprint not in cached and fingerprint not in pending and product.get('title'):
+                pending[fingerprint] = product
+
+        answers = {fingerprint: row['category'] for fingerprint, row in cached.items()}
+        pending = list(pending.items())
+        for start in range(0, len(pending), LLM_BATCH_SIZE):
+            batch = pending[start:start + LLM_BATCH_SIZE]
+            try:
+                answers.update(self._classify_batch(batch))
+            except Exception as e:
+                print(f"  ⚠️ LLM batch category detection failed: {e}")
+        if pending:
+            print(f"  🧠 LLM categories: {len(cached)} cached, {len(pending)} classified in "
+                  f"{(len(pending) + LLM_BATCH_SIZE - 1) // LLM_BATCH_SIZE} requests")
+        return [answers.get(fingerprint) for fingerprint in fingerprints]
+
+    def _classify_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Optional[str]]:
+        """One numbered prompt for up to LLM_BATCH_SIZE products; answers are cached as they arrive"""
+        lines = []
+        for number, (_, product) in enumerate(batch, 1):
+            description = product.get('description') or self._meta_description(product.get('html', ''))
+            lines.append(f"{number}. Title: {product.get('title', '')}\n   Description: {description}")
+        prompt = (CATEGORY_EXAMPLES.replace("PRODUCT TO ANALYZE:", "PRODUCTS TO ANALYZE:") + "\n".join(lines)
+                  + CATEGORY_OPTIONS + "\n\nRespond with one line per product in the form \"<number>. <category>\""
+                  ", in the same order, with no explanation.")
+        answer = self._ask_llm(prompt, max_tokens=8 * len(batch) + 20)
+        if answer is None:
+            return {}
+
+        numbered = {}
+        for line in answer.splitlines():
+            match = BATCH_ANSWER_PATTERN.match(line)
+            if match:
+                numbered.setdefault(int(match.group(1)), match.group(2).strip())
+        results = {}
+        for number, (fingerprint, product) in enumerate(batch, 1):
+            if number not in numbered:
+                continue  # Not answered - asked again next time rather than cached
+            raw = numbered[number]
+            category = raw if raw in VALID_CATEGORIES else None
+            self.llm_cache.put(fingerprint, category, raw, product.get('title'), LLM_CATEGORY_CONTEXT)
+            results[fingerprint] = category
+        return results
     
     def _clean_specifications(self, specifications: Dict[str, Any]) -> Dict[str, Any]:
         """Clean and standardize specification values with corruption filtering"""
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP fetch engine for Tileshop acquisition
+Reuses keep-alive connections across pages instead of forking curl per request,
+with a per-host concurrency limit and a token-bucket politeness budget
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_controller import get_rate_controller
+
+# Same browser identity the curl path uses - keeps responses identical
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+
+# Configuration
+DEFAULT_PER_HOST_CONCURRENCY = 4
+DEFAULT_RATE_PER_SECOND = 2.0  # Politeness budget: sustained requests per second per engine
+DEFAULT_BURST = 4
+DEFAULT_TIMEOUT = 30
+
+@dataclass
+class FetchResult:
+    """Outcome of a single page fetch"""
+    url: str
+    status_code: Optional[int] = None
+    html: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code == 200 and bool(self.html)
+
+class TokenBucket:
+    """Thread-safe token bucket used as a politeness budget"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: float):
+        """Change the refill rate (requests per second) on the fly"""
+        with self._lock:
+            self._refill()
+            self.rate = max(float(rate), 0.001)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available; returns the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                shortfall = (tokens - self._tokens) / self.rate
+            time.sleep(shortfall)
+            waited += shortfall
+
+class FetchEngine:
+    """Keep-alive HTTP client with per-host concurrency and rate limiting"""
+
+    def __init__(self, per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+                 rate_per_second: float = DEFAULT_RATE_PER_SECOND,
+                 burst: float = DEFAULT_BURST,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 user_agent: str = DEFAULT_USER_AGENT,
+                 rate_controller=None):
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_per_second, burst)
+        # An adaptive controller replaces the fixed token bucket when given
+        self.rate_controller = rate_controller
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(per_host_concurrency, 1) * 2, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_concurrency)
+            return self._host_slots[host]
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """Fetch one URL, respecting the host slot and the politeness budget"""
+        # Fragments never reach the server - strip them so the pool is keyed on the real resource
+        request_url = url.split('#', 1)[0]
+        result = FetchResult(url=url)
+
+        with self._host_slot(request_url):
+            if self.rate_controller:
+                self.rate_controller.wait()
+            else:
+                self.bucket.acquire()
+            start = time.monotonic()
+            try:
+                response = self.session.get(request_url, headers=headers, timeout=self.timeout)
+                result.status_code = response.status_code
+                result.headers = response.headers  # Case-insensitive lookups (ETag vs Etag)
+                if response.status_code == 200:
+                    # Mirror curl's decoding behaviour: utf-8 first, then the declared charset
+                    try:
+                        result.html = response.content.decode('utf-8')
+                    except UnicodeDecodeError:
+                        result.html = response.content.decode(response.encoding or 'latin1', errors='ignore')
+                elif response.status_code != 304:
+                    result.error = f"HTTP {response.status_code}"
+            except requests.Timeout:
+                result.error = 'timeout'
+            except requests.RequestException as e:
+                result.error = f"Network error: {e}"
+            result.elapsed = time.monotonic() - start
+
+        if self.rate_controller:
+            self.rate_controller.record(result.status_code, result.elapsed, result.error,
+                                        result.headers.get('Retry-After') if result.headers else None)
+        return result
+
+    def fetch_many(self, urls: Iterable[str], max_workers: Optional[int] = None) -> Iterator[FetchResult]:
+        """Fetch URLs concurrently, yielding results as they complete"""
+        urls = list(urls)
+        if not urls:
+            return
+        workers = max_workers or self.per_host_concurrency
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.fetch, url) for url in urls]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def close(self):
+        self.session.close()
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+def get_fetch_engine(**kwargs) -> FetchEngine:
+    """Return the process-wide engine so every caller shares one connection pool
+    
+    The shared engine is paced by the shared adaptive rate controller.
+    """
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            kwargs.setdefault('rate_controller', get_rate_controller())
+            _shared_engine = FetchEngine(**kwargs)
+        return _shared_engine
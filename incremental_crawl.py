@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Incremental re-crawl support for Tileshop acquisition
+Stores ETag/Last-Modified and a hash of the normalized product payload per URL,
+sends conditional requests and skips extraction for unchanged products
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from fetch_engine import get_fetch_engine
+
+# Configuration
+VALIDATORS_FILE = "crawl_validators.json"
+FLUSH_EVERY = 25  # Persist validators after this many updates
+
+# Change detection outcomes
+UNCHANGED_SITEMAP = 'unchanged_sitemap'   # Sitemap lastmod not newer than last check - no request
+NOT_MODIFIED = 'not_modified'             # Server answered 304
+UNCHANGED_CONTENT = 'unchanged_content'   # 200, but normalized payload hash is the same
+CHANGED = 'changed'
+FAILED = 'failed'
+
+UNCHANGED_OUTCOMES = (UNCHANGED_SITEMAP, NOT_MODIFIED, UNCHANGED_CONTENT)
+
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+JSON_LD_PATTERN = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+
+def _product_data_from_next_data(html):
+    """Return the productData block from __NEXT_DATA__, if present"""
+    match = NEXT_DATA_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        next_data = json.loads(match.group(1))
+        return next_data['props']['pageProps']['layoutData']['sitecore']['context']['productData']
+    except (json.JSONDecodeError, KeyError, TypeError):
+        return None
+
+def normalize_product_payload(html):
+    """Reduce a product page to the parts extraction depends on
+
+    Uses the __NEXT_DATA__ productData and JSON-LD Product blocks, which are
+    stable across requests; falls back to whitespace-collapsed HTML with
+    scripts removed when neither is present.
+    """
+    payload = {}
+
+    product_data = _product_data_from_next_data(html)
+    if product_data is not None:
+        payload['next_data'] = product_data
+
+    json_ld_blocks = []
+    for block in JSON_LD_PATTERN.findall(html):
+        try:
+            json_ld_blocks.append(json.loads(block.strip()))
+        except json.JSONDecodeError:
+            continue
+    if json_ld_blocks:
+        payload['json_ld'] = json_ld_blocks
+
+    if payload:
+        return json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    text = re.sub(r'<script\b.*?</script>', '', html, flags=re.IGNORECASE | re.DOTALL)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def compute_content_hash(html):
+    """SHA-256 of the normalized product payload"""
+    return hashlib.sha256(normalize_product_payload(html).encode('utf-8')).hexdigest()
+
+class ValidatorStore:
+    """Per-URL HTTP validators and content hashes, persisted as JSON
+    
+    Entries also count checks and observed payload changes, which
+    crawl_scheduler.py turns into a change frequency.
+    """
+
+    def __init__(self, path=VALIDATORS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.validators = {}
+        self.pending = {}  # New validators held until the product is saved
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.validators = json.load(f).get('urls', {})
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️  Could not load {path}: {e} - starting with empty validators")
+
+    def get(self, url):
+        return self.validators.get(url)
+
+    def update(self, url, **fields):
+        with self._lock:
+            entry = self.validators.setdefault(url, {})
+            entry.update({k: v for k, v in fields.items() if v is not None})
+            entry['checked_at'] = datetime.now().isoformat()
+            self._dirty += 1
+            should_flush = self._dirty >= FLUSH_EVERY
+        if should_flush:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            data = {'updated_at': datetime.now().isoformat(), 'urls': self.validators}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+
+def conditional_headers(entry):
+    """Build If-None-Match / If-Modified-Since headers from stored validators"""
+    headers = {}
+    if not entry:
+        return headers
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+def _parse_lastmod(value):
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def sitemap_says_unchanged(entry, sitemap_lastmod):
+    """True when the sitemap lastmod is not newer than our last successful check"""
+    if not entry or not entry.get('content_hash') or not sitemap_lastmod:
+        return False
+    lastmod = _parse_lastmod(sitemap_lastmod)
+    checked_at = _parse_lastmod(entry.get('checked_at'))
+    return bool(lastmod and checked_at and lastmod <= checked_at)
+
+def check_for_changes(url, store, sitemap_lastmod=None, engine=None):
+    """Decide whether a product page changed since the last crawl
+
+    Returns (outcome, html) - html is only set when the page must be re-extracted.
+    The content hash is recorded by mark_extracted once the save succeeds, so a
+    failed save is retried on the next run.
+    """
+    entry = store.get(url)
+
+    if sitemap_says_unchanged(entry, sitemap_lastmod):
+        return UNCHANGED_SITEMAP, None
+
+    engine = engine or get_fetch_engine()
+    result = engine.fetch(url, headers=conditional_headers(entry))
+
+    # Observation counters feed the re-crawl scheduler's change frequency
+    checks = (entry or {}).get('checks', 0) + 1
+    
+    if result.status_code == 304:
+        store.update(url, checks=checks)
+        return NOT_MODIFIED, None
+
+    if not result.ok:
+        return FAILED, None
+
+    content_hash = compute_content_hash(result.html)
+    validators = {
+        'etag': result.headers.get('ETag'),
+        'last_modified': result.headers.get('Last-Modified'),
+    }
+
+    if entry and entry.get('content_hash') == content_hash:
+        store.update(url, checks=checks, **validators)
+        return UNCHANGED_CONTENT, None
+
+    # Hold the new hash until the product is saved
+    pending = dict(validators, content_hash=content_hash, checks=checks)
+    if entry and entry.get('content_hash'):
+        pending['changes'] = entry.get('changes', 0) + 1
+        pending['changed_at'] = datetime.now().isoformat()
+    store.pending[url] = pending
+    return CHANGED, result.html
+
+def mark_extracted(url, store):
+    """Commit the pending hash/validators after a successful save"""
+    pending = store.pending.pop(url, None)
+    if pending:
+        store.update(url, **pending)
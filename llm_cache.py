@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Persistent cache for LLM product category answers
+EnhancedSpecificationExtractor asks claude-3-haiku for each product's
+category. Answers are kept in SQLite under a fingerprint of the normalized
+title, breadcrumb and category-relevant specs (color words and SKUs removed,
+so color siblings share one entry), together with the model and prompt
+version. Rejected answers are cached too: replaying or re-crawling a known
+catalog returns the first answer for every product and makes no API call.
+EnhancedCategorizer keeps its LLM material verdicts in the same table under
+its own model/prompt context.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+# Configuration
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LLM_CACHE_DB = os.environ.get('TILESHOP_LLM_CACHE', os.path.join(BASE_DIR, 'llm_category_cache.db'))
+FINGERPRINT_SPECS = ('material_type', 'product_type')   # Specs that tell products apart by category
+COLOR_SPECS = ('color', 'color_family')                 # Removed from the title - siblings share answers
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS category_answers (
+    fingerprint TEXT PRIMARY KEY,
+    category TEXT,
+    raw_answer TEXT,
+    title TEXT,
+    context TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def normalize_text(text, drop_words=()):
+    """Lowercase words and numbers only, without the given words or SKU-like numbers"""
+    text = (text or '').lower()
+    for word in drop_words:
+        if word:
+            text = re.sub(rf'\b{re.escape(word.lower())}\b', ' ', text)
+    text = re.sub(r'\b\d{5,}\b', ' ', text)
+    return ' '.join(re.findall(r'[a-z0-9]+(?:\.[0-9]+)?', text))
+
+def category_fingerprint(title, breadcrumb='', specifications=None, context=''):
+    """Cache key for one product's category question
+
+    context names the model and prompt version - changing either starts a
+    fresh set of answers.
+    """
+    specifications = specifications or {}
+    colors = [str(specifications[key]) for key in COLOR_SPECS if specifications.get(key)]
+    parts = [context, normalize_text(title, colors), normalize_text(breadcrumb)]
+    parts += [f"{key}={normalize_text(str(specifications[key]))}" for key in FINGERPRINT_SPECS if specifications.get(key)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class LLMCategoryCache:
+    """Category answers by fingerprint, with per-process hit/miss counters"""
+
+    def __init__(self, path=LLM_CACHE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get_many(self, fingerprints):
+        """{fingerprint: row} for the cached ones; rows carry category (None for rejected answers)"""
+        fingerprints = list(dict.fromkeys(fingerprints))
+        found = {}
+        with self._lock, self.conn:
+            for start in range(0, len(fingerprints), 500):
+                chunk = fingerprints[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.conn.execute(
+                    f'SELECT * FROM category_answers WHERE fingerprint IN ({placeholders})', chunk).fetchall()
+                found.update((row['fingerprint'], dict(row)) for row in rows)
+            if found:
+                self.conn.executemany('UPDATE category_answers SET hit_count = hit_count + 1 WHERE fingerprint = ?',
+                                      [(fingerprint,) for fingerprint in found])
+            self.hits += len(found)
+            self.misses += len(fingerprints) - len(found)
+        return found
+
+    def get(self, fingerprint):
+        """The cached row for fingerprint, or None on a miss"""
+        return self.get_many([fingerprint]).get(fingerprint)
+
+    def put(self, fingerprint, category, raw_answer=None, title=None, context=''):
+        """Record an answer; the first answer for a fingerprint is kept"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO category_answers (fingerprint, category, raw_answer, title, context, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (fingerprint, category, raw_answer, title, context, datetime.now().isoformat()))
+            self.stores += 1
+
+    def clear(self):
+        with self._lock, self.conn:
+            return self.conn.execute('DELETE FROM category_answers').rowcount
+
+    def statistics(self):
+        with self._lock:
+            entries, rejected, total_hits = self.conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(category IS NULL), 0), COALESCE(SUM(hit_count), 0) '
+                'FROM category_answers').fetchone()
+            categories = dict(self.conn.execute(
+                'SELECT COALESCE(category, \'(rejected)\'), COUNT(*) FROM category_answers '
+                'GROUP BY category ORDER BY COUNT(*) DESC').fetchall())
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'rejected_answers': rejected,
+            'lifetime_hits': total_hits,
+            'categories': categories,
+            'session_hits': self.hits,
+            'session_misses': self.misses,
+            'session_hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
+
+    def close(self):
+        self.conn.close()
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_llm_cache(path=LLM_CACHE_DB):
+    """Shared cache per database file and process (SQLite connections do not survive fork)"""
+    key = (path, os.getpid())
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = LLMCategoryCache(path)
+        return _caches[key]
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show or clear the LLM category answer cache')
+    parser.add_argument('--clear', action='store_true', help='Delete every cached answer')
+    args = parser.parse_args()
+
+    cache = get_llm_cache()
+    if args.clear:
+        print(f"🧹 Removed {cache.clear():,} cached answers")
+    stats = cache.statistics()
+    print(f"🧠 LLM category cache: {LLM_CACHE_DB}")
+    print(f"   Entries: {stats['entries']:,} ({stats['rejected_answers']:,} rejected answers)")
+    print(f"   Lifetime hits: {stats['lifetime_hits']:,}")
+    for category, count in stats['categories'].items():
+        print(f"   {category:<12} {count:,}")
@@ -1026,20 +1026,15 @@ class DatabaseManager:
             }
 
     def _get_available_urls_count(self) -> int:
-        """Get the count of available URLs from the sitemap JSON file"""
+        """Get the count of available URLs from the URL frontier"""
         try:
-            import os
-            import json
-            
-            # Path to the sitemap JSON file
-            sitemap_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tileshop_sitemap.json')
+            from url_frontier import get_frontier
             
-            if os.path.exists(sitemap_path):
-                with open(sitemap_path, 'r') as f:
-                    sitemap_data = json.load(f)
-                    return sitemap_data.get('total_urls', 0)
+            frontier = get_frontier()
+            if not frontier.is_empty():
+                return frontier.get_statistics()['total_urls']
             else:
-                logger.warning(f"Sitemap file not found at {sitemap_path}, using default count")
+                logger.warning(f"URL frontier is empty, using default count")
                 return 4775  # Fallback to last known count
                 
         except Exception as e:
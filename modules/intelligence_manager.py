@@ -9,6 +9,7 @@ import subprocess
 import threading
 import time
 import json
+import uuid
 import logging
 from typing import Dict, Any, Optional, Callable, List
 from datetime import datetime, timezone, timedelta
@@ -28,6 +29,10 @@ except ImportError:
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from progress_events import ProgressStats, read_events, PROGRESS_FD_ENV, URL_DONE, OUTCOME_SUCCESS, STAGE_PROFILE
+from stage_profiler import StageProfiler, PROFILE_ENV
+from rate_controller import RATE_WORKERS_ENV
+
 logger = logging.getLogger(__name__)
 
 class ScraperManager:
@@ -48,12 +53,21 @@ class ScraperManager:
             'script': 'acquire_from_sitemap.py',
             'description': 'Category-based acquisition with optimized parsing',
             'args': []
+        },
+        'scheduled': {
+            'script': 'acquire_from_sitemap.py',
+            'description': 'Priority-scored re-crawl within a budget (limit = crawl budget)',
+            'args': ['--scheduled']
         }
     }
     
     def __init__(self, progress_callback: Optional[Callable] = None):
         self.progress_callback = progress_callback
         self.current_process = None
+        self.worker_processes = []  # Multi-worker mode: one leased-batch worker per process
+        self.worker_count = 1
+        self.run_id = None
+        self._log_lock = threading.Lock()
         self.is_running = False
         self.current_mode = None
         self.current_args = []
@@ -66,6 +80,11 @@ class ScraperManager:
             'estimated_total': 0,
             'progress_percent': 0
         }
+        # Fed by structured events from the acquisition processes' progress pipe
+        self.progress = ProgressStats()
+        # Per-stage extraction timings published by profiled acquisition runs
+        self.stage_profile = StageProfiler(enabled=True)
+        self.profile_stages = False
         
         # Rolling performance tracking for speed calculation
         self.recent_successful_saves = []  # Store last 5 successful save timestamps
@@ -88,10 +107,15 @@ class ScraperManager:
             'relational_db': False,
             'vector_db': False,
             'sitemap_validation': False,
-            'crawl4ai_service': False
+            'crawl4ai_service': False,
+            'relearn_workers': False
         }
         self.prewarm_thread = None
         
+        # Warm relearn workers (started by pre-warming or the first relearn)
+        self.relearn_pool = None
+        self._relearn_lock = threading.Lock()
+        
     def start_prewarm(self):
         """Start pre-warming initialization in background"""
         if self.prewarm_thread and self.prewarm_thread.is_alive():
@@ -165,6 +189,15 @@ class ScraperManager:
             except Exception as e:
                 logger.warning(f"Pre-warming: Crawler service check failed: {e}")
             
+            logger.info("Pre-warming: Starting relearn workers...")
+            # Workers import the extraction stack in the background
+            try:
+                self._get_relearn_pool()
+                self.prewarm_status['relearn_workers'] = True
+                logger.info("Pre-warming: Relearn workers started")
+            except Exception as e:
+                logger.warning(f"Pre-warming: Relearn workers failed to start: {e}")
+            
             # Check if all components are ready
             all_ready = all(self.prewarm_status.values())
             self.is_prewarmed = all_ready
@@ -183,11 +216,19 @@ class ScraperManager:
         return {
             'is_prewarmed': self.is_prewarmed,
             'prewarm_status': self.prewarm_status.copy(),
-            'prewarm_in_progress': self.prewarm_thread and self.prewarm_thread.is_alive()
+            'prewarm_in_progress': self.prewarm_thread and self.prewarm_thread.is_alive(),
+            'relearn_workers': self.get_relearn_status()
         }
         
-    def start_acquisition(self, mode: str, limit: Optional[int] = None, fresh: bool = False, batch_size: Optional[int] = None, category: Optional[str] = None) -> Dict[str, Any]:
-        """Start data acquisition in specified mode"""
+    def start_acquisition(self, mode: str, limit: Optional[int] = None, fresh: bool = False, batch_size: Optional[int] = None, category: Optional[str] = None, workers: int = 1, profile: bool = False) -> Dict[str, Any]:
+        """Start data acquisition in specified mode
+        
+        With workers > 1, starts that many acquire_from_sitemap.py --worker
+        processes that claim leased URL batches from the shared Postgres
+        crawl queue; their progress is combined in get_status().
+        With profile, the processes record per-stage extraction timings
+        (see get_stage_profile()).
+        """
         if self.is_running:
             return {
                 'success': False,
@@ -200,6 +241,11 @@ class ScraperManager:
                 'error': f'Unknown acquisition mode: {mode}'
             }
         
+        workers = max(1, int(workers or 1))
+        if workers > 1 and limit:
+            # Split the limit across workers
+            limit = -(-limit // workers)
+        
         # Build command arguments
         script_path = self.ACQUISITION_MODES[mode]['script']
         args = ['python', script_path]
@@ -217,13 +263,32 @@ class ScraperManager:
                 args.extend(['--category', category])
             if fresh:
                 args.append('--fresh')
+        elif mode == 'scheduled':
+            if limit:
+                args.append(str(limit))
+            if category:
+                args.extend(['--category', category])
+            args.extend(self.ACQUISITION_MODES[mode]['args'])
         
         # Add batch size parameter if provided
         if batch_size:
             args.extend(['--batch-size', str(batch_size)])
         
+        self.run_id = None
+        if workers > 1:
+            self.run_id = uuid.uuid4().hex[:12]
+            if '--fresh' in args:
+                # Reset once here rather than in every worker
+                args.remove('--fresh')
+                fresh_result = self._reset_shared_queue(category)
+                if not fresh_result['success']:
+                    return fresh_result
+            args.extend(['--worker', '--run-id', self.run_id])
+        
         self.current_mode = mode
         self.current_args = args
+        self.worker_count = workers
+        self.profile_stages = bool(profile)
         self.reset_stats()
         
         try:
@@ -232,15 +297,20 @@ class ScraperManager:
             self.is_running = True
             
             # Run in separate thread to avoid blocking
-            thread = threading.Thread(target=self._run_acquisition, args=(args,))
+            if workers > 1:
+                thread = threading.Thread(target=self._run_workers, args=(args, workers))
+            else:
+                thread = threading.Thread(target=self._run_acquisition, args=(args,))
             thread.daemon = True
             thread.start()
             
             return {
                 'success': True,
-                'message': f'Started {mode} acquisition',
+                'message': f'Started {mode} acquisition' + (f' with {workers} workers' if workers > 1 else ''),
                 'mode': mode,
-                'args': args
+                'args': args,
+                'workers': workers,
+                'run_id': self.run_id
             }
             
         except Exception as e:
@@ -250,52 +320,117 @@ class ScraperManager:
                 'error': f'Failed to start acquisition: {str(e)}'
             }
     
-    def _run_acquisition(self, args: list):
-        """Run the acquisition subprocess with monitoring"""
+    def _spawn_acquisition_process(self, args: list, prefix: str = '') -> tuple:
+        """Start an acquisition subprocess in the project's virtual environment
+        
+        The child gets the write end of a progress pipe (TILESHOP_PROGRESS_FD)
+        for JSON events; returns (process, event reader thread).
+        """
+        # Change to project directory
+        project_dir = os.path.dirname(os.path.abspath(__file__)).replace('/modules', '')
+        
+        # Activate virtual environment and run
+        venv_python = '/Users/robertsher/Projects/autogen_env/bin/python'  # Sandbox environment
+        if os.path.exists(venv_python):
+            args[0] = venv_python
+        
+        # Set up environment for virtual environment
+        env = os.environ.copy()
+        venv_dir = '/Users/robertsher/Projects/sandbox_env'  # Sandbox directory
+        if os.path.exists(venv_dir):
+            env['VIRTUAL_ENV'] = venv_dir
+            env['PATH'] = f"{venv_dir}/bin:{env.get('PATH', '')}"
+        
+        read_fd, write_fd = os.pipe()
+        env[PROGRESS_FD_ENV] = str(write_fd)
+        if self.profile_stages:
+            env[PROFILE_ENV] = '1'
+        if self.worker_count > 1:
+            # Workers split the request rate budget between them
+            env[RATE_WORKERS_ENV] = str(self.worker_count)
         try:
-            # Change to project directory
-            project_dir = os.path.dirname(os.path.abspath(__file__)).replace('/modules', '')
-            
-            # Activate virtual environment and run
-            venv_python = '/Users/robertsher/Projects/autogen_env/bin/python'  # Sandbox environment
-            if os.path.exists(venv_python):
-                args[0] = venv_python
-            
-            # Set up environment for virtual environment
-            env = os.environ.copy()
-            venv_dir = '/Users/robertsher/Projects/sandbox_env'  # Sandbox directory
-            if os.path.exists(venv_dir):
-                env['VIRTUAL_ENV'] = venv_dir
-                env['PATH'] = f"{venv_dir}/bin:{env.get('PATH', '')}"
-            
-            self.current_process = subprocess.Popen(
+            process = subprocess.Popen(
                 args,
                 cwd=project_dir,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 universal_newlines=True,
                 bufsize=1,
-                env=env
+                env=env,
+                pass_fds=(write_fd,)
             )
-            
-            # Monitor output with enhanced progress detection
-            for line in iter(self.current_process.stdout.readline, ''):
-                if line:
-                    line_stripped = line.strip()
+        except Exception:
+            os.close(read_fd)
+            raise
+        finally:
+            # Only the child keeps the write end, so the reader sees EOF when it exits
+            os.close(write_fd)
+        
+        event_reader = threading.Thread(target=self._monitor_events, args=(read_fd, prefix), daemon=True)
+        event_reader.start()
+        return process, event_reader
+    
+    def _monitor_events(self, read_fd: int, prefix: str = ''):
+        """Apply progress events from one child's pipe to the running stats"""
+        with os.fdopen(read_fd, 'r', encoding='utf-8') as stream:
+            for event in read_events(stream):
+                if prefix:
+                    event['source'] = prefix.strip()
+                with self._log_lock:
+                    self._handle_progress_event(event)
+                    stats = self.stats.copy()
+                if self.progress_callback:
+                    self.progress_callback('progress_update', {'event': event, 'stats': stats})
+    
+    def _handle_progress_event(self, event: Dict[str, Any]):
+        """Constant-time stats update for one event"""
+        if event.get('event') == STAGE_PROFILE:
+            self.stage_profile.merge(event.get('stages'), forward=False)
+            return
+        self.progress.apply(event)
+        self.stats.update(self.progress.snapshot())
+        
+        if event.get('event') == URL_DONE and event.get('outcome') == OUTCOME_SUCCESS:
+            self._record_successful_save(event.get('ts') or time.time())
+    
+    def _record_successful_save(self, timestamp: float):
+        """Track save timestamps and time between page reads for the speed figures"""
+        self.recent_successful_saves.append(timestamp)
+        if len(self.recent_successful_saves) > self.max_recent_saves:
+            self.recent_successful_saves = self.recent_successful_saves[-self.max_recent_saves:]
+        
+        if self.last_page_read_time is not None:
+            self.recent_counter_values.append(int(timestamp - self.last_page_read_time))
+            if len(self.recent_counter_values) > self.max_counter_values:
+                self.recent_counter_values = self.recent_counter_values[-self.max_counter_values:]
+        else:
+            self.counter_start_time = timestamp
+        self.seconds_since_last_read = 0
+        self.last_page_read_time = timestamp
+    
+    def _monitor_output(self, process: subprocess.Popen, prefix: str = ''):
+        """Feed subprocess output into the log buffer (stats come from the progress pipe)"""
+        for line in iter(process.stdout.readline, ''):
+            if line:
+                line_stripped = prefix + line.strip()
+                # Worker readers share the log buffer
+                with self._log_lock:
                     self._process_log_line(line_stripped)
-                    
-                    # Debug: Log every line to help diagnose issues
-                    logger.debug(f"Acquisition subprocess output: {line_stripped}")
-                    
-                    # Enhanced progress callback with detailed parsing
-                    if self.progress_callback:
-                        progress_data = self._parse_progress_line(line_stripped)
-                        if progress_data:
-                            self.progress_callback('progress_update', progress_data)
-                        self.progress_callback('log', {'line': line_stripped})
+                
+                # Debug: Log every line to help diagnose issues
+                logger.debug(f"Acquisition subprocess output: {line_stripped}")
+    
+    def _run_acquisition(self, args: list):
+        """Run the acquisition subprocess with monitoring"""
+        try:
+            self.current_process, event_reader = self._spawn_acquisition_process(args)
+            
+            # Log lines here, progress events on the reader thread
+            self._monitor_output(self.current_process)
             
             # Wait for completion
             return_code = self.current_process.wait()
+            event_reader.join(timeout=5)
             
             # Update final status
             self.is_running = False
@@ -314,79 +449,87 @@ class ScraperManager:
             if self.progress_callback:
                 self.progress_callback('error', {'error': str(e)})
     
-    def _parse_progress_line(self, line: str) -> Optional[Dict[str, Any]]:
-        """Parse progress information from enhanced crawl output"""
-        line_lower = line.lower()
-        
-        # Parse crawl progress events
-        if '📊 crawl_start:' in line:
-            return {'type': 'crawl_start', 'stage': 'starting', 'message': line}
-        elif '📋 task submitted:' in line:
-            # Extract task ID and timing
-            if 'task submitted:' in line and '(' in line:
-                parts = line.split('task submitted:')[1].strip()
-                task_id = parts.split('(')[0].strip()
-                timing = parts.split('(')[1].replace(')', '').replace('s', '')
-                return {
-                    'type': 'crawl_submitted', 
-                    'task_id': task_id, 
-                    'submit_time': float(timing) if timing.replace('.', '').isdigit() else 0
-                }
-        elif '🔍 status check #' in line and ':' in line:
-            # Extract status and timing info
+    def _run_workers(self, args: list, workers: int):
+        """Run leased-batch worker subprocesses and combine their output"""
+        try:
+            readers = []
+            self.worker_processes = []
+            for n in range(1, workers + 1):
+                worker_args = args + ['--worker-id', f'{self.run_id}-w{n}']
+                process, event_reader = self._spawn_acquisition_process(worker_args, f'[w{n}] ')
+                self.worker_processes.append(process)
+                reader = threading.Thread(target=self._monitor_output, args=(process, f'[w{n}] '), daemon=True)
+                reader.start()
+                readers.extend([reader, event_reader])
+            
+            return_codes = [process.wait() for process in self.worker_processes]
+            for reader in readers:
+                reader.join(timeout=5)
+            
+            self.is_running = False
+            final_status = 'completed' if all(code == 0 for code in return_codes) else 'failed'
+            
+            if self.progress_callback:
+                self.progress_callback('completed', {
+                    'status': final_status,
+                    'return_codes': return_codes,
+                    'stats': self.stats,
+                    'workers': self._get_worker_progress()
+                })
+                
+        except Exception as e:
+            logger.error(f"Error running acquisition workers: {e}")
+            self.is_running = False
+            for process in self.worker_processes:
+                if process.poll() is None:
+                    process.terminate()
+            if self.progress_callback:
+                self.progress_callback('error', {'error': str(e)})
+    
+    def _reset_shared_queue(self, category: Optional[str] = None) -> Dict[str, Any]:
+        """Fresh start for multi-worker mode: reset URL statuses, empty the lease queue and reseed it
+        
+        Done once here, before any worker starts; the reset refuses while
+        other workers still hold live leases.
+        """
+        try:
+            from url_frontier import get_frontier
+            from crawl_leases import LeaseManager
+            
+            leases = LeaseManager(worker_id=f'{self.run_id}-manager', run_id=self.run_id)
             try:
-                if 'elapsed' in line and 'check' in line:
-                    status_part = line.split(':')[1].split('(')[0].strip()
-                    elapsed_part = line.split('elapsed')[0].split('(')[-1].replace('s', '')
-                    return {
-                        'type': 'crawl_status',
-                        'status': status_part,
-                        'elapsed': float(elapsed_part) if elapsed_part.replace('.', '').isdigit() else 0
-                    }
-            except (IndexError, ValueError):
-                pass
-        elif '✅ crawl completed in' in line or '⚡ crawl completed immediately' in line:
-            # Log crawl completion but don't use for speed calculation
+                leases.ensure_schema()
+                leases.reset_queue()
+                frontier = get_frontier()
+                frontier.reset_statuses(category=category)
+                leases.seed(frontier.get_pending_urls(category=category))
+            finally:
+                leases.close()
+            return {'success': True}
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Failed to reset shared crawl queue: {str(e)}'
+            }
+    
+    def _get_worker_progress(self) -> Optional[Dict[str, Any]]:
+        """Per-worker progress and combined totals from the lease tables"""
+        if not self.run_id:
+            return None
+        try:
+            from crawl_leases import get_lease_connection, get_worker_statistics, get_queue_statistics
+            
+            conn = get_lease_connection()
             try:
-                if 'completed in' in line:
-                    time_part = line.split('completed in')[1].split('s')[0].strip()
-                elif 'completed immediately' in line and '(' in line:
-                    time_part = line.split('(')[1].split('s')[0].strip()
-                else:
-                    time_part = None
-                
-                if time_part and time_part.replace('.', '').isdigit():
-                    crawl_time = float(time_part)
-                    return {
-                        'type': 'crawl_complete',
-                        'total_time': crawl_time
-                    }
-            except (IndexError, ValueError):
-                pass
-        elif '⏰ crawl timeout' in line:
-            return {'type': 'crawl_timeout', 'message': line}
-        elif '✗ crawl failed:' in line:
-            error_msg = line.split('crawl failed:')[1].strip() if 'crawl failed:' in line else 'Unknown error'
-            return {'type': 'crawl_error', 'error': error_msg}
-        
-        # Parse general progress patterns
-        elif any(pattern in line_lower for pattern in ['processing', 'scraping', 'extracting']):
-            if 'processing ' in line_lower and '/' in line:
-                try:
-                    # Extract current/total pattern like "Processing 5/100"
-                    progress_part = line.split('Processing')[1].split(':')[0].strip()
-                    if '/' in progress_part:
-                        current, total = progress_part.split('/')
-                        return {
-                            'type': 'processing_progress',
-                            'current': int(current),
-                            'total': int(total),
-                            'percent': (int(current) / int(total)) * 100
-                        }
-                except (IndexError, ValueError):
-                    pass
-        
-        return None
+                progress = get_worker_statistics(conn, self.run_id)
+                progress['queue'] = get_queue_statistics(conn)
+            finally:
+                conn.close()
+            progress['run_id'] = self.run_id
+            return progress
+        except Exception as e:
+            logger.debug(f"Worker progress unavailable: {e}")
+            return {'run_id': self.run_id, 'error': str(e)}
     
     def _calculate_rolling_speed(self) -> float:
         """Calculate rolling average speed from last 5 successful saves based on timestamp differences"""
@@ -445,7 +588,7 @@ class ScraperManager:
             return 0
     
     def _process_log_line(self, line: str):
-        """Process log line and extract progress information"""
+        """Add a subprocess log line to the buffer and forward it to the UI"""
         # Add to log buffer
         self.log_lines.append({
             'timestamp': datetime.now(EST).isoformat(),
@@ -456,127 +599,6 @@ class ScraperManager:
         if len(self.log_lines) > self.max_log_lines:
             self.log_lines = self.log_lines[-self.max_log_lines:]
         
-        # Extract progress information
-        try:
-            line_lower = line.lower()
-            
-            # Look for URL processing patterns (broader patterns)
-            processing_patterns = [
-                'processing url:', 'processing product', '🔄 processing url:', 
-                'scraping url', 'scraping:', 'fetching:', 'crawling:', 
-                'extracting from', 'loading url', 'requesting url'
-            ]
-            
-            if any(pattern in line_lower for pattern in processing_patterns):
-                self.stats['products_processed'] += 1
-                
-                # Try to extract current URL
-                if 'https://' in line:
-                    url_start = line.find('https://')
-                    url_end = line.find(' ', url_start)
-                    if url_end == -1:
-                        url_end = len(line)
-                    self.stats['current_url'] = line[url_start:url_end]
-            
-            # Look for success patterns (broader patterns)
-            success_patterns = [
-                '✓ saved product data', 'saved product data for:', 'successfully extracted', 'success', 
-                '✅ product scraped', 'completed successfully', 'saved to database',
-                'product data saved', 'extraction complete', 'successfully processed',
-                'inserted product', 'data extraction complete', 'saved product',
-                'product stored', 'database insert', 'successfully saved'
-            ]
-            
-            if any(pattern in line_lower for pattern in success_patterns):
-                self.stats['success_count'] += 1
-                
-                # Track successful save timestamp for speed calculation
-                import time
-                current_timestamp = time.time()
-                self.recent_successful_saves.append(current_timestamp)
-                
-                # Keep only last 5 successful saves
-                if len(self.recent_successful_saves) > self.max_recent_saves:
-                    self.recent_successful_saves = self.recent_successful_saves[-self.max_recent_saves:]
-                
-                # Update counter for time between page reads
-                if self.last_page_read_time is not None:
-                    counter_value = int(current_timestamp - self.last_page_read_time)
-                    # Store this counter value for average calculation
-                    self.recent_counter_values.append(counter_value)
-                    # Keep only last 5 counter values
-                    if len(self.recent_counter_values) > self.max_counter_values:
-                        self.recent_counter_values = self.recent_counter_values[-self.max_counter_values:]
-                    
-                    # Reset counter to 0 for next page
-                    self.seconds_since_last_read = 0
-                else:
-                    # First page read, initialize counter
-                    self.counter_start_time = current_timestamp
-                    self.seconds_since_last_read = 0
-                    
-                self.last_page_read_time = current_timestamp
-                
-                # Extract URL from success messages
-                if 'https://' in line:
-                    url_start = line.find('https://')
-                    url_end = line.find(' ', url_start)
-                    if url_end == -1:
-                        url_end = len(line)
-                    self.stats['current_url'] = line[url_start:url_end]
-                
-            # Look for actual error patterns (improved logic to avoid false positives)
-            error_patterns = [
-                'exception', 'timeout', 'could not', 'unable to', 'error:', 'warning:',
-                'failed to', 'connection error', 'network error', 'http error'
-            ]
-            
-            # Exclude false positives - don't count these as errors:
-            false_positive_patterns = [
-                'failed: 0',  # Status messages showing zero failures
-                'no pdfs found',  # Normal when products don't have PDFs
-                'no predictive pdfs',  # Normal operational message
-                'no specific applications found',  # Normal when specs don't specify applications
-                'status - pending:',  # Status reports
-                'completed:',  # Progress reports
-            ]
-            
-            # Only count as error if it matches error patterns AND doesn't match false positives
-            if (any(pattern in line_lower for pattern in error_patterns) and 
-                not any(fp_pattern in line_lower for fp_pattern in false_positive_patterns)):
-                self.stats['error_count'] += 1
-                
-            # Look for total count patterns (broader patterns)
-            total_patterns = [
-                'total products to scrape', 'found', 'urls to process:',
-                'total urls:', 'processing', 'items to scrape', 'total items:'
-            ]
-            
-            if any(pattern in line_lower for pattern in total_patterns):
-                # Try to extract total count
-                import re
-                numbers = re.findall(r'\d+', line)
-                if numbers:
-                    # Take the largest number found
-                    max_number = max(int(n) for n in numbers)
-                    # Only update if it's a reasonable number
-                    if max_number > self.stats['estimated_total'] and max_number < 100000:
-                        self.stats['estimated_total'] = max_number
-            
-            # Calculate progress percentage - use success_count for more accurate progress
-            if self.stats['estimated_total'] > 0:
-                # Use success_count for progress calculation as it's more meaningful
-                self.stats['progress_percent'] = min(
-                    100,
-                    (self.stats['success_count'] / self.stats['estimated_total']) * 100
-                )
-            elif self.stats['products_processed'] > 0:
-                # If no total, show relative progress
-                self.stats['progress_percent'] = min(100, self.stats['products_processed'] * 2)
-            
-        except Exception as e:
-            logger.debug(f"Error parsing log line: {e}")
-        
         # Emit progress update via callback for real-time UI updates
         if self.progress_callback:
             self.progress_callback('log', {
@@ -586,25 +608,30 @@ class ScraperManager:
     
     def stop_acquisition(self) -> Dict[str, Any]:
         """Stop the currently running acquisition process"""
-        if not self.is_running or not self.current_process:
+        processes = [p for p in [self.current_process] + self.worker_processes if p]
+        if not self.is_running or not processes:
             return {
                 'success': False,
                 'error': 'No acquisition process is currently running'
             }
         
         try:
-            self.current_process.terminate()
+            # Workers release their leases on SIGTERM
+            for process in processes:
+                process.terminate()
             
             # Wait for graceful shutdown
-            try:
-                self.current_process.wait(timeout=10)
-            except subprocess.TimeoutExpired:
-                # Force kill if needed
-                self.current_process.kill()
-                self.current_process.wait()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    # Force kill if needed
+                    process.kill()
+                    process.wait()
             
             self.is_running = False
             self.current_process = None
+            self.worker_processes = []
             
             return {
                 'success': True,
@@ -633,15 +660,12 @@ class ScraperManager:
                 # If scraper status file indicates processing, update is_running
                 if scraper_file_status in ['starting', 'processing']:
                     scraper_is_running = True
-                elif scraper_file_status in ['completed', 'idle'] and not self.current_process:
+                elif scraper_file_status in ['completed', 'idle'] and not self.current_process and not self.worker_processes:
                     scraper_is_running = False
         except (FileNotFoundError, json.JSONDecodeError, KeyError):
             # Fall back to internal is_running state
             pass
         
-        # Reprocess logs to ensure accurate statistics
-        self._reprocess_logs_for_stats()
-        
         # Enhance stats with sitemap data for accurate progress
         enhanced_stats = self._enhance_stats_with_sitemap()
         
@@ -655,137 +679,46 @@ class ScraperManager:
             'recent_logs': self.log_lines[-10:] if self.log_lines else [],
             'average_read_speed_pages_per_minute': self._calculate_average_read_speed(),
             'counter_seconds_since_last_read': self._get_current_counter_value(),
-            'recent_save_count': len(self.recent_successful_saves)
+            'recent_save_count': len(self.recent_successful_saves),
+            'request_rate': self._get_request_rate(),
+            'worker_count': self.worker_count,
+            'workers': self._get_worker_progress(),
+            'stage_profile': self.get_stage_profile() if self.profile_stages else None
         }
     
+    def _get_request_rate(self) -> Optional[Dict[str, Any]]:
+        """Adaptive rate controller state summed over the acquisition processes"""
+        try:
+            from rate_controller import read_rate_status
+            return read_rate_status()
+        except ImportError:
+            return None
+    
+    def get_stage_profile(self) -> Dict[str, Any]:
+        """Per-stage wall/CPU figures over the rolling window, slowest total first"""
+        snapshot = self.stage_profile.snapshot()
+        snapshot['enabled'] = self.profile_stages
+        return snapshot
+    
     def get_logs(self, lines: int = 50) -> List[Dict[str, str]]:
         """Get recent log lines"""
         return self.log_lines[-lines:] if self.log_lines else []
     
-    def _reprocess_logs_for_stats(self):
-        """Reprocess all logs to calculate accurate statistics"""
-        if not self.log_lines:
-            return
-            
-        # Reset counters but preserve estimated_total
-        estimated_total = self.stats.get('estimated_total', 0)
-        current_url = self.stats.get('current_url', '')
-        
-        temp_stats = {
-            'products_processed': 0,
-            'success_count': 0,
-            'error_count': 0,
-            'current_url': current_url,
-            'estimated_total': estimated_total,
-            'progress_percent': 0
-        }
-        
-        # Process all log lines to get accurate counts
-        for log_entry in self.log_lines:
-            line = log_entry.get('message', '')
-            line_lower = line.lower()
-            
-            # Count processing events (use same patterns as _process_log_line)
-            processing_patterns = [
-                'processing url:', 'processing product', '🔄 processing url:', 
-                'scraping url', 'scraping:', 'fetching:', 'crawling:', 
-                'extracting from', 'loading url', 'requesting url'
-            ]
-            
-            if any(pattern in line_lower for pattern in processing_patterns):
-                temp_stats['products_processed'] += 1
-                
-                # Extract current URL
-                if 'https://' in line:
-                    url_start = line.find('https://')
-                    url_end = line.find(' ', url_start)
-                    if url_end == -1:
-                        url_end = len(line)
-                    temp_stats['current_url'] = line[url_start:url_end]
-            
-            # Count successes (use same patterns as _process_log_line)
-            success_patterns = [
-                '✓ saved product data', 'saved product data for:', 'successfully extracted', 'success', 
-                '✅ product scraped', 'completed successfully', 'saved to database',
-                'product data saved', 'extraction complete', 'successfully processed'
-            ]
-            
-            if any(pattern in line_lower for pattern in success_patterns):
-                temp_stats['success_count'] += 1
-                
-                # Extract URL from success messages
-                if 'https://' in line:
-                    url_start = line.find('https://')
-                    url_end = line.find(' ', url_start)
-                    if url_end == -1:
-                        url_end = len(line)
-                    temp_stats['current_url'] = line[url_start:url_end]
-            
-            # Count actual errors with improved logic to avoid false positives
-            error_patterns = [
-                'exception', 'timeout', 'could not', 'unable to', 'error:', 'warning:',
-                'failed to', 'connection error', 'network error', 'http error'
-            ]
-            
-            # Exclude false positives - don't count these as errors:
-            false_positive_patterns = [
-                'failed: 0',  # Status messages showing zero failures
-                'no pdfs found',  # Normal when products don't have PDFs
-                'no predictive pdfs',  # Normal operational message
-                'no specific applications found',  # Normal when specs don't specify applications
-                'status - pending:',  # Status reports
-                'completed:',  # Progress reports
-            ]
-            
-            # Only count as error if it matches error patterns AND doesn't match false positives
-            if (any(pattern in line_lower for pattern in error_patterns) and 
-                not any(fp_pattern in line_lower for fp_pattern in false_positive_patterns)):
-                temp_stats['error_count'] += 1
-            
-            # Extract total count (use same patterns as _process_log_line)
-            total_patterns = [
-                'total products to scrape', 'found', 'urls to process:',
-                'total urls:', 'processing', 'items to scrape', 'total items:'
-            ]
-            
-            if any(pattern in line_lower for pattern in total_patterns):
-                import re
-                numbers = re.findall(r'\d+', line)
-                if numbers:
-                    max_number = max(int(n) for n in numbers)
-                    if max_number > temp_stats['estimated_total'] and max_number < 100000:
-                        temp_stats['estimated_total'] = max_number
-        
-        # Calculate progress percentage
-        if temp_stats['estimated_total'] > 0:
-            temp_stats['progress_percent'] = min(
-                100,
-                (temp_stats['success_count'] / temp_stats['estimated_total']) * 100
-            )
-        
-        # Update main stats
-        self.stats.update(temp_stats)
-    
     def _enhance_stats_with_sitemap(self) -> Dict[str, Any]:
         """Enhance stats with actual sitemap data for accurate progress tracking"""
         enhanced_stats = self.stats.copy()
         
-        # Try to read sitemap data for accurate totals
-        sitemap_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tileshop_sitemap.json')
-        
+        # Read maintained status counters from the URL frontier for accurate totals
         try:
-            if os.path.exists(sitemap_path):
-                with open(sitemap_path, 'r') as f:
-                    sitemap_data = json.load(f)
-                
-                # Get accurate counts from sitemap
-                total_urls = sitemap_data.get('total_urls', enhanced_stats['estimated_total'])
-                
-                # Count completed and pending URLs
-                urls = sitemap_data.get('urls', [])
-                completed_count = len([url for url in urls if url.get('scrape_status') == 'completed'])
-                pending_count = len([url for url in urls if url.get('scrape_status') == 'pending'])
-                failed_count = len([url for url in urls if url.get('scrape_status') == 'failed'])
+            from url_frontier import get_frontier
+            frontier = get_frontier()
+            
+            if not frontier.is_empty():
+                frontier_stats = frontier.get_statistics()
+                total_urls = frontier_stats['total_urls'] or enhanced_stats['estimated_total']
+                completed_count = frontier_stats['completed']
+                pending_count = frontier_stats['pending']
+                failed_count = frontier_stats['failed']
                 
                 # Update enhanced stats with sitemap data - preserve real-time counts if higher
                 enhanced_stats['estimated_total'] = total_urls
@@ -831,11 +764,10 @@ class ScraperManager:
                 except (FileNotFoundError, json.JSONDecodeError, KeyError):
                     # Fall back to original logic if status file is not available
                     if self.is_running and not enhanced_stats['current_url']:
-                        # Find the first pending URL as likely current processing
-                        for url_data in urls:
-                            if url_data.get('scrape_status') == 'pending':
-                                enhanced_stats['current_url'] = url_data.get('url', '')
-                                break
+                        # First pending URL is the likely current processing
+                        next_pending = frontier.get_pending_urls(1)
+                        if next_pending:
+                            enhanced_stats['current_url'] = next_pending[0]
                         
                         if not enhanced_stats['current_url']:
                             enhanced_stats['current_url'] = 'Starting scraper...'
@@ -843,7 +775,7 @@ class ScraperManager:
                         enhanced_stats['current_url'] = ''
                     
         except Exception as e:
-            logger.warning(f"Could not enhance stats with sitemap data: {e}")
+            logger.warning(f"Could not enhance stats with frontier data: {e}")
             # Fall back to log-based stats
             pass
         
@@ -859,6 +791,11 @@ class ScraperManager:
             'estimated_total': 0,
             'progress_percent': 0
         }
+        self.progress = ProgressStats()
+        self.stage_profile.reset()
+        self.recent_successful_saves = []
+        self.recent_counter_values = []
+        self.last_page_read_time = None
         self.log_lines = []
     
     def check_dependencies(self) -> Dict[str, Any]:
@@ -909,8 +846,20 @@ class ScraperManager:
         """Get all available acquisition modes"""
         return self.ACQUISITION_MODES.copy()
     
+    def _get_relearn_pool(self):
+        """Start the warm relearn workers on first use"""
+        with self._relearn_lock:
+            if self.relearn_pool is None:
+                from relearn_pool import RelearnPool
+                self.relearn_pool = RelearnPool(on_result=self._on_relearn_result)
+            return self.relearn_pool.start()
+    
+    def get_relearn_status(self) -> Optional[Dict[str, Any]]:
+        """Warm relearn worker state, or None before the pool has started"""
+        return self.relearn_pool.status() if self.relearn_pool else None
+    
     def learn_single_product(self, url: str, sku: str = 'Unknown') -> Dict[str, Any]:
-        """Learn a single product by URL"""
+        """Learn a single product by URL on a pre-warmed relearn worker"""
         try:
             logger.info(f"Starting single product learning for SKU {sku}: {url}")
             
@@ -920,6 +869,48 @@ class ScraperManager:
                     'error': 'Acquisition system is currently running. Please wait for it to complete or stop it first.'
                 }
             
+            try:
+                pool = self._get_relearn_pool()
+            except Exception as e:
+                logger.warning(f"Relearn pool unavailable, using a one-off process: {e}")
+                return self._learn_in_subprocess(url, sku)
+            
+            job_id = pool.submit(url, sku)
+            self.update_scraper_status(url, 'processing')
+            pool_status = pool.status()
+            
+            return {
+                'success': True,
+                'message': f'Queued learning for SKU {sku} on a warm worker '
+                           f'({pool_status["ready"]}/{pool_status["workers"]} ready, {pool_status["pending"]} queued).',
+                'url': url,
+                'sku': sku,
+                'job_id': job_id
+            }
+        except Exception as e:
+            logger.error(f"Error in learn_single_product: {e}")
+            return {
+                'success': False,
+                'error': f'Single product learning failed: {str(e)}'
+            }
+    
+    def _on_relearn_result(self, result: Dict[str, Any]):
+        """Relearn worker finished a job - log it and update the status file"""
+        status = 'succeeded' if result.get('success') else f"failed: {result.get('error')}"
+        with self._log_lock:
+            for line in result.get('log', []):
+                self._process_log_line(f"[relearn] {line}")
+        logger.info(f"Relearn SKU {result.get('sku')} {status} "
+                    f"({result.get('elapsed')}s on worker {result.get('worker')}, {result.get('total_seconds')}s total)")
+        
+        pool_status = self.relearn_pool.status() if self.relearn_pool else {'pending': 0}
+        self.update_scraper_status(None, 'idle' if pool_status['pending'] == 0 else 'processing')
+        if self.progress_callback:
+            self.progress_callback('relearn_completed', {k: v for k, v in result.items() if k != 'log'})
+    
+    def _learn_in_subprocess(self, url: str, sku: str = 'Unknown') -> Dict[str, Any]:
+        """Learn a single product in a fresh interpreter (fallback when the relearn pool is unavailable)"""
+        try:
             # Prepare single URL for learning
             self.is_running = True
             self.stats = {
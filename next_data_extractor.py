@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Structured product extraction from the Tileshop __NEXT_DATA__ payload
+The Next.js payload already carries name, SKU, prices, coverage, every
+PDPInfo_* specification group, resources and (on most pages) images and
+sibling colors. When the payload is complete, extract_product_data takes
+sibling colors and resources from it instead of scanning the page and
+probing for PDFs, and fills the fields page parsing leaves empty; pages
+where it is missing, malformed or partial use page parsing alone.
+"""
+
+import re
+from urllib.parse import urljoin
+
+from parsed_page import parse_page
+
+# PDPInfo keys whose product_data field differs from the snake_cased key
+PDP_FIELD_MAP = {
+    'PDPInfo_Dimensions': 'size_shape',
+    'PDPInfo_Weight': 'weight',
+    'PDPInfo_CoverageArea': 'coverage_area',
+    'PDPInfo_Applications': 'applications',
+}
+INT_FIELDS = ('box_quantity', 'number_of_faces', 'pei_rating')
+BOOL_FIELDS = ('directional_layout',)
+
+PRICE_KEYS = {
+    'BoxPrice': 'price_per_box', 'PricePerBox': 'price_per_box',
+    'SqFtPrice': 'price_per_sqft', 'PricePerSqFt': 'price_per_sqft',
+    'EachPrice': 'price_per_piece', 'PiecePrice': 'price_per_piece', 'PricePerPiece': 'price_per_piece',
+}
+COVERAGE_KEYS = ('CoveragePerBox', 'SqFtPerBox')
+SIBLING_KEYS = ('ColorVariants', 'ColorVariations', 'Variants', 'Swatches')
+IMAGE_KEYS = ('Images', 'ImageUrls', 'Gallery')
+
+# Fields a payload must yield before extract_product_data relies on it
+REQUIRED_FIELDS = ('title', 'sku', 'specifications')
+PRICE_FIELDS = ('price_per_box', 'price_per_sqft', 'price_per_piece')
+
+def pdp_field_name(key):
+    """'PDPInfo_CountryOfOrigin' -> 'country_of_origin'"""
+    if key in PDP_FIELD_MAP:
+        return PDP_FIELD_MAP[key]
+    name = key[len('PDPInfo_'):] if key.startswith('PDPInfo_') else key
+    return re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', name).lower()
+
+def iter_specifications(product):
+    """(group, key, value) for every PDPInfo entry
+
+    Specifications is a dict of group (PDPInfo_DesignInstallation,
+    PDPInfo_Dimensions, PDPInfo_TechnicalDetails, ...) -> [{'Key', 'Value'}, ...].
+    """
+    specifications = product.get('Specifications')
+    if not isinstance(specifications, dict):
+        return
+    for group_name, entries in specifications.items():
+        if not isinstance(entries, list):
+            continue
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get('Key') and entry.get('Value') not in (None, ''):
+                yield group_name, entry['Key'], entry['Value']
+
+def scene7_variants(image_url):
+    """Standard Scene7 renditions for a product image URL"""
+    base_url = image_url.split('?')[0]
+    return {
+        'base_url': base_url,
+        'extra_large': f"{base_url}?$ExtraLarge$",
+        'large': f"{base_url}?$Large$",
+        'medium': f"{base_url}?$Medium$",
+        'small': f"{base_url}?$Small$",
+        'thumbnail': f"{base_url}?$Thumbnail$"
+    }
+
+def _convert(field, value):
+    if field in INT_FIELDS and isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if field in BOOL_FIELDS and isinstance(value, str):
+        return value.strip().lower() in ('yes', 'true', '1')
+    return value
+
+def _url(entry, base_url):
+    url = entry if isinstance(entry, str) else (entry.get('Url') or entry.get('ProductUrl') or entry.get('Src'))
+    return urljoin(base_url, url) if url else None
+
+def _price(value):
+    try:
+        return round(float(str(value).replace(',', '').lstrip('$')), 2)
+    except (TypeError, ValueError):
+        return None
+
+def extract_from_next_data(page, url=''):
+    """product_data fields from the __NEXT_DATA__ payload, or None without one
+
+    `page` is a ParsedPage or raw HTML. JSON-LD (already on the page) only
+    fills description, brand and image when the payload omits them.
+    """
+    page = parse_page(page, url)
+    product = page.product_payload
+    if not product:
+        return None
+    base_url = url or page.url
+    data = {'parsing_method': 'NextDataExtractor'}
+
+    data['title'] = product.get('Name') or product.get('Title')
+    data['sku'] = str(product.get('ProductId') or product.get('Sku') or '') or None
+
+    # Prices and coverage
+    price = product.get('Price') or {}
+    if isinstance(price, dict):
+        for key, field in PRICE_KEYS.items():
+            if price.get(key) is not None and not data.get(field):
+                data[field] = _price(price[key])
+        for key in COVERAGE_KEYS:
+            if price.get(key):
+                data['coverage'] = f"{price[key]} sq ft"
+                break
+
+    # Every PDPInfo group, flattened into fields and the specifications JSON
+    specifications = {}
+    for _, key, value in iter_specifications(product):
+        field = pdp_field_name(key)
+        specifications[field] = value
+        data.setdefault(field, _convert(field, value))
+    data['specifications'] = specifications
+
+    # Resources / PDFs
+    resources, seen = [], set()
+    for entry in product.get('Resources') or []:
+        resource_url = _url(entry, base_url)
+        if resource_url and resource_url not in seen:
+            seen.add(resource_url)
+            title = entry.get('Name') if isinstance(entry, dict) else None
+            resources.append({'type': 'PDF' if '.pdf' in resource_url.lower() else 'Link',
+                              'title': (title or 'PDF Document').strip(), 'url': resource_url})
+    data['resources'] = resources
+
+    # Sibling colors
+    siblings = []
+    for key in SIBLING_KEYS:
+        for entry in product.get(key) or []:
+            if not isinstance(entry, dict):
+                continue
+            sku = str(entry.get('Sku') or entry.get('ProductId') or '')
+            color = entry.get('Color') or entry.get('ColorName') or entry.get('Name')
+            if sku and sku != data['sku'] and color:
+                siblings.append({'color': color, 'sku': sku, 'url': _url(entry, base_url)})
+        if siblings:
+            break
+    data['color_variations'] = siblings
+
+    # Images: payload first, JSON-LD for the primary image otherwise
+    images = []
+    for key in IMAGE_KEYS:
+        images = [image for image in (_url(entry, base_url) for entry in product.get(key) or []) if image]
+        if images:
+            break
+    json_ld = None
+    primary_image = product.get('PrimaryImage') or (images[0] if images else None)
+    if not primary_image:
+        json_ld = page.product_json_ld
+        image = json_ld.get('image')
+        primary_image = image[0] if isinstance(image, list) and image else image if isinstance(image, str) else None
+    data['images'] = images
+    data['primary_image'] = primary_image
+    if primary_image and 'scene7.com' in primary_image:
+        data['image_variants'] = scene7_variants(primary_image)
+
+    # Description and brand
+    description = product.get('Description')
+    brand = product.get('Brand')
+    if not description or not brand:
+        json_ld = page.product_json_ld if json_ld is None else json_ld
+        description = description or json_ld.get('description')
+        brand = brand or json_ld.get('brand')
+        data['title'] = data['title'] or json_ld.get('name')
+        data['sku'] = data['sku'] or json_ld.get('sku')
+    if isinstance(brand, dict):
+        brand = brand.get('name') or brand.get('Name')
+    if description:
+        data['description'] = re.sub(r'\n+', ' ', re.sub(r'<[^>]+>', '', description)).strip()
+    data['brand'] = brand.strip() if isinstance(brand, str) and brand.strip() else None
+
+    return data
+
+def is_complete(data):
+    """Whether payload fields are complete enough for extract_product_data to rely on"""
+    return bool(data and all(data.get(field) for field in REQUIRED_FIELDS)
+                and any(data.get(field) for field in PRICE_FIELDS))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Content-addressed raw page cache for Tileshop acquisition
+Every fetched product page is stored once, compressed, under the SHA-256 of
+its HTML; a SQLite index records which URL returned which page at what time.
+reparse.py re-runs extraction over the cache without touching the site.
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Configuration
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_CACHE_DIR = os.environ.get('TILESHOP_PAGE_CACHE', os.path.join(BASE_DIR, 'page_cache'))
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetches (
+    url TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (url, fetched_at)
+);
+CREATE INDEX IF NOT EXISTS idx_fetches_hash ON fetches(content_hash);
+"""
+
+def content_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+class PageCache:
+    """Compressed pages addressed by content hash, indexed by URL and fetch time"""
+
+    def __init__(self, root=PAGE_CACHE_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def _object_path(self, digest, extension):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.{extension}")
+
+    def _find_object(self, digest):
+        for extension in ('zst', 'gz'):
+            path = self._object_path(digest, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, url, html, fetched_at=None):
+        """Store a fetched page; identical content is written only once. Returns the hash."""
+        digest = content_hash(html)
+        fetched_at = fetched_at or datetime.now().isoformat()
+
+        if not self._find_object(digest):
+            raw = html.encode('utf-8')
+            if ZSTD_AVAILABLE:
+                path = self._object_path(digest, 'zst')
+                data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+            else:
+                path = self._object_path(digest, 'gz')
+                data = gzip.compress(raw, compresslevel=GZIP_LEVEL)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO fetches(url, fetched_at, content_hash, size) VALUES (?, ?, ?, ?)',
+                              (url, fetched_at, digest, len(html)))
+        return digest
+
+    def get(self, digest):
+        """Decompressed HTML for a content hash, or None"""
+        path = self._find_object(digest)
+        if not path:
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith('.zst'):
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError(f"zstandard is required to read {path}")
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = gzip.decompress(data)
+        return raw.decode('utf-8')
+
+    def latest(self, url):
+        """Most recent cached fetch of a URL as (fetched_at, html), or None"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT fetched_at, content_hash FROM fetches WHERE url = ? ORDER BY fetched_at DESC LIMIT 1',
+                (url,)).fetchone()
+        if not row:
+            return None
+        return row[0], self.get(row[1])
+
+    def latest_entries(self, url_filter=None, limit=None):
+        """(url, fetched_at, content_hash) of the newest fetch per URL
+
+        Relies on SQLite returning the bare column from the MAX() row.
+        """
+        sql = """
+            SELECT url, MAX(fetched_at), content_hash FROM fetches
+            {where} GROUP BY url ORDER BY url
+        """.format(where='WHERE url LIKE ?' if url_filter else '')
+        params = [f"%{url_filter}%"] if url_filter else []
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            return [tuple(row) for row in self.conn.execute(sql, params)]
+
+    def statistics(self):
+        with self._lock:
+            fetches, urls, pages, raw_bytes = self.conn.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT url), COUNT(DISTINCT content_hash), '
+                'COALESCE(SUM(size), 0) FROM fetches').fetchone()
+        stored_bytes = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            stored_bytes += sum(os.path.getsize(os.path.join(dirpath, name)) for name in filenames)
+        return {
+            'fetches': fetches,
+            'urls': urls,
+            'unique_pages': pages,
+            'raw_bytes': raw_bytes,
+            'stored_bytes': stored_bytes,
+            'codec': 'zstd' if ZSTD_AVAILABLE else 'gzip'
+        }
+
+_page_caches = {}
+_page_caches_lock = threading.Lock()
+
+def get_page_cache(root=PAGE_CACHE_DIR):
+    """Shared cache per directory"""
+    with _page_caches_lock:
+        if root not in _page_caches:
+            _page_caches[root] = PageCache(root)
+        return _page_caches[root]
+
+if __name__ == "__main__":
+    stats = get_page_cache().statistics()
+    print(f"📦 Page cache: {PAGE_CACHE_DIR} ({stats['codec']})")
+    print(f"   URLs: {stats['urls']:,}, fetches: {stats['fetches']:,}, unique pages: {stats['unique_pages']:,}")
+    if stats['stored_bytes']:
+        print(f"   {stats['raw_bytes']/1e6:.1f} MB raw → {stats['stored_bytes']/1e6:.1f} MB on disk "
+              f"({stats['raw_bytes']/stats['stored_bytes']:.1f}x)")
@@ -9,6 +9,11 @@ import re
 from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from parsed_page import ParsedPage
+from regex_registry import compile_pattern, folded_text
+from stage_profiler import profile_stage
+
+MEASUREMENT_MATCH_LIMIT = 5  # Matches kept in detected_features; the score saturates at 3
 
 class PageType(Enum):
     """Product page types based on structure analysis"""
@@ -27,12 +32,73 @@ class PageStructure:
     detected_features: Dict[str, Any]
     recommended_parser: str
 
+@dataclass
+class DocumentHits:
+    """Everything the detection patterns found in one page, for all page types"""
+    keywords: set
+    url_keywords: set
+    json_ld_clues: set
+    measurements: Dict[str, list]
+    resources: set
+
+class DetectionMatcher:
+    """Detection keywords and patterns of every page type, compiled once
+
+    One scan per page answers all page types: each distinct keyword is
+    looked up once (C substring search - a per-character Aho-Corasick
+    automaton in Python was 5x slower on full-size pages), regexes shared by
+    several types run once, and measurement scans stop at the matches the
+    score and detected_features use.
+    """
+
+    def __init__(self, detection_patterns: Dict[PageType, Dict]):
+        keywords, url_keywords, clues, measurements, resources = set(), set(), set(), [], []
+        for patterns in detection_patterns.values():
+            ranked = patterns["keywords"]["high_confidence"] + patterns["keywords"]["medium_confidence"]
+            url_keywords.update(ranked)
+            keywords.update(ranked + patterns["pricing_indicators"] + patterns["specification_keywords"])
+            clues.update(patterns["json_ld_clues"])
+            measurements += [p for p in patterns["keywords"]["measurement_patterns"] if p not in measurements]
+            resources += [p for p in patterns["resource_patterns"] if p not in resources]
+        self.keywords = sorted(keywords)
+        self.url_keywords = sorted(url_keywords)
+        self.json_ld_clues = sorted(clues)
+        self.measurements = {p: compile_pattern(f"detector.measurement[{i}]", p, re.IGNORECASE)
+                             for i, p in enumerate(measurements)}
+        self.resources = {p: compile_pattern(f"detector.resource[{i}]", p, re.IGNORECASE)
+                          for i, p in enumerate(resources)}
+
+    def scan(self, content: str, url: str, json_ld_data: Dict = None) -> DocumentHits:
+        """Hits in lowercased content and url (and JSON-LD, when given)"""
+        json_content = json.dumps(json_ld_data).lower() if json_ld_data else ''
+        folded = folded_text(content, lower=content)
+        measurements = {}
+        for pattern, named in self.measurements.items():
+            matches = []
+            if not named.may_match(content, folded):
+                measurements[pattern] = matches
+                continue
+            for match in named.first_matches(content, MEASUREMENT_MATCH_LIMIT):
+                groups = match.groups(default='')
+                # Items as re.findall returns them
+                matches.append(match.group(0) if not groups else groups[0] if len(groups) == 1 else groups)
+            measurements[pattern] = matches
+        return DocumentHits(
+            keywords={kw for kw in self.keywords if kw in content},
+            url_keywords={kw for kw in self.url_keywords if kw in url},
+            json_ld_clues={clue for clue in self.json_ld_clues if clue in json_content},
+            measurements=measurements,
+            resources={p for p, named in self.resources.items()
+                       if named.may_match(content, folded) and named.search(content)}
+        )
+
 class PageStructureDetector:
     """Intelligent page structure detection system"""
     
     def __init__(self):
         self.detection_patterns = self._build_detection_patterns()
         self.feature_weights = self._build_feature_weights()
+        self.matcher = DetectionMatcher(self.detection_patterns)
     
     def _build_detection_patterns(self) -> Dict[str, Dict]:
         """Build comprehensive detection patterns for each page type"""
@@ -110,23 +176,27 @@ class PageStructureDetector:
             "json_ld_clues": 0.02
         }
     
-    def detect_page_structure(self, html_content: str, url: str, json_ld_data: Dict = None) -> PageStructure:
+    @profile_stage('detect')
+    def detect_page_structure(self, html_content: str, url: str, json_ld_data: Dict = None,
+                              page: Optional[ParsedPage] = None) -> PageStructure:
         """
         Detect page structure and recommend appropriate parser
         Returns PageStructure with type, confidence, and recommended parser
+        page: shared ParsedPage for html_content, reusing its lowercased text
         """
         
         # Prepare content for analysis
-        content_lower = html_content.lower()
+        content_lower = page.lower if page is not None else html_content.lower()
         url_lower = url.lower()
         
-        # Score each page type
+        # Score each page type from a single scan of the page
         page_scores = {}
         detailed_features = {}
+        hits = self.matcher.scan(content_lower, url_lower, json_ld_data)
         
         for page_type, patterns in self.detection_patterns.items():
             score, features = self._score_page_type(
-                content_lower, url_lower, patterns, json_ld_data
+                content_lower, url_lower, patterns, json_ld_data, hits
             )
             page_scores[page_type] = score
             detailed_features[page_type] = features
@@ -163,14 +233,19 @@ class PageStructureDetector:
             recommended_parser=parser_map[best_type]
         )
     
-    def _score_page_type(self, content: str, url: str, patterns: Dict, json_ld_data: Dict = None) -> Tuple[float, Dict]:
-        """Score how well content matches a specific page type"""
+    def _score_page_type(self, content: str, url: str, patterns: Dict, json_ld_data: Dict = None,
+                         hits: Optional[DocumentHits] = None) -> Tuple[float, Dict]:
+        """Score how well content matches a specific page type
+        hits: the page's DetectionMatcher scan, shared across page types
+        """
+        if hits is None:
+            hits = self.matcher.scan(content, url, json_ld_data)
         score = 0.0
         detected_features = {}
         
         # Score high confidence keywords
         high_keywords = patterns["keywords"]["high_confidence"]
-        high_matches = [kw for kw in high_keywords if kw in content or kw in url]
+        high_matches = [kw for kw in high_keywords if kw in hits.keywords or kw in hits.url_keywords]
         if high_matches:
             keyword_score = len(high_matches) / len(high_keywords)
             score += keyword_score * self.feature_weights["high_confidence_keywords"]
@@ -178,7 +253,7 @@ class PageStructureDetector:
         
         # Score medium confidence keywords  
         med_keywords = patterns["keywords"]["medium_confidence"]
-        med_matches = [kw for kw in med_keywords if kw in content or kw in url]
+        med_matches = [kw for kw in med_keywords if kw in hits.keywords or kw in hits.url_keywords]
         if med_matches:
             keyword_score = len(med_matches) / len(med_keywords)
             score += keyword_score * self.feature_weights["medium_confidence_keywords"]
@@ -188,9 +263,9 @@ class PageStructureDetector:
         measurement_patterns = patterns["keywords"]["measurement_patterns"]
         measurement_matches = []
         for pattern in measurement_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            if matches:
-                measurement_matches.extend(matches)
+            measurement_matches.extend(hits.measurements[pattern])
+            if len(measurement_matches) >= MEASUREMENT_MATCH_LIMIT:
+                break
         if measurement_matches:
             pattern_score = min(len(measurement_matches) / 3, 1.0)  # Cap at 3 matches
             score += pattern_score * self.feature_weights["measurement_patterns"]
@@ -198,7 +273,7 @@ class PageStructureDetector:
         
         # Score pricing indicators
         pricing_indicators = patterns["pricing_indicators"]
-        pricing_matches = [pi for pi in pricing_indicators if pi in content]
+        pricing_matches = [pi for pi in pricing_indicators if pi in hits.keywords]
         if pricing_matches:
             pricing_score = len(pricing_matches) / len(pricing_indicators)
             score += pricing_score * self.feature_weights["pricing_indicators"]
@@ -206,7 +281,7 @@ class PageStructureDetector:
         
         # Score specification keywords
         spec_keywords = patterns["specification_keywords"]
-        spec_matches = [sk for sk in spec_keywords if sk in content]
+        spec_matches = [sk for sk in spec_keywords if sk in hits.keywords]
         if spec_matches:
             spec_score = len(spec_matches) / len(spec_keywords)
             score += spec_score * self.feature_weights["specification_keywords"]
@@ -216,7 +291,7 @@ class PageStructureDetector:
         resource_patterns = patterns["resource_patterns"]
         resource_matches = []
         for pattern in resource_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
+            if pattern in hits.resources:
                 resource_matches.append(pattern)
         if resource_matches:
             resource_score = len(resource_matches) / len(resource_patterns)
@@ -225,9 +300,8 @@ class PageStructureDetector:
         
         # Score JSON-LD clues
         if json_ld_data:
-            json_content = json.dumps(json_ld_data).lower()
             json_clues = patterns["json_ld_clues"]
-            json_matches = [clue for clue in json_clues if clue in json_content]
+            json_matches = [clue for clue in json_clues if clue in hits.json_ld_clues]
             if json_matches:
                 json_score = len(json_matches) / len(json_clues)
                 score += json_score * self.feature_weights["json_ld_clues"]
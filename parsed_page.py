@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Parsed product page shared across the extraction pipeline
+Built once per fetched page: the lowercased document, decoded JSON-LD blocks
+and the decoded __NEXT_DATA__ payload are each computed on first use and then
+reused by page structure detection, the specialized parsers, the
+specification extractor and extract_product_data.
+"""
+
+import json
+import re
+from functools import cached_property
+from stage_profiler import profile_stage
+
+JSON_LD_PATTERN = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+                             re.IGNORECASE | re.DOTALL)
+NEXT_DATA_PATTERN = re.compile(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', re.DOTALL)
+
+class ParsedPage:
+    """One product page's HTML with lazily computed, cached views"""
+
+    def __init__(self, html, url=''):
+        self.html = html or ''
+        self.url = url or ''
+        self.json_ld_errors = 0
+
+    @cached_property
+    def lower(self):
+        return self.html.lower()
+
+    @cached_property
+    @profile_stage('parse.json_ld')
+    def json_ld_blocks(self):
+        """Every decodable JSON-LD block, in document order"""
+        blocks = []
+        for raw in JSON_LD_PATTERN.findall(self.html):
+            try:
+                blocks.append(json.loads(raw.strip()))
+            except json.JSONDecodeError:
+                self.json_ld_errors += 1
+        return blocks
+
+    @cached_property
+    def product_json_ld(self):
+        """The first JSON-LD block of @type Product, or {}"""
+        for block in self.json_ld_blocks:
+            if isinstance(block, dict) and block.get('@type') == 'Product':
+                return block
+        return {}
+
+    @cached_property
+    def breadcrumb(self):
+        """Names from the first JSON-LD BreadcrumbList joined with ' > ', or ''"""
+        for block in self.json_ld_blocks:
+            if isinstance(block, dict) and block.get('@type') == 'BreadcrumbList':
+                names = []
+                for item in block.get('itemListElement') or []:
+                    if not isinstance(item, dict):
+                        continue
+                    name = item.get('name')
+                    if not name and isinstance(item.get('item'), dict):
+                        name = item['item'].get('name')
+                    if isinstance(name, str) and name.strip():
+                        names.append(name.strip())
+                return ' > '.join(names)
+        return ''
+
+    @cached_property
+    @profile_stage('parse.next_data')
+    def next_data(self):
+        """Decoded __NEXT_DATA__ payload, or None when missing or malformed"""
+        match = NEXT_DATA_PATTERN.search(self.html)
+        if not match:
+            return None
+        try:
+            return json.loads(match.group(1))
+        except json.JSONDecodeError:
+            return None
+
+    @cached_property
+    def product_payload(self):
+        """productData from the Next.js payload, or {}"""
+        try:
+            product = self.next_data['props']['pageProps']['layoutData']['sitecore']['context']['productData']
+        except (KeyError, TypeError):
+            return {}
+        return product if isinstance(product, dict) else {}
+
+def parse_page(html, url=''):
+    """ParsedPage for html (passed through unchanged if it already is one)"""
+    if isinstance(html, ParsedPage):
+        return html
+    return ParsedPage(html, url)
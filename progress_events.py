@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Structured progress events between acquisition subprocesses and the dashboard
+Acquisition scripts write one JSON object per line to a dedicated pipe (file
+descriptor passed in TILESHOP_PROGRESS_FD) instead of the dashboard scraping
+emoji log text. ProgressStats folds events into running totals at constant
+cost per event, however long the run.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Configuration
+PROGRESS_FD_ENV = 'TILESHOP_PROGRESS_FD'
+
+# Event types
+RUN_START = 'run_start'     # total: URLs this process will work through (None when unknown)
+URL_START = 'url_start'     # url, index
+URL_DONE = 'url_done'       # url, outcome (success | failed | unchanged), error
+RUN_END = 'run_end'         # status, successful, failed, unchanged
+STAGE_PROFILE = 'stage_profile'  # stages: per-stage timing histogram deltas (stage_profiler)
+
+OUTCOME_SUCCESS = 'success'
+OUTCOME_FAILED = 'failed'
+OUTCOME_UNCHANGED = 'unchanged'
+
+_channel = None
+_channel_lock = threading.Lock()
+_channel_checked = False
+
+def _get_channel():
+    """Writable progress pipe inherited from the parent, or None when run standalone"""
+    global _channel, _channel_checked
+    if not _channel_checked:
+        _channel_checked = True
+        fd = os.environ.get(PROGRESS_FD_ENV)
+        if fd and fd.isdigit():
+            try:
+                _channel = os.fdopen(int(fd), 'w', buffering=1, encoding='utf-8')
+            except OSError:
+                _channel = None
+    return _channel
+
+def emit(event, **data):
+    """Send one progress event to the parent process (no-op without a channel)"""
+    global _channel
+    with _channel_lock:
+        channel = _get_channel()
+        if channel is None:
+            return False
+        record = {'event': event, 'ts': time.time(), 'pid': os.getpid(), **data}
+        try:
+            channel.write(json.dumps(record, default=str) + '\n')
+        except (OSError, ValueError):
+            # Parent went away - carry on with stdout logging only
+            _channel = None
+            return False
+    return True
+
+def read_events(stream):
+    """Yield decoded events from a progress pipe until it closes, skipping malformed lines"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(event, dict) and event.get('event'):
+            yield event
+
+class ProgressStats:
+    """Running acquisition totals updated per event"""
+
+    def __init__(self):
+        self.estimated_total = 0
+        self.processed = 0
+        self.successful = 0
+        self.failed = 0
+        self.unchanged = 0
+        self.current_url = ''
+        self.runs_started = 0
+        self.runs_finished = 0
+        self.last_error = None
+
+    def apply(self, event):
+        """Fold one event into the totals; returns the event type"""
+        kind = event.get('event')
+
+        if kind == RUN_START:
+            self.runs_started += 1
+            if event.get('total'):
+                self.estimated_total += int(event['total'])
+        elif kind == URL_START:
+            self.current_url = event.get('url', '')
+        elif kind == URL_DONE:
+            self.processed += 1
+            outcome = event.get('outcome')
+            if outcome == OUTCOME_SUCCESS:
+                self.successful += 1
+            elif outcome == OUTCOME_UNCHANGED:
+                self.unchanged += 1
+            else:
+                self.failed += 1
+                self.last_error = event.get('error')
+        elif kind == RUN_END:
+            self.runs_finished += 1
+            if self.runs_finished >= self.runs_started:
+                self.current_url = ''
+        return kind
+
+    def snapshot(self):
+        """Totals in the dashboard's stats shape"""
+        done = self.successful + self.unchanged
+        return {
+            'products_processed': self.processed,
+            'success_count': self.successful,
+            'error_count': self.failed,
+            'unchanged_count': self.unchanged,
+            'current_url': self.current_url,
+            'estimated_total': self.estimated_total,
+            'progress_percent': min(100, done / self.estimated_total * 100) if self.estimated_total else 0
+        }
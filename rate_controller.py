@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Adaptive (AIMD) request pacing for Tileshop acquisition
+Replaces fixed human-like sleeps: the request rate climbs additively while
+responses are fast and healthy, halves on 429/5xx/timeouts and honours
+Retry-After. When several acquisition processes crawl at once, each one
+gets an equal share of the rate budget (TILESHOP_RATE_WORKERS) and
+publishes its own status file; the dashboard shows their sum.
+"""
+
+import glob
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+# Configuration
+RATE_STATUS_FILE = '/tmp/tileshop_rate_status.{pid}.json'  # One file per process
+RATE_WORKERS_ENV = 'TILESHOP_RATE_WORKERS'  # Processes sharing the rate budget
+INITIAL_RATE = 0.25          # Requests per second (one every 4s - the old 3s sleep plus fetch time)
+MIN_RATE = 1 / 30            # Never slower than one request every 30s
+MAX_RATE = 2.0               # Same ceiling as the fetch engine's politeness budget
+ADDITIVE_INCREASE = 0.02     # Requests per second added per healthy response
+MULTIPLICATIVE_DECREASE = 0.5
+LATENCY_TARGET = 3.0         # Seconds; slower responses hold the rate, 3x slower back off
+JITTER = 0.2                 # +/- fraction applied to each delay
+STATUS_WRITE_INTERVAL = 1.0
+STATUS_STALE_SECONDS = 300   # Ignore status files not updated for this long
+
+HEALTHY = 'healthy'
+SLOW = 'slow'
+BACKOFF = 'backoff'
+NEUTRAL = 'neutral'
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP date) as seconds to wait, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def classify_response(status_code=None, latency=None, error=None, latency_target=LATENCY_TARGET):
+    """Map one response to a controller signal"""
+    if error == 'timeout' or status_code == 429 or (status_code is not None and status_code >= 500):
+        return BACKOFF
+    if status_code in (200, 304):
+        if latency is not None and latency > latency_target * 3:
+            return BACKOFF
+        if latency is not None and latency > latency_target:
+            return SLOW
+        return HEALTHY
+    # 404s and DNS/connection failures say nothing about server load
+    return NEUTRAL
+
+class AdaptiveRateController:
+    """Thread-safe AIMD pacer shared by every fetch path in a process"""
+
+    def __init__(self, initial_rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 additive_increase=ADDITIVE_INCREASE, multiplicative_decrease=MULTIPLICATIVE_DECREASE,
+                 latency_target=LATENCY_TARGET, jitter=JITTER, status_file=RATE_STATUS_FILE, workers=1):
+        # Each of `workers` processes paces itself to an equal share of the budget
+        self.workers = max(1, int(workers or 1))
+        self.min_rate = min_rate / self.workers
+        self.max_rate = max_rate / self.workers
+        self.rate = min(max(initial_rate / self.workers, self.min_rate), self.max_rate)
+        self.additive_increase = additive_increase / self.workers
+        self.multiplicative_decrease = multiplicative_decrease
+        self.latency_target = latency_target
+        self.jitter = jitter
+        self.status_file = status_file.format(pid=os.getpid()) if status_file else None
+
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._cooldown_until = 0.0
+        self._last_status_write = 0.0
+        self.counts = {HEALTHY: 0, SLOW: 0, BACKOFF: 0, NEUTRAL: 0}
+        self.last_signal = None
+        self.last_latency = None
+
+    @property
+    def delay(self):
+        return 1.0 / self.rate
+
+    def wait(self):
+        """Block until this caller's request slot; returns seconds slept
+
+        Slots are handed out in order, so concurrent callers share one rate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            slot = max(now, self._next_slot, self._cooldown_until)
+            self._next_slot = slot + delay
+        sleep_for = slot - now
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        return max(sleep_for, 0.0)
+
+    def record(self, status_code=None, latency=None, error=None, retry_after=None):
+        """Feed one response outcome back into the rate; returns the signal"""
+        signal = classify_response(status_code, latency, error, self.latency_target)
+        retry_seconds = parse_retry_after(retry_after)
+
+        with self._lock:
+            if signal == HEALTHY:
+                self.rate = min(self.max_rate, self.rate + self.additive_increase)
+            elif signal == BACKOFF:
+                self.rate = max(self.min_rate, self.rate * self.multiplicative_decrease)
+                # Push back the next slot too - requests already scheduled at the old rate
+                self._next_slot = max(self._next_slot, time.monotonic() + self.delay)
+            if retry_seconds:
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + retry_seconds)
+            self.counts[signal] += 1
+            self.last_signal = signal
+            self.last_latency = latency
+
+        self.publish_status()
+        return signal
+
+    def snapshot(self):
+        with self._lock:
+            cooldown = max(0.0, self._cooldown_until - time.monotonic())
+            return {
+                'rate_per_second': round(self.rate, 4),
+                'requests_per_minute': round(self.rate * 60, 1),
+                'delay_seconds': round(self.delay, 2),
+                'cooldown_seconds': round(cooldown, 1),
+                'last_signal': self.last_signal,
+                'last_latency': round(self.last_latency, 3) if self.last_latency is not None else None,
+                'counts': dict(self.counts),
+                'workers': self.workers,
+                'pid': os.getpid(),
+                'updated_at': datetime.now().isoformat()
+            }
+
+    def publish_status(self, force=False):
+        """Write the current rate for the dashboard (throttled)"""
+        if not self.status_file:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_status_write < STATUS_WRITE_INTERVAL:
+            return
+        self._last_status_write = now
+        try:
+            tmp_path = f"{self.status_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, self.status_file)
+        except OSError:
+            pass
+
+def _process_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except PermissionError:
+        return True  # Running under another user
+    except (ProcessLookupError, TypeError, ValueError):
+        return False
+    return True
+
+def read_rate_status(status_file=RATE_STATUS_FILE, max_age=STATUS_STALE_SECONDS):
+    """Combined state of every process publishing a rate, or None
+
+    Rates and counts are summed over live processes; with none running,
+    the most recently published state is returned on its own.
+    """
+    statuses = []
+    for path in glob.glob(status_file.format(pid='*')):
+        try:
+            with open(path, 'r') as f:
+                status = json.load(f)
+            age = time.time() - os.path.getmtime(path)
+        except (OSError, json.JSONDecodeError):
+            continue
+        statuses.append((age, status))
+    if not statuses:
+        return None
+
+    live = [status for age, status in statuses if age <= max_age and _process_alive(status.get('pid'))]
+    if not live:
+        return min(statuses, key=lambda entry: entry[0])[1]
+
+    rate = sum(status['rate_per_second'] for status in live)
+    counts = {}
+    for status in live:
+        for signal, count in status.get('counts', {}).items():
+            counts[signal] = counts.get(signal, 0) + count
+    latest = max(live, key=lambda status: status.get('updated_at') or '')
+    backing_off = [status for status in live if status.get('last_signal') == BACKOFF]
+    return {
+        'rate_per_second': round(rate, 4),
+        'requests_per_minute': round(sum(status['requests_per_minute'] for status in live), 1),
+        'delay_seconds': round(1.0 / rate, 2) if rate else None,
+        'cooldown_seconds': max(status.get('cooldown_seconds') or 0.0 for status in live),
+        'last_signal': BACKOFF if backing_off else latest.get('last_signal'),
+        'last_latency': latest.get('last_latency'),
+        'counts': counts,
+        'processes': len(live),
+        'per_process': sorted(live, key=lambda status: status['pid']),
+        'updated_at': latest.get('updated_at')
+    }
+
+_shared_controller = None
+_shared_controller_lock = threading.Lock()
+
+def get_rate_controller(**kwargs):
+    """Return the process-wide controller so every fetch path shares one rate
+
+    Worker processes started together set TILESHOP_RATE_WORKERS so their
+    controllers split the rate budget instead of each using all of it.
+    """
+    global _shared_controller
+    with _shared_controller_lock:
+        if _shared_controller is None:
+            kwargs.setdefault('workers', int(os.environ.get(RATE_WORKERS_ENV) or 1))
+            _shared_controller = AdaptiveRateController(**kwargs)
+        return _shared_controller
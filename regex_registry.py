@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Precompiled, named regular expressions for the extraction pipeline
+Patterns are compiled once at import and counted: every call records hits
+and time per pattern, so the slow or dead ones show up in statistics().
+A PatternChain resolves an ordered list of fallback patterns (try the first,
+then the next...) in one call. Each pattern's required literal text, such as
+'box weight' in r'Box Weight[:\\s]*([0-9.]+)', is checked with a plain
+substring test first, so patterns that cannot match skip the regex scan.
+The result is always what the sequential loop would have returned.
+
+Chains are deliberately not merged into one named-group alternation scanned
+once per page. An alternation returns the leftmost match of any member, so
+an earlier match of a lower-ranked pattern hides the preferred one: 14 of
+390 chain/page results differ on the recorded pages. Recovering the ranking
+means scanning every match, and CPython's re also loses each pattern's
+literal-prefix search once they are alternated. Per page that costs
+8.9 ms, against 3.6 ms for the sequential loop and 1.8 ms for the chains
+(benchmark_regex_registry.py).
+"""
+
+import re
+import time
+from itertools import islice
+
+MIN_LITERAL = 3     # Shorter required literals are not worth a substring pre-check
+
+# Non-ASCII characters that IGNORECASE matches to ASCII letters (İ ı ſ K) - their
+# presence makes a lowercase substring check unreliable, so the regex runs as-is
+_CASE_FOLD_SPECIALS = re.compile('[İıſK]')
+_INLINE_FLAGS = re.compile(r'\(\?[aiLmsux]+[):]')
+_QUANTIFIER = re.compile(r'[?*+]|\{(?:\d+|\d*,\d*)\}')
+_NOT_LITERAL = set('.^$?*+')
+
+def folded_text(text, lower=None):
+    """Haystack for IGNORECASE literal pre-checks: text.lower(), or '' when the check is unreliable"""
+    if _CASE_FOLD_SPECIALS.search(text):
+        return ''
+    return lower if lower is not None else text.lower()
+
+def required_literal(pattern, flags=0):
+    """Longest run of literal text every match of `pattern` must contain ('' if none)
+
+    Only top-level characters count: anything inside a group or class, or
+    followed by a quantifier, may be absent, and a top-level '|' means
+    nothing is required. Lowercased for IGNORECASE patterns.
+    """
+    if flags & re.VERBOSE or _INLINE_FLAGS.search(pattern):
+        return ''
+    runs, run, depth, i, n = [], '', 0, 0, len(pattern)
+    while i < n:
+        ch = pattern[i]
+        literal = None
+        if ch == '\\':
+            escaped = pattern[i + 1:i + 2]
+            i += 2
+            if depth == 0 and escaped and not escaped.isalnum():
+                literal = escaped
+        elif ch == '[':
+            # Skip the class body; ']' right after '[' or '[^' is a member
+            i += 1
+            i += pattern[i:i + 1] == '^'
+            i += pattern[i:i + 1] == ']'
+            while i < n and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+        elif ch == '(':
+            depth += 1
+            i += 1
+        elif ch == ')':
+            depth -= 1
+            i += 1
+        elif ch == '|':
+            if depth == 0:
+                return ''
+            i += 1
+        else:
+            quantifier = _QUANTIFIER.match(pattern, i)
+            if quantifier:
+                i = quantifier.end()
+            else:
+                i += 1
+                if depth == 0 and ch not in _NOT_LITERAL:
+                    literal = ch
+        if literal is not None and not _QUANTIFIER.match(pattern, i):
+            run += literal
+        else:
+            runs.append(run)
+            run = ''
+    runs.append(run)
+    best = max(runs, key=len)
+    if len(best) < MIN_LITERAL:
+        return ''
+    return best.lower() if flags & re.IGNORECASE else best
+
+class NamedPattern:
+    """A compiled pattern that records its calls, hits and time
+
+    Counters are plain attributes updated without a lock, so they are
+    approximate when several threads share a pattern.
+    """
+
+    __slots__ = ('name', 'regex', 'literal', 'ignorecase', 'calls', 'hits', 'skipped', 'seconds')
+
+    def __init__(self, name, regex):
+        self.name = name
+        self.regex = regex
+        self.literal = required_literal(regex.pattern, regex.flags)
+        self.ignorecase = bool(regex.flags & re.IGNORECASE)
+        self.calls = 0
+        self.hits = 0
+        self.skipped = 0      # Calls answered by the literal pre-check alone
+        self.seconds = 0.0
+
+    @property
+    def pattern(self):
+        return self.regex.pattern
+
+    def _record(self, hit, started):
+        self.seconds += time.perf_counter() - started
+        self.calls += 1
+        if hit:
+            self.hits += 1
+
+    def may_match(self, text, folded=None):
+        """False when the required literal is missing from text, so the regex cannot match
+
+        folded: folded_text(text) when the caller already has it.
+        """
+        if not self.literal:
+            return True
+        haystack = text
+        if self.ignorecase:
+            haystack = folded if folded is not None else folded_text(text)
+        if haystack and self.literal not in haystack:
+            self.skipped += 1
+            return False
+        return True
+
+    def search(self, text, pos=0):
+        started = time.perf_counter()
+        match = self.regex.search(text, pos)
+        self._record(match is not None, started)
+        return match
+
+    def findall(self, text):
+        started = time.perf_counter()
+        matches = self.regex.findall(text)
+        self._record(bool(matches), started)
+        return matches
+
+    def first_matches(self, text, limit=None):
+        """Up to `limit` matches in order (all of them when limit is None), stopping the scan there"""
+        started = time.perf_counter()
+        matches = list(islice(self.regex.finditer(text), limit))
+        self._record(bool(matches), started)
+        return matches
+
+    def sub(self, repl, text, count=0):
+        started = time.perf_counter()
+        result, replaced = self.regex.subn(repl, text, count)
+        self._record(replaced > 0, started)
+        return result
+
+class PatternChain:
+    """Ordered fallback patterns resolved in one call with literal pre-checks"""
+
+    def __init__(self, registry, name, patterns, flags=0):
+        self.name = name
+        self.members = [registry.compile(f"{name}[{i}]", pattern, flags) for i, pattern in enumerate(patterns)]
+
+    def first(self, text, accept=None, lower=None):
+        """First match of the highest-ranked pattern that matches and is accepted, or None
+
+        Same result as searching each pattern in turn and stopping at the
+        first match `accept(match)` allows (any match when accept is None).
+        Pass `lower` when the caller already has text.lower().
+        """
+        folded = None
+        for member in self.members:
+            if member.literal and member.ignorecase and folded is None:
+                folded = folded_text(text, lower)
+            if not member.may_match(text, folded):
+                continue
+            match = member.search(text)
+            if match is not None and (accept is None or accept(match)):
+                return match
+        return None
+
+    def rank(self, match):
+        """Position in the chain of the pattern that produced `match`"""
+        for i, member in enumerate(self.members):
+            if member.regex is match.re:
+                return i
+        return -1
+
+class RegexRegistry:
+    """Named patterns compiled once and shared by every extractor"""
+
+    def __init__(self):
+        self._patterns = {}
+        self._chains = {}
+
+    def compile(self, name, pattern, flags=0):
+        """The NamedPattern for `name`, compiling it on first registration"""
+        existing = self._patterns.get(name)
+        if existing is not None:
+            if (existing.regex.pattern, existing.regex.flags) != (pattern, re.compile(pattern, flags).flags):
+                raise ValueError(f"Regex '{name}' is already registered with a different pattern")
+            return existing
+        named = NamedPattern(name, re.compile(pattern, flags))
+        self._patterns[name] = named
+        return named
+
+    def chain(self, name, patterns, flags=0):
+        """The PatternChain for `name` over ordered fallback `patterns`"""
+        patterns = list(patterns)
+        chain = self._chains.get(name)
+        if chain is None:
+            chain = self._chains[name] = PatternChain(self, name, patterns, flags)
+        elif [member.pattern for member in chain.members] != patterns:
+            raise ValueError(f"Regex chain '{name}' is already registered with different patterns")
+        return chain
+
+    def chains(self):
+        return list(self._chains.values())
+
+    def statistics(self, min_calls=1):
+        """Per-pattern counters, slowest first"""
+        stats = [{'name': p.name, 'calls': p.calls, 'hits': p.hits, 'skipped': p.skipped,
+                  'seconds': round(p.seconds, 6),
+                  'us_per_call': round(p.seconds / p.calls * 1e6, 2) if p.calls else 0.0}
+                 for p in self._patterns.values() if p.calls + p.skipped >= min_calls]
+        return sorted(stats, key=lambda s: s['seconds'], reverse=True)
+
+    def reset_statistics(self):
+        for named in self._patterns.values():
+            named.calls, named.hits, named.skipped, named.seconds = 0, 0, 0, 0.0
+
+_registry = RegexRegistry()
+
+def get_regex_registry():
+    """Shared registry used by the extraction modules"""
+    return _registry
+
+def compile_pattern(name, pattern, flags=0):
+    return _registry.compile(name, pattern, flags)
+
+def pattern_chain(name, patterns, flags=0):
+    return _registry.chain(name, patterns, flags)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Warm worker pool for single-product relearns
+Keeps extraction worker processes alive with tileshop_learner and its
+categorizer, specification extractor and page structure detector already
+loaded, so a dashboard relearn costs a page fetch rather than an interpreter
+start and re-import per request. Jobs and results travel over queues.
+"""
+
+import io
+import multiprocessing
+import threading
+import time
+import uuid
+from contextlib import redirect_stdout
+
+# Configuration
+DEFAULT_WORKERS = 2
+JOB_TIMEOUT = 180           # Seconds wait() blocks for one relearn
+LOG_TAIL_LINES = 40         # Worker output lines returned with each result
+MAX_FINISHED = 100          # Results kept for wait() callers
+READY = 'ready'
+RESULT = 'result'
+
+def warm_extraction():
+    """Load the extraction stack once per worker and build the categorizer, spec extractor and page detector"""
+    from tileshop_learner import get_enhanced_categorizer, get_page_detector, get_spec_extractor
+
+    get_enhanced_categorizer()
+    get_spec_extractor()
+    get_page_detector()
+
+def relearn_product(url):
+    """Fetch, extract and save one product; returns a result dict"""
+    from curl_scraper import scrape_product_with_curl, save_product_to_database
+
+    product_data = scrape_product_with_curl(url)
+    if not product_data:
+        return {'success': False, 'error': 'Failed to extract product data'}
+    sku, title = product_data.get('sku'), product_data.get('title')
+    if not save_product_to_database(product_data):
+        return {'success': False, 'error': 'Database save failed', 'sku': sku}
+    return {'success': True, 'sku': sku, 'title': title}
+
+def _worker_main(worker_n, jobs, results, handler, warmup):
+    """Worker process: warm up once, then serve jobs until a None sentinel"""
+    start = time.time()
+    warm_error = None
+    try:
+        with redirect_stdout(io.StringIO()):
+            warmup()
+    except Exception as e:
+        # Keep serving - each job will report the underlying problem
+        warm_error = f'{type(e).__name__}: {e}'
+    results.put((READY, {'worker': worker_n, 'warm_seconds': time.time() - start, 'error': warm_error}))
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        output = io.StringIO()
+        job_start = time.time()
+        try:
+            with redirect_stdout(output):
+                result = handler(job['url'])
+        except Exception as e:
+            result = {'success': False, 'error': f'{type(e).__name__}: {e}'}
+        result.update({
+            'job_id': job['job_id'],
+            'url': job['url'],
+            'worker': worker_n,
+            'elapsed': round(time.time() - job_start, 3),
+            'log': output.getvalue().splitlines()[-LOG_TAIL_LINES:]
+        })
+        results.put((RESULT, result))
+
+class RelearnPool:
+    """Pre-warmed extraction processes fed from a job queue"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, handler=relearn_product, warmup=warm_extraction, on_result=None):
+        self.workers = max(1, workers)
+        self.handler = handler
+        self.warmup = warmup
+        self.on_result = on_result
+        # spawn: the dashboard is multi-threaded, forking it is not safe
+        self._ctx = multiprocessing.get_context('spawn')
+        self._jobs = None
+        self._results = None
+        self._processes = {}
+        self._collector = None
+        self._lock = threading.Lock()
+        self._pending = {}      # job_id -> {'url', 'sku', 'submitted_at', 'event'}
+        self._finished = {}     # job_id -> result (until collected by wait())
+        self.ready_workers = set()
+        self.warm_seconds = {}
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start (or top up) the worker processes; returns immediately while they warm up"""
+        with self._lock:
+            if self._jobs is None:
+                self._jobs = self._ctx.Queue()
+                self._results = self._ctx.Queue()
+                self._collector = threading.Thread(target=self._collect, daemon=True, name='relearn-collector')
+                self._collector.start()
+            for worker_n in range(1, self.workers + 1):
+                process = self._processes.get(worker_n)
+                if process is not None and process.is_alive():
+                    continue
+                self.ready_workers.discard(worker_n)
+                process = self._ctx.Process(target=_worker_main, daemon=True, name=f'relearn-worker-{worker_n}',
+                                            args=(worker_n, self._jobs, self._results, self.handler, self.warmup))
+                process.start()
+                self._processes[worker_n] = process
+        return self
+
+    def submit(self, url, sku=None):
+        """Queue one relearn; returns its job id"""
+        self.start()  # Replaces any worker that died
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._pending[job_id] = {'url': url, 'sku': sku, 'submitted_at': time.time(),
+                                     'event': threading.Event()}
+        self._jobs.put({'job_id': job_id, 'url': url})
+        return job_id
+
+    def wait(self, job_id, timeout=JOB_TIMEOUT):
+        """Block until a job finishes; returns its result dict, or None on timeout"""
+        with self._lock:
+            if job_id in self._finished:
+                return self._finished.pop(job_id)
+            pending = self._pending.get(job_id)
+        if pending is None or not pending['event'].wait(timeout):
+            return None
+        with self._lock:
+            return self._finished.pop(job_id, None)
+
+    def _collect(self):
+        while True:
+            try:
+                kind, payload = self._results.get()
+            except (EOFError, OSError):
+                return
+            if kind == READY:
+                self.ready_workers.add(payload['worker'])
+                self.warm_seconds[payload['worker']] = round(payload['warm_seconds'], 2)
+                if payload.get('error'):
+                    print(f"⚠️  Relearn worker {payload['worker']} warm-up failed: {payload['error']}")
+                continue
+            with self._lock:
+                pending = self._pending.pop(payload['job_id'], None)
+                if pending:
+                    payload.setdefault('sku', pending['sku'])
+                    payload['total_seconds'] = round(time.time() - pending['submitted_at'], 3)
+                    self._finished[payload['job_id']] = payload
+                    while len(self._finished) > MAX_FINISHED:
+                        self._finished.pop(next(iter(self._finished)))
+                if payload.get('success'):
+                    self.completed += 1
+                else:
+                    self.failed += 1
+            if self.on_result:
+                try:
+                    self.on_result(payload)
+                except Exception as e:
+                    print(f"⚠️  Relearn result callback failed: {e}")
+            if pending:
+                pending['event'].set()
+
+    def status(self):
+        with self._lock:
+            alive = sum(1 for process in self._processes.values() if process.is_alive())
+            return {
+                'workers': self.workers,
+                'alive': alive,
+                'ready': len(self.ready_workers),
+                'warm_seconds': dict(self.warm_seconds),
+                'pending': len(self._pending),
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+    def stop(self, timeout=10):
+        """Ask workers to finish their current job and exit"""
+        with self._lock:
+            processes = list(self._processes.values())
+            self._processes = {}
+        for _ in processes:
+            self._jobs.put(None)
+        for process in processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.ready_workers.clear()
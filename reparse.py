@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Re-run product extraction over the raw page cache
+Extraction runs in parallel worker processes and results are upserted with
+save_to_database, so a parser fix can be applied to every cached product
+without re-crawling tileshop.com.
+
+Usage:
+    python reparse.py [--workers N] [--limit N] [--match TEXT] [--dry-run] [--verbose]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from curl_scraper import build_tab_views
+from page_cache import PAGE_CACHE_DIR, get_page_cache
+from tileshop_learner import extract_product_data, save_to_database
+
+def _extract_cached(cache_root, url, digest, verbose=False):
+    """Worker: load one cached page and extract it; returns (url, product_data, error)"""
+    html = get_page_cache(cache_root).get(digest)
+    if not html:
+        return url, None, 'Cached page missing'
+    crawl_results = build_tab_views(html)
+    try:
+        if verbose:
+            product_data = extract_product_data(crawl_results, url)
+        else:
+            # Extraction is chatty - keep per-product logging out of the summary
+            with contextlib.redirect_stdout(io.StringIO()):
+                product_data = extract_product_data(crawl_results, url)
+    except Exception as e:
+        return url, None, f"Extraction error: {e}"
+    if not product_data:
+        return url, None, 'No product data extracted'
+    product_data['_crawl_results'] = crawl_results
+    return url, product_data, None
+
+def reparse_cached_pages(workers=None, limit=None, url_filter=None, save=True, save_workers=4,
+                         cache_root=PAGE_CACHE_DIR, verbose=False):
+    """Extract the newest cached page of every URL and upsert the results
+
+    Returns a stats dict; with save=False the extracted products are
+    returned under 'products' instead of being written to the database.
+    """
+    entries = get_page_cache(cache_root).latest_entries(url_filter, limit)
+    workers = workers or os.cpu_count() or 1
+    print(f"🔁 Reparsing {len(entries):,} cached pages with {workers} workers")
+
+    stats = {'pages': len(entries), 'extracted': 0, 'failed': 0, 'saved': 0, 'errors': {}}
+    products = {}
+    start_time = time.time()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, ThreadPoolExecutor(max_workers=save_workers) as savers:
+        futures = [pool.submit(_extract_cached, cache_root, url, digest, verbose) for url, _, digest in entries]
+        saves = []
+        for i, future in enumerate(as_completed(futures), 1):
+            url, product_data, error = future.result()
+            if error:
+                stats['failed'] += 1
+                stats['errors'][url] = error
+                print(f"  ✗ {url.split('/')[-1]}: {error}")
+            else:
+                stats['extracted'] += 1
+                if save:
+                    crawl_results = product_data.pop('_crawl_results')
+                    saves.append((url, savers.submit(save_to_database, product_data, crawl_results)))
+                else:
+                    products[url] = product_data
+            if i % 100 == 0:
+                print(f"  📈 {i:,}/{len(entries):,} extracted ({time.time() - start_time:.0f}s)")
+        for url, save_future in saves:
+            try:
+                saved = save_future.result()
+            except Exception as e:
+                saved, error = False, f"Save error: {e}"
+            else:
+                error = 'save_to_database reported a failure'
+            if saved:
+                stats['saved'] += 1
+            else:
+                stats['errors'][url] = error
+                print(f"  ✗ {url.split('/')[-1]}: {error}")
+
+    stats['elapsed'] = time.time() - start_time
+    if not save:
+        stats['products'] = products
+    print(f"✅ Reparse complete in {stats['elapsed']:.1f}s: {stats['extracted']:,} extracted, "
+          f"{stats['failed']:,} failed, {stats['saved']:,} saved, "
+          f"{len(stats['errors']) - stats['failed']:,} save errors")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Re-run extraction over cached product pages')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Extraction processes (default: CPU count)')
+    parser.add_argument('--limit', type=int, default=None,
+                       help='Maximum number of cached URLs to reparse')
+    parser.add_argument('--match', type=str, default=None,
+                       help='Only reparse URLs containing this text')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Extract only, do not write to the database')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Show per-product extraction output')
+    args = parser.parse_args()
+
+    reparse_cached_pages(workers=args.workers, limit=args.limit, url_filter=args.match,
+                         save=not args.dry_run, verbose=args.verbose)
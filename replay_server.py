@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for tileshop.com that replays recorded product pages
+Serves benchmarks/pages/*.html with configurable latency, server errors and
+429 throttling so crawl throughput can be measured without touching the
+real site. Injected failures are drawn from a seeded RNG, so a run with the
+same settings sees the same failure sequence.
+"""
+
+import glob
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configuration
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'pages')
+DEFAULT_LATENCY = 0.05      # Seconds before each response
+DEFAULT_RETRY_AFTER = 1     # Seconds advertised on injected 429s
+
+def load_pages(pages_dir=PAGES_DIR):
+    """Recorded pages keyed by file stem, e.g. 'grout_superior_sanded_...'"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)[:-5]] = f.read()
+    return pages
+
+def page_category(stem):
+    """Product family from a page stem's prefix (tile, grout, trim, lvp, tool)"""
+    return stem.split('_', 1)[0]
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        replay = self.server.replay
+        status, body, headers = replay.respond(self.path)
+        time.sleep(replay.delay())
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class ReplayServer:
+    """Threaded HTTP server replaying recorded product pages with injected faults"""
+
+    def __init__(self, pages_dir=PAGES_DIR, latency=DEFAULT_LATENCY, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=DEFAULT_RETRY_AFTER, seed=0):
+        self.pages = load_pages(pages_dir)
+        if not self.pages:
+            raise ValueError(f"No recorded pages in {pages_dir}")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._fault_rng = random.Random(seed)
+        self._latency_rng = random.Random(seed + 1)
+        self._lock = threading.Lock()
+        self._server = None
+        self.counts = {'requests': 0, 'ok': 0, 'throttled': 0, 'errors': 0, 'not_found': 0}
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _ReplayHandler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+        threading.Thread(target=self._server.serve_forever, daemon=True, name='replay-server').start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def urls(self, count):
+        """Product URLs cycling through the recorded pages
+
+        Repeats get their own path (/products/r2/<stem>) so every URL is a
+        distinct frontier entry, but the last segment still names the page.
+        """
+        stems = list(self.pages)
+        urls = []
+        for i in range(count):
+            stem = stems[i % len(stems)]
+            round_n = i // len(stems)
+            urls.append(f"{self.base_url}/products/{f'r{round_n}/' if round_n else ''}{stem}")
+        return urls
+
+    def delay(self):
+        with self._lock:
+            return max(0.0, self.latency + self._latency_rng.uniform(-self.jitter, self.jitter))
+
+    def respond(self, path):
+        """Status, body and extra headers for one request"""
+        stem = path.split('#', 1)[0].split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+        with self._lock:
+            self.counts['requests'] += 1
+            roll = self._fault_rng.random()
+            if roll < self.throttle_rate:
+                self.counts['throttled'] += 1
+                return 429, b'<html><body>Too Many Requests</body></html>', {'Retry-After': str(self.retry_after)}
+            if roll < self.throttle_rate + self.error_rate:
+                self.counts['errors'] += 1
+                return 500, b'<html><body>Internal Server Error</body></html>', {}
+            body = self.pages.get(stem)
+            if body is None:
+                self.counts['not_found'] += 1
+                return 404, b'<html><body>Not Found</body></html>', {}
+            self.counts['ok'] += 1
+            return 200, body, {}
+
+    def statistics(self):
+        with self._lock:
+            return dict(self.counts)
+
+if __name__ == "__main__":
+    server = ReplayServer().start()
+    print(f"🔁 Replaying {len(server.pages)} recorded pages at {server.base_url}/products/<page>")
+    for stem in server.pages:
+        print(f"   {page_category(stem):<6} {server.base_url}/products/{stem}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
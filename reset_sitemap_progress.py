@@ -4,35 +4,21 @@ Reset sitemap progress counters to 0
 Useful when you want to start fresh learning from the beginning
 """
 
-import json
-import os
-
-SITEMAP_FILE = "tileshop_sitemap.json"
+from url_frontier import get_frontier
 
 def reset_sitemap_progress():
-    """Reset all URLs in sitemap to pending status"""
-    if not os.path.exists(SITEMAP_FILE):
-        print(f"❌ Sitemap file {SITEMAP_FILE} not found")
+    """Reset all URLs in the frontier to pending status"""
+    frontier = get_frontier()
+    if frontier.is_empty():
+        print(f"❌ Sitemap not found - download the sitemap first")
         return False
     
     try:
-        with open(SITEMAP_FILE, 'r') as f:
-            data = json.load(f)
-        
         # Reset all URLs to pending status
-        reset_count = 0
-        for url in data['urls']:
-            if url['scrape_status'] != 'pending':
-                url['scrape_status'] = 'pending'
-                url['scraped_at'] = None
-                reset_count += 1
-        
-        # Save back to file
-        with open(SITEMAP_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        reset_count = frontier.reset_statuses()
         
         print(f"✅ Reset sitemap progress successfully")
-        print(f"📊 Total URLs: {len(data['urls']):,}")
+        print(f"📊 Total URLs: {frontier.get_statistics()['total_urls']:,}")
         print(f"🔄 Reset {reset_count:,} URLs to pending status")
         
         return True
@@ -1,65 +1,63 @@
 #!/usr/bin/env python3
 """
 Retry failed URLs from sitemap with enhanced error handling
+Failed URLs are retried automatically by acquire_from_sitemap once their
+backoff has passed (see retry_policy.py); this tool inspects the retry
+queue and dead-letter set and forces retries by hand.
 """
 
-import json
 import sys
-from download_sitemap import load_sitemap_data, update_url_status
+from url_frontier import get_frontier
+from retry_policy import DEAD_LETTER
 from acquire_from_sitemap import scrape_from_sitemap
 
 def get_failed_urls(max_retries=None):
     """Get list of failed URLs to retry"""
-    sitemap_data = load_sitemap_data()
-    if not sitemap_data:
-        return []
-    
-    failed_urls = [url_data['url'] for url_data in sitemap_data['urls'] 
-                   if url_data['scrape_status'] == 'failed']
-    
-    if max_retries:
-        failed_urls = failed_urls[:max_retries]
-    
-    return failed_urls
+    return [url_data['url'] for url_data in get_frontier().get_urls(status='failed', limit=max_retries)]
 
-def reset_failed_to_pending(max_urls=None):
-    """Reset failed URLs back to pending status for retry"""
-    sitemap_data = load_sitemap_data()
-    if not sitemap_data:
+def reset_failed_to_pending(max_urls=None, from_status='failed'):
+    """Reset failed (or dead-lettered) URLs back to pending status for retry
+    
+    Error info is kept in previous_error for reference.
+    """
+    frontier = get_frontier()
+    if frontier.is_empty():
         print("❌ No sitemap data found")
         return 0
     
-    reset_count = 0
-    failed_urls = [url_data for url_data in sitemap_data['urls'] 
-                   if url_data['scrape_status'] == 'failed']
-    
-    if max_urls:
-        failed_urls = failed_urls[:max_urls]
-    
-    for url_data in failed_urls:
-        url_data['scrape_status'] = 'pending'
-        url_data['scraped_at'] = None
-        # Keep error info for reference but allow retry
-        if 'error' in url_data:
-            url_data['previous_error'] = url_data['error']
-            del url_data['error']
-        reset_count += 1
-    
-    # Save updated sitemap
-    with open('tileshop_sitemap.json', 'w', encoding='utf-8') as f:
-        json.dump(sitemap_data, f, indent=2, ensure_ascii=False)
-    
-    return reset_count
+    return frontier.reset_statuses(from_status=from_status, limit=max_urls)
+
+def show_retry_queue():
+    """Show scheduled retries and dead-lettered URLs per failure class"""
+    summary = get_frontier().retry_summary()
+    print(f"🔁 Retry queue: {summary['scheduled']} scheduled ({summary['due']} due now), "
+          f"{summary['dead_letter']} dead-lettered")
+    if summary['next_retry_at']:
+        print(f"   Next retry: {summary['next_retry_at'][:19]}")
+    for error_class, counts in sorted(summary['by_class'].items()):
+        print(f"   {error_class:<14} scheduled {counts['scheduled']:>5}   dead-lettered {counts['dead_letter']:>5}")
+
+def show_dead_letters(limit=50):
+    """List URLs that ran out of retries"""
+    dead = get_frontier().get_urls(status=DEAD_LETTER)
+    if not dead:
+        print("✅ Dead-letter set is empty")
+        return
+    print(f"☠️  Dead-lettered URLs ({len(dead)} total):")
+    for url_data in dead[:limit]:
+        print(f"   [{url_data.get('error_class') or 'unknown'}] x{url_data['failure_count']} "
+              f"{url_data['url'].split('/')[-1]} - {url_data.get('error') or 'Unknown error'}")
+    if len(dead) > limit:
+        print(f"   ... and {len(dead) - limit} more")
 
 def show_failed_summary():
     """Show summary of failed URLs and their errors"""
-    sitemap_data = load_sitemap_data()
-    if not sitemap_data:
+    frontier = get_frontier()
+    if frontier.is_empty():
         print("❌ No sitemap data found")
         return
     
-    failed_urls = [url_data for url_data in sitemap_data['urls'] 
-                   if url_data['scrape_status'] == 'failed']
+    failed_urls = frontier.get_urls(status='failed')
     
     if not failed_urls:
         print("✅ No failed URLs found!")
@@ -71,7 +69,7 @@ def show_failed_summary():
     # Group by error type
     error_groups = {}
     for url_data in failed_urls:
-        error = url_data.get('error', 'Unknown error')
+        error = url_data.get('error') or 'Unknown error'
         if error not in error_groups:
             error_groups[error] = []
         error_groups[error].append(url_data['url'])
@@ -89,9 +87,28 @@ def main():
         command = sys.argv[1].lower()
         
         if command == 'list':
+            show_retry_queue()
+            print()
             show_failed_summary()
             return
         
+        elif command == 'dead':
+            show_dead_letters()
+            return
+        
+        elif command == 'revive':
+            max_urls = None
+            if len(sys.argv) > 2:
+                try:
+                    max_urls = int(sys.argv[2])
+                except ValueError:
+                    print("Invalid number for max URLs")
+                    return
+            
+            reset_count = reset_failed_to_pending(max_urls, from_status=DEAD_LETTER)
+            print(f"✅ Revived {reset_count} dead-lettered URLs with fresh retry attempts")
+            return
+        
         elif command == 'reset':
             max_urls = None
             if len(sys.argv) > 2:
@@ -129,9 +146,11 @@ def main():
     print("=" * 50)
     print()
     print("Usage:")
-    print("  python retry_failed.py list              - Show failed URLs summary")
-    print("  python retry_failed.py reset [N]         - Reset N failed URLs to pending")
-    print("  python retry_failed.py retry [N]         - Reset and retry N failed URLs")
+    print("  python retry_failed.py list              - Show retry queue and failed URLs summary")
+    print("  python retry_failed.py dead              - List URLs that ran out of retries")
+    print("  python retry_failed.py revive [N]        - Move N dead-lettered URLs back to pending")
+    print("  python retry_failed.py reset [N]         - Reset N failed URLs to pending now (skip backoff)")
+    print("  python retry_failed.py retry [N]         - Reset and retry N failed URLs now")
     print()
     print("Examples:")
     print("  python retry_failed.py list")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Failure classes and retry scheduling for acquisition
+Each failed URL is classified (timeout, 4xx, 5xx, parse failure, DB failure)
+and gets a retry time from its class's jittered exponential backoff. After
+the class's attempt limit it moves to the dead-letter set instead. Due
+retries are served by the frontier alongside fresh pending URLs.
+"""
+
+import random
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# Failure classes
+TIMEOUT = 'timeout'
+CLIENT_ERROR = 'client_error'       # 4xx (except 408/429)
+SERVER_ERROR = 'server_error'       # 5xx, 429 - the site is struggling or throttling us
+PARSE_FAILURE = 'parse_failure'     # Page fetched but no product data extracted
+DB_FAILURE = 'db_failure'           # Product extracted but the save failed
+WORKER_LOST = 'worker_lost'         # Lease expired - the worker crashed or hung on the URL
+UNKNOWN = 'unknown'
+
+DEAD_LETTER = 'dead_letter'         # Frontier status once a URL is out of attempts
+RETRY_SHARE = 0.25                  # Max fraction of a work batch given to due retries
+
+@dataclass
+class RetryPolicy:
+    base_delay: float       # Seconds before the first retry
+    max_delay: float        # Backoff ceiling in seconds
+    max_attempts: int       # Failures before dead-lettering
+
+    def delay(self, attempt, rng=random):
+        """Backoff before retry number `attempt` (1-based), jittered to 50-100% of the step"""
+        step = min(self.max_delay, self.base_delay * (2 ** max(attempt - 1, 0)))
+        return rng.uniform(step / 2, step)
+
+RETRY_POLICIES = {
+    TIMEOUT: RetryPolicy(base_delay=60, max_delay=3600, max_attempts=5),
+    SERVER_ERROR: RetryPolicy(base_delay=300, max_delay=6 * 3600, max_attempts=5),
+    CLIENT_ERROR: RetryPolicy(base_delay=3600, max_delay=24 * 3600, max_attempts=2),     # 404s rarely come back
+    PARSE_FAILURE: RetryPolicy(base_delay=6 * 3600, max_delay=3 * 86400, max_attempts=3),
+    DB_FAILURE: RetryPolicy(base_delay=30, max_delay=1800, max_attempts=8),              # The page itself was fine
+    WORKER_LOST: RetryPolicy(base_delay=0, max_delay=0, max_attempts=3),                 # Requeued at once; repeat offenders are poison URLs
+    UNKNOWN: RetryPolicy(base_delay=300, max_delay=6 * 3600, max_attempts=4),
+}
+
+_HTTP_STATUS = re.compile(r'\bHTTP (\d{3})\b')
+
+def classify_status(status_code):
+    """Failure class for an HTTP status code"""
+    if status_code in (408,):
+        return TIMEOUT
+    if status_code == 429 or status_code >= 500:
+        return SERVER_ERROR
+    if status_code >= 400:
+        return CLIENT_ERROR
+    return UNKNOWN
+
+def classify_failure(error_msg=None, status_code=None):
+    """Failure class from a status code or the error message recorded for the URL"""
+    if status_code:
+        return classify_status(status_code)
+    text = (error_msg or '').lower()
+    match = _HTTP_STATUS.search(error_msg or '')
+    if match:
+        return classify_status(int(match.group(1)))
+    if 'timeout' in text or 'timed out' in text:
+        return TIMEOUT
+    if 'database' in text or 'save failed' in text:
+        return DB_FAILURE
+    if 'extract' in text or 'parse' in text:
+        return PARSE_FAILURE
+    return UNKNOWN
+
+def plan_retry(error_class, failures, now=None, rng=random):
+    """When to retry after `failures` consecutive failures; None means dead-letter"""
+    policy = RETRY_POLICIES.get(error_class, RETRY_POLICIES[UNKNOWN])
+    if failures >= policy.max_attempts:
+        return None
+    return (now or datetime.now()) + timedelta(seconds=policy.delay(failures, rng))
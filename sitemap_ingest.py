@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Streaming sitemap ingestion for the URL frontier
+Parses sitemaps with iterparse while they download, follows sitemap indexes
+and .xml.gz children, and applies only the delta (added, removed,
+lastmod-changed URLs) to the frontier so a refresh keeps scrape progress.
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import requests
+
+from color_variation_index import get_color_variation_index
+from url_frontier import get_frontier
+
+# Configuration
+SITEMAP_URL = "https://www.tileshop.com/sitemap.xml"
+SITEMAP_FILE = "tileshop_sitemap.json"
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+MAX_INDEX_DEPTH = 3
+REQUEST_TIMEOUT = 30
+GZIP_MAGIC = b'\x1f\x8b'
+
+def is_product_url(url):
+    """Product URL filter (same conditions as the n8n workflow)"""
+    return ("tileshop.com/products/" in url and
+            "https://www.tileshop.com/products/,-w-," not in url and
+            url != "https://www.tileshop.com/products/" and
+            "sample" not in url)
+
+class _PeekableStream:
+    """Lets us sniff the gzip magic bytes without buffering the whole body"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.head = b''
+
+    def peek(self, size):
+        while len(self.head) < size:
+            chunk = self.raw.read(size - len(self.head))
+            if not chunk:
+                break
+            self.head += chunk
+        return self.head[:size]
+
+    def read(self, size=-1):
+        if self.head:
+            if size is None or size < 0:
+                data, self.head = self.head + self.raw.read(), b''
+                return data
+            data, self.head = self.head[:size], self.head[size:]
+            if len(data) < size:
+                data += self.raw.read(size - len(data))
+            return data
+        return self.raw.read(size)
+
+def _open_stream(response):
+    """Decoded byte stream for a sitemap response, gunzipping .xml.gz bodies"""
+    # Transfer encoding (Content-Encoding: gzip) is undone by urllib3
+    response.raw.decode_content = True
+    stream = _PeekableStream(response.raw)
+    # .xml.gz files are gzip *content* - detect by magic bytes rather than trusting the name
+    if stream.peek(2) == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream)
+    return stream
+
+def iter_sitemap_entries(sitemap_url, session=None, depth=0, stats=None):
+    """Yield (url, lastmod) from a sitemap or sitemap index, streaming
+
+    Child sitemaps listed in an index are followed after the index itself
+    has been parsed. Elements are cleared as soon as they are read, so memory
+    stays flat regardless of sitemap size.
+    """
+    session = session or requests.Session()
+    stats = stats if stats is not None else {}
+    children = []
+
+    with session.get(sitemap_url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        stats['sitemaps'] = stats.get('sitemaps', 0) + 1
+
+        loc = lastmod = None
+        for event, elem in ET.iterparse(_open_stream(response), events=('end',)):
+            tag = elem.tag
+            if tag == f'{SITEMAP_NS}loc':
+                loc = (elem.text or '').strip()
+            elif tag == f'{SITEMAP_NS}lastmod':
+                lastmod = (elem.text or '').strip() or None
+            elif tag == f'{SITEMAP_NS}url':
+                if loc:
+                    yield loc, lastmod
+                loc = lastmod = None
+                elem.clear()
+            elif tag == f'{SITEMAP_NS}sitemap':
+                if loc:
+                    children.append(loc)
+                loc = lastmod = None
+                elem.clear()
+
+    if children:
+        if depth >= MAX_INDEX_DEPTH:
+            print(f"⚠️  Sitemap index nesting deeper than {MAX_INDEX_DEPTH} - skipping {len(children)} children")
+            return
+        for child_url in children:
+            yield from iter_sitemap_entries(child_url, session, depth + 1, stats)
+
+def diff_sitemap(entries, existing_lastmods):
+    """Compare fresh (url, lastmod) entries with the frontier's url -> lastmod map
+
+    Returns (added, removed, changed, filled). A URL counts as changed only
+    when both sides have a lastmod and they differ; a URL stored without a
+    lastmod that now has one is listed in filled so the value is recorded
+    without requeueing it.
+    """
+    added = []
+    changed = []
+    filled = []
+    seen = set()
+    for url, lastmod in entries:
+        if url in seen:
+            continue
+        seen.add(url)
+        if url not in existing_lastmods:
+            added.append((url, lastmod))
+        elif lastmod and not existing_lastmods[url]:
+            filled.append((url, lastmod))
+        elif lastmod and lastmod != existing_lastmods[url]:
+            changed.append((url, lastmod))
+    removed = [url for url in existing_lastmods if url not in seen]
+    return added, removed, changed, filled
+
+def write_snapshot(entries, downloaded_at, source_url, sitemap_file=SITEMAP_FILE):
+    """Keep tileshop_sitemap.json as the downloaded snapshot for other tools"""
+    sitemap_data = {
+        'downloaded_at': downloaded_at,
+        'total_urls': len(entries),
+        'status': 'ready',
+        'source_url': source_url,
+        'urls': [{'url': url, 'lastmod': lastmod, 'scraped_at': None, 'scrape_status': 'pending'}
+                 for url, lastmod in entries]
+    }
+    tmp_path = f"{sitemap_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(sitemap_data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, sitemap_file)
+
+def ingest_sitemap(sitemap_url=SITEMAP_URL, frontier=None, dry_run=False, progress_callback=None,
+                   sitemap_file=SITEMAP_FILE):
+    """Stream the sitemap, diff it against the frontier and queue only the delta
+
+    progress_callback(stage, progress, message, details=None) matches the
+    dashboard's sitemap progress events. Returns a stats dict.
+    """
+    def report(stage, progress, message, details=None):
+        print(f"  {message}")
+        if progress_callback:
+            progress_callback(stage, progress, message, details)
+
+    frontier = frontier or get_frontier()
+    start_time = time.time()
+    stats = {}
+
+    report('downloading', 0, f'Streaming sitemap from {sitemap_url}')
+    entries = []
+    total_seen = 0
+    for url, lastmod in iter_sitemap_entries(sitemap_url, stats=stats):
+        total_seen += 1
+        if is_product_url(url):
+            entries.append((url, lastmod))
+        if total_seen % 1000 == 0:
+            report('extracting', 50, f'Parsed {total_seen:,} URLs ({len(entries):,} products)')
+    report('extracting', 100, f'Parsed {total_seen:,} URLs from {stats.get("sitemaps", 0)} sitemap(s), '
+                              f'{len(entries):,} product URLs')
+
+    added, removed, changed, filled = diff_sitemap(entries, frontier.get_lastmods())
+    result = {
+        'source_url': sitemap_url,
+        'sitemaps': stats.get('sitemaps', 0),
+        'total_urls': total_seen,
+        'product_urls': len(entries),
+        'added': len(added),
+        'removed': len(removed),
+        'lastmod_changed': len(changed),
+        'lastmod_filled': len(filled),
+        'unchanged': len(entries) - len(added) - len(changed),
+        'dry_run': dry_run
+    }
+
+    if not dry_run:
+        report('saving', 50, f'Applying delta: +{len(added):,} added, -{len(removed):,} removed, '
+                             f'~{len(changed):,} lastmod changed')
+        downloaded_at = datetime.now().isoformat()
+        variation_index = get_color_variation_index(frontier)
+        frontier.apply_sitemap_diff(added, removed, changed, downloaded_at=downloaded_at, source_url=sitemap_url,
+                                    filled=filled)
+        # lastmod changes keep their slug - only added/removed URLs touch the variation index
+        variation_index.apply_diff([url for url, _ in added], removed)
+        if sitemap_file:
+            write_snapshot(entries, downloaded_at, sitemap_url, sitemap_file)
+
+    result['elapsed'] = round(time.time() - start_time, 2)
+    report('completed', 100, f'Sitemap refresh complete in {result["elapsed"]}s: {len(added):,} new, '
+                             f'{len(changed):,} changed, {len(removed):,} removed', result)
+    return result
+
+if __name__ == "__main__":
+    dry_run = '--dry-run' in sys.argv
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    ingest_sitemap(args[0] if args else SITEMAP_URL, dry_run=dry_run)
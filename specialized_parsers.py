@@ -9,6 +9,8 @@ import re
 from typing import Dict, Any, List, Optional, Tuple
 from abc import ABC, abstractmethod
 from page_structure_detector import PageType, PageStructure
+from parsed_page import ParsedPage
+from regex_registry import pattern_chain
 
 class BaseProductParser(ABC):
     """Base class for all specialized product parsers"""
@@ -16,6 +18,11 @@ class BaseProductParser(ABC):
     def __init__(self, page_type: PageType):
         self.page_type = page_type
         self.extraction_patterns = self._build_extraction_patterns()
+        # Ordered fallback regex lists, compiled once into registry chains
+        self.pattern_chains = {
+            key: pattern_chain(f"{self.__class__.__name__}.{key}", patterns)
+            for key, patterns in self.extraction_patterns.items() if key.endswith('_patterns')
+        }
     
     @abstractmethod
     def _build_extraction_patterns(self) -> Dict[str, Any]:
@@ -23,12 +30,27 @@ class BaseProductParser(ABC):
         pass
     
     @abstractmethod
-    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None) -> Dict[str, Any]:
-        """Parse product data using specialized logic for this page type"""
+    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None,
+                           page: Optional[ParsedPage] = None) -> Dict[str, Any]:
+        """Parse product data using specialized logic for this page type
+        
+        page: shared ParsedPage for html_content (JSON-LD and lowercased text are reused)
+        """
         pass
     
-    def _extract_json_ld_data(self, html_content: str) -> Dict[str, Any]:
+    def _first_match(self, key: str, content: str, accept=None):
+        """First match from the highest-priority pattern in extraction_patterns[key]"""
+        return self.pattern_chains[key].first(content, accept)
+    
+    def _lower(self, html_content: str, page: Optional[ParsedPage] = None) -> str:
+        """Lowercased document, computed once per page when a ParsedPage is shared"""
+        return page.lower if page is not None else html_content.lower()
+    
+    def _extract_json_ld_data(self, html_content: str, page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Extract and parse JSON-LD structured data"""
+        if page is not None:
+            return page.product_json_ld
+        
         json_ld_matches = re.findall(
             r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', 
             html_content, 
@@ -89,18 +111,19 @@ class TilePageParser(BaseProductParser):
             ]
         }
     
-    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None) -> Dict[str, Any]:
+    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None,
+                           page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Parse tile-specific product data with high precision - JSON-LD priority"""
         
         # Extract JSON-LD if not provided
         if not json_ld_data:
-            json_ld_data = self._extract_json_ld_data(html_content)
+            json_ld_data = self._extract_json_ld_data(html_content, page)
         
         # Initialize product data with JSON-LD as primary source
         product_data = self._extract_from_json_ld_primary(json_ld_data, url)
         
         # Enhance with tile-specific extraction from HTML
-        html_data = self._extract_tile_specific_data(html_content, url)
+        html_data = self._extract_tile_specific_data(html_content, url, page)
         
         # Merge data, prioritizing JSON-LD for essential fields
         for key, value in html_data.items():
@@ -166,7 +189,8 @@ class TilePageParser(BaseProductParser):
         
         return product_data
     
-    def _extract_tile_specific_data(self, html_content: str, url: str) -> Dict[str, Any]:
+    def _extract_tile_specific_data(self, html_content: str, url: str,
+                                    page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Extract tile-specific data from HTML content"""
         tile_data = {
             'size_shape': None,
@@ -176,21 +200,17 @@ class TilePageParser(BaseProductParser):
             'color': None
         }
         
-        content_lower = html_content.lower()
+        content_lower = self._lower(html_content, page)
         
         # Extract size/shape
-        for pattern in self.extraction_patterns["size_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                tile_data['size_shape'] = f"{match.group(1)} x {match.group(2)} in."
-                break
+        match = self._first_match("size_patterns", content_lower)
+        if match:
+            tile_data['size_shape'] = f"{match.group(1)} x {match.group(2)} in."
         
         # Extract coverage
-        for pattern in self.extraction_patterns["coverage_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                tile_data['coverage'] = f"{match.group(1)} sq ft"
-                break
+        match = self._first_match("coverage_patterns", content_lower)
+        if match:
+            tile_data['coverage'] = f"{match.group(1)} sq ft"
         
         # Extract material
         for material in self.extraction_patterns["material_keywords"]:
@@ -281,7 +301,14 @@ class GroutPageParser(BaseProductParser):
                 r'(\d+)\s*lbs\.?(?:\s|$)',
                 r'(\d+)\s*pounds?'
             ],
-            "grout_types": ["sanded", "unsanded", "epoxy", "urethane", "acrylic"],
+            # Whole words, so "unsanded" is not read as "sanded"
+            "grout_type_patterns": [
+                r'\b(sanded)\b',
+                r'\b(unsanded)\b',
+                r'\b(epoxy)\b',
+                r'\b(urethane)\b',
+                r'\b(acrylic)\b'
+            ],
             "color_patterns": [
                 r'color[:\s]*([a-zA-Z\s]+)',
                 r'colour[:\s]*([a-zA-Z\s]+)'
@@ -289,12 +316,13 @@ class GroutPageParser(BaseProductParser):
             "brand_keywords": ["mapei", "custom", "superior", "laticrete", "bostik"]
         }
     
-    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None) -> Dict[str, Any]:
+    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None,
+                           page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Parse grout-specific product data with high precision"""
         
         # Extract JSON-LD if not provided
         if not json_ld_data:
-            json_ld_data = self._extract_json_ld_data(html_content)
+            json_ld_data = self._extract_json_ld_data(html_content, page)
         
         # Initialize product data
         product_data = {
@@ -336,29 +364,24 @@ class GroutPageParser(BaseProductParser):
                 product_data['primary_image'] = json_ld_data['image']
         
         # Extract grout-specific information
-        content_lower = html_content.lower()
+        content_lower = self._lower(html_content, page)
         
         # Extract weight
-        for pattern in self.extraction_patterns["weight_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                product_data['weight'] = f"{match.group(1)} lbs"
-                break
+        match = self._first_match("weight_patterns", content_lower)
+        if match:
+            product_data['weight'] = f"{match.group(1)} lbs"
         
         # Extract grout type
-        for grout_type in self.extraction_patterns["grout_types"]:
-            if grout_type in content_lower:
-                product_data['grout_type'] = grout_type.title()
-                break
+        match = self._first_match("grout_type_patterns", content_lower)
+        if match:
+            product_data['grout_type'] = match.group(1).title()
         
         # Extract color
-        for pattern in self.extraction_patterns["color_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                color = match.group(1).strip()
-                if len(color) > 2 and len(color) < 20:  # Reasonable color name length
-                    product_data['color'] = color.title()
-                    break
+        # Reasonable color name length, otherwise fall through to the next pattern
+        match = self._first_match("color_patterns", content_lower,
+                                  accept=lambda m: 2 < len(m.group(1).strip()) < 20)
+        if match:
+            product_data['color'] = match.group(1).strip().title()
         
         # Build specifications
         specs = {}
@@ -398,12 +421,13 @@ class TrimMoldingPageParser(BaseProductParser):
             ]
         }
     
-    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None) -> Dict[str, Any]:
+    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None,
+                           page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Parse trim/molding-specific product data with high precision"""
         
         # Extract JSON-LD if not provided
         if not json_ld_data:
-            json_ld_data = self._extract_json_ld_data(html_content)
+            json_ld_data = self._extract_json_ld_data(html_content, page)
         
         # Initialize product data
         product_data = {
@@ -449,14 +473,12 @@ class TrimMoldingPageParser(BaseProductParser):
                 product_data['primary_image'] = json_ld_data['image']
         
         # Extract trim-specific information
-        content_lower = html_content.lower()
+        content_lower = self._lower(html_content, page)
         
         # Extract dimensions
-        for pattern in self.extraction_patterns["dimension_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                product_data['dimensions'] = f"{match.group(1)} x {match.group(2)} in."
-                break
+        match = self._first_match("dimension_patterns", content_lower)
+        if match:
+            product_data['dimensions'] = f"{match.group(1)} x {match.group(2)} in."
         
         # Extract trim type
         for trim_type in self.extraction_patterns["trim_types"]:
@@ -465,23 +487,19 @@ class TrimMoldingPageParser(BaseProductParser):
                 break
         
         # Extract pieces per box
-        for pattern in self.extraction_patterns["piece_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                product_data['pieces_per_box'] = int(match.group(1))
-                # Calculate price per piece if we have both values
-                if product_data['price_per_box'] and product_data['pieces_per_box']:
-                    product_data['price_per_piece'] = round(
-                        product_data['price_per_box'] / product_data['pieces_per_box'], 2
-                    )
-                break
+        match = self._first_match("piece_patterns", content_lower)
+        if match:
+            product_data['pieces_per_box'] = int(match.group(1))
+            # Calculate price per piece if we have both values
+            if product_data['price_per_box'] and product_data['pieces_per_box']:
+                product_data['price_per_piece'] = round(
+                    product_data['price_per_box'] / product_data['pieces_per_box'], 2
+                )
         
         # Extract linear feet information
-        for pattern in self.extraction_patterns["linear_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                product_data['linear_feet'] = f"{match.group(1)} ft per piece"
-                break
+        match = self._first_match("linear_patterns", content_lower)
+        if match:
+            product_data['linear_feet'] = f"{match.group(1)} ft per piece"
         
         # Build specifications
         specs = {}
@@ -523,12 +541,13 @@ class LuxuryVinylPageParser(BaseProductParser):
             ]
         }
     
-    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None) -> Dict[str, Any]:
+    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None,
+                           page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Parse luxury vinyl-specific product data with high precision"""
         
         # Extract JSON-LD if not provided
         if not json_ld_data:
-            json_ld_data = self._extract_json_ld_data(html_content)
+            json_ld_data = self._extract_json_ld_data(html_content, page)
         
         # Initialize product data
         product_data = {
@@ -573,21 +592,17 @@ class LuxuryVinylPageParser(BaseProductParser):
                 product_data['primary_image'] = json_ld_data['image']
         
         # Extract luxury vinyl-specific information
-        content_lower = html_content.lower()
+        content_lower = self._lower(html_content, page)
         
         # Extract wear layer
-        for pattern in self.extraction_patterns["wear_layer_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                product_data['wear_layer'] = f"{match.group(1)} MIL"
-                break
+        match = self._first_match("wear_layer_patterns", content_lower)
+        if match:
+            product_data['wear_layer'] = f"{match.group(1)} MIL"
         
         # Extract thickness
-        for pattern in self.extraction_patterns["thickness_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                product_data['thickness'] = f"{match.group(1)}mm"
-                break
+        match = self._first_match("thickness_patterns", content_lower)
+        if match:
+            product_data['thickness'] = f"{match.group(1)}mm"
         
         # Extract installation method
         for method in self.extraction_patterns["installation_keywords"]:
@@ -596,19 +611,17 @@ class LuxuryVinylPageParser(BaseProductParser):
                 break
         
         # Extract coverage and calculate price per sqft
-        for pattern in self.extraction_patterns["coverage_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                product_data['coverage'] = f"{match.group(1)} sq. ft. per Box"
-                if product_data['price_per_box'] and match.group(1):
-                    try:
-                        coverage_value = float(match.group(1))
-                        product_data['price_per_sqft'] = round(
-                            product_data['price_per_box'] / coverage_value, 2
-                        )
-                    except (ValueError, ZeroDivisionError):
-                        pass
-                break
+        match = self._first_match("coverage_patterns", content_lower)
+        if match:
+            product_data['coverage'] = f"{match.group(1)} sq. ft. per Box"
+            if product_data['price_per_box'] and match.group(1):
+                try:
+                    coverage_value = float(match.group(1))
+                    product_data['price_per_sqft'] = round(
+                        product_data['price_per_box'] / coverage_value, 2
+                    )
+                except (ValueError, ZeroDivisionError):
+                    pass
         
         # Build specifications
         specs = {}
@@ -647,18 +660,19 @@ class InstallationToolPageParser(BaseProductParser):
             "brand_keywords": ["best of everything", "raimondi", "marshalltown", "qep", "perfect level master"]
         }
     
-    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None) -> Dict[str, Any]:
+    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None,
+                           page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Parse installation tool product data with JSON-LD priority"""
         
         # Extract JSON-LD if not provided
         if not json_ld_data:
-            json_ld_data = self._extract_json_ld_data(html_content)
+            json_ld_data = self._extract_json_ld_data(html_content, page)
         
         # Initialize product data with JSON-LD as primary source
         product_data = self._extract_from_json_ld_primary(json_ld_data, url)
         
         # Enhance with tool-specific extraction from HTML
-        html_data = self._extract_tool_specific_data(html_content, url)
+        html_data = self._extract_tool_specific_data(html_content, url, page)
         
         # Merge data, prioritizing JSON-LD for essential fields
         for key, value in html_data.items():
@@ -714,7 +728,8 @@ class InstallationToolPageParser(BaseProductParser):
         
         return product_data
     
-    def _extract_tool_specific_data(self, html_content: str, url: str) -> Dict[str, Any]:
+    def _extract_tool_specific_data(self, html_content: str, url: str,
+                                    page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Extract installation tool-specific data from HTML content"""
         tool_data = {
             'quantity': None,
@@ -722,21 +737,17 @@ class InstallationToolPageParser(BaseProductParser):
             'tool_type': None
         }
         
-        content_lower = html_content.lower()
+        content_lower = self._lower(html_content, page)
         
         # Extract quantity (pieces per bag/box)
-        for pattern in self.extraction_patterns["quantity_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                tool_data['quantity'] = f"{match.group(1)} pieces"
-                break
+        match = self._first_match("quantity_patterns", content_lower)
+        if match:
+            tool_data['quantity'] = f"{match.group(1)} pieces"
         
         # Extract weight
-        for pattern in self.extraction_patterns["weight_patterns"]:
-            match = re.search(pattern, content_lower)
-            if match:
-                tool_data['weight'] = f"{match.group(1)} lbs"
-                break
+        match = self._first_match("weight_patterns", content_lower)
+        if match:
+            tool_data['weight'] = f"{match.group(1)} lbs"
         
         # Identify tool type
         for tool_type in self.extraction_patterns["tool_keywords"]:
@@ -761,12 +772,13 @@ class DefaultPageParser(BaseProductParser):
             ]
         }
     
-    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None) -> Dict[str, Any]:
+    def parse_product_data(self, html_content: str, url: str, json_ld_data: Dict = None,
+                           page: Optional[ParsedPage] = None) -> Dict[str, Any]:
         """Generic parsing for unknown page types"""
         
         # Extract JSON-LD if not provided
         if not json_ld_data:
-            json_ld_data = self._extract_json_ld_data(html_content)
+            json_ld_data = self._extract_json_ld_data(html_content, page)
         
         # Initialize basic product data
         product_data = {
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Per-stage wall and CPU time for the extraction path
+Stages (page detection, the specialized parsers, JSON-LD parsing,
+categorization, LLM calls, the docker cp database write...) are timed by the
+profile_stage decorator or the stage() context manager into rolling
+histograms. Profiling is off unless TILESHOP_PROFILE=1 (or enable() is
+called); disabled, a decorated call costs one attribute check and stage()
+returns a shared no-op context.
+
+Acquisition processes publish histogram deltas as stage_profile progress
+events; ScraperManager folds them into its own StageProfiler for the
+dashboard. Stage times are inclusive - extract includes detect, parser.*
+and the rest.
+"""
+
+import atexit
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+
+from progress_events import emit, STAGE_PROFILE
+
+# Configuration
+PROFILE_ENV = 'TILESHOP_PROFILE'
+WINDOW_SECONDS = 300      # Rolling window shown on the dashboard
+WINDOW_SLICES = 10        # Old samples expire one slice (30s) at a time
+PUBLISH_INTERVAL = 2.0    # Seconds between stage_profile events
+BUCKET_BOUNDS = tuple(0.0001 * 2 ** i for i in range(20))  # 0.1 ms to 52 s, then one open bucket
+
+def _bucket(seconds):
+    return bisect_left(BUCKET_BOUNDS, seconds)
+
+def _percentile(counts, total, fraction):
+    """Upper bound of the bucket holding the given fraction of samples, in seconds"""
+    target = fraction * total
+    seen = 0
+    for index, count in enumerate(counts):
+        seen += count
+        if seen >= target and count:
+            return BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else BUCKET_BOUNDS[-1] * 2
+    return 0.0
+
+class StageSamples:
+    """Wall and CPU bucket counts with totals - one histogram slice or one delta"""
+
+    __slots__ = ('started', 'wall', 'cpu', 'count', 'wall_sum', 'cpu_sum', 'wall_max')
+
+    def __init__(self, started=0.0):
+        self.started = started
+        self.wall = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.cpu = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.wall_sum = 0.0
+        self.cpu_sum = 0.0
+        self.wall_max = 0.0
+
+    def add(self, wall, cpu):
+        self.wall[_bucket(wall)] += 1
+        self.cpu[_bucket(cpu)] += 1
+        self.count += 1
+        self.wall_sum += wall
+        self.cpu_sum += cpu
+        self.wall_max = max(self.wall_max, wall)
+
+    def merge(self, other):
+        """Add counts from another StageSamples or its to_dict() form"""
+        if isinstance(other, dict):
+            other = StageSamples.from_dict(other)
+        self.wall = [a + b for a, b in zip(self.wall, other.wall)]
+        self.cpu = [a + b for a, b in zip(self.cpu, other.cpu)]
+        self.count += other.count
+        self.wall_sum += other.wall_sum
+        self.cpu_sum += other.cpu_sum
+        self.wall_max = max(self.wall_max, other.wall_max)
+
+    def to_dict(self):
+        return {'wall': self.wall, 'cpu': self.cpu, 'count': self.count, 'wall_sum': self.wall_sum,
+                'cpu_sum': self.cpu_sum, 'wall_max': self.wall_max}
+
+    @classmethod
+    def from_dict(cls, data):
+        samples = cls()
+        size = len(samples.wall)
+        samples.wall = (list(data.get('wall') or []) + [0] * size)[:size]
+        samples.cpu = (list(data.get('cpu') or []) + [0] * size)[:size]
+        samples.count = int(data.get('count', 0))
+        samples.wall_sum = float(data.get('wall_sum', 0.0))
+        samples.cpu_sum = float(data.get('cpu_sum', 0.0))
+        samples.wall_max = float(data.get('wall_max', 0.0))
+        return samples
+
+class RollingHistogram:
+    """Stage timings over the last window_seconds, kept as time slices that expire whole"""
+
+    def __init__(self, window_seconds=WINDOW_SECONDS, slices=WINDOW_SLICES):
+        self.window_seconds = window_seconds
+        self.slice_seconds = window_seconds / slices
+        self.slices = []
+        self.total_count = 0  # Since the start, not just the window
+
+    def _current(self, now):
+        if not self.slices or now - self.slices[-1].started >= self.slice_seconds:
+            self.slices.append(StageSamples(now - (now % self.slice_seconds)))
+            self._expire(now)
+        return self.slices[-1]
+
+    def _expire(self, now):
+        while self.slices and self.slices[0].started <= now - self.window_seconds:
+            self.slices.pop(0)
+
+    def add(self, wall, cpu, now=None):
+        self._current(time.time() if now is None else now).add(wall, cpu)
+        self.total_count += 1
+
+    def merge(self, samples, now=None):
+        samples = samples if isinstance(samples, StageSamples) else StageSamples.from_dict(samples)
+        self._current(time.time() if now is None else now).merge(samples)
+        self.total_count += samples.count
+
+    def window(self, now=None):
+        """All samples still inside the window, merged"""
+        self._expire(time.time() if now is None else now)
+        merged = StageSamples()
+        for samples in self.slices:
+            merged.merge(samples)
+        return merged
+
+    def snapshot(self, now=None):
+        samples = self.window(now)
+        count = samples.count
+        ms = lambda seconds: round(seconds * 1000, 2)
+        return {
+            'count': count,
+            'total_count': self.total_count,
+            'wall_total_s': round(samples.wall_sum, 3),
+            'cpu_total_s': round(samples.cpu_sum, 3),
+            'wall_mean_ms': ms(samples.wall_sum / count) if count else 0.0,
+            'cpu_mean_ms': ms(samples.cpu_sum / count) if count else 0.0,
+            # Bucket upper bounds, capped at the slowest call seen
+            'wall_p50_ms': ms(min(_percentile(samples.wall, count, 0.5), samples.wall_max)),
+            'wall_p95_ms': ms(min(_percentile(samples.wall, count, 0.95), samples.wall_max)),
+            'wall_p99_ms': ms(min(_percentile(samples.wall, count, 0.99), samples.wall_max)),
+            'cpu_p95_ms': ms(min(_percentile(samples.cpu, count, 0.95), samples.wall_max)),
+            'wall_max_ms': ms(samples.wall_max),
+            # Share of wall time spent on CPU - low means waiting on I/O, the LLM or docker
+            'cpu_ratio': round(samples.cpu_sum / samples.wall_sum, 3) if samples.wall_sum else 0.0
+        }
+
+class StageProfiler:
+    """Rolling histograms per stage, plus the unpublished delta since take_delta()"""
+
+    def __init__(self, enabled=False, window_seconds=WINDOW_SECONDS):
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self.stages = {}
+        self._pending = {}
+
+    def _histogram(self, name):
+        if name not in self.stages:
+            self.stages[name] = RollingHistogram(self.window_seconds)
+        return self.stages[name]
+
+    def record(self, name, wall, cpu, now=None):
+        with self._lock:
+            self._histogram(name).add(wall, cpu, now)
+            self._pending.setdefault(name, StageSamples()).add(wall, cpu)
+
+    def merge(self, delta, now=None, forward=True):
+        """Fold a take_delta() result from another process in; forward passes it on with our next delta"""
+        with self._lock:
+            for name, samples in (delta or {}).items():
+                samples = StageSamples.from_dict(samples)
+                self._histogram(name).merge(samples, now)
+                if forward:
+                    self._pending.setdefault(name, StageSamples()).merge(samples)
+
+    def take_delta(self):
+        """{stage: samples dict} recorded since the last call (JSON-serializable)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return {name: samples.to_dict() for name, samples in pending.items()}
+
+    def snapshot(self, now=None):
+        """Per-stage figures over the rolling window, slowest total first"""
+        with self._lock:
+            stages = {name: histogram.snapshot(now) for name, histogram in self.stages.items()}
+        ordered = sorted(stages.items(), key=lambda item: item[1]['wall_total_s'], reverse=True)
+        return {'enabled': self.enabled, 'window_seconds': self.window_seconds, 'stages': dict(ordered)}
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self._pending = {}
+
+_profiler = StageProfiler(enabled=os.environ.get(PROFILE_ENV) == '1')
+
+def get_profiler():
+    return _profiler
+
+def enable():
+    _profiler.enabled = True
+
+def disable():
+    _profiler.enabled = False
+
+def is_enabled():
+    return _profiler.enabled
+
+class _StageTimer:
+    __slots__ = ('name', 'wall', 'cpu')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        _profiler.record(self.name, time.perf_counter() - self.wall, time.thread_time() - self.cpu)
+        return False
+
+_NO_STAGE = nullcontext()
+
+def stage(name):
+    """Context manager timing a block as stage name (a shared no-op while disabled)"""
+    return _StageTimer(name) if _profiler.enabled else _NO_STAGE
+
+def profile_stage(name):
+    """Decorator timing every call as stage name while profiling is enabled"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _profiler.record(name, time.perf_counter() - wall, time.thread_time() - cpu)
+        return wrapper
+    return decorate
+
+def publish(force=False, _last=[0.0]):
+    """Send the pending delta as a stage_profile event, at most every PUBLISH_INTERVAL seconds"""
+    if not _profiler.enabled:
+        return False
+    now = time.monotonic()
+    if not force and now - _last[0] < PUBLISH_INTERVAL:
+        return False
+    _last[0] = now
+    delta = _profiler.take_delta()
+    return bool(delta) and emit(STAGE_PROFILE, stages=delta)
+
+_publisher = None
+
+def start_publishing(interval=PUBLISH_INTERVAL):
+    """Publish deltas from a background thread every interval seconds, and once more at exit
+
+    Does nothing unless profiling is enabled. Returns whether a publisher runs.
+    """
+    global _publisher
+    if not _profiler.enabled:
+        return False
+    if _publisher is None:
+        def loop():
+            while True:
+                time.sleep(interval)
+                publish(force=True)
+        _publisher = threading.Thread(target=loop, name='stage-profile-publisher', daemon=True)
+        _publisher.start()
+        atexit.register(publish, force=True)
+    return True
+
+def print_stage_profile(snapshot=None):
+    """Print the per-stage table for a snapshot (default: this process)"""
+    snapshot = snapshot or _profiler.snapshot()
+    if not snapshot['stages']:
+        print("⏱️  No stage timings recorded")
+        return
+    print(f"⏱️  Stage profile (last {snapshot['window_seconds'] // 60} min, inclusive times)")
+    print(f"   {'stage':<26} {'calls':>7} {'total s':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'cpu':>6}")
+    for name, stats in snapshot['stages'].items():
+        print(f"   {name:<26} {stats['count']:>7} {stats['wall_total_s']:>9.2f} {stats['wall_mean_ms']:>9.2f} "
+              f"{stats['wall_p95_ms']:>9.2f} {stats['wall_max_ms']:>9.2f} {stats['cpu_ratio']:>6.0%}")
+
+if __name__ == "__main__":
+    # Profile the extraction stack over the recorded benchmark pages
+    import io
+    from contextlib import redirect_stdout
+    from replay_server import load_pages
+    import stage_profiler  # The instance the instrumented modules use, not __main__
+
+    stage_profiler.enable()
+    with redirect_stdout(io.StringIO()):
+        import tileshop_learner
+        for stem, body in load_pages().items():
+            tileshop_learner.extract_product_data({'main': {'html': body.decode('utf-8')}},
+                                                  f"https://www.tileshop.com/products/{stem}")
+    stage_profiler.print_stage_profile()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the sitemap-derived color variation index
+"""
+
+import os
+import tempfile
+
+from color_variation_index import ColorVariationIndex, parse_product_slug
+from url_frontier import URLFrontier
+
+BASE = "https://www.tileshop.com/products/"
+CLOUDY = BASE + 'penny-round-cloudy-porcelain-mosaic-wall-and-floor-tile-615826'
+MILK = BASE + 'penny-round-milk-porcelain-mosaic-wall-and-floor-tile-669029'
+SKY_BLUE = BASE + 'penny-round-sky-blue-porcelain-mosaic-wall-and-floor-tile-670001'
+WHITE = BASE + 'laura-park-bespoke-white-ceramic-wall-tile-256-x-10-in-485000'
+AEGEAN = BASE + 'laura-park-bespoke-aegean-blue-ceramic-wall-tile-256-x-10-in-484999'
+WHITE_5IN = BASE + 'laura-park-bespoke-white-ceramic-wall-tile-256-x-5-in-484997'
+NO_COLOR = BASE + 'marmi-imperiali-zenobia-porcelain-wall-and-floor-tile-12-in-684287'
+
+def _frontier(urls):
+    frontier = URLFrontier(os.path.join(tempfile.mkdtemp(), 'frontier.db'), auto_migrate=False)
+    frontier.replace_sitemap([{'url': url} for url in urls], downloaded_at='2025-07-01T00:00:00')
+    return frontier
+
+def test_siblings_from_slugs():
+    """Color words and SKU are stripped; a leading modifier word joins the plain family"""
+    assert parse_product_slug(SKY_BLUE)[:3] == ('penny-round-*-porcelain-mosaic-wall-and-floor-tile',
+                                                'penny-*-porcelain-mosaic-wall-and-floor-tile', 'sky-blue')
+    assert parse_product_slug(NO_COLOR) is None
+
+    index = ColorVariationIndex(_frontier([CLOUDY, MILK, SKY_BLUE, WHITE, AEGEAN, WHITE_5IN, NO_COLOR]))
+    assert [(v['color'], v['sku']) for v in index.find_variations(CLOUDY)] == [('Milk', '669029'), ('Sky Blue', '670001')]
+    assert [v['color'] for v in index.find_variations(WHITE)] == ['Aegean Blue']   # Sizes are separate products
+    assert index.family_key(AEGEAN) == index.family_key(WHITE)
+    assert index.find_variations(NO_COLOR) == []
+    print(f"✅ Variation lookup: {index.statistics()}")
+
+def test_incremental_updates_and_rebuild():
+    """Sitemap deltas update the stored index; a wholesale sitemap replacement rebuilds it"""
+    frontier = _frontier([CLOUDY, MILK])
+    index = ColorVariationIndex(frontier)
+    frontier.apply_sitemap_diff([(SKY_BLUE, None)], [MILK], [], downloaded_at='2025-07-08T00:00:00')
+    index.apply_diff([SKY_BLUE], [MILK])
+    assert [v['sku'] for v in index.find_variations(CLOUDY)] == ['670001']
+
+    # A fresh process loads the stored index as-is
+    reloaded = ColorVariationIndex(frontier)
+    assert reloaded.entries == index.entries
+
+    frontier.replace_sitemap([{'url': CLOUDY}, {'url': MILK}], downloaded_at='2025-07-15T00:00:00')
+    rebuilt = ColorVariationIndex(frontier)
+    assert [v['sku'] for v in rebuilt.find_variations(CLOUDY)] == ['669029']
+    print("✅ Incremental update, reload and rebuild")
+
+if __name__ == "__main__":
+    test_siblings_from_slugs()
+    test_incremental_updates_and_rebuild()
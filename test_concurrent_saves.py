@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test that concurrent saves never share a SQL script path inside the
+relational_db container (docker is replaced by an in-memory container)
+"""
+
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import curl_scraper
+import tileshop_learner
+
+class _FakeContainer:
+    """docker cp / psql -f / rm against an in-memory /tmp, slow enough to interleave callers
+
+    Scripts containing `failing` error like a bad statement: psql reports it
+    on stderr but, as the real one does, only exits non-zero with ON_ERROR_STOP=1.
+    """
+
+    def __init__(self, failing=None):
+        self.files = {}
+        self.executed = []
+        self.failing = failing
+        self.lock = threading.Lock()
+
+    def run(self, args, **kwargs):
+        if args[:2] == ['docker', 'cp']:
+            with open(args[2]) as f:
+                sql = f.read()
+            with self.lock:
+                self.files[args[3].split(':', 1)[1]] = sql
+        elif 'psql' in args:
+            time.sleep(0.01)  # Another save's docker cp lands here if paths are shared
+            with self.lock:
+                sql = self.files[args[-1]]
+                self.executed.append(sql)
+            if self.failing and self.failing in sql:
+                stderr = 'ERROR:  invalid input syntax for type numeric'
+                return subprocess.CompletedProcess(args, 3 if 'ON_ERROR_STOP=1' in args else 0, '', stderr)
+        elif args[-3:-1] == ['rm', '-f']:
+            with self.lock:
+                self.files.pop(args[-1], None)
+        return subprocess.CompletedProcess(args, 0, '', '')
+
+def _product(n):
+    product = dict.fromkeys(('price_per_box', 'price_per_sqft', 'price_per_piece', 'coverage', 'finish', 'color',
+                             'size_shape', 'description', 'images', 'collection_links', 'resources', 'brand',
+                             'primary_image', 'image_variants'))
+    product.update({'url': f'https://www.tileshop.com/products/tile-{n}-{n}', 'sku': str(n), 'title': f'Tile {n}',
+                    'specifications': {}})
+    return product
+
+def test_concurrent_saves_run_their_own_sql(monkeypatch):
+    """Every concurrent save executes exactly its own product's SQL and cleans up its script"""
+    container = _FakeContainer()
+    monkeypatch.setattr(subprocess, 'run', container.run)
+
+    products = [_product(n) for n in range(24)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda p: tileshop_learner.save_to_database(p, None), products))
+
+    assert all(results)
+    saved_urls = sorted(re.search(r"'(https://www\.tileshop\.com/products/[^']+)'", sql).group(1)
+                        for sql in container.executed)
+    assert saved_urls == sorted(p['url'] for p in products)
+    assert container.files == {}
+    print(f"✅ {len(products)} concurrent saves, each ran its own script")
+
+def test_concurrent_batches_and_single_saves(monkeypatch):
+    """Batch saves and single saves running together do not clobber each other"""
+    container = _FakeContainer()
+    monkeypatch.setattr(subprocess, 'run', container.run)
+
+    batches = [[(_product(b * 10 + n), None) for n in range(3)] for b in range(4)]
+    singles = [_product(100 + n) for n in range(4)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        batch_futures = [pool.submit(tileshop_learner.save_batch_to_database, batch) for batch in batches]
+        single_futures = [pool.submit(tileshop_learner.save_to_database, p, None) for p in singles]
+        assert all(all(f.result()) for f in batch_futures)
+        assert all(f.result() for f in single_futures)
+
+    executed = '\n'.join(container.executed)
+    for product, _ in [pair for batch in batches for pair in batch]:
+        assert executed.count(f"'{product['url']}'") == 1
+    for product in singles:
+        assert executed.count(f"'{product['url']}'") == 1
+    assert container.files == {}
+    print("✅ Batch and single saves isolated")
+
+def test_scrape_and_save_reports_failed_saves(monkeypatch):
+    """A product that is extracted but not saved is not counted as a success"""
+    monkeypatch.setattr(curl_scraper, 'scrape_product_with_curl', lambda url, single_fetch=True: _product(1))
+    monkeypatch.setattr(tileshop_learner, 'save_to_database', lambda product_data, crawl_results: False)
+    assert curl_scraper._scrape_and_save(_product(1)['url']) is False
+
+    monkeypatch.setattr(tileshop_learner, 'save_to_database', lambda product_data, crawl_results: True)
+    assert curl_scraper._scrape_and_save(_product(1)['url']) is True
+    print("✅ Save result propagated to the scraper")
+
+def test_failing_statement_is_reported(monkeypatch):
+    """A statement error fails the save, and the batch fallback isolates the bad row"""
+    bad = _product(7)
+    container = _FakeContainer(failing=bad['url'])
+    monkeypatch.setattr(subprocess, 'run', container.run)
+
+    ok, error = tileshop_learner._run_sql_in_container(f"SELECT '{bad['url']}';")
+    assert ok is False and 'invalid input syntax' in error
+    assert tileshop_learner.save_to_database(bad, None) is False
+
+    batch = [(_product(n), None) for n in (6, 7, 8)]
+    assert tileshop_learner.save_batch_to_database(batch) == [True, False, True]
+    assert container.files == {}
+    print("✅ Failing statements reported as failed saves")
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, '-v'])
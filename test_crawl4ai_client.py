@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the batched Crawl4AI client against a local fake Crawl4AI server
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawl4ai_client import Crawl4AIClient
+
+BASE = "https://www.tileshop.com/products/"
+
+class _FakeCrawl4AI(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    submissions = []
+    tasks = {}
+    lock = threading.Lock()
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        urls = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['urls']
+        with self.lock:
+            self.submissions.append(urls)
+            task_id = f"task-{len(self.submissions)}"
+            self.tasks[task_id] = {'urls': urls, 'polls': 0}
+        if any('reject' in url for url in urls):
+            return self._reply(503, {'detail': 'busy'})
+        if any('sync' in url for url in urls):
+            return self._reply(200, {'success': True, 'results': [{'url': u, 'html': f'<h1>{u}</h1>'} for u in urls]})
+        self._reply(200, {'task_id': task_id})
+
+    def do_GET(self):
+        task = self.tasks[self.path.rsplit('/', 1)[-1]]
+        task['polls'] += 1
+        if any('broken' in url for url in task['urls']):
+            return self._reply(200, {'status': 'failed', 'error': 'Page crashed'})
+        if task['polls'] < 2:
+            return self._reply(200, {'status': 'processing'})
+        # Results come back in a different order than submitted
+        results = [{'url': u, 'html': f'<h1>{u}</h1>', 'status_code': 200} for u in reversed(task['urls'])]
+        self._reply(200, {'status': 'completed', 'results': results})
+
+    def log_message(self, *args):
+        pass
+
+def _serve():
+    _FakeCrawl4AI.submissions = []
+    _FakeCrawl4AI.tasks = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeCrawl4AI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = Crawl4AIClient(base_url=f"http://127.0.0.1:{server.server_address[1]}", batch_size=2,
+                            max_in_flight=3, poll_initial=0.1, poll_max=0.4, task_timeout=5)
+    return server, client
+
+def test_batches_are_polled_concurrently():
+    """Several URLs per /crawl request; outstanding tasks are polled together"""
+    server, client = _serve()
+    urls = [BASE + f'tile-{n}' for n in range(6)]
+    start = time.time()
+    pages = {url: (result, error) for url, result, error in client.crawl_many(urls)}
+    elapsed = time.time() - start
+    server.shutdown()
+
+    assert _FakeCrawl4AI.submissions == [urls[0:2], urls[2:4], urls[4:6]]
+    assert set(pages) == set(urls)
+    assert all(error is None and result['html'] == f'<h1>{url}</h1>' for url, (result, error) in pages.items())
+    # Serially: 3 tasks x (0.1s + 0.2s) of backoff; concurrently it is paid once
+    assert elapsed < 0.7
+    print(f"✅ 6 URLs in 3 requests, polled concurrently in {elapsed:.2f}s")
+
+def test_sync_results_and_failures_are_reported_per_url():
+    """Synchronous responses, failed tasks and rejected submissions all yield per-URL outcomes"""
+    server, client = _serve()
+    urls = [BASE + 'sync-1', BASE + 'broken-2', BASE + 'reject-3']
+    pages = {url: (result, error) for url, result, error in client.crawl_many(urls, batch_size=1)}
+    server.shutdown()
+
+    assert pages[BASE + 'sync-1'][0]['html'] == f'<h1>{BASE}sync-1</h1>'
+    assert pages[BASE + 'broken-2'] == (None, 'Page crashed')
+    assert pages[BASE + 'reject-3'] == (None, 'HTTP 503')
+    print("✅ Sync, failed and rejected crawls reported")
+
+if __name__ == "__main__":
+    test_batches_are_polled_concurrently()
+    test_sync_results_and_failures_are_reported_per_url()
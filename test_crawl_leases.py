@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test leased URL batches: disjoint claims across workers, heartbeat, release,
+reclaiming a crashed worker's leases, shared retry state and coordinator
+seeding/resets (needs the local Postgres)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+import pytest
+
+from crawl_leases import DB_CONFIG, LeaseManager, reclaim_expired_leases, get_worker_statistics
+from retry_policy import DB_FAILURE, DEAD_LETTER, RETRY_POLICIES, WORKER_LOST
+
+TEST_SCHEMA = 'crawl_leases_test'
+TEST_CONFIG = dict(DB_CONFIG, options=f'-c search_path={TEST_SCHEMA}')
+URLS = [f"https://www.tileshop.com/products/tile-{n}-{n}" for n in range(25)]
+
+def _fresh_schema():
+    """Isolated schema so the real crawl queue is untouched"""
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not available: {e}")
+    with conn, conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {TEST_SCHEMA}")
+    conn.close()
+
+def _worker(worker_id, lease_seconds=300):
+    leases = LeaseManager(worker_id=worker_id, run_id='test-run', lease_seconds=lease_seconds,
+                          batch_size=10, db_config=TEST_CONFIG)
+    leases.register()
+    return leases
+
+def test_workers_claim_disjoint_batches():
+    """Two workers never lease the same URL; completed URLs are not handed out again"""
+    _fresh_schema()
+    w1, w2 = _worker('w1'), _worker('w2')
+    assert w1.seed(URLS) == 25
+    assert w2.seed(URLS) == 0  # Seeding from every worker is idempotent
+
+    claimed = {}
+    while True:
+        b1, b2 = w1.claim_batch(), w2.claim_batch()
+        if not b1 and not b2:
+            break
+        for leases, batch in ((w1, b1), (w2, b2)):
+            for url in batch:
+                assert url not in claimed
+                claimed[url] = leases.worker_id
+                assert leases.complete(url, success=True)
+
+    assert sorted(claimed) == sorted(URLS)
+    totals = get_worker_statistics(w1.conn, 'test-run')['totals']
+    assert totals['processed'] == 25 and totals['workers'] == 2
+    w1.close()
+    w2.close()
+    print("✅ 25 URLs leased once each across 2 workers")
+
+def test_crashed_worker_leases_are_reclaimed():
+    """Expired leases go back to the queue; the crashed worker can no longer complete them"""
+    _fresh_schema()
+    crashed, survivor = _worker('crashed', lease_seconds=0), _worker('survivor')
+    crashed.seed(URLS[:5])
+    lost = crashed.claim_batch()
+    assert len(lost) == 5
+
+    # No heartbeat from the crashed worker - its zero-second leases have already expired
+    assert sorted(reclaim_expired_leases(survivor.conn)) == sorted(lost)
+    assert sorted(survivor.claim_batch()) == sorted(lost)
+    assert not crashed.complete(lost[0], success=True)
+    crashed.close()
+    survivor.close()
+    print("✅ Crashed worker's leases reclaimed")
+
+def test_poison_url_is_dead_lettered():
+    """A URL whose lease keeps expiring counts a failure each time and is dead-lettered at the limit"""
+    _fresh_schema()
+    hanging = _worker('hanging', lease_seconds=0)
+    hanging.seed(URLS[:1])
+    url = URLS[0]
+
+    limit = RETRY_POLICIES[WORKER_LOST].max_attempts
+    for expiry in range(limit):
+        # Each claim first fails the previous (already expired) lease
+        assert hanging.claim_batch() == [url]
+        assert hanging.get_url(url)['failure_count'] == expiry
+    assert hanging.claim_batch() == []
+
+    record = hanging.get_url(url)
+    assert record['state'] == DEAD_LETTER and record['failure_count'] == limit
+    assert record['error_class'] == WORKER_LOST
+    assert reclaim_expired_leases(hanging.conn) == []
+    hanging.close()
+    print(f"✅ Poison URL dead-lettered after {limit} expired leases")
+
+def test_heartbeat_and_release():
+    """Heartbeat keeps leases alive; release hands unfinished URLs back"""
+    _fresh_schema()
+    w1, w2 = _worker('w1'), _worker('w2')
+    w1.seed(URLS[:10])
+    batch = w1.claim_batch(4)
+    assert w1.heartbeat() == 4
+    assert len(w2.claim_batch()) == 6  # Only the unleased URLs
+
+    w1.complete(batch[0], success=False, error_msg='HTTP 500')
+    assert w1.release('stopped') == 3
+    assert sorted(w2.claim_batch()) == sorted(batch[1:])
+    w1.close()
+    w2.close()
+    print("✅ Heartbeat and release")
+
+def test_retry_state_is_shared_across_workers():
+    """Failure counts and backoff live in the queue, so any worker continues a URL's retry schedule"""
+    _fresh_schema()
+    w1, w2 = _worker('host-a'), _worker('host-b')
+    w1.seed(URLS[:1])
+    url = URLS[0]
+    # Backoff computed from long ago, so each retry is already due
+    long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+
+    workers = [w1, w2]
+    for failure in range(1, RETRY_POLICIES[DB_FAILURE].max_attempts + 1):
+        worker = workers[failure % 2]
+        assert worker.claim_batch() == [url]
+        state = worker.complete(url, success=False, error_msg='Database save failed', error_class=DB_FAILURE,
+                                now=long_ago)
+        record = worker.get_url(url)
+        assert record['failure_count'] == failure and record['error_class'] == DB_FAILURE
+        if failure < RETRY_POLICIES[DB_FAILURE].max_attempts:
+            assert state == 'pending' and record['not_before'] is not None
+    assert state == DEAD_LETTER
+    assert not w1.claim_batch() and not w2.claim_batch()
+
+    # A scheduled retry is not handed out before its backoff has passed
+    w1.seed(URLS[1:2])
+    assert w1.claim_batch() == [URLS[1]]
+    assert w1.complete(URLS[1], success=False, error_msg='HTTP 500') == 'pending'
+    assert not w2.claim_batch()
+    w1.close()
+    w2.close()
+    print("✅ Retry schedule and dead-lettering shared across workers")
+
+def test_seeding_and_reset_are_coordinator_steps():
+    """Workers only seed an empty queue; a reset refuses while leases are live"""
+    _fresh_schema()
+    coordinator, w1, w2 = _worker('coordinator'), _worker('w1'), _worker('w2')
+    assert w1.seed(URLS[:10], only_if_empty=True) == 10
+    # A second host's (stale) pending list is not added to a running crawl
+    assert w2.seed(URLS, only_if_empty=True) == 0
+
+    leased = w1.claim_batch(3)
+    with pytest.raises(RuntimeError):
+        coordinator.reset_queue()
+    assert sorted(w1.get_url(url)['state'] for url in leased) == ['leased'] * 3
+
+    w1.release()
+    assert coordinator.reset_queue() == 10
+    assert coordinator.seed(URLS) == 25
+    for leases in (coordinator, w1, w2):
+        leases.close()
+    print("✅ Seeding and reset only from the coordinator")
+
+if __name__ == "__main__":
+    test_workers_claim_disjoint_batches()
+    test_crashed_worker_leases_are_reclaimed()
+    test_poison_url_is_dead_lettered()
+    test_heartbeat_and_release()
+    test_retry_state_is_shared_across_workers()
+    test_seeding_and_reset_are_coordinator_steps()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the staged crawl pipeline against the local replay server
+"""
+
+import time
+
+import requests
+
+from crawl_pipeline import CrawlPipeline
+from replay_server import ReplayServer
+from retry_policy import SERVER_ERROR
+
+def replay_fetch(url):
+    response = requests.get(url, timeout=10)
+    if response.status_code != 200:
+        return None, f"HTTP {response.status_code}"
+    return response.text, None
+
+def test_pipeline_extracts_saves_in_batches_and_records_failures():
+    """Every URL comes out of the writer once; products are saved in batches, failures classified"""
+    server = ReplayServer(latency=0.01, error_rate=0.2, seed=1).start()
+    batches, results = [], []
+
+    def save_batch(products):
+        batches.append([product_data['url'] for product_data, crawl_results in products])
+        assert all(crawl_results['main']['html'] for _, crawl_results in products)
+        return [True] * len(products)
+
+    try:
+        urls = server.urls(12)
+        pipeline = CrawlPipeline(fetch=replay_fetch, save_batch=save_batch, on_result=results.append,
+                                 fetchers=3, parsers=2, write_batch=4, flush_seconds=0.2)
+        metrics = pipeline.run(urls)
+        statuses = server.statistics()
+    finally:
+        server.stop()
+
+    assert sorted(item.url for item in results) == sorted(urls)
+    failed = [item for item in results if not item.success]
+    assert len(failed) == statuses['requests'] - statuses['ok'] > 0
+    assert all(item.error == 'HTTP 500' and item.error_class == SERVER_ERROR for item in failed)
+    saved = [url for batch in batches for url in batch]
+    assert sorted(saved) == sorted(item.url for item in results if item.success)
+    assert max(len(batch) for batch in batches) > 1 and all(len(batch) <= 4 for batch in batches)
+    assert all(item.html is None and item.product_data['sku'] for item in results if item.success)
+
+    stages = metrics['stages']
+    assert stages['fetch']['processed'] == 12 and stages['fetch']['failed'] == len(failed)
+    assert stages['parse']['processed'] == len(saved) and stages['parse']['cpu_seconds'] > 0
+    assert stages['write']['processed'] == len(saved) and metrics['write_batches'] == len(batches)
+    assert metrics['pages_per_minute'] > 0 and not metrics['stopped']
+
+def test_backpressure_and_graceful_stop():
+    """A slow writer bounds the queues; a stop drains fetched pages and leaves the rest unfetched"""
+    server = ReplayServer(latency=0, seed=2).start()
+    results = []
+
+    def slow_save(products):
+        time.sleep(0.1 * len(products))
+        return [True] * len(products)
+
+    try:
+        urls = server.urls(40)
+        pipeline = CrawlPipeline(fetch=replay_fetch, save_batch=slow_save, on_result=results.append,
+                                 should_stop=lambda: len(results) >= 3, fetchers=2, parsers=1,
+                                 queue_size=2, write_batch=1)
+        metrics = pipeline.run(urls)
+        fetched = server.statistics()['requests']
+    finally:
+        server.stop()
+
+    stages = metrics['stages']
+    assert metrics['stopped'] and metrics['dropped_on_stop'] > 0
+    assert all(stage['max_queue_depth'] <= 2 for stage in stages.values())
+    assert stages['fetch']['blocked_seconds'] > 0
+    # Everything fetched before the stop was still extracted, saved and reported
+    assert fetched < len(urls) and len(results) == fetched == stages['fetch']['processed']
+    assert all(item.success for item in results)
+
+if __name__ == "__main__":
+    test_pipeline_extracts_saves_in_batches_and_records_failures()
+    test_backpressure_and_graceful_stop()
+    print("✅ Crawl pipeline tests passed")
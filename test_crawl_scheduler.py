@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the priority-scored re-crawl scheduler
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+from crawl_scheduler import CrawlScheduler
+from incremental_crawl import ValidatorStore
+from url_frontier import URLFrontier
+
+BASE = "https://www.tileshop.com/products/"
+NOW = datetime(2025, 7, 20, 12, 0, 0)
+
+def _scheduler():
+    tmp = tempfile.mkdtemp()
+    frontier = URLFrontier(os.path.join(tmp, 'frontier.db'), auto_migrate=False)
+    frontier.replace_sitemap([
+        {'url': BASE + 'never-1', 'scrape_status': 'pending'},
+        {'url': BASE + 'volatile-2', 'scrape_status': 'completed', 'scraped_at': '2025-07-06T12:00:00'},
+        {'url': BASE + 'steady-3', 'scrape_status': 'completed', 'scraped_at': '2025-07-06T12:00:00'},
+        {'url': BASE + 'fresh-4', 'scrape_status': 'completed', 'scraped_at': '2025-07-20T11:00:00'},
+        {'url': BASE + 'grout-5', 'scrape_status': 'completed', 'scraped_at': '2025-07-06T12:00:00'},
+        {'url': BASE + 'broken-6', 'scrape_status': 'pending'},
+    ])
+    frontier.apply_categories({
+        'TILES': [{'url': BASE + u} for u in ('never-1', 'volatile-2', 'steady-3', 'fresh-4', 'broken-6')],
+        'GROUT': [{'url': BASE + 'grout-5'}],
+    })
+    for _ in range(3):
+        frontier.update_status(BASE + 'broken-6', 'failed', 'HTTP 500')
+
+    store = ValidatorStore(os.path.join(tmp, 'validators.json'))
+    store.validators = {
+        BASE + 'volatile-2': {'content_hash': 'a', 'checks': 10, 'changes': 8},
+        BASE + 'steady-3': {'content_hash': 'b', 'checks': 10, 'changes': 0},
+        BASE + 'grout-5': {'content_hash': 'c', 'checks': 10, 'changes': 0},
+    }
+    return CrawlScheduler(frontier, store, {'TILES': 1.0, 'GROUT': 0.02}, now=NOW)
+
+def test_score_order():
+    """Never scraped, then frequently-changing stale data; fresh, low-weight and failing URLs last"""
+    order = [url.rsplit('/', 1)[-1] for url in _scheduler().get_scheduled_urls()]
+    assert order[:2] == ['never-1', 'volatile-2']
+    assert order.index('steady-3') < order.index('grout-5')   # Same history, heavier category
+    assert order.index('steady-3') < order.index('fresh-4')   # Same category, older data
+    assert order.index('broken-6') > order.index('volatile-2')  # Three consecutive failures
+    print(f"✅ Schedule: {order}")
+
+def test_budget_and_category():
+    """The crawl budget cuts the ranked list; category filter applies"""
+    scheduler = _scheduler()
+    assert len(scheduler.schedule(budget=2)) == 2
+    assert scheduler.get_scheduled_urls(category='grout') == [BASE + 'grout-5']
+
+    # A success clears the failure penalty
+    scheduler.frontier.update_status(BASE + 'broken-6', 'completed')
+    assert scheduler.frontier.get_url(BASE + 'broken-6')['failure_count'] == 0
+    print("✅ Budget, category filter and failure reset")
+
+if __name__ == "__main__":
+    test_score_order()
+    test_budget_and_category()
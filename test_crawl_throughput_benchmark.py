@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test the replay server and the end-to-end crawl throughput benchmark
+"""
+
+import json
+import os
+import tempfile
+
+import requests
+
+import curl_scraper
+from benchmark_crawl_throughput import run_benchmark, write_results, STAGES
+from replay_server import ReplayServer, page_category
+
+def test_replay_server_injects_faults_deterministically():
+    """Same seed, same failure sequence; 429s advertise Retry-After"""
+    runs = []
+    for _ in range(2):
+        server = ReplayServer(latency=0, error_rate=0.2, throttle_rate=0.2, retry_after=7, seed=3).start()
+        try:
+            urls = server.urls(12)
+            responses = [requests.get(url, timeout=5) for url in urls]
+            runs.append([r.status_code for r in responses])
+            stats = server.statistics()
+        finally:
+            server.stop()
+
+    assert runs[0] == runs[1]
+    assert set(runs[0]) == {200, 429, 500}
+    throttled = next(r for r in responses if r.status_code == 429)
+    assert throttled.headers['Retry-After'] == '7'
+    assert len(set(urls)) == 12
+    assert {page_category(url.rsplit('/', 1)[-1]) for url in urls} == {'tile', 'grout', 'trim', 'lvp', 'tool'}
+    assert stats['requests'] == 12 and stats['ok'] == runs[0].count(200)
+    print(f"✅ Replayed statuses: {runs[0]}")
+
+def test_benchmark_reports_stages_and_writes():
+    """Every page is fetched, parsed and saved; the real pipeline is restored afterwards"""
+    original_get_page = curl_scraper.get_page
+    results = run_benchmark(pages=5, latency=0.01, db='sqlite')
+
+    assert (results['succeeded'], results['failed']) == (5, 0)
+    assert list(results['stages']) == STAGES
+    for stage in ('fetch', 'parse', 'save'):
+        assert results['stages'][stage]['count'] == 5
+        assert results['stages'][stage]['p95_ms'] >= results['stages'][stage]['p50_ms']
+    assert results['db']['writes'] == 5 and results['db']['writes_per_second'] > 0
+    assert results['pages_per_minute'] > 0
+    assert curl_scraper.get_page is original_get_page
+
+    path = write_results(results, os.path.join(tempfile.mkdtemp(), 'results.json'))
+    with open(path) as f:
+        assert json.load(f)['config']['pages'] == 5
+    print(f"✅ {results['pages_per_minute']:.0f} pages/min, stages: "
+          f"{ {stage: summary['p50_ms'] for stage, summary in results['stages'].items()} }")
+
+if __name__ == "__main__":
+    test_replay_server_injects_faults_deterministically()
+    test_benchmark_reports_stages_and_writes()
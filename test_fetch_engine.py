@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the pooled fetch engine against a local server
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import curl_scraper
+from fetch_engine import FetchEngine, TokenBucket
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    active = 0
+    peak = 0
+    served = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with _Handler.lock:
+            _Handler.served += 1
+            _Handler.active += 1
+            _Handler.peak = max(_Handler.peak, _Handler.active)
+        time.sleep(0.05)
+        body = b'<html>ok</html>' if not self.path.endswith('missing') else b''
+        self.send_response(200 if body else 404)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with _Handler.lock:
+            _Handler.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+def _serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_fetch_many_respects_per_host_limit():
+    """Concurrent fetches never exceed the per-host limit"""
+    server, base = _serve()
+    _Handler.peak = 0
+    engine = FetchEngine(per_host_concurrency=2, rate_per_second=1000, burst=1000)
+    results = list(engine.fetch_many([f"{base}/p{i}" for i in range(8)], max_workers=6))
+    server.shutdown()
+
+    assert len(results) == 8
+    assert all(r.ok for r in results)
+    assert _Handler.peak <= 2
+    print(f"✅ 8 pages fetched, peak concurrency {_Handler.peak}")
+
+def test_fragment_and_error_handling():
+    """Fragments are stripped and HTTP errors are reported, not raised"""
+    server, base = _serve()
+    engine = FetchEngine(rate_per_second=1000, burst=1000)
+    tab = engine.fetch(f"{base}/product#resources")
+    missing = engine.fetch(f"{base}/missing")
+    server.shutdown()
+
+    assert tab.ok and tab.url.endswith('#resources')
+    assert not missing.ok and missing.error == 'HTTP 404'
+    print("✅ Fragment stripped, 404 surfaced as error")
+
+def test_token_bucket_paces_requests():
+    """Token bucket enforces the sustained rate after the burst"""
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    assert elapsed >= 0.18
+    print(f"✅ 5 tokens at 20/s took {elapsed:.2f}s")
+
+def test_http_failures_are_not_refetched_with_curl(monkeypatch):
+    """A 404 is the server's answer: one request, status kept; only transport errors fall back to curl"""
+    server, base = _serve()
+    engine = FetchEngine(rate_per_second=1000, burst=1000)
+    monkeypatch.setattr(curl_scraper, 'get_fetch_engine', lambda: engine)
+    monkeypatch.setattr(curl_scraper, 'FETCH_ENGINE_AVAILABLE', True)
+    curl_calls = []
+    monkeypatch.setattr(curl_scraper, 'get_page_with_curl', lambda url, user_agent=None: curl_calls.append(url))
+
+    _Handler.served = 0
+    assert curl_scraper.get_page(base + '/products/missing') is None
+    assert curl_scraper.last_fetch_error() == 'HTTP 404'
+    assert _Handler.served == 1 and curl_calls == []
+
+    server.shutdown()
+    refused = 'http://127.0.0.1:1/products/tile-1'  # Nothing listens here: no HTTP status
+    assert curl_scraper.get_page(refused) is None
+    assert curl_calls == [refused]
+    engine.close()
+    print("✅ HTTP failures returned as-is, connection failures retried with curl")
+
+if __name__ == "__main__":
+    test_fetch_many_respects_per_host_limit()
+    test_fragment_and_error_handling()
+    test_token_bucket_paces_requests()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test incremental re-crawl change detection: conditional GET, content hashing
+and sitemap lastmod
+"""
+
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fetch_engine import FetchEngine
+from incremental_crawl import (ValidatorStore, check_for_changes, mark_extracted, compute_content_hash,
+                               CHANGED, NOT_MODIFIED, UNCHANGED_CONTENT, UNCHANGED_SITEMAP)
+
+PAGE = ('<html><head><script type="application/ld+json">{"@type":"Product","name":"Penny Round Milk","offers":{"price":"17.99"}}</script></head>'
+        '<body><div class="promo">__PROMO__</div>'
+        '<script id="__NEXT_DATA__" type="application/json">{"props":{"pageProps":{"layoutData":{"sitecore":{"context":'
+        '{"productData":{"ProductId":"669029","Price":__PRICE__}}}}}}}</script></body></html>')
+
+def _page(promo, price):
+    return PAGE.replace('__PROMO__', promo).replace('__PRICE__', price)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    send_etag = True
+    price = '17.99'
+    promo = 'Free shipping'
+    requests_served = 0
+
+    def do_GET(self):
+        _Handler.requests_served += 1
+        etag = f'"v-{self.price}"'
+        if self.send_etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = _page(self.promo, self.price).encode('utf-8')
+        self.send_response(200)
+        if self.send_etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _setup():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/products/penny-round-milk-669029"
+    store = ValidatorStore(os.path.join(tempfile.mkdtemp(), 'validators.json'))
+    engine = FetchEngine(rate_per_second=1000, burst=1000)
+    return server, url, store, engine
+
+def test_conditional_get_and_hash():
+    """First crawl extracts, then 304 and unchanged payload are skipped, price change is detected"""
+    server, url, store, engine = _setup()
+    _Handler.send_etag, _Handler.price, _Handler.promo = True, '17.99', 'Free shipping'
+
+    outcome, html = check_for_changes(url, store, engine=engine)
+    assert outcome == CHANGED and html
+    mark_extracted(url, store)
+
+    outcome, html = check_for_changes(url, store, engine=engine)
+    assert outcome == NOT_MODIFIED and html is None
+
+    # No validators from the server - fall back to the payload hash; promo text is not payload
+    _Handler.send_etag, _Handler.promo = False, 'Summer sale'
+    outcome, _ = check_for_changes(url, store, engine=engine)
+    assert outcome == UNCHANGED_CONTENT
+
+    _Handler.price = '19.99'
+    outcome, html = check_for_changes(url, store, engine=engine)
+    assert outcome == CHANGED and '19.99' in html
+    server.shutdown()
+    print("✅ CHANGED → NOT_MODIFIED → UNCHANGED_CONTENT → CHANGED")
+
+def test_sitemap_lastmod_skips_request():
+    """An older sitemap lastmod skips the request entirely; a newer one re-checks"""
+    server, url, store, engine = _setup()
+    _Handler.send_etag = True
+    check_for_changes(url, store, engine=engine)
+    mark_extracted(url, store)
+
+    _Handler.requests_served = 0
+    outcome, _ = check_for_changes(url, store, sitemap_lastmod='2020-01-01', engine=engine)
+    assert outcome == UNCHANGED_SITEMAP and _Handler.requests_served == 0
+
+    outcome, _ = check_for_changes(url, store, sitemap_lastmod='2999-01-01T00:00:00+00:00', engine=engine)
+    assert outcome != UNCHANGED_SITEMAP and _Handler.requests_served == 1
+    server.shutdown()
+    print("✅ Sitemap lastmod honoured")
+
+def test_validators_persist_and_failed_saves_retry():
+    """Validators survive a reload; a product that was never saved is not marked unchanged"""
+    server, url, store, engine = _setup()
+    _Handler.send_etag = True
+    check_for_changes(url, store, engine=engine)  # No mark_extracted - save "failed"
+    outcome, _ = check_for_changes(url, store, engine=engine)
+    assert outcome == CHANGED
+
+    mark_extracted(url, store)
+    store.save()
+    reloaded = ValidatorStore(store.path)
+    assert reloaded.get(url)['content_hash'] == compute_content_hash(_page('x', _Handler.price))
+    server.shutdown()
+    print("✅ Validators persisted, failed saves retried")
+
+if __name__ == "__main__":
+    test_conditional_get_and_hash()
+    test_sitemap_lastmod_skips_request()
+    test_validators_persist_and_failed_saves_retry()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test the persistent LLM category cache and batched category detection
+"""
+
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+
+from enhanced_specification_extractor import EnhancedSpecificationExtractor, LLM_CATEGORY_CONTEXT
+from llm_cache import LLMCategoryCache, category_fingerprint
+
+class FakeClient:
+    """Answers category prompts from a title lookup and counts requests"""
+
+    def __init__(self, categories):
+        self.categories = categories
+        self.requests = []
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, model, max_tokens, temperature, messages):
+        prompt = messages[0]['content']
+        self.requests.append(prompt)
+        assert temperature == 0
+        if 'PRODUCTS TO ANALYZE' in prompt:
+            lines = [line for line in prompt.splitlines() if line[:1].isdigit() and '. Title: ' in line]
+            text = "\n".join(f"{line.split('.')[0]}. {self.answer(line)}" for line in lines)
+        else:
+            text = self.answer(prompt.split('PRODUCT TO ANALYZE:')[1].splitlines()[1])
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    def answer(self, title_line):
+        return next((category for word, category in self.categories.items() if word in title_line.lower()), 'Unsure')
+
+def make_extractor(cache_path, client):
+    extractor = EnhancedSpecificationExtractor()
+    extractor.llm_cache = LLMCategoryCache(cache_path)
+    extractor._anthropic_client = client
+    return extractor
+
+def test_fingerprint_and_persistence():
+    """Color siblings share a fingerprint; answers, including rejected ones, survive a restart"""
+    specs = {'color': 'Matte Black', 'material_type': 'Porcelain'}
+    black = category_fingerprint('Valencia Matte Black Porcelain Tile 684287', 'Tile > Floor', specs, 'v1')
+    white = category_fingerprint('Valencia  Matte White porcelain tile 684290', 'Tile > Floor',
+                                 {'color': 'Matte White', 'material_type': 'porcelain'}, 'v1')
+    assert black == white
+    assert black != category_fingerprint('Valencia Matte Black Porcelain Tile', 'Tile > Floor', specs, 'v2')
+    assert black != category_fingerprint('Valencia Matte Black Porcelain Tile', 'Trim', specs, 'v1')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.db')
+        cache = LLMCategoryCache(path)
+        cache.put(black, 'Tile', 'Tile', 'Valencia')
+        cache.put('rejected', None, 'Maybe flooring?', 'Odd Product')
+        cache.put(black, 'Trim', 'Trim')   # First answer wins
+        cache.close()
+
+        reopened = LLMCategoryCache(path)
+        assert reopened.get(black)['category'] == 'Tile'
+        assert reopened.get('rejected')['category'] is None
+        assert reopened.get('unknown') is None
+        stats = reopened.statistics()
+        assert stats['entries'] == 2 and stats['rejected_answers'] == 1
+        assert stats['session_hits'] == 2 and stats['session_misses'] == 1
+        reopened.close()
+
+def test_replay_and_batch_make_no_repeat_calls():
+    """A second pass over the same products makes zero LLM calls; a batch uses one request"""
+    categories = {'sealer': 'Sealer', 'grout': 'Grout', 'trowel': 'Tool', 'tile': 'Tile'}
+    titles = ['Stone Sealer', 'Sanded Grout Gray', 'Sanded Grout White', 'Euro Trowel', 'Marble Tile', 'Mystery Widget']
+    specs = [None, {'color': 'Gray'}, {'color': 'White'}, None, None, None]
+    with tempfile.TemporaryDirectory() as tmp, redirect_stdout(io.StringIO()):
+        path = os.path.join(tmp, 'cache.db')
+        client = FakeClient(categories)
+        extractor = make_extractor(path, client)
+        first = [extractor._detect_category_with_llm(title, '', '', spec) for title, spec in zip(titles, specs)]
+        assert first == ['Sealer', 'Grout', 'Grout', 'Tool', 'Tile', None]
+        assert len(client.requests) == 5   # The grout color siblings share one answer
+
+        replay_client = FakeClient({})
+        replay = make_extractor(path, replay_client)
+        assert [replay._detect_category_with_llm(title, '', '', spec) for title, spec in zip(titles, specs)] == first
+        assert replay_client.requests == [] and replay.llm_calls == 0
+
+        batch_client = FakeClient(categories)
+        batch = make_extractor(os.path.join(tmp, 'batch.db'), batch_client)
+        products = [{'title': title, 'html': '', 'specifications': spec} for title, spec in zip(titles, specs)] * 2
+        assert batch.detect_categories_with_llm(products) == first * 2
+        assert len(batch_client.requests) == 1 and batch_client.requests[0].count('. Title: ') == 5
+        assert batch.detect_categories_with_llm(products) == first * 2
+        assert [batch._detect_category_with_llm(title, '', '', spec) for title, spec in zip(titles, specs)] == first
+        assert len(batch_client.requests) == 1
+        assert batch.llm_cache.get(category_fingerprint('Mystery Widget', context=LLM_CATEGORY_CONTEXT))['raw_answer'] == 'Unsure'
+
+if __name__ == "__main__":
+    test_fingerprint_and_persistence()
+    test_replay_and_batch_make_no_repeat_calls()
+    print("✅ LLM cache tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the confidence-gated material classifier and its persistent verdict cache
+"""
+
+import io
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from benchmark_material_classification import INSTALLATION_PRODUCTS, SimulatedLLM, legacy_extract_material_type
+from enhanced_categorization_system import EnhancedCategorizer
+from llm_cache import LLMCategoryCache
+
+def make_categorizer(cache, threshold=0.7):
+    with redirect_stdout(io.StringIO()):
+        categorizer = EnhancedCategorizer(material_llm_threshold=threshold)
+    categorizer.verdict_cache = cache
+    categorizer._anthropic_client = SimulatedLLM(latency=0)
+    return categorizer
+
+def classify(categorizer, product):
+    with redirect_stdout(io.StringIO()):
+        return categorizer.classify_material(product)
+
+def test_rules_decide_unambiguous_products():
+    """Specs, titles and function keywords settle clear cases; only ambiguous ones reach the LLM"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LLMCategoryCache(os.path.join(tmp, 'verdicts.db'))
+        categorizer = make_categorizer(cache)
+        expected = {
+            'Wedi Screw and Washer Fastener Kit': ('metal', 'keywords'),
+            'Superior Premium Gold Stone Sealer Pint': ('chemical', 'keywords'),
+            'Leveling Clips 1/16 in. - 100 Pack': ('plastic', 'title'),
+            'GoBoard Backer Board 4ft x 8ft x 1/2 in': ('polyisocyanurate', 'title'),
+            'Natural Stone Cleaner': ('chemical', 'keywords'),
+            'Carrara Marble Polished Tile - 12x24 in': ('marble', 'llm'),
+        }
+        for product in INSTALLATION_PRODUCTS:
+            if product['title'] in expected:
+                verdict = classify(categorizer, product)
+                assert (verdict.material, verdict.tier) == expected[product['title']], product['title']
+                assert verdict.material == legacy_extract_material_type(categorizer, product)
+        assert classify(categorizer, {'title': 'Anything', 'specifications': {'material_type': 'Quartz'}}).material == 'quartz'
+        # Rejected LLM answers are remembered too
+        calls = categorizer.llm_calls
+        assert classify(categorizer, {'title': 'Plain Widget'}).material is None
+        assert classify(categorizer, {'title': 'Plain Widget'}).material is None
+        assert categorizer.llm_calls == calls + 1
+
+        # A threshold above every rule confidence sends clear cases to the LLM as well
+        strict = make_categorizer(cache, threshold=1.01)
+        assert classify(strict, {'title': 'Pro Sealant Clear'}).tier == 'llm'
+        assert strict._anthropic_client.requests == 1
+        cache.close()
+
+def test_verdicts_persist_across_runs():
+    """A second categorizer on the same cache makes no LLM calls; without API access nothing is cached"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'verdicts.db')
+        first = make_categorizer(LLMCategoryCache(path))
+        materials = [classify(first, product).material for product in INSTALLATION_PRODUCTS]
+        assert 0 < first.llm_calls < len(INSTALLATION_PRODUCTS)
+        first.verdict_cache.close()
+
+        replay = make_categorizer(LLMCategoryCache(path))
+        assert [classify(replay, product).material for product in INSTALLATION_PRODUCTS] == materials
+        assert replay.llm_calls == 0 and replay._anthropic_client.requests == 0
+        assert replay.material_tiers['cache'] == first.material_tiers['llm']
+
+        offline = make_categorizer(LLMCategoryCache(os.path.join(tmp, 'offline.db')))
+        offline._llm_client = lambda: None
+        verdict = classify(offline, {'title': 'Ardex T-7 Ceramic Tile Sponge', 'description': 'Cleaning sponge'})
+        assert verdict.material is None and verdict.tier == 'none'
+        assert offline.verdict_cache.statistics()['entries'] == 0
+
+if __name__ == "__main__":
+    test_rules_decide_unambiguous_products()
+    test_verdicts_persist_across_runs()
+    print("✅ Material classifier tests passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the __NEXT_DATA__ fast-path extractor, its parity with page parsing and its fallback
+"""
+
+import io
+import json
+from contextlib import redirect_stdout
+
+from next_data_extractor import extract_from_next_data, is_complete, iter_specifications, pdp_field_name
+from replay_server import load_pages
+
+def next_data_page(product, json_ld=None):
+    payload = {'props': {'pageProps': {'layoutData': {'sitecore': {'context': {'productData': product}}}}}}
+    html = f'<html><head><script id="__NEXT_DATA__" type="application/json">{json.dumps(payload)}</script>'
+    if json_ld:
+        html += f'<script type="application/ld+json">{json.dumps(json_ld)}</script>'
+    return html + '</head><body></body></html>'
+
+def test_payload_fields():
+    """Both Specifications shapes, prices, resources, siblings and JSON-LD gap filling"""
+    product = {
+        'ProductId': '615826', 'Name': 'Penny Round Cloudy Porcelain Mosaic',
+        'Specifications': {'PDPInfo_DesignInstallation': [{'Key': 'PDPInfo_EdgeType', 'Value': 'Straight'},
+                                                         {'Key': 'PDPInfo_DirectionalLayout', 'Value': 'No'}],
+                           'PDPInfo_Dimensions': [{'Key': 'PDPInfo_BoxQuantity', 'Value': '10'}]},
+        'Resources': [{'Name': 'Install Guide', 'Url': '/pdf/install.pdf'}, {'Name': 'Dup', 'Url': '/pdf/install.pdf'}],
+        'ColorVariants': [{'Color': 'Milk', 'Sku': '669029', 'Url': '/products/penny-round-milk-669029'},
+                          {'Color': 'Cloudy', 'Sku': '615826', 'Url': '/products/penny-round-cloudy-615826'}],
+        'Price': {'BoxPrice': '17.99', 'SqFtPrice': 17.99, 'CoveragePerBox': 1.0},
+    }
+    json_ld = {'@type': 'Product', 'description': '<p>Classic\nmosaic</p>', 'brand': {'name': 'Rush River'},
+               'image': 'https://tileshop.scene7.com/is/image/TileShop/615826?$Large$'}
+    data = extract_from_next_data(next_data_page(product, json_ld), 'https://www.tileshop.com/products/x-615826')
+
+    assert data['sku'] == '615826' and data['price_per_box'] == 17.99 and data['coverage'] == '1.0 sq ft'
+    assert data['edge_type'] == 'Straight' and data['directional_layout'] is False and data['box_quantity'] == 10
+    assert data['specifications'] == {'edge_type': 'Straight', 'directional_layout': 'No', 'box_quantity': '10'}
+    assert data['resources'] == [{'type': 'PDF', 'title': 'Install Guide', 'url': 'https://www.tileshop.com/pdf/install.pdf'}]
+    assert data['color_variations'] == [{'color': 'Milk', 'sku': '669029',
+                                         'url': 'https://www.tileshop.com/products/penny-round-milk-669029'}]
+    assert data['description'] == 'Classic mosaic' and data['brand'] == 'Rush River'
+    assert data['image_variants']['base_url'] == 'https://tileshop.scene7.com/is/image/TileShop/615826'
+    assert is_complete(data)
+
+    # Specifications in any other shape yield nothing, so the legacy path runs
+    grouped = {'Specifications': [{'Name': 'PDPInfo_Packaging', 'Specifications': [{'Key': 'PDPInfo_CountryOfOrigin', 'Value': 'USA'}]}]}
+    assert list(iter_specifications(grouped)) == []
+    assert pdp_field_name('PDPInfo_NotchSize') == 'notch_size'
+
+    # No price means the legacy path still runs; no payload means nothing to read
+    del product['Price']
+    assert not is_complete(extract_from_next_data(next_data_page(product)))
+    assert extract_from_next_data('<html><body>No payload</body></html>') is None
+
+# Columns build_product_upsert_sql persists
+PERSISTED_FIELDS = ('sku', 'title', 'price_per_box', 'price_per_sqft', 'price_per_piece', 'coverage', 'finish', 'color',
+                    'size_shape', 'description', 'specifications', 'resources', 'images', 'collection_links', 'brand',
+                    'primary_image', 'image_variants', 'color_variations', 'color_images', 'category', 'subcategory',
+                    'product_type', 'application_areas', 'related_products', 'rag_keywords', 'installation_complexity',
+                    'typical_use_cases', 'thickness', 'box_quantity', 'box_weight', 'edge_type', 'shade_variation',
+                    'number_of_faces', 'directional_layout', 'country_of_origin', 'material_type', 'product_category')
+
+def _extract(crawl_results, url, fast_path):
+    import tileshop_learner
+    previous = tileshop_learner.NEXT_DATA_FAST_PATH
+    tileshop_learner.NEXT_DATA_FAST_PATH = fast_path
+    try:
+        with redirect_stdout(io.StringIO()):
+            return tileshop_learner.extract_product_data(crawl_results, url)
+    finally:
+        tileshop_learner.NEXT_DATA_FAST_PATH = previous
+
+def _recorded_pages():
+    from benchmark_parser_corpus import GOLDEN_PAGES_DIR
+    pages = load_pages()
+    pages.update(load_pages(GOLDEN_PAGES_DIR))
+    return {stem: body.decode('utf-8') for stem, body in pages.items()}
+
+def test_extract_product_data_fast_path_and_fallback():
+    """Pages with a complete payload take the fast path; a malformed payload falls back to page parsing"""
+    import tileshop_learner
+    assert tileshop_learner.NEXT_DATA_FAST_PATH
+    for stem, html in _recorded_pages().items():
+        url = f"https://www.tileshop.com/products/{stem}"
+        product = _extract({'main': {'html': html}}, url, fast_path=True)
+        if not is_complete(extract_from_next_data(html, url)):
+            assert not product['parsing_method'].endswith('+NextDataExtractor'), stem
+            continue
+        assert product['parsing_method'].endswith('+NextDataExtractor'), stem
+        assert product['title'] and product['sku'] and product['category'] and product['category'] != 'uncategorized'
+        assert json.loads(product['resources']) and json.loads(product['specifications'])
+
+    html = load_pages()['tile_penny_round_milk_669029'].decode('utf-8')
+    broken = html.replace('<script id="__NEXT_DATA__" type="application/json">',
+                          '<script id="__NEXT_DATA__" type="application/json">{truncated')
+    product = _extract({'main': {'html': broken}}, "https://www.tileshop.com/products/tile_penny_round_milk_669029",
+                       fast_path=True)
+    assert product['parsing_method'] == 'TilePageParser'
+    assert product['sku'] == '669029' and product['price_per_box'] == 17.99
+
+def test_fast_path_matches_full_path():
+    """Every persisted column matches the full path; the payload only fills columns it left empty"""
+    from curl_scraper import build_tab_views
+    filled = set()
+    for stem, html in _recorded_pages().items():
+        url = f"https://www.tileshop.com/products/{stem}"
+        for crawl_results in ({'main': {'html': html}}, build_tab_views(html)):
+            full = _extract(crawl_results, url, fast_path=False)
+            fast = _extract(crawl_results, url, fast_path=True)
+            for field in PERSISTED_FIELDS:
+                if fast.get(field) != full.get(field):
+                    assert full.get(field) in (None, '', '[]', '{}'), (stem, field, fast.get(field), full.get(field))
+                    assert fast.get(field), (stem, field)
+                    filled.add(field)
+    # Recorded pages exercise the payload gap filling (description, size_shape, resources, ...)
+    assert 'description' in filled and 'resources' in filled
+
+if __name__ == "__main__":
+    test_payload_fields()
+    test_extract_product_data_fast_path_and_fallback()
+    test_fast_path_matches_full_path()
+    print("✅ __NEXT_DATA__ extractor tests passed")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed page cache and offline re-extraction
+"""
+
+import glob
+import json
+import os
+import tempfile
+
+from curl_scraper import build_tab_views
+import reparse
+from page_cache import PageCache
+from reparse import reparse_cached_pages
+from tileshop_learner import extract_product_data
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'pages')
+BASE = "https://www.tileshop.com/products/"
+
+def _object_files(cache):
+    return [f for f in glob.glob(os.path.join(cache.objects_dir, '*', '*')) if not f.endswith('.tmp')]
+
+def test_pages_are_content_addressed():
+    """Re-fetching identical content adds an index row but no new object; newest fetch wins"""
+    cache = PageCache(tempfile.mkdtemp())
+    url = BASE + 'tile-a-1'
+    first = cache.put(url, '<html>v1</html>', fetched_at='2025-07-01T10:00:00')
+    again = cache.put(url, '<html>v1</html>', fetched_at='2025-07-02T10:00:00')
+    assert first == again and len(_object_files(cache)) == 1
+
+    cache.put(url, '<html>v2</html>', fetched_at='2025-07-03T10:00:00')
+    assert cache.latest(url) == ('2025-07-03T10:00:00', '<html>v2</html>')
+    assert cache.get(first) == '<html>v1</html>'
+    assert [(u, f) for u, f, _ in cache.latest_entries()] == [(url, '2025-07-03T10:00:00')]
+
+    stats = cache.statistics()
+    assert stats['fetches'] == 3 and stats['unique_pages'] == 2
+    print(f"✅ Content-addressed cache: {stats}")
+
+def test_reparse_matches_live_extraction():
+    """Reparsing cached pages gives the same products as extracting the fetched HTML"""
+    root = tempfile.mkdtemp()
+    cache = PageCache(root)
+    expected = {}
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        url = BASE + os.path.basename(path)[:-5]
+        html = open(path, encoding='utf-8').read()
+        cache.put(url, html)
+        expected[url] = extract_product_data(build_tab_views(html), url)
+    assert expected, "No saved pages found"
+
+    stats = reparse_cached_pages(workers=2, save=False, cache_root=root)
+    assert stats['extracted'] == len(expected) and stats['failed'] == 0
+    for url, product_data in stats['products'].items():
+        product_data.pop('_crawl_results', None)
+        assert json.dumps(product_data, sort_keys=True, default=str) == \
+            json.dumps(expected[url], sort_keys=True, default=str)
+    print(f"✅ Reparsed {stats['extracted']} cached pages")
+
+def test_reparse_counts_only_successful_saves(monkeypatch):
+    """Saves that report failure or raise are listed under errors, not counted as saved"""
+    root = tempfile.mkdtemp()
+    cache = PageCache(root)
+    urls = []
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        urls.append(BASE + os.path.basename(path)[:-5])
+        cache.put(urls[-1], open(path, encoding='utf-8').read())
+    rejected, broken = urls[0], urls[1]
+
+    def fake_save(product_data, crawl_results):
+        if product_data['url'] == broken:
+            raise RuntimeError('connection lost')
+        return product_data['url'] != rejected
+    monkeypatch.setattr(reparse, 'save_to_database', fake_save)
+
+    stats = reparse_cached_pages(workers=2, cache_root=root)
+    assert stats['extracted'] == len(urls) and stats['failed'] == 0
+    assert stats['saved'] == len(urls) - 2
+    assert stats['errors'] == {rejected: 'save_to_database reported a failure',
+                               broken: 'Save error: connection lost'}
+    print(f"✅ {stats['saved']} saved, {len(stats['errors'])} save errors reported")
+
+if __name__ == "__main__":
+    test_pages_are_content_addressed()
+    test_reparse_matches_live_extraction()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test that one DetectionMatcher scan scores pages exactly like the per-type loops
+"""
+
+import io
+import re
+from contextlib import redirect_stdout
+
+from benchmark_page_detection import legacy_detect
+from page_structure_detector import PageStructureDetector
+from parsed_page import ParsedPage
+from regex_registry import RegexRegistry, folded_text
+from replay_server import load_pages
+
+def assert_same_structure(detector, html, url, json_ld=None):
+    expected = legacy_detect(detector, html, url, json_ld)
+    actual = detector.detect_page_structure(html, url, json_ld)
+    assert actual.page_type == expected.page_type, url
+    assert actual.detected_features == expected.detected_features, url
+    assert actual.recommended_parser == expected.recommended_parser, url
+    assert abs(actual.confidence - expected.confidence) < 1e-12, url
+    return actual
+
+def test_matcher_scores_match_per_type_loops():
+    """Recorded pages and edge cases: overlapping keywords, URL-only hits, many measurements, no JSON-LD"""
+    with redirect_stdout(io.StringIO()):
+        detector = PageStructureDetector()
+    for stem, body in load_pages().items():
+        html = body.decode('utf-8')
+        assert_same_structure(detector, html, f"https://www.tileshop.com/products/{stem}", ParsedPage(html).product_json_ld)
+        assert_same_structure(detector, html, f"https://www.tileshop.com/products/{stem}")
+
+    cases = [
+        # Nested and overlapping keywords: "epoxy grout" contains "grout", "per box quantity" spans two
+        ("Epoxy grout 25 lb, 10 lbs, 3 pounds, 12 lb - per box quantity 4", "https://www.tileshop.com/products/x-1", {'name': 'Epoxy Grout'}),
+        # Keywords only in the URL
+        ("Plain page", "https://www.tileshop.com/products/luxury-vinyl-plank-t-molding-2", None),
+        # More measurements than detected_features keeps, spread over several patterns
+        (" ".join(f"{n} x {n + 1} in" for n in range(8)) + " 3 sq ft per box 20 mil 6mm click to lock",
+         "https://www.tileshop.com/products/x-3", {'@type': 'Product', 'name': 'LVT Plank'}),
+        # Case-fold specials disable literal pre-checks (ſ matches s under IGNORECASE)
+        ("ſell ſheet and ſafety data ſheet, grout", "https://www.tileshop.com/products/x-4", None),
+        ("", "https://www.tileshop.com/products/empty-5", {}),
+    ]
+    for content, url, json_ld in cases:
+        assert_same_structure(detector, content, url, json_ld)
+
+def test_literal_precheck_and_limited_matches():
+    """may_match only rules out patterns whose literal is absent; first_matches stops at the limit"""
+    registry = RegexRegistry()
+    pounds = registry.compile('test.pounds', r'(\d+)\s*pounds?', re.IGNORECASE)
+    assert pounds.literal == 'pound'
+    text = '25 lb bag, 50 lbs pallet'
+    assert not pounds.may_match(text, folded_text(text)) and pounds.skipped == 1
+    assert pounds.may_match('10 POUNDS') and pounds.search('10 POUNDS')
+    assert folded_text('ſell sheet') == ''
+    assert registry.compile('test.sell', 'sell sheet', re.IGNORECASE).may_match('ſell ſheet', folded_text('ſell ſheet'))
+
+    numbers = registry.compile('test.numbers', r'(\d+)')
+    assert [m.group(1) for m in numbers.first_matches('1 2 3 4 5 6 7', 3)] == ['1', '2', '3']
+    assert len(numbers.first_matches('1 2 3 4 5 6 7')) == 7
+    assert numbers.calls == 2
+
+if __name__ == "__main__":
+    test_matcher_scores_match_per_type_loops()
+    test_literal_precheck_and_limited_matches()
+    print("✅ Page detection matcher tests passed")
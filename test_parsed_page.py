@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test the shared ParsedPage: cached views, and identical results to per-stage parsing
+"""
+
+import io
+from contextlib import redirect_stdout
+
+from parsed_page import ParsedPage, parse_page
+from replay_server import load_pages
+
+NEXT_DATA = ('<script id="__NEXT_DATA__" type="application/json">'
+             '{"props": {"pageProps": {"layoutData": {"sitecore": {"context": {"productData": {"Sku": "669029"}}}}}}}'
+             '</script>')
+
+def test_views_are_decoded_once():
+    """JSON-LD, __NEXT_DATA__ and the lowercased text are computed on first use and cached"""
+    html = ('<HTML><script type="application/ld+json">{"@type": "BreadcrumbList", "itemListElement": '
+            '[{"name": "Tile"}, {"item": {"name": "Mosaics"}}]}</script>'
+            '<script type="application/ld+json">{not json}</script>'
+            '<script type="application/ld+json">{"@type": "Product", "sku": "669029"}</script>'
+            + NEXT_DATA + '<p>Penny Round</p></HTML>')
+    page = ParsedPage(html, "https://www.tileshop.com/products/tile-669029")
+
+    assert page.lower is page.lower and 'penny round' in page.lower
+    assert len(page.json_ld_blocks) == 2 and page.json_ld_errors == 1
+    assert page.json_ld_blocks is page.json_ld_blocks and page.json_ld_errors == 1
+    assert page.product_json_ld == {"@type": "Product", "sku": "669029"}
+    assert page.product_payload == {"Sku": "669029"}
+    assert page.breadcrumb == "Tile > Mosaics"
+    assert parse_page(page) is page
+
+    empty = ParsedPage('<html><script id="__NEXT_DATA__" type="application/json">{broken</script></html>')
+    assert empty.next_data is None and empty.product_payload == {} and empty.product_json_ld == {}
+    assert empty.breadcrumb == ''
+
+def test_shared_page_matches_separate_parsing():
+    """Detector, specialized parsers and spec extractor give the same output with a shared page"""
+    from page_structure_detector import PageStructureDetector
+    from specialized_parsers import get_parser_for_page_type
+    from enhanced_specification_extractor import EnhancedSpecificationExtractor
+
+    with redirect_stdout(io.StringIO()):
+        detector = PageStructureDetector()
+        spec_extractor = EnhancedSpecificationExtractor()
+        for stem, body in load_pages().items():
+            html = body.decode('utf-8')
+            url = f"https://www.tileshop.com/products/{stem}"
+            page = ParsedPage(html, url)
+
+            structure = detector.detect_page_structure(html, url)
+            shared_structure = detector.detect_page_structure(html, url, page=page)
+            assert (structure.page_type, structure.confidence) == (shared_structure.page_type, shared_structure.confidence), stem
+
+            parser = get_parser_for_page_type(structure.page_type)
+            assert parser.parse_product_data(html, url) == parser.parse_product_data(html, url, page=page), stem
+            assert spec_extractor.extract_specifications(html) == spec_extractor.extract_specifications(html, page=page), stem
+
+if __name__ == "__main__":
+    test_views_are_decoded_once()
+    test_shared_page_matches_separate_parsing()
+    print("✅ Parsed page tests passed")
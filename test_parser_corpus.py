@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the specialized and category parsers against the golden page corpus
+"""
+
+import copy
+import os
+import tempfile
+
+from benchmark_parser_corpus import (FAMILY_PARSERS, import_cached_pages, load_corpus, load_expected, record,
+                                     run_corpus, write_expected)
+from page_cache import PageCache
+
+def test_parsers_match_golden_corpus():
+    """Every parser covers at least one saved page and gets every hand-verified field right or known wrong"""
+    expected = load_expected()
+    results = run_corpus(load_corpus(), expected, rounds=1)
+    for difference in sum((summary['differences'] for summary in results['parsers'].values()), []):
+        print(f"❌ {difference}")
+    assert results['passed'] and results['known_wrong'] > 0 and results['accuracy'] < 1.0
+    assert results['unrecorded'] == [] and results['unverified'] == []
+    grout = next(entry for key, entry in expected.items() if 'unsanded' in key)
+    assert grout['parsers']['GroutPageParser']['grout_type'] == 'Unsanded'
+    assert grout['parsers']['GroutParser']['grout_type'] == 'Unsanded'
+    assert 'grout_type' not in grout.get('known_wrong', {}).get('GroutParser', {})
+    parsers = {name for names in FAMILY_PARSERS.values() for name in names}
+    assert set(results['parsers']) == parsers
+    for name, summary in results['parsers'].items():
+        assert summary['pages'] >= 1 and summary['fields'] > 0, name
+        assert summary['pages_per_second'] > 0, name
+        assert summary['new_fields'] == [], name
+
+def test_field_differences_are_reported():
+    """A changed nested field, an unexpected field and an unrecorded page all fail the run"""
+    corpus = load_corpus()
+    expected = record(corpus)
+    grout = next(key for key in expected if 'unsanded' in key)
+    tile = next(key for key in expected if 'penny_round' in key)
+    changed = copy.deepcopy(expected)
+    changed[grout]['parsers']['GroutPageParser']['specifications']['weight'] = '25 lbs'
+    del changed[grout]['parsers']['GroutParser']['application']
+    del changed[tile]
+
+    results = run_corpus(corpus, changed, rounds=1)
+    assert not results['passed'] and results['accuracy'] < 1.0
+    grout_results = results['parsers']['GroutPageParser']
+    assert grout_results['differences'] == [{'page': grout, 'field': 'specifications.weight',
+                                             'expected': '25 lbs', 'actual': '10 lbs'}]
+    assert grout_results['matched'] == grout_results['fields'] - 1
+    assert results['parsers']['GroutParser']['new_fields'] == [f"{grout} application"]
+    assert results['unrecorded'] == [f"{tile} TilePageParser", f"{tile} TileParser"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_expected(expected, os.path.join(tmp, 'expected.json'))
+        assert load_expected(path) == expected
+        assert run_corpus(corpus, load_expected(path), rounds=1)['passed']
+
+def test_known_wrong_fields():
+    """Known-wrong values lower accuracy without failing; a different value or a fixed field fails the run"""
+    corpus = load_corpus()
+    expected = record(corpus)
+    grout = next(key for key in expected if 'unsanded' in key)
+    assert expected[grout]['verified'] is False
+    marked = copy.deepcopy(expected)
+    marked[grout]['parsers']['GroutPageParser']['weight'] = '10 lb'
+    marked[grout]['known_wrong'] = {'GroutPageParser': {'weight': '10 lbs'}}
+
+    results = run_corpus(corpus, marked, rounds=1)
+    assert results['passed'] and results['known_wrong'] == 1 and results['accuracy'] < 1.0
+    assert results['parsers']['GroutPageParser']['known_wrong'] == [
+        {'page': grout, 'field': 'weight', 'expected': '10 lb', 'actual': '10 lbs'}]
+
+    marked[grout]['known_wrong']['GroutPageParser']['weight'] = '25 lbs'
+    assert not run_corpus(corpus, marked, rounds=1)['passed']
+
+    fixed = copy.deepcopy(expected)
+    fixed[grout]['known_wrong'] = {'GroutPageParser': {'weight': '10 lb'}}
+    results = run_corpus(corpus, fixed, rounds=1)
+    assert not results['passed'] and results['parsers']['GroutPageParser']['fixed'] == [f"{grout} weight"]
+
+def test_update_keeps_verified_fields():
+    """Recording fills in missing pages as unverified and leaves hand-verified entries alone"""
+    corpus = load_corpus()
+    expected = load_expected()
+    tile = next(key for key in expected if 'penny_round' in key)
+    partial = copy.deepcopy(expected)
+    del partial[tile]
+
+    recorded = record(corpus, expected=partial)
+    assert recorded[tile]['verified'] is False
+    assert all(recorded[key] == entry for key, entry in partial.items())
+    assert run_corpus(corpus, recorded, rounds=1)['unverified'] == [tile]
+
+def test_cached_pages_are_imported_by_family():
+    """--import-cache files cached product pages under their detected family and skips non-product URLs"""
+    corpus = {key: html for key, _, html in load_corpus()}
+    grout = next(html for key, html in corpus.items() if 'unsanded' in key)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(os.path.join(tmp, 'cache'))
+        cache.put('https://www.tileshop.com/products/custom-polyblend-unsanded-grout-351210', grout)
+        cache.put('https://www.tileshop.com/collections/grout', grout)
+        pages_dir = os.path.join(tmp, 'pages')
+
+        written = import_cached_pages(cache, pages_dir=pages_dir)
+        assert [os.path.basename(path) for path in written] == ['grout_custom_polyblend_unsanded_grout_351210.html']
+        assert open(written[0], encoding='utf-8').read() == grout
+        assert import_cached_pages(cache, pages_dir=pages_dir) == []  # Existing corpus pages are kept
+
+        imported = load_corpus((pages_dir,))
+        assert run_corpus(imported, record(imported), rounds=1)['passed']
+
+if __name__ == "__main__":
+    test_parsers_match_golden_corpus()
+    test_field_differences_are_reported()
+    test_known_wrong_fields()
+    test_update_keeps_verified_fields()
+    test_cached_pages_are_imported_by_family()
+    print("✅ Parser corpus tests passed")
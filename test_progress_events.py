@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test structured progress events from acquisition subprocesses
+"""
+
+import sys
+
+from modules.intelligence_manager import ScraperManager
+from progress_events import ProgressStats, RUN_START, URL_START, URL_DONE, RUN_END
+
+CHILD = """
+import progress_events as p
+p.emit(p.RUN_START, total=4)
+for i, outcome in enumerate(['success', 'failed', 'unchanged', 'success']):
+    p.emit(p.URL_START, url=f'https://www.tileshop.com/products/tile-{i}')
+    # Log text that the old pattern matching would have miscounted
+    print(f'Processing {i}: warning: found 99999 success timeout')
+    p.emit(p.URL_DONE, url=f'https://www.tileshop.com/products/tile-{i}', outcome=outcome,
+           error='HTTP 500' if outcome == 'failed' else None)
+p.emit(p.RUN_END, status='completed')
+"""
+
+def test_stats_fold_events():
+    """Totals come from event types, two runs sharing one total"""
+    stats = ProgressStats()
+    for event in [{'event': RUN_START, 'total': 3}, {'event': RUN_START, 'total': 2},
+                  {'event': URL_START, 'url': 'a'}, {'event': URL_DONE, 'url': 'a', 'outcome': 'success'},
+                  {'event': URL_DONE, 'url': 'b', 'outcome': 'failed', 'error': 'HTTP 404'},
+                  {'event': RUN_END}]:
+        stats.apply(event)
+    snapshot = stats.snapshot()
+    assert (snapshot['estimated_total'], snapshot['products_processed'], snapshot['success_count'],
+            snapshot['error_count'], snapshot['progress_percent']) == (5, 2, 1, 1, 20.0)
+    assert snapshot['current_url'] == 'a'   # One run still going
+    assert stats.last_error == 'HTTP 404'
+    print(f"✅ Folded stats: {snapshot}")
+
+def test_manager_reads_progress_pipe():
+    """The manager's stats follow the child's event pipe, not its stdout text"""
+    events = []
+    manager = ScraperManager(progress_callback=lambda kind, data: events.append(kind))
+    manager.reset_stats()
+    manager.is_running = True
+    manager._run_acquisition([sys.executable, '-c', CHILD])
+
+    assert (manager.stats['products_processed'], manager.stats['success_count'], manager.stats['error_count'],
+            manager.stats['unchanged_count'], manager.stats['estimated_total']) == (4, 2, 1, 1, 4)
+    assert len(manager.recent_successful_saves) == 2
+    assert len(manager.log_lines) == 4
+    assert events.count('progress_update') == 10 and events[-1] == 'completed'
+    print(f"✅ Manager stats from events: {manager.stats}")
+
+if __name__ == "__main__":
+    test_stats_fold_events()
+    test_manager_reads_progress_pipe()
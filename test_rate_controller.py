@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test the adaptive (AIMD) rate controller and its use by the fetch engine
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import curl_scraper
+from fetch_engine import FetchEngine
+from rate_controller import (AdaptiveRateController, parse_retry_after, read_rate_status,
+                             HEALTHY, SLOW, BACKOFF, NEUTRAL, RATE_WORKERS_ENV)
+
+def _controller(**kwargs):
+    kwargs.setdefault('status_file', None)
+    kwargs.setdefault('jitter', 0)
+    return AdaptiveRateController(**kwargs)
+
+def test_additive_increase_multiplicative_decrease():
+    """Healthy responses add, 429/5xx/timeouts halve, slow responses hold; bounds apply"""
+    controller = _controller(initial_rate=1.0, min_rate=0.1, max_rate=1.5, additive_increase=0.1)
+    assert controller.record(200, latency=0.2) == HEALTHY
+    assert abs(controller.rate - 1.1) < 1e-9
+    assert controller.record(200, latency=5.0) == SLOW and abs(controller.rate - 1.1) < 1e-9
+    assert controller.record(404, latency=0.1) == NEUTRAL and abs(controller.rate - 1.1) < 1e-9
+
+    assert controller.record(429) == BACKOFF and abs(controller.rate - 0.55) < 1e-9
+    controller.record(503)
+    controller.record(error='timeout')
+    controller.record(error='timeout')
+    assert controller.rate == 0.1  # Floor
+
+    for _ in range(50):
+        controller.record(304, latency=0.1)
+    assert controller.rate == 1.5  # Ceiling
+    print(f"✅ AIMD: {controller.snapshot()['counts']}")
+
+def test_retry_after_pauses_requests():
+    """Retry-After (seconds or HTTP date) delays the next slot"""
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+
+    controller = _controller(initial_rate=100, max_rate=100)
+    controller.wait()
+    controller.record(503, retry_after='0.3')
+    assert controller.wait() >= 0.25
+    print("✅ Retry-After honoured")
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    failures_left = 0
+
+    def do_GET(self):
+        if _FlakyHandler.failures_left > 0:
+            _FlakyHandler.failures_left -= 1
+            status, body = 429, b'slow down'
+        else:
+            status, body = 200, b'<html>ok</html>'
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_fetch_engine_feeds_controller():
+    """The engine paces through the controller and reports every response"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/products/tile-1"
+
+    controller = _controller(initial_rate=50, max_rate=60, additive_increase=1)
+    engine = FetchEngine(rate_controller=controller)
+    _FlakyHandler.failures_left = 2
+
+    start = time.monotonic()
+    results = [engine.fetch(url) for _ in range(6)]
+    elapsed = time.monotonic() - start
+
+    assert [r.status_code for r in results] == [429, 429, 200, 200, 200, 200]
+    assert controller.counts[BACKOFF] == 2 and controller.counts[HEALTHY] == 4
+    assert abs(controller.rate - (50 * 0.25 + 4)) < 1e-9
+    assert elapsed < 2
+    engine.close()
+    server.shutdown()
+    print(f"✅ Engine backed off to {controller.rate:.1f}/s and recovered")
+
+def test_workers_split_the_rate_budget():
+    """N worker processes together stay within one process's bounds and ramp"""
+    single = _controller(initial_rate=0.5, min_rate=0.1, max_rate=2.0, additive_increase=0.1)
+    shared = _controller(initial_rate=0.5, min_rate=0.1, max_rate=2.0, additive_increase=0.1, workers=4)
+    assert abs(shared.rate * 4 - single.rate) < 1e-9
+    assert abs(shared.max_rate * 4 - single.max_rate) < 1e-9 and abs(shared.min_rate * 4 - single.min_rate) < 1e-9
+    for _ in range(50):
+        single.record(200, latency=0.1)
+        shared.record(200, latency=0.1)
+    assert abs(shared.rate * 4 - single.rate) < 1e-9
+
+    # Worker processes pick their share up from the environment
+    code = 'from rate_controller import get_rate_controller; c = get_rate_controller(status_file=None); print(c.workers, c.max_rate)'
+    env = dict(os.environ, **{RATE_WORKERS_ENV: '4'})
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    assert output == ['4', '0.5']
+    print(f"✅ 4 workers x {shared.max_rate}/s ceiling")
+
+def test_dashboard_sums_worker_status_files():
+    """Each process writes its own status file; reading sums the live ones"""
+    status_file = os.path.join(tempfile.mkdtemp(), 'rate.{pid}.json')
+    controller = _controller(initial_rate=1.0, workers=2, status_file=status_file)
+    controller.publish_status(force=True)
+    assert os.path.exists(status_file.format(pid=os.getpid()))
+
+    other = dict(controller.snapshot(), pid=os.getppid(), rate_per_second=0.25, requests_per_minute=15.0,
+                 last_signal=BACKOFF, counts={HEALTHY: 1, SLOW: 0, BACKOFF: 2, NEUTRAL: 0})
+    with open(status_file.format(pid=os.getppid()), 'w') as f:
+        json.dump(other, f)
+    gone = dict(other, pid=2 ** 22 + 1)  # Not a running process
+    with open(status_file.format(pid=gone['pid']), 'w') as f:
+        json.dump(gone, f)
+
+    status = read_rate_status(status_file)
+    assert status['processes'] == 2
+    assert status['rate_per_second'] == 0.75 and status['requests_per_minute'] == 45.0
+    assert status['last_signal'] == BACKOFF and status['counts'][BACKOFF] == 2
+    assert read_rate_status(os.path.join(tempfile.mkdtemp(), 'rate.{pid}.json')) is None
+    print(f"✅ Dashboard rate {status['requests_per_minute']} req/min over {status['processes']} processes")
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path.endswith('slow'):
+            time.sleep(3)
+        status, body = (503, b'busy') if self.path.endswith('busy') else (200, b'<html>ok</html>')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_curl_path_reports_congestion(monkeypatch):
+    """curl timeouts and HTTP errors back the controller off; pages come back without the status trailer"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/products/"
+
+    controller = _controller(initial_rate=100, max_rate=100)
+    monkeypatch.setattr(curl_scraper, 'FETCH_ENGINE_AVAILABLE', False)
+    monkeypatch.setattr(curl_scraper, 'get_rate_controller', lambda: controller)
+    monkeypatch.setattr(curl_scraper, 'CURL_TIMEOUT', 1)
+
+    assert curl_scraper.get_page(base + 'tile-1') == '<html>ok</html>'
+    assert controller.counts[HEALTHY] == 1
+
+    assert curl_scraper.get_page(base + 'busy') is None
+    assert curl_scraper.last_fetch_error() == 'HTTP 503' and controller.counts[BACKOFF] == 1
+
+    assert curl_scraper.get_page(base + 'slow') is None
+    assert curl_scraper.last_fetch_error() == 'timeout' and controller.counts[BACKOFF] == 2
+    server.shutdown()
+    print(f"✅ curl path signals: {controller.counts}")
+
+if __name__ == "__main__":
+    test_additive_increase_multiplicative_decrease()
+    test_retry_after_pauses_requests()
+    test_fetch_engine_feeds_controller()
+    test_workers_split_the_rate_budget()
+    test_dashboard_sums_worker_status_files()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the regex registry: literal pre-checks and chains that match the sequential loop
+"""
+
+import re
+
+from regex_registry import RegexRegistry, required_literal
+
+def sequential_first(patterns, text, flags=0, accept=None):
+    for pattern in patterns:
+        match = re.search(pattern, text, flags)
+        if match and (accept is None or accept(match)):
+            return match.group(0)
+    return None
+
+def test_required_literal():
+    """Only text every match must contain is used for the substring pre-check"""
+    assert required_literal(r'Box Weight[:\s]*([0-9.]+\s*lbs?)', re.IGNORECASE) == 'box weight'
+    assert required_literal(r'"PDPInfo_EdgeType","Value":"([^"]+)"') == '"PDPInfo_EdgeType","Value":"'
+    assert required_literal(r'window\.open\(["\']([^"\']*\.pdf)') == 'window.open('
+    assert required_literal(r'x{2,3}yyyz') == 'yyyz'
+    assert required_literal(r'Pieces?\s+per') == 'Piece'
+    assert required_literal(r'Thickness|Depth') == ''           # Top-level alternation
+    assert required_literal(r'(?i)Thickness') == ''             # Inline flags
+    assert required_literal(r'(\d+)\s*lb') == ''                # Too short to help
+
+def test_chain_matches_sequential_search():
+    """Chains return what trying each pattern in turn returns, and count skipped patterns"""
+    registry = RegexRegistry()
+    patterns = [r'Box Quantity[:\s]*([0-9]+)', r'Pieces per Box[:\s]*([0-9]+)', r'Quantity[:\s]*([0-9]+)']
+    chain = registry.chain('test.box_quantity', patterns, re.IGNORECASE)
+    texts = [
+        '<li>Pieces per Box: 12</li><li>Box Quantity: 8</li>',
+        '<li>QUANTITY: 3</li>',
+        '<li>pieces per box: 6</li>',
+        '<li>Pieces per Boxes</li>',
+        'Kelvin ſign: BOX QUANTİTY: 4 - Box Quantity: 5',     # Case-fold specials skip the pre-check
+        '',
+    ]
+    for text in texts:
+        match = chain.first(text)
+        assert (match.group(0) if match else None) == sequential_first(patterns, text, re.IGNORECASE), text
+
+    # A rejected match falls through to the next pattern, like the old loop's `continue`
+    accept = lambda m: int(m.group(1)) > 10
+    text = '<li>Box Quantity: 8</li><li>Pieces per Box: 12</li>'
+    assert chain.first(text, accept).group(0) == sequential_first(patterns, text, re.IGNORECASE, accept)
+    assert chain.rank(chain.first(text, accept)) == 1
+
+    stats = {s['name']: s for s in registry.statistics()}
+    assert stats['test.box_quantity[0]']['skipped'] >= 2
+    assert registry.chain('test.box_quantity', patterns, re.IGNORECASE) is chain
+    try:
+        registry.chain('test.box_quantity', patterns[:2], re.IGNORECASE)
+        assert False, "Re-registering a chain with different patterns should fail"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_required_literal()
+    test_chain_matches_sequential_search()
+    print("✅ Regex registry tests passed")
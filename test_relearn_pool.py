@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the warm relearn worker pool (with a stand-in extraction handler)
+"""
+
+import os
+import time
+
+from relearn_pool import RelearnPool
+
+BASE = "https://www.tileshop.com/products/"
+WARM_UP_SECONDS = 0.5
+warm_ups = 0
+
+def _slow_warmup():
+    """Stands in for importing tileshop_learner and building its helpers"""
+    global warm_ups
+    time.sleep(WARM_UP_SECONDS)
+    warm_ups += 1
+
+def _no_warmup():
+    pass
+
+def _fake_relearn(url):
+    if 'broken' in url:
+        raise ValueError('no product title')
+    print(f"Relearned {url}")
+    return {'success': True, 'sku': url.rsplit('-', 1)[-1], 'pid': os.getpid(), 'warm_ups': warm_ups}
+
+def test_jobs_reuse_a_warm_worker():
+    """Warm-up is paid once per worker, not per relearn"""
+    results = []
+    pool = RelearnPool(workers=1, handler=_fake_relearn, warmup=_slow_warmup, on_result=results.append).start()
+    try:
+        job_ids = [pool.submit(BASE + f'tile-{sku}', sku=str(sku)) for sku in (101, 102, 103)]
+        finished = [pool.wait(job_id, timeout=30) for job_id in job_ids]
+    finally:
+        pool.stop()
+
+    assert [r['sku'] for r in finished] == ['101', '102', '103']
+    assert len({r['pid'] for r in finished}) == 1 and all(r['warm_ups'] == 1 for r in finished)
+    assert all(r['elapsed'] < WARM_UP_SECONDS for r in finished)
+    assert finished[0]['log'] == [f"Relearned {BASE}tile-101"]
+    assert len(results) == 3 and pool.status()['completed'] == 3
+    print(f"✅ 3 relearns on one warm worker, slowest {max(r['elapsed'] for r in finished):.3f}s")
+
+def test_failed_job_keeps_worker_alive():
+    """An extraction error is reported for that job and the worker carries on"""
+    pool = RelearnPool(workers=1, handler=_fake_relearn, warmup=_no_warmup).start()
+    try:
+        broken = pool.wait(pool.submit(BASE + 'broken-1', sku='1'), timeout=30)
+        healthy = pool.wait(pool.submit(BASE + 'tile-2', sku='2'), timeout=30)
+        status = pool.status()
+    finally:
+        pool.stop()
+
+    assert broken['success'] is False and broken['error'] == 'ValueError: no product title'
+    assert broken['sku'] == '1'
+    assert healthy['success'] is True
+    assert (status['alive'], status['completed'], status['failed']) == (1, 1, 1)
+    print("✅ Failed relearn reported, worker kept serving")
+
+if __name__ == "__main__":
+    test_jobs_reuse_a_warm_worker()
+    test_failed_job_keeps_worker_alive()
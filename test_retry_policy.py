@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test failure classification, retry backoff and dead-lettering in the frontier
+"""
+
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from retry_policy import (RETRY_POLICIES, TIMEOUT, CLIENT_ERROR, SERVER_ERROR, PARSE_FAILURE, DB_FAILURE,
+                          DEAD_LETTER, classify_failure, plan_retry)
+from url_frontier import URLFrontier
+
+BASE = "https://www.tileshop.com/products/tile-"
+
+def test_classification_and_backoff():
+    """Errors map to classes; delays double per attempt within the jitter band and stop at the limit"""
+    assert classify_failure('Fetch failed: HTTP 503') == SERVER_ERROR
+    assert classify_failure('Fetch failed: HTTP 429') == SERVER_ERROR
+    assert classify_failure('Fetch failed: HTTP 404') == CLIENT_ERROR
+    assert classify_failure('Fetch failed: timeout') == TIMEOUT
+    assert classify_failure('Curl scraper failed to extract data') == PARSE_FAILURE
+    assert classify_failure('Database save failed') == DB_FAILURE
+    assert classify_failure('Crawl timeout after 3 attempts (95s)') == TIMEOUT   # Crawl4AI render failures
+    assert classify_failure('HTTP 502') == SERVER_ERROR
+
+    policy = RETRY_POLICIES[TIMEOUT]
+    rng = random.Random(1)
+    now = datetime(2025, 7, 1)
+    for attempt in range(1, policy.max_attempts):
+        step = min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1))
+        delay = (plan_retry(TIMEOUT, attempt, now, rng) - now).total_seconds()
+        assert step / 2 <= delay <= step
+    assert plan_retry(TIMEOUT, policy.max_attempts, now) is None
+    assert plan_retry(CLIENT_ERROR, RETRY_POLICIES[CLIENT_ERROR].max_attempts, now) is None
+    print("✅ Classification and jittered backoff")
+
+def test_frontier_retries_alongside_fresh_work():
+    """Due retries are mixed into pending work; exhausted URLs are dead-lettered"""
+    frontier = URLFrontier(os.path.join(tempfile.mkdtemp(), 'frontier.db'), auto_migrate=False)
+    frontier.replace_sitemap([{'url': f'{BASE}{i}'} for i in range(8)])
+
+    status, retry_at = frontier.record_failure(f'{BASE}0', 'Fetch failed: HTTP 503')
+    assert status == 'failed' and retry_at > datetime.now().isoformat()
+    assert f'{BASE}0' not in frontier.get_pending_urls(include_retries=True)   # Backoff not over yet
+
+    later = datetime.now() + timedelta(days=1)
+    assert frontier.get_due_retries(now=later) == [f'{BASE}0']
+    frontier.conn.execute('UPDATE urls SET next_retry_at = ? WHERE url = ?', (datetime.now().isoformat(), f'{BASE}0'))
+    batch = frontier.get_pending_urls(4, include_retries=True)
+    assert len(batch) == 4 and batch[0] == f'{BASE}0' and batch[1:] == [f'{BASE}{i}' for i in (1, 2, 3)]
+
+    for _ in range(RETRY_POLICIES[CLIENT_ERROR].max_attempts):
+        outcome = frontier.record_failure(f'{BASE}5', 'Fetch failed: HTTP 404')
+    assert outcome == (DEAD_LETTER, None)
+    record = frontier.get_url(f'{BASE}5')
+    assert (record['error_class'], record['failure_count']) == (CLIENT_ERROR, 2)
+
+    summary = frontier.retry_summary()
+    assert (summary['scheduled'], summary['due'], summary['dead_letter']) == (1, 1, 1)
+    assert summary['by_class'] == {SERVER_ERROR: {'scheduled': 1, 'dead_letter': 0},
+                                   CLIENT_ERROR: {'scheduled': 0, 'dead_letter': 1}}
+    assert frontier.get_statistics()[DEAD_LETTER] == 1
+
+    frontier.update_status(f'{BASE}0', 'completed')
+    assert frontier.get_url(f'{BASE}0')['next_retry_at'] is None
+    assert frontier.reset_statuses(from_status=DEAD_LETTER) == 1
+    assert frontier.get_url(f'{BASE}5')['failure_count'] == 0
+    print(f"✅ Retry queue: {summary}")
+
+if __name__ == "__main__":
+    test_classification_and_backoff()
+    test_frontier_retries_alongside_fresh_work()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test that single-fetch mode extracts the same fields as the legacy
+three-request (main, #resources, #specifications) mode on saved pages
+"""
+
+import glob
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import curl_scraper
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'pages')
+
+class _SavedPageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    pages = {}
+    requests_served = 0
+
+    def do_GET(self):
+        _SavedPageHandler.requests_served += 1
+        body = self.pages.get(self.path.rsplit('/', 1)[-1], b'')
+        self.send_response(200 if body else 404)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _comparable(product_data):
+    product_data = dict(product_data)
+    product_data.pop('_crawl_results', None)
+    return json.loads(json.dumps(product_data, sort_keys=True, default=str))
+
+def test_single_fetch_matches_multi_fetch():
+    """Per-field output is identical and only one request is made per product"""
+    pages = sorted(glob.glob(os.path.join(PAGES_DIR, '*.html')))
+    assert pages, "No saved pages found"
+    _SavedPageHandler.pages = {os.path.basename(p)[:-5]: open(p, 'rb').read() for p in pages}
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SavedPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/products/"
+
+    original_sleep = curl_scraper.time.sleep
+    original_cache = curl_scraper.PAGE_CACHE_AVAILABLE
+    curl_scraper.time.sleep = lambda seconds: None
+    curl_scraper.PAGE_CACHE_AVAILABLE = False  # Keep the real page cache clean
+    try:
+        for name in _SavedPageHandler.pages:
+            url = base + name
+
+            _SavedPageHandler.requests_served = 0
+            legacy = curl_scraper.scrape_product_with_curl(url, single_fetch=False)
+            legacy_requests = _SavedPageHandler.requests_served
+
+            _SavedPageHandler.requests_served = 0
+            single = curl_scraper.scrape_product_with_curl(url, single_fetch=True)
+            single_requests = _SavedPageHandler.requests_served
+
+            assert legacy and single
+            assert _comparable(single) == _comparable(legacy), f"Field mismatch for {name}"
+            assert legacy_requests == 3 and single_requests == 1
+            print(f"✅ {name}: identical fields, {legacy_requests} → {single_requests} requests")
+    finally:
+        curl_scraper.time.sleep = original_sleep
+        curl_scraper.PAGE_CACHE_AVAILABLE = original_cache
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_single_fetch_matches_multi_fetch()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test streaming sitemap ingestion: sitemap index, .xml.gz children and
+delta application against the frontier
+"""
+
+import gzip
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sitemap_ingest import ingest_sitemap, iter_sitemap_entries
+from url_frontier import URLFrontier
+
+BASE = "https://www.tileshop.com/products/"
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+def _urlset(entries):
+    urls = ''.join(f'<url><loc>{url}</loc><lastmod>{lastmod}</lastmod></url>' for url, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{urls}</urlset>'.encode('utf-8')
+
+class _SitemapHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    files = {}
+
+    def do_GET(self):
+        body, headers = self.files.get(self.path, (b'', {}))
+        self.send_response(200 if body else 404)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _serve(products_a, products_b):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SitemapHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    root = f"http://127.0.0.1:{server.server_address[1]}"
+    index = (f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>'
+             f'<sitemap><loc>{root}/sitemap-products-1.xml</loc></sitemap>'
+             f'<sitemap><loc>{root}/sitemap-products-2.xml.gz</loc></sitemap>'
+             f'</sitemapindex>').encode('utf-8')
+    _SitemapHandler.files = {
+        '/sitemap.xml': (index, {'Content-Type': 'application/xml'}),
+        # Compressed in transit only - urllib3 decodes it
+        '/sitemap-products-1.xml': (gzip.compress(_urlset(products_a)), {'Content-Encoding': 'gzip'}),
+        # A gzip file served as-is
+        '/sitemap-products-2.xml.gz': (gzip.compress(_urlset(products_b)), {'Content-Type': 'application/x-gzip'}),
+    }
+    return server, f"{root}/sitemap.xml"
+
+def test_index_and_gzip_children_are_streamed():
+    """Index children (transfer-gzipped and .xml.gz) are followed in order"""
+    server, url = _serve([(BASE + 'tile-a-1', '2025-07-01')], [(BASE + 'tile-b-2', '2025-07-02'),
+                                                               ('https://www.tileshop.com/about', '2025-07-02')])
+    stats = {}
+    entries = list(iter_sitemap_entries(url, stats=stats))
+    assert entries == [(BASE + 'tile-a-1', '2025-07-01'), (BASE + 'tile-b-2', '2025-07-02'),
+                       ('https://www.tileshop.com/about', '2025-07-02')]
+    assert stats['sitemaps'] == 3
+    server.shutdown()
+    print("✅ Sitemap index with gzip children streamed")
+
+def test_refresh_applies_only_the_delta():
+    """Unchanged URLs keep their progress; added/changed are queued, removed are dropped"""
+    tmp = tempfile.mkdtemp()
+    frontier = URLFrontier(os.path.join(tmp, 'frontier.db'), auto_migrate=False)
+    frontier.replace_sitemap([
+        {'url': BASE + 'tile-a-1', 'lastmod': '2025-07-01'},
+        {'url': BASE + 'tile-b-2', 'lastmod': '2025-07-01'},
+        {'url': BASE + 'tile-c-3', 'lastmod': '2025-07-01'},
+        {'url': BASE + 'tile-e-5', 'lastmod': None},
+    ])
+    for url in (BASE + 'tile-a-1', BASE + 'tile-b-2', BASE + 'tile-c-3', BASE + 'tile-e-5'):
+        frontier.update_status(url, 'completed')
+
+    server, url = _serve([(BASE + 'tile-a-1', '2025-07-01'), (BASE + 'tile-b-2', '2025-07-09'),
+                          (BASE + 'tile-e-5', '2025-07-05')],
+                         [(BASE + 'tile-d-4', '2025-07-09'), (BASE + 'tile-d-4-sample', '2025-07-09')])
+    result = ingest_sitemap(url, frontier=frontier, sitemap_file=os.path.join(tmp, 'sitemap.json'))
+    server.shutdown()
+
+    assert (result['added'], result['removed'], result['lastmod_changed'], result['unchanged']) == (1, 1, 1, 2)
+    assert result['lastmod_filled'] == 1
+    assert frontier.get_url(BASE + 'tile-a-1')['scrape_status'] == 'completed'
+    # A missing lastmod is recorded without requeueing, so the next refresh can spot changes
+    filled = frontier.get_url(BASE + 'tile-e-5')
+    assert filled['scrape_status'] == 'completed' and filled['lastmod'] == '2025-07-05'
+    changed = frontier.get_url(BASE + 'tile-b-2')
+    assert changed['scrape_status'] == 'pending' and changed['lastmod'] == '2025-07-09'
+    assert frontier.get_url(BASE + 'tile-c-3') is None
+    assert frontier.get_pending_urls() == [BASE + 'tile-d-4', BASE + 'tile-b-2']
+
+    stats = frontier.get_statistics()
+    assert (stats['total_urls'], stats['completed'], stats['pending'], stats['never_attempted']) == (4, 2, 2, 1)
+    assert frontier.get_meta('source_url') == url
+    print(f"✅ Delta applied: {result}")
+
+if __name__ == "__main__":
+    test_index_and_gzip_children_are_streamed()
+    test_refresh_applies_only_the_delta()
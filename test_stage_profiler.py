@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test per-stage timing histograms and their path to the dashboard's ScraperManager
+"""
+
+import json
+import sys
+import time
+
+import stage_profiler
+from modules.intelligence_manager import ScraperManager
+from stage_profiler import StageProfiler, profile_stage, stage
+
+# Child acquisition process: enabled through the manager's environment, publishes one delta
+CHILD = """
+import time
+import stage_profiler
+from stage_profiler import profile_stage, stage
+assert stage_profiler.is_enabled()
+
+@profile_stage('db.docker')
+def write():
+    time.sleep(0.02)
+
+for _ in range(3):
+    write()
+    with stage('detect'):
+        sum(range(20000))
+stage_profiler.publish(force=True)
+print('done')
+"""
+
+def test_rolling_histograms_and_deltas():
+    """Windowed percentiles, slice expiry, JSON deltas between processes, and no cost while disabled"""
+    profiler = StageProfiler(enabled=True, window_seconds=60)
+    start = 1_000_000.0
+    for i in range(100):
+        profiler.record('extract', wall=0.004 if i < 95 else 0.2, cpu=0.003, now=start + i * 0.1)
+    profiler.record('llm.category', wall=0.5, cpu=0.001, now=start + 5)
+
+    extract = profiler.snapshot(now=start + 10)['stages']['extract']
+    assert extract['count'] == 100 and extract['total_count'] == 100
+    assert 3.2 <= extract['wall_p50_ms'] <= 6.4 and extract['wall_max_ms'] == 200.0
+    assert extract['wall_p99_ms'] == 200.0 and abs(extract['cpu_ratio'] - 0.3 / 1.38) < 0.001
+    windowed = profiler.snapshot(now=start + 10)['stages']
+    assert list(windowed) == ['extract', 'llm.category']  # Slowest total first
+    # Samples leave the window once their slice is older than window_seconds
+    assert profiler.snapshot(now=start + 100)['stages']['extract']['count'] == 0
+
+    delta = json.loads(json.dumps(profiler.take_delta()))
+    assert profiler.take_delta() == {}
+    dashboard = StageProfiler(enabled=True, window_seconds=60)
+    dashboard.merge(delta, now=start + 10, forward=False)
+    assert dashboard.snapshot(now=start + 10)['stages'] == windowed
+    assert dashboard.take_delta() == {}
+
+    calls = []
+    timed = profile_stage('test.stage')(lambda value: calls.append(value) or value)
+    was_enabled = stage_profiler.is_enabled()
+    try:
+        stage_profiler.disable()
+        assert timed(1) == 1 and stage('test.block') is stage('test.other')
+        assert 'test.stage' not in stage_profiler.get_profiler().snapshot()['stages']
+        stage_profiler.enable()
+        assert timed(2) == 2
+        with stage('test.block'):
+            time.sleep(0.01)
+        stages = stage_profiler.get_profiler().snapshot()['stages']
+        assert stages['test.stage']['count'] == 1 and stages['test.block']['wall_max_ms'] >= 10
+        assert stages['test.block']['cpu_ratio'] < 0.5  # Sleeping is wall time, not CPU
+    finally:
+        stage_profiler.get_profiler().reset()
+        stage_profiler.get_profiler().enabled = was_enabled
+    assert calls == [1, 2]
+
+def test_manager_collects_child_stage_profile():
+    """A profiled acquisition process's stage_profile events reach get_status() without touching progress stats"""
+    manager = ScraperManager()
+    manager.reset_stats()
+    manager.profile_stages = True
+    manager.is_running = True
+    manager._run_acquisition([sys.executable, '-c', CHILD])
+
+    profile = manager.get_status()['stage_profile']
+    assert profile['enabled'] and list(profile['stages']) == ['db.docker', 'detect']
+    docker = profile['stages']['db.docker']
+    assert docker['count'] == 3 and docker['wall_mean_ms'] >= 20 and docker['cpu_ratio'] < 0.5
+    assert profile['stages']['detect']['count'] == 3
+    assert manager.stats['products_processed'] == 0
+    assert any('done' in line['message'] for line in manager.log_lines)
+
+    manager.profile_stages = False
+    assert manager.get_status()['stage_profile'] is None
+    manager.reset_stats()
+    assert manager.get_stage_profile()['stages'] == {}
+
+if __name__ == "__main__":
+    test_rolling_histograms_and_deltas()
+    test_manager_collects_child_stage_profile()
+    print("✅ Stage profiler tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test that importing tileshop_learner is quick and silent, with extraction components built on first use
+"""
+
+import io
+import os
+import subprocess
+import sys
+import threading
+from contextlib import redirect_stdout
+
+IMPORT_BUDGET_SECONDS = 1.0
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import tileshop_learner
+elapsed = time.perf_counter() - start
+print(repr((elapsed, sorted(tileshop_learner._components), 'anthropic' in sys.modules)))
+"""
+
+def test_import_is_fast_and_side_effect_free():
+    """A fresh interpreter imports tileshop_learner within budget, prints nothing and builds no components"""
+    result = subprocess.run([sys.executable, '-c', IMPORT_PROBE], capture_output=True, text=True, timeout=60,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.strip().splitlines()
+    assert len(lines) == 1, f"Unexpected import output: {lines[:-1]}"
+    elapsed, components, anthropic_loaded = eval(lines[0])
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"import tileshop_learner took {elapsed:.2f}s"
+    assert components == [] and not anthropic_loaded
+    print(f"✅ import tileshop_learner: {elapsed * 1000:.0f} ms")
+
+def test_components_are_built_once_on_first_use():
+    """Concurrent first calls share one instance per component; extraction builds them on demand"""
+    import tileshop_learner
+    from replay_server import load_pages
+
+    saved = dict(tileshop_learner._components)
+    tileshop_learner._components.clear()
+    try:
+        output = io.StringIO()
+        detectors = []
+        with redirect_stdout(output):
+            threads = [threading.Thread(target=lambda: detectors.append(tileshop_learner.get_page_detector()))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert len(detectors) == 8 and all(detector is detectors[0] for detector in detectors)
+        assert output.getvalue().count("Intelligent page structure detection loaded") == 1
+        assert sorted(tileshop_learner._components) == ['page_detector']
+
+        stem, body = next(iter(load_pages().items()))
+        with redirect_stdout(io.StringIO()):
+            product = tileshop_learner.extract_product_data({'main': {'html': body.decode('utf-8')}},
+                                                            f"https://www.tileshop.com/products/{stem}")
+        assert product and product.get('title')
+        assert tileshop_learner.get_spec_extractor() is tileshop_learner._components['spec_extractor']
+        assert tileshop_learner.get_enhanced_categorizer() is tileshop_learner._components['categorizer']
+        assert tileshop_learner.get_page_detector() is detectors[0]
+    finally:
+        tileshop_learner._components.clear()
+        tileshop_learner._components.update(saved)
+
+if __name__ == "__main__":
+    test_import_is_fast_and_side_effect_free()
+    test_components_are_built_once_on_first_use()
+    print("✅ tileshop_learner import tests passed")
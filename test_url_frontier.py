@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the indexed URL frontier: JSON migration, maintained counters and queue order
+"""
+
+import json
+import os
+import tempfile
+
+from url_frontier import URLFrontier
+
+BASE = "https://www.tileshop.com/products/"
+
+def _make_frontier():
+    tmp = tempfile.mkdtemp()
+    sitemap = {
+        'downloaded_at': '2025-07-09T15:55:04',
+        'total_urls': 5,
+        'status': 'ready',
+        'urls': [
+            {'url': BASE + 'tile-a-1', 'lastmod': None, 'scraped_at': '2025-07-09T16:05:58', 'scrape_status': 'completed'},
+            {'url': BASE + 'tile-b-2', 'lastmod': None, 'scraped_at': None, 'scrape_status': 'pending'},
+            {'url': BASE + 'grout-c-3', 'lastmod': None, 'scraped_at': '2025-07-08T10:00:00', 'scrape_status': 'pending'},
+            {'url': BASE + 'grout-d-4', 'lastmod': None, 'scraped_at': '2025-07-09T10:00:00', 'scrape_status': 'failed', 'error': 'timeout'},
+            {'url': BASE + 'tile-e-5', 'lastmod': None, 'scraped_at': None, 'scrape_status': 'pending'},
+        ]
+    }
+    categorized = {'categorized_products': {
+        'TILES': [{'url': BASE + 'tile-a-1', 'sku': '1'}, {'url': BASE + 'tile-b-2', 'sku': '2'}, {'url': BASE + 'tile-e-5', 'sku': '5'}],
+        'GROUT': [{'url': BASE + 'grout-c-3', 'sku': '3'}, {'url': BASE + 'grout-d-4', 'sku': '4'}, {'url': BASE + 'not-in-sitemap-9', 'sku': '9'}],
+    }}
+    sitemap_file = os.path.join(tmp, 'tileshop_sitemap.json')
+    categorized_file = os.path.join(tmp, 'categorized_sitemap.json')
+    json.dump(sitemap, open(sitemap_file, 'w'))
+    json.dump(categorized, open(categorized_file, 'w'))
+
+    frontier = URLFrontier(os.path.join(tmp, 'frontier.db'), auto_migrate=False)
+    frontier.migrate_from_json(sitemap_file, categorized_file)
+    return frontier
+
+def _recount(frontier):
+    """Brute-force counts to check the trigger-maintained counters"""
+    urls = frontier.get_urls()
+    return {
+        'pending': sum(1 for u in urls if u['scrape_status'] == 'pending'),
+        'completed': sum(1 for u in urls if u['scrape_status'] == 'completed'),
+        'failed': sum(1 for u in urls if u['scrape_status'] == 'failed'),
+        'never_attempted': sum(1 for u in urls if u['scrape_status'] == 'pending' and u['scraped_at'] is None),
+    }
+
+def test_migration_and_statistics():
+    """Statuses, errors and categories survive migration; stats match a full recount"""
+    frontier = _make_frontier()
+    stats = frontier.get_statistics()
+
+    assert stats['total_urls'] == 5
+    assert {k: stats[k] for k in ('pending', 'completed', 'failed', 'never_attempted')} == _recount(frontier)
+    assert stats['oldest_completion'] == '2025-07-09T16:05:58'
+    assert frontier.get_url(BASE + 'grout-d-4')['error'] == 'timeout'
+    assert frontier.categories() == {'TILES': 3, 'GROUT': 2}
+    assert frontier.get_meta('downloaded_at') == '2025-07-09T15:55:04'
+    print(f"✅ Migrated: {stats}")
+
+def test_counters_follow_updates_and_resets():
+    """Trigger-maintained counters stay exact through updates and resets"""
+    frontier = _make_frontier()
+    frontier.update_status(BASE + 'tile-b-2', 'completed')
+    frontier.update_status(BASE + 'tile-e-5', 'failed', 'HTTP 500')
+    assert not frontier.update_status(BASE + 'missing-0', 'completed')
+    stats = frontier.get_statistics()
+    assert {k: stats[k] for k in ('pending', 'completed', 'failed', 'never_attempted')} == _recount(frontier)
+
+    assert frontier.reset_statuses(from_status='failed') == 2
+    reset = frontier.get_url(BASE + 'tile-e-5')
+    assert reset['scrape_status'] == 'pending' and reset['error'] is None and reset['previous_error'] == 'HTTP 500'
+
+    frontier.reset_statuses()
+    assert frontier.get_statistics()['never_attempted'] == 5 == _recount(frontier)['never_attempted']
+    print("✅ Counters exact after updates and resets")
+
+def test_pending_order_and_category_filter():
+    """Never-attempted URLs first in sitemap order, then oldest attempts; category filter applies"""
+    frontier = _make_frontier()
+    assert frontier.get_pending_urls() == [BASE + 'tile-b-2', BASE + 'tile-e-5', BASE + 'grout-c-3']
+    assert frontier.get_pending_urls(1) == [BASE + 'tile-b-2']
+    assert frontier.get_pending_urls(category='grout') == [BASE + 'grout-c-3']
+    print("✅ Pending order and category filter")
+
+def test_populated_frontier_keeps_progress():
+    """migrate refuses to overwrite crawl state; apply-categories only touches categories"""
+    frontier = _make_frontier()
+    tmp = os.path.dirname(frontier.db_path)
+    sitemap_file = os.path.join(tmp, 'tileshop_sitemap.json')
+    categorized_file = os.path.join(tmp, 'categorized_sitemap.json')
+    frontier.update_status(BASE + 'tile-b-2', 'completed')
+    frontier.record_failure(BASE + 'tile-e-5', 'HTTP 404 Not Found')
+    before = {u['url']: u for u in frontier.get_urls()}
+
+    try:
+        frontier.migrate_from_json(sitemap_file, categorized_file)
+        assert False, "migrate over a populated frontier must be refused"
+    except RuntimeError:
+        pass
+    assert {u['url']: u for u in frontier.get_urls()} == before
+
+    json.dump({'categorized_products': {'TRIM': [{'url': BASE + 'tile-b-2', 'sku': '2', 'product_name': 'Trim B'}]}},
+              open(categorized_file, 'w'))
+    assert frontier.apply_categories_from_json(categorized_file) == (1, 0)
+    after = frontier.get_url(BASE + 'tile-b-2')
+    assert after['category'] == 'TRIM' and after['scrape_status'] == 'completed'
+    assert frontier.get_url(BASE + 'tile-e-5') == before[BASE + 'tile-e-5']
+
+    # --force is the explicit escape hatch: statuses come back from the snapshot
+    frontier.migrate_from_json(sitemap_file, None, force=True)
+    assert frontier.get_url(BASE + 'tile-b-2')['scrape_status'] == 'pending'
+    print("✅ Populated frontier protected from migrate")
+
+if __name__ == "__main__":
+    test_migration_and_statistics()
+    test_counters_follow_updates_and_resets()
+    test_pending_order_and_category_filter()
+    test_populated_frontier_keeps_progress()
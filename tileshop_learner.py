@@ -16,6 +16,16 @@ from datetime import datetime, timezone, timedelta
 import time
 from urllib.parse import urlparse, urljoin
 import sys
+import threading
+from parsed_page import ParsedPage
+from regex_registry import compile_pattern, pattern_chain
+from next_data_extractor import PRICE_FIELDS, extract_from_next_data, is_complete
+from stage_profiler import profile_stage, stage
+
+# Use complete __NEXT_DATA__ payloads in place of the color-variation page scan and the predictive
+# resource probes, and to fill fields page parsing leaves empty. Every other field still comes from
+# page parsing; test_next_data_extractor holds both paths to the same values.
+NEXT_DATA_FAST_PATH = True
 
 # Import category-specific parsers
 try:
@@ -29,35 +39,36 @@ except ImportError:
 try:
     from enhanced_categorization_system import EnhancedCategorizer
     ENHANCED_CATEGORIZATION_AVAILABLE = True
-    enhanced_categorizer = EnhancedCategorizer()
-    print("✅ Enhanced categorization system loaded")
 except ImportError:
     print("Warning: Enhanced categorization not available. Using basic categorization.")
     ENHANCED_CATEGORIZATION_AVAILABLE = False
-    enhanced_categorizer = None
 
 # Import enhanced specification extractor
 try:
     from enhanced_specification_extractor import EnhancedSpecificationExtractor
     ENHANCED_SPECIFICATION_EXTRACTION_AVAILABLE = True
-    spec_extractor = EnhancedSpecificationExtractor()
-    print("✅ Enhanced specification extractor loaded")
 except ImportError:
     print("Warning: Enhanced specification extraction not available.")
     ENHANCED_SPECIFICATION_EXTRACTION_AVAILABLE = False
-    spec_extractor = None
 
 # Import intelligent page structure detection and specialized parsers
 try:
     from page_structure_detector import PageStructureDetector
     from specialized_parsers import get_parser_for_page_type
     INTELLIGENT_PARSING_AVAILABLE = True
-    page_detector = PageStructureDetector()
-    print("✅ Intelligent page structure detection loaded")
 except ImportError:
     print("Warning: Intelligent parsing not available. Using fallback parsing.")
     INTELLIGENT_PARSING_AVAILABLE = False
-    page_detector = None
+
+# Import sitemap-derived color variation index
+try:
+    from color_variation_index import get_color_variation_index
+    COLOR_VARIATION_INDEX_AVAILABLE = True
+except ImportError:
+    COLOR_VARIATION_INDEX_AVAILABLE = False
+
+# Batched Crawl4AI client - concurrent task polling, paced by the adaptive rate controller
+from crawl4ai_client import get_crawl4ai_client
 
 # Set EST timezone globally for the project
 EST = timezone(timedelta(hours=-5))  # EST is UTC-5
@@ -72,6 +83,7 @@ except ImportError:
 # Configuration
 CRAWL4AI_URL = "http://localhost:11235"
 CRAWL4AI_TOKEN = "tileshop"
+TAB_TASK_TIMEOUT = 180  # Tab renders wait up to 60s plus the js_code waits
 DB_CONFIG = {
     'host': 'localhost',
     'port': 5432,
@@ -85,6 +97,37 @@ SAMPLE_URLS = [
     "https://www.tileshop.com/products/penny-round-cloudy-porcelain-mosaic-wall-and-floor-tile-615826",  # Test carousel interaction for all colors (should have Moss, Sky Blue, etc.)
 ]
 
+# Extraction components are built on first use, so importing this module
+# (curl_scraper, acquire_from_sitemap, ScraperManager subprocesses) stays cheap
+_components = {}
+_components_lock = threading.Lock()
+
+def _component(name, factory, loaded_message):
+    """Process-wide instance of an extraction component, built on first use"""
+    with _components_lock:
+        if name not in _components:
+            _components[name] = factory()
+            print(loaded_message)
+        return _components[name]
+
+def get_enhanced_categorizer():
+    """Shared EnhancedCategorizer, or None when unavailable"""
+    if not ENHANCED_CATEGORIZATION_AVAILABLE:
+        return None
+    return _component('categorizer', EnhancedCategorizer, "✅ Enhanced categorization system loaded")
+
+def get_spec_extractor():
+    """Shared EnhancedSpecificationExtractor, or None when unavailable"""
+    if not ENHANCED_SPECIFICATION_EXTRACTION_AVAILABLE:
+        return None
+    return _component('spec_extractor', EnhancedSpecificationExtractor, "✅ Enhanced specification extractor loaded")
+
+def get_page_detector():
+    """Shared PageStructureDetector, or None when unavailable"""
+    if not INTELLIGENT_PARSING_AVAILABLE:
+        return None
+    return _component('page_detector', PageStructureDetector, "✅ Intelligent page structure detection loaded")
+
 def get_db_connection():
     """Get PostgreSQL connection using docker exec"""
     return psycopg2.connect(
@@ -110,6 +153,8 @@ def crawl_page_with_tabs(url):
     ]
     
     results = {}
+    jobs = []
+    tab_names = {}
     
     for crawl_url in urls_to_crawl:
         tab_name = crawl_url.split('#')[-1] if '#' in crawl_url else 'main'
@@ -256,47 +301,18 @@ def crawl_page_with_tabs(url):
             ]
         }
         
-        response = requests.post(f"{CRAWL4AI_URL}/crawl", headers=headers, json=crawl_data)
-        
-        if response.status_code != 200:
-            print(f"Failed to submit crawl request for {tab_name}: {response.status_code}")
-            continue
-        
-        response_data = response.json()
-        task_id = response_data.get('task_id')
-        print(f"Task ID for {tab_name}: {task_id}")
-        
-        # Handle both synchronous and asynchronous responses
-        if task_id is None:
-            # Synchronous response - results are immediate
-            if response_data.get('success') and response_data.get('results'):
-                results[tab_name] = response_data['results'][0]
-                print(f"✓ {tab_name} completed (synchronous)")
-            else:
-                print(f"✗ {tab_name} failed (synchronous): {response_data}")
+        jobs.append(([crawl_url], crawl_data))
+        tab_names[crawl_url] = tab_name
+    
+    # All tabs render at once; each task is polled with backoff instead of fixed 2s sleeps
+    client = get_crawl4ai_client(base_url=CRAWL4AI_URL, token=CRAWL4AI_TOKEN)
+    for crawl_url, result, error in client.run(jobs, task_timeout=TAB_TASK_TIMEOUT):
+        tab_name = tab_names[crawl_url]
+        if result:
+            results[tab_name] = result
+            print(f"✓ {tab_name} completed")
         else:
-            # Asynchronous response - wait for completion
-            max_attempts = 20
-            for attempt in range(max_attempts):
-                result_response = requests.get(f"{CRAWL4AI_URL}/task/{task_id}", headers=headers)
-                
-                if result_response.status_code == 200:
-                    result = result_response.json()
-                    if result.get('status') == 'completed':
-                        results[tab_name] = result.get('results', [{}])[0] if result.get('results') else None
-                        print(f"✓ {tab_name} completed (asynchronous)")
-                        break
-                    elif result.get('status') == 'failed':
-                        print(f"✗ {tab_name} failed (asynchronous): {result}")
-                        break
-                
-                time.sleep(2)
-        
-        # Realistic human-like delay between requests (15-30 seconds)
-        import random
-        delay = random.uniform(15, 30)
-        print(f"  ⏳ Human-like delay: {delay:.1f} seconds")
-        time.sleep(delay)
+            print(f"✗ {tab_name} failed: {error}")
     
     return results
 
@@ -329,17 +345,17 @@ def extract_resources_from_tabs(crawl_results):
                 print(f"  📄 Resources tab HTML length: {len(resources_html)} chars")
                 
                 # Enhanced PDF detection patterns including JSON-embedded PDFs
-                pdf_patterns = [
+                pdf_patterns = pattern_chain('learner.resource_pdfs', [
                     r'href="([^"]*\.pdf[^"]*)"[^>]*>([^<]+)',  # Original pattern
                     r'href="([^"]*\.pdf[^"]*)"',  # URL only
                     r'data-href="([^"]*\.pdf[^"]*)"',  # Data attribute
                     r'onclick="[^"]*\'([^\']*\.pdf[^\']*)\'',  # JavaScript links
                     r'window\.open\(["\']([^"\']*\.pdf[^"\']*)["\']',  # Window.open
-                ]
+                ], re.IGNORECASE)
                 
                 # Check for JSON-embedded PDFs (Tileshop pattern)
-                json_pdf_pattern = r'"Name":"([^"]+)"[^}]*"Url":"([^"]*\.pdf[^"]*)"'
-                json_matches = re.findall(json_pdf_pattern, resources_html, re.IGNORECASE)
+                json_pdf_pattern = compile_pattern('learner.resource_json_pdfs', r'"Name":"([^"]+)"[^}]*"Url":"([^"]*\.pdf[^"]*)"', re.IGNORECASE)
+                json_matches = json_pdf_pattern.findall(resources_html)
                 if json_matches:
                     print(f"  ✓ JSON pattern found {len(json_matches)} PDF(s)")
                     # Use a set to deduplicate PDFs by URL
@@ -356,25 +372,26 @@ def extract_resources_from_tabs(crawl_results):
                 
                 # Only try other patterns if JSON pattern didn't find anything
                 if not json_matches:
-                    for i, pattern in enumerate(pdf_patterns):
-                        matches = re.findall(pattern, resources_html, re.IGNORECASE)
-                        if matches:
-                            print(f"  ✓ Pattern {i+1} found {len(matches)} PDF(s)")
-                            for match in matches:
-                                if isinstance(match, tuple):
-                                    url, title = match[0], match[1].strip()
-                                    resources.append({
-                                        'type': 'PDF',
-                                        'title': title or 'PDF Document',
-                                        'url': url
-                                    })
-                                else:
-                                    resources.append({
-                                        'type': 'PDF', 
-                                        'title': 'PDF Document',
-                                        'url': match
-                                    })
-                            break  # Stop after first successful pattern
+                    # First pattern with any match wins
+                    winner = pdf_patterns.first(resources_html)
+                    if winner:
+                        rank = pdf_patterns.rank(winner)
+                        matches = pdf_patterns.members[rank].findall(resources_html)
+                        print(f"  ✓ Pattern {rank+1} found {len(matches)} PDF(s)")
+                        for match in matches:
+                            if isinstance(match, tuple):
+                                url, title = match[0], match[1].strip()
+                                resources.append({
+                                    'type': 'PDF',
+                                    'title': title or 'PDF Document',
+                                    'url': url
+                                })
+                            else:
+                                resources.append({
+                                    'type': 'PDF', 
+                                    'title': 'PDF Document',
+                                    'url': match
+                                })
                 
                 if not resources:
                     print("  ❌ No PDFs found with any pattern")
@@ -396,9 +413,29 @@ def extract_resources_from_tabs(crawl_results):
         print(f"extract_resources_from_tabs error: {e}")
         return []
 
+def lookup_indexed_variations(base_url):
+    """Sibling colors from the sitemap-derived index, or None when the URL is not indexed"""
+    if not COLOR_VARIATION_INDEX_AVAILABLE:
+        return None
+    try:
+        index = get_color_variation_index()
+    except Exception as e:
+        print(f"  ⚠ Color variation index unavailable: {e}")
+        return None
+    if base_url not in index.entries:
+        return None
+    return index.find_variations(base_url)
+
 def find_color_variations(html_content, base_url, specs_html=None):
     """Find color variation URLs using pattern generation and validation"""
-    import requests
+    # Sitemap-derived index first - a dictionary lookup instead of page scanning and guessing
+    indexed_variations = lookup_indexed_variations(base_url)
+    if indexed_variations is not None:
+        print(f"  ✓ Color variation index: {len(indexed_variations)} sibling color(s)")
+        for variation in indexed_variations:
+            print(f"    {variation['color']} (SKU: {variation['sku']})")
+        return indexed_variations
+    
     color_variations = []
     
     # Extract base product name pattern (everything before color name)
@@ -419,16 +456,17 @@ def find_color_variations(html_content, base_url, specs_html=None):
     js_extracted_colors = set()
     
     # Look for color variations in specifications content
-    js_color_patterns = [
+    js_color_patterns = [compile_pattern(f'learner.js_colors[{i}]', pattern, re.IGNORECASE) for i, pattern in enumerate([
         r'Found colors?:\s*([^\n]+)',
-    ]
+    ])]
+    quoted_value = compile_pattern('learner.quoted_value', r'["\']([^"\']+)["\']')
     
     all_content = (html_content or '') + (specs_html or '')
     for pattern in js_color_patterns:
-        matches = re.findall(pattern, all_content, re.IGNORECASE)
+        matches = pattern.findall(all_content)
         for match in matches:
             # Parse color list like '"Cloudy","Milk","Moss","Sky Blue"'
-            color_list = re.findall(r'["\']([^"\']+)["\']', match)
+            color_list = quoted_value.findall(match)
             for color in color_list:
                 clean_color = color.strip()
                 if clean_color and len(clean_color) < 30:
@@ -440,23 +478,24 @@ def find_color_variations(html_content, base_url, specs_html=None):
         print("  Searching specifications tab for color variations...")
         
         # Look for color-related dropdowns, buttons, or options in specs tab
-        color_option_patterns = [
+        color_option_patterns = [compile_pattern(f'learner.spec_color_options[{i}]', pattern, re.IGNORECASE) for i, pattern in enumerate([
             r'(?:color|colour)[^>]*>([^<]*(?:moss|sky|blue|green|grey|white|black|cream|ivory)[^<]*)',
             r'<option[^>]*value="([^"]*)"[^>]*>([^<]*(?:moss|sky|blue|green|grey|white|black|cream|ivory)[^<]*)</option>',
             r'data-color[^>]*="([^"]*)"',
             r'(?:available|options)[^>]*color[^>]*>([^<]*(?:moss|sky|blue|green|grey|white|black|cream|ivory)[^<]*)',
-        ]
+        ])]
         
         found_spec_colors = set()
         for pattern in color_option_patterns:
-            matches = re.findall(pattern, specs_html, re.IGNORECASE)
+            matches = pattern.findall(specs_html)
             for match in matches:
                 color_text = match if isinstance(match, str) else (match[1] if len(match) > 1 else match[0])
                 
                 # Extract individual color names from text like "Moss, Sky Blue, Cloudy"
                 safe_color_words = [w for w in color_words if w is not None and isinstance(w, str)]
                 if safe_color_words:
-                    colors_in_text = re.findall(r'\b(?:' + '|'.join(safe_color_words) + r')\b[^,]*', color_text, re.IGNORECASE)
+                    color_word_pattern = compile_pattern('learner.color_words', r'\b(?:' + '|'.join(safe_color_words) + r')\b[^,]*', re.IGNORECASE)
+                    colors_in_text = color_word_pattern.findall(color_text)
                 else:
                     colors_in_text = []
                 for color in colors_in_text:
@@ -500,6 +539,7 @@ def find_color_variations(html_content, base_url, specs_html=None):
         # First, look for variations in HTML content
         variation_pattern = base_pattern.replace('COLOR_PLACEHOLDER', r'([a-z-]+)')
         variation_regex = rf'/products/{variation_pattern}-(\d+)'
+        # Built from this product's URL, so it is not worth registering
         matches = re.findall(variation_regex, html_content, re.IGNORECASE)
         
         for match in matches:
@@ -545,6 +585,55 @@ def find_color_variations(html_content, base_url, specs_html=None):
     
     return color_variations
 
+def _standard_applications(app_text):
+    """Map an Applications value ("Wall, Floor, Shower Floor") to standard application areas"""
+    app_lower = app_text.lower()
+    if 'wall' in app_lower and 'floor' not in app_lower:
+        return ['walls']
+    if 'floor' in app_lower and 'wall' not in app_lower:
+        return ['floors']
+    if 'wall' in app_lower and 'floor' in app_lower:
+        return ['walls', 'floors']
+    if 'backsplash' in app_lower:
+        return ['backsplash']
+    if any(term in app_lower for term in ['bathroom', 'shower', 'wet']):
+        return ['bathroom', 'walls']
+    if 'kitchen' in app_lower:
+        return ['kitchen', 'walls']
+    # Keep the original text for manual review
+    return [app_lower]
+
+def _normalize_material_type(data, enhanced_categorizer):
+    """Replace a missing or suspect material_type with the categorizer's classification"""
+    current_material = data.get('material_type')
+    if (not current_material or 
+        current_material in ['Material', 'None', None] or
+        # Re-evaluate potentially incorrect legacy detections
+        (current_material == 'Natural Stone' and any(keyword in data.get('title', '').lower() 
+         for keyword in ['thinset', 'mortar', 'grout', 'adhesive', 'caulk', 'sealant']))):
+        
+        material_type = enhanced_categorizer.extract_material_type(data)
+        if material_type and material_type != current_material:
+            data['material_type'] = material_type
+            print(f"  ✅ Material type corrected: {current_material} → {material_type}")
+        elif material_type:
+            data['material_type'] = material_type
+            print(f"  ✅ Material type added: {material_type}")
+
+def _fill_from_next_data(data, next_data_fields):
+    """Fill fields page parsing left empty from the __NEXT_DATA__ payload; parsed values always win"""
+    # Prices are resolved together by _consolidate_final_pricing; once page parsing found one, leave them alone
+    has_price = any(data.get(field) for field in PRICE_FIELDS)
+    for key, value in next_data_fields.items():
+        if has_price and key in PRICE_FIELDS:
+            continue
+        if value is None or value == "" or value == {} or value == []:
+            continue
+        if data.get(key) not in (None, "", {}, [], '[]', '{}', 'null'):
+            continue
+        data[key] = json.dumps(value) if isinstance(value, (dict, list)) else value
+
+@profile_stage('extract')
 def extract_product_data(crawl_results, base_url, category=None):
     """Extract structured product data from crawled content with intelligent page-specific parsing"""
     main_html = crawl_results.get('main', {}).get('html', '') if crawl_results.get('main') else ''
@@ -576,11 +665,29 @@ def extract_product_data(crawl_results, base_url, category=None):
         print("No main HTML content found")
         return None
     
+    # Parsed once, shared by detection, the specialized parser, spec extraction and JSON-LD below
+    page = ParsedPage(main_html, base_url)
+    
+    # Fast path: a complete Next.js payload stands in for the color and resource lookups below
+    next_data_fields = None
+    if NEXT_DATA_FAST_PATH:
+        next_data_fields = extract_from_next_data(page, base_url)
+        if is_complete(next_data_fields):
+            print("\n--- __NEXT_DATA__ Fast Path ---")
+        else:
+            if next_data_fields is not None:
+                print("⚠️ __NEXT_DATA__ payload incomplete. Using page parsing only.")
+            next_data_fields = None
+    
+    page_detector = get_page_detector()
+    spec_extractor = get_spec_extractor()
+    enhanced_categorizer = get_enhanced_categorizer()
+    
     # Apply intelligent page structure detection and specialized parsing
     if INTELLIGENT_PARSING_AVAILABLE and page_detector:
         try:
             print("\n--- Intelligent Page Structure Detection ---")
-            page_structure = page_detector.detect_page_structure(main_html, base_url)
+            page_structure = page_detector.detect_page_structure(main_html, base_url, page=page)
             
             print(f"✅ {page_detector.get_page_type_summary(page_structure)}")
             
@@ -589,20 +696,12 @@ def extract_product_data(crawl_results, base_url, category=None):
             
             print(f"🔧 Applying {specialized_parser.__class__.__name__} for high-precision extraction")
             
-            # Extract JSON-LD data first for the specialized parser
-            json_ld_data = {}
-            json_ld_matches = re.findall(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', main_html, re.IGNORECASE | re.DOTALL)
-            for json_ld in json_ld_matches:
-                try:
-                    json_data = json.loads(json_ld.strip())
-                    if json_data.get('@type') == 'Product':
-                        json_ld_data = json_data
-                        break
-                except json.JSONDecodeError:
-                    continue
+            # JSON-LD Product block for the specialized parser
+            json_ld_data = page.product_json_ld
             
             # Use specialized parser to extract product data
-            specialized_data = specialized_parser.parse_product_data(main_html, base_url, json_ld_data)
+            with stage(f"parser.{page_structure.page_type.value}"):
+                specialized_data = specialized_parser.parse_product_data(main_html, base_url, json_ld_data, page=page)
             
             # Merge specialized data with our data structure, prioritizing specialized results
             for key, value in specialized_data.items():
@@ -611,12 +710,22 @@ def extract_product_data(crawl_results, base_url, category=None):
             
             print(f"✅ Specialized parsing completed. Extracted {len([v for v in specialized_data.values() if v])} fields")
             
+            # A complete payload supplies the title and SKU the parser missed
+            if next_data_fields:
+                data['title'] = data['title'] or next_data_fields['title']
+                data['sku'] = data['sku'] or next_data_fields['sku']
+                data['parsing_method'] = f"{data.get('parsing_method', specialized_parser.__class__.__name__)}+NextDataExtractor"
+            
             # If specialized parsing was successful, we can skip the legacy extraction
-            if specialized_data.get('title') and specialized_data.get('sku'):
+            if data.get('title') and data.get('sku'):
                 print("🚀 High-quality extraction achieved. Skipping legacy fallback methods.")
                 # Still run color variation and resource extraction
                 try:
-                    color_variations = discover_color_variations(crawl_results, main_html, base_url)
+                    if next_data_fields:
+                        # Payload siblings, then the sitemap index - no page scanning
+                        color_variations = next_data_fields.get('color_variations') or lookup_indexed_variations(base_url)
+                    else:
+                        color_variations = discover_color_variations(crawl_results, main_html, base_url)
                     if color_variations:
                         data['color_variations'] = json.dumps(color_variations)
                         print(f"   Color variations: {len(color_variations)} found")
@@ -688,38 +797,34 @@ def extract_product_data(crawl_results, base_url, category=None):
                             specs_html = crawl_results.get('specifications', {}).get('html', '') if crawl_results else ''
                             if specs_html:
                                 # Look for structured specifications JSON
-                                specs_color_patterns = [
+                                specs_color_patterns = pattern_chain('learner.specs_color', [
                                     r'"PDPInfo_Color"[^}]*"Value"\s*:\s*"([^"]+)"',
                                     r'"Key"\s*:\s*"PDPInfo_Color"[^}]*"Value"\s*:\s*"([^"]+)"'
-                                ]
+                                ], re.IGNORECASE)
                                 
-                                for pattern in specs_color_patterns:
-                                    color_match = re.search(pattern, specs_html, re.IGNORECASE)
-                                    if color_match:
-                                        data['color'] = color_match.group(1).strip()
-                                        print(f"  ✓ Found structured color: {data['color']}")
-                                        break
+                                color_match = specs_color_patterns.first(specs_html)
+                                if color_match:
+                                    data['color'] = color_match.group(1).strip()
+                                    print(f"  ✓ Found structured color: {data['color']}")
                             
                             # Fallback to main page patterns if specs didn't work
                             if not data.get('color'):
-                                color_patterns = [
+                                color_patterns = pattern_chain('learner.fallback_color', [
                                     r'"color":\s*"([^"]+)"',
                                     r'Color:\s*([^<\n,]+)',
                                     r'data-color="([^"]+)"',
                                     r'Beige[,\s]*Brown',  # Specific for Morris & Co products
                                     r'(?:Color|Colour)\s*[:=]\s*([^<\n,]+)',
                                     r'(#[0-9a-fA-F]{6})',  # Hex color as last resort
-                                ]
+                                ], re.IGNORECASE)
                                 
-                                for pattern in color_patterns:
-                                    color_match = re.search(pattern, main_html, re.IGNORECASE)
-                                    if color_match:
-                                        raw_color = color_match.group(1).strip()
-                                        # Clean up color extraction - remove HTML artifacts
-                                        cleaned_color = re.sub(r'["\/>]+$', '', raw_color)
-                                        data['color'] = cleaned_color
-                                        print(f"  ✓ Found fallback color: {data['color']}")
-                                        break
+                                color_match = color_patterns.first(main_html)
+                                if color_match:
+                                    raw_color = color_match.group(1).strip()
+                                    # Clean up color extraction - remove HTML artifacts
+                                    cleaned_color = compile_pattern('learner.trailing_markup', r'["\/>]+$').sub('', raw_color)
+                                    data['color'] = cleaned_color
+                                    print(f"  ✓ Found fallback color: {data['color']}")
                         except Exception as e:
                             print(f"  ❌ Color extraction error: {e}")
                     
@@ -729,18 +834,16 @@ def extract_product_data(crawl_results, base_url, category=None):
                             print("💰 Extracting price per box...")
                             
                             # Search in JSON-LD data and main HTML
-                            price_box_patterns = [
+                            price_box_patterns = pattern_chain('learner.fallback_price_per_box', [
                                 r'"price":\s*([0-9]+\.?[0-9]*)',
                                 r'\$([0-9,]+\.?\d+)',
                                 r'price.*?([0-9]+\.?\d+)',
-                            ]
+                            ], re.IGNORECASE)
                             
-                            for pattern in price_box_patterns:
-                                price_match = re.search(pattern, main_html, re.IGNORECASE)
-                                if price_match:
-                                    data['price_per_box'] = float(price_match.group(1).replace(',', ''))
-                                    print(f"  ✓ Found price per box: ${data['price_per_box']}")
-                                    break
+                            price_match = price_box_patterns.first(main_html)
+                            if price_match:
+                                data['price_per_box'] = float(price_match.group(1).replace(',', ''))
+                                print(f"  ✓ Found price per box: ${data['price_per_box']}")
                         except Exception as e:
                             print(f"  ❌ Price per box extraction error: {e}")
                     
@@ -749,19 +852,17 @@ def extract_product_data(crawl_results, base_url, category=None):
                         try:
                             print("📐 Extracting coverage...")
                             
-                            coverage_patterns = [
+                            coverage_patterns = pattern_chain('learner.fallback_coverage', [
                                 r'Coverage\s*([0-9]+\.?\d*)\s*sq\.?\s*ft\.?\s*per\s*box',
                                 r'([0-9]+\.?\d*)\s*sq\.?\s*ft\.?\s*per\s*box',
                                 r'Coverage:\s*([0-9]+\.?\d*)',
-                            ]
+                            ], re.IGNORECASE)
                             
-                            for pattern in coverage_patterns:
-                                coverage_match = re.search(pattern, main_html, re.IGNORECASE)
-                                if coverage_match:
-                                    coverage_num = coverage_match.group(1)
-                                    data['coverage'] = f"{coverage_num} sq ft"
-                                    print(f"  ✓ Found coverage: {data['coverage']}")
-                                    break
+                            coverage_match = coverage_patterns.first(main_html)
+                            if coverage_match:
+                                coverage_num = coverage_match.group(1)
+                                data['coverage'] = f"{coverage_num} sq ft"
+                                print(f"  ✓ Found coverage: {data['coverage']}")
                         except Exception as e:
                             print(f"  ❌ Coverage extraction error: {e}")
                     
@@ -779,25 +880,22 @@ def extract_product_data(crawl_results, base_url, category=None):
                             if resources_html:
                                 search_content.append(resources_html)
                         
-                        enhanced_sqft_patterns = [
+                        enhanced_sqft_patterns = pattern_chain('learner.displayed_price_per_sqft', [
                             r'\$([0-9,]+\.?\d+)\s*/\s*[Ss]q\.?\s*[Ff]t\.?',
                             r'\$([0-9,]+\.?\d+)\s*[Pp]er\s*[Ss]q\.?\s*[Ff]t\.?',
                             r'\$([0-9,]+\.?\d+)/[Ss][Qq]\.\s*[Ff][Tt]\.',
                             r'([0-9,]+\.?\d+)\s*per\s*sq\.?\s*ft\.?',
                             r'"pricePerSqFt":\s*"?([0-9,]+\.?\d+)"?',
                             r'Price\s*per\s*[Ss]q\.?\s*[Ff]t\.?\s*[:=]?\s*\$([0-9,]+\.?\d+)',
-                        ]
+                        ], re.IGNORECASE)
                         
                         found_displayed_price = False
                         for content in search_content:
-                            for pattern in enhanced_sqft_patterns:
-                                price_match = re.search(pattern, content, re.IGNORECASE)
-                                if price_match:
-                                    data['price_per_sqft'] = float(price_match.group(1).replace(',', ''))
-                                    print(f"  ✓ Found DISPLAYED price per sqft: ${data['price_per_sqft']}")
-                                    found_displayed_price = True
-                                    break
-                            if found_displayed_price:
+                            price_match = enhanced_sqft_patterns.first(content)
+                            if price_match:
+                                data['price_per_sqft'] = float(price_match.group(1).replace(',', ''))
+                                print(f"  ✓ Found DISPLAYED price per sqft: ${data['price_per_sqft']}")
+                                found_displayed_price = True
                                 break
                         
                         # Only calculate if no displayed price was found
@@ -805,7 +903,7 @@ def extract_product_data(crawl_results, base_url, category=None):
                             try:
                                 price_box = float(data['price_per_box'])
                                 coverage_text = str(data['coverage'])
-                                coverage_match = re.search(r'([0-9]+\.?[0-9]*)', coverage_text)
+                                coverage_match = compile_pattern('learner.coverage_number', r'([0-9]+\.?[0-9]*)').search(coverage_text)
                                 if coverage_match:
                                     coverage_num = float(coverage_match.group(1))
                                     calculated_per_sqft = round(price_box / coverage_num, 2)
@@ -816,7 +914,11 @@ def extract_product_data(crawl_results, base_url, category=None):
                     
                     # 3. Enhanced resources/PDF extraction for main page if missing or empty
                     resources_empty = not data.get('resources') or data.get('resources') == '[]' or data.get('resources') == '{}'
-                    if resources_empty:
+                    if resources_empty and next_data_fields and next_data_fields.get('resources'):
+                        # The payload lists the real resources; no need to probe for guessed PDFs
+                        data['resources'] = json.dumps(next_data_fields['resources'])
+                        print(f"  ✓ Resources from __NEXT_DATA__: {len(next_data_fields['resources'])} found")
+                    elif resources_empty:
                         try:
                             print("📋 Extracting resources from main page...")
                             print("  🔍 Attempting predictive Scene7 PDF detection...")
@@ -889,7 +991,7 @@ def extract_product_data(crawl_results, base_url, category=None):
                         specs_html = crawl_results.get('specifications', {}).get('html', '') if crawl_results else ''
                         if specs_html:
                             # Look for Applications field in specifications
-                            app_patterns = [
+                            app_patterns = pattern_chain('learner.specs_applications', [
                                 r'"PDPInfo_Applications?"[^}]*"Value"\s*:\s*"([^"]+)"',
                                 r'"Key"\s*:\s*"Applications?"[^}]*"Value"\s*:\s*"([^"]+)"',
                                 r'Applications?:\s*([^<\n,]+)',
@@ -897,71 +999,45 @@ def extract_product_data(crawl_results, base_url, category=None):
                                 r'Recommended\s+for\s*[:=]\s*([^<\n,]+)',
                                 r'Use[d]?\s+for\s*[:=]\s*([^<\n,]+)',
                                 r'Suitable\s+for\s*[:=]\s*([^<\n,]+)',
-                            ]
+                            ], re.IGNORECASE)
                             
-                            for pattern in app_patterns:
-                                app_match = re.search(pattern, specs_html, re.IGNORECASE)
-                                if app_match:
-                                    app_text = app_match.group(1).strip()
-                                    # Clean up the application text
-                                    app_text = re.sub(r'["\/>]+$', '', app_text)
-                                    
-                                    # Convert to lowercase for processing
-                                    app_lower = app_text.lower()
-                                    
-                                    # Map common application terms to standard values
-                                    if 'wall' in app_lower and 'floor' not in app_lower:
-                                        extracted_applications = ['walls']
-                                        print(f"  ✓ Found wall-only application: {app_text}")
-                                    elif 'floor' in app_lower and 'wall' not in app_lower:
-                                        extracted_applications = ['floors']
-                                        print(f"  ✓ Found floor-only application: {app_text}")
-                                    elif 'wall' in app_lower and 'floor' in app_lower:
-                                        extracted_applications = ['walls', 'floors']
-                                        print(f"  ✓ Found wall and floor application: {app_text}")
-                                    elif 'backsplash' in app_lower:
-                                        extracted_applications = ['backsplash']
-                                        print(f"  ✓ Found backsplash application: {app_text}")
-                                    elif any(term in app_lower for term in ['bathroom', 'shower', 'wet']):
-                                        extracted_applications = ['bathroom', 'walls']
-                                        print(f"  ✓ Found bathroom application: {app_text}")
-                                    elif 'kitchen' in app_lower:
-                                        extracted_applications = ['kitchen', 'walls']
-                                        print(f"  ✓ Found kitchen application: {app_text}")
-                                    else:
-                                        # Keep the original text for manual review
-                                        extracted_applications = [app_text.lower()]
-                                        print(f"  ✓ Found custom application: {app_text}")
-                                    break
+                            app_match = app_patterns.first(specs_html)
+                            if app_match:
+                                app_text = app_match.group(1).strip()
+                                # Clean up the application text
+                                app_text = compile_pattern('learner.trailing_markup', r'["\/>]+$').sub('', app_text)
+                                
+                                # Map common application terms to standard values
+                                extracted_applications = _standard_applications(app_text)
+                                print(f"  ✓ Found application: {app_text} -> {extracted_applications}")
                         
                         # Fallback to main page if specifications didn't provide results
                         if not extracted_applications:
-                            app_patterns_main = [
+                            app_patterns_main = pattern_chain('learner.main_applications', [
                                 r'Applications?:\s*([^<\n,]+)',
                                 r'Application[s]?\s*[:=]\s*([^<\n,]+)',
                                 r'Recommended\s+for\s*[:=]\s*([^<\n,]+)',
                                 r'wall\s+tile',
                                 r'floor\s+tile',
                                 r'backsplash\s+tile',
-                            ]
+                            ], re.IGNORECASE)
                             
-                            for pattern in app_patterns_main:
-                                app_match = re.search(pattern, main_html, re.IGNORECASE)
-                                if app_match:
-                                    if pattern in ['wall\\s+tile']:
-                                        extracted_applications = ['walls']
-                                        print(f"  ✓ Detected wall tile from main page")
-                                    elif pattern in ['floor\\s+tile']:
-                                        extracted_applications = ['floors']
-                                        print(f"  ✓ Detected floor tile from main page")
-                                    elif pattern in ['backsplash\\s+tile']:
-                                        extracted_applications = ['backsplash']
-                                        print(f"  ✓ Detected backsplash tile from main page")
-                                    else:
-                                        app_text = app_match.group(1).strip()
-                                        extracted_applications = [app_text.lower()]
-                                        print(f"  ✓ Found application from main page: {app_text}")
-                                    break
+                            app_match = app_patterns_main.first(main_html)
+                            if app_match:
+                                pattern = app_match.re.pattern
+                                if pattern in ['wall\\s+tile']:
+                                    extracted_applications = ['walls']
+                                    print(f"  ✓ Detected wall tile from main page")
+                                elif pattern in ['floor\\s+tile']:
+                                    extracted_applications = ['floors']
+                                    print(f"  ✓ Detected floor tile from main page")
+                                elif pattern in ['backsplash\\s+tile']:
+                                    extracted_applications = ['backsplash']
+                                    print(f"  ✓ Detected backsplash tile from main page")
+                                else:
+                                    app_text = app_match.group(1).strip()
+                                    extracted_applications = [app_text.lower()]
+                                    print(f"  ✓ Found application from main page: {app_text}")
                         
                         # Store extracted applications for later use
                         if extracted_applications:
@@ -982,9 +1058,11 @@ def extract_product_data(crawl_results, base_url, category=None):
                             specs_html = crawl_results.get('specifications', {}).get('html', '') if crawl_results else ''
                             if not specs_html:
                                 specs_html = main_html
+                            specs_page = page if specs_html is main_html else ParsedPage(specs_html, base_url)
                             
                             # Extract all available specifications
-                            enhanced_specs = spec_extractor.extract_specifications(specs_html, data.get('category', 'tile'), data.get('title', ''))
+                            enhanced_specs = spec_extractor.extract_specifications(specs_html, data.get('category', 'tile'), data.get('title', ''),
+                                                                                   page=specs_page)
                             
                             # Map extracted specifications to database schema
                             field_mappings = {
@@ -1050,20 +1128,7 @@ def extract_product_data(crawl_results, base_url, category=None):
                             category_info = enhanced_categorizer.categorize_product(data)
                             
                             # Extract material type if missing or potentially incorrect
-                            current_material = data.get('material_type')
-                            if (not current_material or 
-                                current_material in ['Material', 'None', None] or
-                                # Re-evaluate potentially incorrect legacy detections
-                                (current_material == 'Natural Stone' and any(keyword in data.get('title', '').lower() 
-                                 for keyword in ['thinset', 'mortar', 'grout', 'adhesive', 'caulk', 'sealant']))):
-                                
-                                material_type = enhanced_categorizer.extract_material_type(data)
-                                if material_type and material_type != current_material:
-                                    data['material_type'] = material_type
-                                    print(f"  ✅ Material type corrected: {current_material} → {material_type}")
-                                elif material_type:
-                                    data['material_type'] = material_type
-                                    print(f"  ✅ Material type added: {material_type}")
+                            _normalize_material_type(data, enhanced_categorizer)
                             
                             # Add enhanced category fields to product data
                             data['category'] = category_info.primary_category
@@ -1101,6 +1166,10 @@ def extract_product_data(crawl_results, base_url, category=None):
                             if not data.get('category'):
                                 data['category'] = 'uncategorized'
                 
+                # Payload values only for fields every pass above left empty
+                if next_data_fields:
+                    _fill_from_next_data(data, next_data_fields)
+                
                 # Final pricing consolidation - ensure price_per_piece is None when both box and sqft prices exist
                 _consolidate_final_pricing(data)
                 
@@ -1119,31 +1188,29 @@ def extract_product_data(crawl_results, base_url, category=None):
     print(f"Debug: Saved HTML to /tmp/debug_html_{sku_debug}.html")
     
     # Extract SKU from URL
-    sku_match = re.search(r'(\d+)$', base_url)
+    sku_match = compile_pattern('learner.url_sku', r'(\d+)$').search(base_url)
     if sku_match:
         data['sku'] = sku_match.group(1)
     
     # Extract title from title tag or h1
-    title_match = re.search(r'<title[^>]*>([^<]+)</title>', main_html, re.IGNORECASE)
+    title_match = compile_pattern('learner.title_tag', r'<title[^>]*>([^<]+)</title>', re.IGNORECASE).search(main_html)
     if title_match:
         title = title_match.group(1).strip()
-        title = re.sub(r'\s*-\s*The Tile Shop\s*$', '', title)
+        title = compile_pattern('learner.title_suffix', r'\s*-\s*The Tile Shop\s*$').sub('', title)
         data['title'] = title
     
     # Also try h1 tag
     if not data['title']:
-        h1_match = re.search(r'<h1[^>]*>([^<]+)</h1>', main_html, re.IGNORECASE)
+        h1_match = compile_pattern('learner.h1', r'<h1[^>]*>([^<]+)</h1>', re.IGNORECASE).search(main_html)
         if h1_match:
             data['title'] = h1_match.group(1).strip()
     
-    # Extract JSON-LD structured data - IMPROVED
-    json_ld_matches = re.findall(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', main_html, re.IGNORECASE | re.DOTALL)
-    for json_ld in json_ld_matches:
+    # Extract JSON-LD structured data - IMPROVED (blocks decoded once on the shared page)
+    json_ld_blocks = page.json_ld_blocks
+    if page.json_ld_errors:
+        print(f"Error parsing JSON-LD: {page.json_ld_errors} block(s) are not valid JSON")
+    for json_data in json_ld_blocks:
         try:
-            # Clean up the JSON content
-            json_content = json_ld.strip()
-            json_data = json.loads(json_content)
-            
             print(f"Found JSON-LD: {json_data.get('@type', 'Unknown type')}")
             
             if json_data.get('@type') == 'Product':
@@ -1160,8 +1227,8 @@ def extract_product_data(crawl_results, base_url, category=None):
                 # Extract description
                 if json_data.get('description'):
                     # Clean HTML from description
-                    desc = re.sub(r'<[^>]+>', '', json_data['description'])
-                    desc = re.sub(r'\n+', ' ', desc).strip()
+                    desc = compile_pattern('learner.html_tag', r'<[^>]+>').sub('', json_data['description'])
+                    desc = compile_pattern('learner.newlines', r'\n+').sub(' ', desc).strip()
                     data['description'] = desc
                     print(f"  Description length: {len(desc)} chars")
                 
@@ -1197,9 +1264,9 @@ def extract_product_data(crawl_results, base_url, category=None):
                         data['image_variants'] = json.dumps(image_variants)
                         print(f"  Image variants generated: {len(image_variants)} sizes")
                 
-        except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
+        except (KeyError, ValueError, TypeError) as e:
             print(f"Error parsing JSON-LD: {e}")
-            print(f"JSON content preview: {json_ld[:200]}...")
+            print(f"JSON content preview: {json.dumps(json_data)[:200]}...")
             continue
     
     # Fallback: Extract primary image from HTML if not found in JSON-LD
@@ -1232,8 +1299,8 @@ def extract_product_data(crawl_results, base_url, category=None):
     # Alternative fallback: Look for any Scene7 ExtraLarge images in the page
     if not data['primary_image']:
         print(f"\n--- Alternative fallback: Looking for Scene7 ExtraLarge images ---")
-        scene7_pattern = r'(https://s7d1\.scene7\.com/is/image/TileShop/[^?]*)\?[^"]*ExtraLarge[^"]*'
-        scene7_matches = re.findall(scene7_pattern, main_html)
+        scene7_pattern = compile_pattern('learner.scene7_extra_large', r'(https://s7d1\.scene7\.com/is/image/TileShop/[^?]*)\?[^"]*ExtraLarge[^"]*')
+        scene7_matches = scene7_pattern.findall(main_html)
         if scene7_matches:
             data['primary_image'] = f"{scene7_matches[0]}?$ExtraLarge$"
             print(f"  Alternative primary image: {data['primary_image']}")
@@ -1241,20 +1308,18 @@ def extract_product_data(crawl_results, base_url, category=None):
             print(f"  No Scene7 ExtraLarge images found")
     
     # Extract price information with multiple patterns - ENHANCED
-    price_patterns = [
+    price_patterns = pattern_chain('learner.price_per_box', [
         r'\$([0-9,]+\.?\d*)/box',
         r'\$([0-9,]+\.?\d*)\s*/\s*box',
         r'([0-9,]+\.?\d*)\s*\/\s*box',
-    ]
-    for pattern in price_patterns:
-        price_box_match = re.search(pattern, main_html, re.IGNORECASE)
-        if price_box_match:
-            data['price_per_box'] = float(price_box_match.group(1).replace(',', ''))
-            print(f"Found price per box in HTML: ${data['price_per_box']}")
-            break
+    ], re.IGNORECASE)
+    price_box_match = price_patterns.first(main_html)
+    if price_box_match:
+        data['price_per_box'] = float(price_box_match.group(1).replace(',', ''))
+        print(f"Found price per box in HTML: ${data['price_per_box']}")
     
     # Enhanced patterns for price per sq ft
-    sqft_patterns = [
+    sqft_patterns = pattern_chain('learner.price_per_sqft', [
         r'\$([0-9,]+\.?\d*)/Sq\.?\s*Ft\.?',
         r'\$([0-9,]+\.?\d*)\s*/\s*Sq\.?\s*Ft\.?',
         r'([0-9,]+\.?\d*)\s*/\s*Sq\.?\s*Ft\.?',
@@ -1268,18 +1333,16 @@ def extract_product_data(crawl_results, base_url, category=None):
         # More flexible sqft patterns
         r'\$([0-9,]+\.?\d+)\s*/\s*[Ss]q\.?\s*[Ff]t\.?',
         r'\$([0-9,]+\.?\d+)/[Ss][Qq]\.\s*[Ff][Tt]\.',
-    ]
-    for pattern in sqft_patterns:
-        price_sqft_match = re.search(pattern, main_html, re.IGNORECASE)
-        if price_sqft_match:
-            data['price_per_sqft'] = float(price_sqft_match.group(1).replace(',', ''))
-            print(f"Found price per sq ft in HTML: ${data['price_per_sqft']}")
-            break
+    ], re.IGNORECASE)
+    price_sqft_match = sqft_patterns.first(main_html)
+    if price_sqft_match:
+        data['price_per_sqft'] = float(price_sqft_match.group(1).replace(',', ''))
+        print(f"Found price per sq ft in HTML: ${data['price_per_sqft']}")
     
     # NEW: Detect per-piece pricing
     # Check for per-unit patterns in HTML
-    has_per_each = bool(re.search(r'/each', main_html, re.IGNORECASE))
-    has_per_bag = bool(re.search(r'/bag', main_html, re.IGNORECASE))
+    has_per_each = bool(compile_pattern('learner.per_each', r'/each', re.IGNORECASE).search(main_html))
+    has_per_bag = bool(compile_pattern('learner.per_bag', r'/bag', re.IGNORECASE).search(main_html))
     has_per_unit = has_per_each or has_per_bag
     print(f"🔍 Per-unit detection: has_per_each={has_per_each}, has_per_bag={has_per_bag}, has_per_unit={has_per_unit}")
     
@@ -1300,7 +1363,7 @@ def extract_product_data(crawl_results, base_url, category=None):
         print(f"🔹 Detected per-piece product (has_per_each: {has_per_each}, has_per_bag: {has_per_bag}, is_per_piece_type: {is_per_piece_product})")
         
         # Extract per-piece pricing patterns
-        per_piece_patterns = [
+        per_piece_patterns = pattern_chain('learner.price_per_piece', [
             r'\$([0-9,]+\.?\d*)/each',
             r'\$([0-9,]+\.?\d*)\s*/\s*each',
             r'([0-9,]+\.?\d*)\s*/\s*each',
@@ -1310,14 +1373,12 @@ def extract_product_data(crawl_results, base_url, category=None):
             r'\$([0-9,]+\.?\d*)\s*/\s*bag',
             r'([0-9,]+\.?\d*)\s*/\s*bag',
             r'\$([0-9,]+\.?\d*)\s*per\s*bag',
-        ]
+        ], re.IGNORECASE)
         
-        for pattern in per_piece_patterns:
-            price_piece_match = re.search(pattern, main_html, re.IGNORECASE)
-            if price_piece_match:
-                data['price_per_piece'] = float(price_piece_match.group(1).replace(',', ''))
-                print(f"Found price per piece in HTML: ${data['price_per_piece']}")
-                break
+        price_piece_match = per_piece_patterns.first(main_html)
+        if price_piece_match:
+            data['price_per_piece'] = float(price_piece_match.group(1).replace(',', ''))
+            print(f"Found price per piece in HTML: ${data['price_per_piece']}")
         
         # If we found per-unit pattern but no explicit per-piece price, use price_per_box as price_per_piece
         if not data.get('price_per_piece') and data.get('price_per_box') and has_per_unit:
@@ -1332,7 +1393,7 @@ def extract_product_data(crawl_results, base_url, category=None):
                 print(f"Per-piece product detected: price_per_piece=${data['price_per_piece']}, cleared price_per_box")
     
     # Extract coverage - IMPROVED
-    coverage_patterns = [
+    coverage_patterns = pattern_chain('learner.coverage', [
         r'Coverage\s+([0-9,.]+\s*sq\.?\s*ft\.?\s*per\s*Box)',
         r'([0-9,.]+\s*sq\.?\s*ft\.?\s*per\s*Box)',
         r'([0-9,.]+)\s*sq\.?\s*ft\.?\s*per\s*Box',
@@ -1340,22 +1401,20 @@ def extract_product_data(crawl_results, base_url, category=None):
         r'([0-9,.]+\s*sq\.?\s*ft\.?\s*coverage)',
         # Look in the content for coverage info
         r'coverage.*?([0-9,.]+\s*sq\.?\s*ft\.?)',
-    ]
-    for pattern in coverage_patterns:
-        coverage_match = re.search(pattern, main_html, re.IGNORECASE)
-        if coverage_match:
-            coverage_value = coverage_match.group(1).strip()
-            if coverage_value and len(coverage_value) > 3:  # Basic validation
-                data['coverage'] = coverage_value
-                print(f"Found coverage: {coverage_value}")
-                break
+    ], re.IGNORECASE)
+    # Basic validation - a pattern whose first match is too short falls through to the next
+    coverage_match = coverage_patterns.first(main_html, accept=lambda m: len(m.group(1).strip()) > 3)
+    if coverage_match:
+        coverage_value = coverage_match.group(1).strip()
+        data['coverage'] = coverage_value
+        print(f"Found coverage: {coverage_value}")
     
     # Extract color variations from product selectors - NEW
     print(f"\n--- Extracting color variations ---")
     color_variations = []
     
     # Look for color options in various selector patterns
-    color_selector_patterns = [
+    color_selector_patterns = [compile_pattern(f'learner.color_selectors[{i}]', pattern, re.IGNORECASE) for i, pattern in enumerate([
         # Common e-commerce color selector patterns
         r'data-color="([^"]+)"[^>]*>([^<]*)',
         r'data-variant-color="([^"]+)"',
@@ -1366,10 +1425,10 @@ def extract_product_data(crawl_results, base_url, category=None):
         r'"colorValue":"([^"]+)"',
         # Look for color names in button or link text
         r'<(?:button|a)[^>]*(?:color|variant)[^>]*>([^<]*(?:grey|blue|white|black|brown|beige|green|red|gold|silver|tan|cream|cloudy|fresh)[^<]*)</(?:button|a)>',
-    ]
+    ])]
     
     for pattern in color_selector_patterns:
-        matches = re.findall(pattern, main_html, re.IGNORECASE)
+        matches = pattern.findall(main_html)
         for match in matches:
             color_name = match if isinstance(match, str) else (match[1] if len(match) > 1 else match[0])
             if color_name and len(color_name.strip()) > 0 and len(color_name.strip()) < 50:
@@ -1379,14 +1438,14 @@ def extract_product_data(crawl_results, base_url, category=None):
                     print(f"  Found color variation: {clean_color}")
     
     # Also look for color-specific images
-    color_image_patterns = [
+    color_image_patterns = [compile_pattern(f'learner.color_images[{i}]', pattern, re.IGNORECASE) for i, pattern in enumerate([
         r'(?:data-)?(?:color|variant)[^>]*="([^"]+)"[^>]*(?:data-)?(?:image|src)="([^"]+)"',
         r'(?:data-)?(?:image|src)="([^"]+)"[^>]*(?:data-)?(?:color|variant)="([^"]+)"',
-    ]
+    ])]
     
     color_images = {}
     for pattern in color_image_patterns:
-        matches = re.findall(pattern, main_html, re.IGNORECASE)
+        matches = pattern.findall(main_html)
         for match in matches:
             if len(match) == 2:
                 color_name = match[0] if 'image' not in match[0] else match[1]
@@ -1417,15 +1476,13 @@ def extract_product_data(crawl_results, base_url, category=None):
         print(f"Total color images found: {len(color_images)}")
     
     # Extract finish information
-    finish_patterns = [
+    finish_patterns = pattern_chain('learner.finish', [
         r'Finish[^>]*>([^<]*(?:Gloss|Matte|Satin)[^<]*)',
         r'(Gloss|Matte|Satin)',
-    ]
-    for pattern in finish_patterns:
-        finish_match = re.search(pattern, main_html, re.IGNORECASE)
-        if finish_match:
-            data['finish'] = finish_match.group(1).strip()
-            break
+    ], re.IGNORECASE)
+    finish_match = finish_patterns.first(main_html)
+    if finish_match:
+        data['finish'] = finish_match.group(1).strip()
     
     # Extract specifications from embedded JSON data - NEW APPROACH
     specs = {}
@@ -1433,7 +1490,8 @@ def extract_product_data(crawl_results, base_url, category=None):
     print(f"\n--- Extracting specifications from embedded JSON data ---")
     
     # Look for the embedded product data JSON
-    spec_match = re.search(r'"Specifications"\s*:\s*({.*?"PDPInfo_TechnicalDetails".*?\]\s*})', main_html, re.DOTALL)
+    spec_match = compile_pattern('learner.embedded_specifications',
+                                 r'"Specifications"\s*:\s*({.*?"PDPInfo_TechnicalDetails".*?\]\s*})', re.DOTALL).search(main_html)
     if spec_match:
         try:
             spec_json_str = spec_match.group(1)
@@ -1497,31 +1555,29 @@ def extract_product_data(crawl_results, base_url, category=None):
         }
         
         for field, patterns in spec_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, main_html, re.IGNORECASE)
-                if match:
-                    value = match.group(1).strip()
-                    value = re.sub(r'<[^>]+>', '', value)
-                    value = re.sub(r'\s+', ' ', value).strip()
+            match = pattern_chain(f'learner.regex_spec.{field}', patterns, re.IGNORECASE).first(main_html)
+            if match:
+                value = match.group(1).strip()
+                value = compile_pattern('learner.html_tag', r'<[^>]+>').sub('', value)
+                value = compile_pattern('learner.whitespace', r'\s+').sub(' ', value).strip()
+                
+                if value and len(value) > 0 and len(value) < 100:
+                    specs[field] = value
+                    print(f"  {field}: {value} (regex)")
                     
-                    if value and len(value) > 0 and len(value) < 100:
-                        specs[field] = value
-                        print(f"  {field}: {value} (regex)")
-                        
-                        if field == 'color':
-                            data['color'] = value
-                        elif field == 'dimensions':
-                            data['size_shape'] = value
-                        elif field == 'finish':
-                            data['finish'] = value
-                    break
+                    if field == 'color':
+                        data['color'] = value
+                    elif field == 'dimensions':
+                        data['size_shape'] = value
+                    elif field == 'finish':
+                        data['finish'] = value
     
     data['specifications'] = specs
     print(f"Total specifications extracted: {len(specs)}")
     
     # Calculate price per sq ft if we have both price and coverage
     if data.get('price_per_box') and data.get('coverage'):
-        coverage_match = re.search(r'([0-9,.]+)', data['coverage'])
+        coverage_match = compile_pattern('learner.coverage_amount', r'([0-9,.]+)').search(data['coverage'])
         if coverage_match:
             coverage_sqft = float(coverage_match.group(1).replace(',', ''))
             data['price_per_sqft'] = round(data['price_per_box'] / coverage_sqft, 2)
@@ -1532,14 +1588,14 @@ def extract_product_data(crawl_results, base_url, category=None):
     images = []
     
     # Look for images in JSON-LD and embedded data
-    image_patterns = [
+    image_patterns = [compile_pattern(f'learner.images[{i}]', pattern, re.IGNORECASE) for i, pattern in enumerate([
         r'"url":"(https://[^"]*\.scene7\.com[^"]*\.(?:jpg|jpeg|png|webp)[^"]*)"',
         r'"image":"([^"]*\.(?:jpg|jpeg|png|webp)[^"]*)"',
         r'<img[^>]*src="([^"]*\.(?:jpg|jpeg|png|webp)[^"]*)"[^>]*>',
-    ]
+    ])]
     
     for pattern in image_patterns:
-        matches = re.findall(pattern, main_html, re.IGNORECASE)
+        matches = pattern.findall(main_html)
         for match in matches:
             if 'signature' in match.lower() or 'oatmeal' in match.lower() or 'ceramic' in match.lower():
                 if match not in images:
@@ -1555,14 +1611,14 @@ def extract_product_data(crawl_results, base_url, category=None):
     collection_links = []
     
     # Look for collection information in embedded JSON
-    collection_patterns = [
+    collection_patterns = [compile_pattern(f'learner.collection_links[{i}]', pattern, re.IGNORECASE) for i, pattern in enumerate([
         r'"Collection"[^}]*"href":"([^"]*)"[^}]*"text":"([^"]*)"',
         r'href="([^"]*signature[^"]*)"[^>]*>([^<]*)',
         r'"name":"([^"]*signature[^"]*)"[^}]*"url":"([^"]*)"',
-    ]
+    ])]
     
     for pattern in collection_patterns:
-        matches = re.findall(pattern, main_html, re.IGNORECASE)
+        matches = pattern.findall(main_html)
         for match in matches:
             if isinstance(match, tuple) and len(match) >= 2:
                 link_data = {'url': match[0], 'text': match[1]}
@@ -1588,17 +1644,15 @@ def extract_product_data(crawl_results, base_url, category=None):
     if crawl_results.get('description', {}).get('html'):
         desc_html = crawl_results['description']['html']
         # Try to find description content
-        desc_patterns = [
+        desc_patterns = pattern_chain('learner.description_tab', [
             r'<div[^>]*class="[^"]*description[^"]*"[^>]*>([^<]+)',
             r'<p[^>]*>([^<]+)</p>'
-        ]
-        for pattern in desc_patterns:
-            desc_match = re.search(pattern, desc_html, re.IGNORECASE)
-            if desc_match:
-                desc = re.sub(r'<[^>]+>', '', desc_match.group(1))
-                if len(desc.strip()) > 50:  # Only use substantial descriptions
-                    data['description'] = desc.strip()
-                    break
+        ], re.IGNORECASE)
+        html_tag = compile_pattern('learner.html_tag', r'<[^>]+>')
+        # Only use substantial descriptions
+        desc_match = desc_patterns.first(desc_html, accept=lambda match: len(html_tag.sub('', match.group(1)).strip()) > 50)
+        if desc_match:
+            data['description'] = html_tag.sub('', desc_match.group(1)).strip()
     
     # Extract resources from resources tab - ENHANCED
     print(f"\n--- Extracting resources ---")
@@ -1609,14 +1663,14 @@ def extract_product_data(crawl_results, base_url, category=None):
         print(f"Processing resources tab content...")
         
         # Look for PDF links, installation guides, etc.
-        pdf_patterns = [
+        pdf_patterns = [compile_pattern(f'learner.resource_tab_pdfs[{i}]', pattern, re.IGNORECASE) for i, pattern in enumerate([
             r'href="([^"]*\.pdf[^"]*)"[^>]*>([^<]*)',  # PDF with link text
             r'href="([^"]*\.pdf[^"]*)"',  # Just PDF URLs
-        ]
+        ])]
         
         pdf_links = []
         for pattern in pdf_patterns:
-            matches = re.findall(pattern, res_html, re.IGNORECASE)
+            matches = pattern.findall(res_html)
             for match in matches:
                 if isinstance(match, tuple):
                     pdf_url, link_text = match[0], match[1].strip()
@@ -1644,10 +1698,11 @@ def extract_product_data(crawl_results, base_url, category=None):
         }
         
         for resource_type, patterns in resource_patterns.items():
-            for pattern in patterns:
+            for i, pattern in enumerate(patterns):
                 # Look for links containing these keywords
-                pattern_regex = f'href="([^"]*)"[^>]*>([^<]*{pattern}[^<]*)'
-                matches = re.findall(pattern_regex, res_html, re.IGNORECASE)
+                pattern_regex = compile_pattern(f'learner.resource_links.{resource_type}[{i}]',
+                                                f'href="([^"]*)"[^>]*>([^<]*{pattern}[^<]*)', re.IGNORECASE)
+                matches = pattern_regex.findall(res_html)
                 if matches:
                     if resource_type not in resources:
                         resources[resource_type] = []
@@ -1669,7 +1724,8 @@ def extract_product_data(crawl_results, base_url, category=None):
     if category and CATEGORY_PARSING_AVAILABLE:
         try:
             print(f"Applying category-specific parsing for: {category}")
-            category_data = parse_product_with_category(main_html, base_url, category)
+            with stage(f"parser.category.{category}"):
+                category_data = parse_product_with_category(main_html, base_url, category)
             
             # Merge category-specific data with existing data, prioritizing category-specific fields
             for key, value in category_data.items():
@@ -1815,19 +1871,14 @@ def _enhance_missing_data(data):
     # 5. Size/Shape inference from title
     if not data.get('size_shape') and title:
         # Look for dimensions in title
-        import re
-        size_pattern = r'(\d+(?:\.\d+)?\s*x\s*\d+(?:\.\d+)?(?:\s*x\s*\d+(?:\.\d+)?)?\s*in\.?)'
-        size_match = re.search(size_pattern, title)
+        size_pattern = compile_pattern('learner.title_size', r'(\d+(?:\.\d+)?\s*x\s*\d+(?:\.\d+)?(?:\s*x\s*\d+(?:\.\d+)?)?\s*in\.?)')
+        size_match = size_pattern.search(title)
         if size_match:
             data['size_shape'] = size_match.group(1)
             print(f"  ✓ Inferred size_shape: {size_match.group(1)} (from title)")
 
-def save_to_database(product_data, crawl_results):
-    """Save product data to PostgreSQL using docker exec with temp file"""
-    import subprocess
-    import tempfile
-    import os
-    
+def build_product_upsert_sql(product_data, crawl_results):
+    """INSERT ... ON CONFLICT (url) DO UPDATE statement for one product"""
     # Prepare the raw content - limit to reasonable size for SQL
     raw_html = ''
     raw_markdown = ''
@@ -1939,36 +1990,93 @@ def save_to_database(product_data, crawl_results):
         product_category = EXCLUDED.product_category,
         updated_at = CURRENT_TIMESTAMP;
     """
+    return insert_sql
+
+@profile_stage('db.docker')
+def _run_sql_in_container(sql, container_prefix='insert', psql_args=()):
+    """Copy a SQL script into the relational_db container and run it with psql; returns (ok, error)
+    
+    Saves run concurrently (scraper threads, several workers per host,
+    reparse's save pool), so every call gets its own container path and
+    removes it afterwards - a shared path lets one save's script overwrite
+    another's before psql reads it. psql runs with ON_ERROR_STOP=1: without
+    it a failing statement still exits 0 and the save looks successful.
+    """
+    import subprocess
+    import tempfile
+    import os
+    import uuid
+    
+    # Write SQL to temp file and execute via docker
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.sql', delete=False) as f:
+        f.write(sql)
+        temp_sql_file = f.name
+    container_path = f'/tmp/{container_prefix}-{uuid.uuid4().hex}.sql'
     
     try:
-        # Write SQL to temp file and execute via docker
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.sql', delete=False) as f:
-            f.write(insert_sql)
-            temp_sql_file = f.name
-        
         # Copy temp file to container and execute
-        result1 = subprocess.run([
-            'docker', 'cp', temp_sql_file, 'relational_db:/tmp/insert.sql'
+        result = subprocess.run([
+            'docker', 'cp', temp_sql_file, f'relational_db:{container_path}'
         ], capture_output=True, text=True)
+        if result.returncode != 0:
+            return False, f"Error copying SQL file: {result.stderr}"
         
-        if result1.returncode == 0:
-            result2 = subprocess.run([
-                'docker', 'exec', 'relational_db', 
-                'psql', '-U', 'postgres', '-f', '/tmp/insert.sql'
+        try:
+            result = subprocess.run([
+                'docker', 'exec', 'relational_db',
+                'psql', '-U', 'postgres', '-v', 'ON_ERROR_STOP=1', *psql_args, '-f', container_path
             ], capture_output=True, text=True)
-            
-            if result2.returncode == 0:
-                print(f"✓ Saved product data for: {product_data['url']}")
-            else:
-                print(f"✗ Error executing SQL: {result2.stderr}")
-        else:
-            print(f"✗ Error copying SQL file: {result1.stderr}")
-        
+        finally:
+            subprocess.run(['docker', 'exec', 'relational_db', 'rm', '-f', container_path],
+                           capture_output=True, text=True)
+        if result.returncode != 0:
+            return False, f"Error executing SQL: {result.stderr}"
+        return True, None
+    finally:
         # Clean up temp file
         os.unlink(temp_sql_file)
+
+@profile_stage('db.save')
+def save_to_database(product_data, crawl_results):
+    """Save product data to PostgreSQL using docker exec with temp file; returns True on success"""
+    insert_sql = build_product_upsert_sql(product_data, crawl_results)
+    
+    try:
+        ok, error = _run_sql_in_container(insert_sql)
+        if ok:
+            print(f"✓ Saved product data for: {product_data['url']}")
+        else:
+            print(f"✗ {error}")
+        return ok
         
     except Exception as e:
         print(f"✗ Error saving to database: {e}")
+        return False
+
+@profile_stage('db.save_batch')
+def save_batch_to_database(products):
+    """Save several (product_data, crawl_results) pairs with one docker cp + psql run
+    
+    The batch runs as a single transaction that stops at the first error;
+    if it fails, each product is saved on its own so one bad row does not
+    lose the rest. Returns one success flag per product.
+    """
+    products = list(products)
+    if len(products) <= 1:
+        return [save_to_database(product_data, crawl_results) for product_data, crawl_results in products]
+    
+    try:
+        batch_sql = '\n'.join(build_product_upsert_sql(product_data, crawl_results)
+                              for product_data, crawl_results in products)
+        ok, error = _run_sql_in_container(batch_sql, 'insert_batch', ('--single-transaction',))
+    except Exception as e:
+        ok, error = False, f"Error saving batch to database: {e}"
+    if ok:
+        print(f"✓ Saved {len(products)} products in one batch")
+        return [True] * len(products)
+    
+    print(f"⚠️ Batch save failed ({error}) - saving products one at a time")
+    return [save_to_database(product_data, crawl_results) for product_data, crawl_results in products]
 
 def create_product_groups_table():
     """Create product groups table for organizing similar products"""
@@ -2045,10 +2153,19 @@ def group_similar_products():
         
         print(f"\n🔗 Grouping {len(products)} products...")
         
-        # Group products by base pattern
+        # Group products by base pattern - the color variation index knows every sitemap sibling
+        variation_index = None
+        if COLOR_VARIATION_INDEX_AVAILABLE:
+            try:
+                variation_index = get_color_variation_index()
+            except Exception as e:
+                print(f"  ⚠ Color variation index unavailable, grouping by title: {e}")
+        
         pattern_groups = {}
         for sku, url, title, color, finish in products:
-            base_pattern = extract_product_pattern(title, url)
+            base_pattern = variation_index.family_key(url) if variation_index else None
+            if not base_pattern:
+                base_pattern = extract_product_pattern(title, url)
             
             if base_pattern not in pattern_groups:
                 pattern_groups[base_pattern] = []
@@ -2071,7 +2188,7 @@ def group_similar_products():
                     VALUES (%s, %s) 
                     ON CONFLICT (base_pattern) DO UPDATE SET group_name = EXCLUDED.group_name
                     RETURNING group_id
-                """, (base_pattern.title(), base_pattern))
+                """, (base_pattern.replace('-*', '').replace('-', ' ').title(), base_pattern))
                 
                 group_id = cursor.fetchone()[0]
                 
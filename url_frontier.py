@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Indexed URL frontier for Tileshop acquisition
+SQLite-backed replacement for per-URL rewrites of tileshop_sitemap.json:
+O(1) status updates, indexed pending/failed queries and trigger-maintained
+status counts. tileshop_sitemap.json remains the downloaded snapshot; the
+frontier owns scrape status from the first migration onwards.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from retry_policy import DEAD_LETTER, RETRY_SHARE, classify_failure, plan_retry
+
+# Columns added after the first release of the frontier
+ADDED_COLUMNS = {
+    'failure_count': 'INTEGER NOT NULL DEFAULT 0',
+    'error_class': 'TEXT',
+    'next_retry_at': 'TEXT',
+}
+
+# Configuration
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTIER_DB = os.path.join(BASE_DIR, 'tileshop_frontier.db')
+SITEMAP_JSON = os.path.join(BASE_DIR, 'tileshop_sitemap.json')
+CATEGORIZED_JSON = os.path.join(BASE_DIR, 'categorized_sitemap.json')
+
+COUNTED_STATUSES = ('pending', 'completed', 'failed', DEAD_LETTER)
+NEVER_ATTEMPTED = 'never_attempted'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    lastmod TEXT,
+    scrape_status TEXT NOT NULL DEFAULT 'pending',
+    scraped_at TEXT,
+    error TEXT,
+    previous_error TEXT,
+    category TEXT,
+    sku TEXT,
+    product_name TEXT,
+    original_index INTEGER NOT NULL DEFAULT 0,
+    failure_count INTEGER NOT NULL DEFAULT 0,
+    error_class TEXT,
+    next_retry_at TEXT
+);
+
+-- Pending queue order: never scraped (NULL sorts first) by sitemap order, then oldest attempt
+CREATE INDEX IF NOT EXISTS idx_urls_status_order ON urls(scrape_status, scraped_at, original_index);
+CREATE INDEX IF NOT EXISTS idx_urls_category_status ON urls(category, scrape_status, scraped_at, original_index);
+-- Retry queue: failed URLs by due time
+CREATE INDEX IF NOT EXISTS idx_urls_retry ON urls(scrape_status, next_retry_at);
+
+CREATE TABLE IF NOT EXISTS status_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_urls_insert AFTER INSERT ON urls BEGIN
+    INSERT INTO status_counts(status, count) VALUES (NEW.scrape_status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+    UPDATE status_counts SET count = count + 1
+        WHERE status = 'never_attempted' AND NEW.scrape_status = 'pending' AND NEW.scraped_at IS NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_urls_delete AFTER DELETE ON urls BEGIN
+    UPDATE status_counts SET count = count - 1 WHERE status = OLD.scrape_status;
+    UPDATE status_counts SET count = count - 1
+        WHERE status = 'never_attempted' AND OLD.scrape_status = 'pending' AND OLD.scraped_at IS NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_urls_update AFTER UPDATE OF scrape_status, scraped_at ON urls BEGIN
+    UPDATE status_counts SET count = count - 1 WHERE status = OLD.scrape_status;
+    INSERT INTO status_counts(status, count) VALUES (NEW.scrape_status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+    UPDATE status_counts SET count = count
+            - (OLD.scrape_status = 'pending' AND OLD.scraped_at IS NULL)
+            + (NEW.scrape_status = 'pending' AND NEW.scraped_at IS NULL)
+        WHERE status = 'never_attempted';
+END;
+"""
+
+class URLFrontier:
+    """SQLite-backed URL frontier with constant-time status statistics"""
+
+    def __init__(self, db_path=FRONTIER_DB, auto_migrate=True):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            columns = {row[1] for row in self.conn.execute('PRAGMA table_info(urls)')}
+            if columns:
+                for column, definition in ADDED_COLUMNS.items():
+                    if column not in columns:
+                        self.conn.execute(f'ALTER TABLE urls ADD COLUMN {column} {definition}')
+            self.conn.executescript(SCHEMA)
+            for status in COUNTED_STATUSES + (NEVER_ATTEMPTED,):
+                self.conn.execute('INSERT OR IGNORE INTO status_counts(status, count) VALUES (?, 0)', (status,))
+
+        if auto_migrate and self.is_empty() and os.path.exists(SITEMAP_JSON):
+            print(f"🔄 Frontier is empty - migrating from {os.path.basename(SITEMAP_JSON)}")
+            self.migrate_from_json()
+
+    def _query(self, sql, params=()):
+        """Run a read query under the connection lock (the connection is shared across threads)"""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # --- Metadata -------------------------------------------------------
+
+    def get_meta(self, key, default=None):
+        rows = self._query('SELECT value FROM meta WHERE key = ?', (key,))
+        return rows[0]['value'] if rows else default
+
+    def set_meta(self, key, value):
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)', (key, value))
+
+    def is_empty(self):
+        return not self._query('SELECT 1 FROM urls LIMIT 1')
+
+    # --- Loading --------------------------------------------------------
+
+    def replace_sitemap(self, urls_data, downloaded_at=None, source_url=None):
+        """Replace the frontier with a freshly downloaded sitemap (all URLs pending)"""
+        rows = [(u['url'], u.get('lastmod'), u.get('scrape_status') or 'pending', u.get('scraped_at'),
+                 u.get('error'), i, 1 if u.get('scrape_status') == 'failed' else 0) for i, u in enumerate(urls_data)]
+        with self._lock, self.conn:
+            categories = {r['url']: (r['category'], r['sku'], r['product_name'])
+                          for r in self.conn.execute('SELECT url, category, sku, product_name FROM urls WHERE category IS NOT NULL')}
+            self.conn.execute('DELETE FROM urls')
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO urls(url, lastmod, scrape_status, scraped_at, error, original_index, failure_count) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows)
+            # Category assignments come from categorize_sitemap.py and outlive a sitemap refresh
+            self.conn.executemany('UPDATE urls SET category = ?, sku = ?, product_name = ? WHERE url = ?',
+                                  [(c, s, n, url) for url, (c, s, n) in categories.items()])
+            self.conn.execute('INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)',
+                              ('downloaded_at', downloaded_at or datetime.now().isoformat()))
+            if source_url:
+                self.conn.execute('INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)', ('source_url', source_url))
+        # Sitemaps can list a URL twice - report what was actually stored
+        return self._query('SELECT COUNT(*) FROM urls')[0][0]
+
+    def get_lastmods(self):
+        """url -> lastmod for every URL (used to diff a fresh sitemap)"""
+        return {row['url']: row['lastmod'] for row in self._query('SELECT url, lastmod FROM urls')}
+
+    def apply_sitemap_diff(self, added, removed, changed, downloaded_at=None, source_url=None, filled=()):
+        """Apply a sitemap delta without touching unchanged URLs
+
+        added: [(url, lastmod)] queued as never-attempted pending URLs
+        removed: [url] dropped from the frontier
+        changed: [(url, lastmod)] requeued as pending; scraped_at is kept so
+        they follow never-attempted URLs in the pending order
+        filled: [(url, lastmod)] stored without a lastmod; only the lastmod is set
+        """
+        with self._lock, self.conn:
+            next_index = self.conn.execute('SELECT COALESCE(MAX(original_index), -1) + 1 FROM urls').fetchone()[0]
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO urls(url, lastmod, original_index) VALUES (?, ?, ?)',
+                [(url, lastmod, next_index + i) for i, (url, lastmod) in enumerate(added)])
+            self.conn.executemany('DELETE FROM urls WHERE url = ?', [(url,) for url in removed])
+            self.conn.executemany(
+                "UPDATE urls SET lastmod = ?, scrape_status = 'pending' WHERE url = ?",
+                [(lastmod, url) for url, lastmod in changed])
+            self.conn.executemany('UPDATE urls SET lastmod = ? WHERE url = ? AND lastmod IS NULL',
+                                  [(lastmod, url) for url, lastmod in filled])
+            self.conn.execute('INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)',
+                              ('downloaded_at', downloaded_at or datetime.now().isoformat()))
+            if source_url:
+                self.conn.execute('INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)', ('source_url', source_url))
+
+    def apply_categories(self, categorized_products):
+        """Attach categories from categorized_sitemap.json; returns (updated, unknown) counts"""
+        updated = unknown = 0
+        with self._lock, self.conn:
+            for category, products in categorized_products.items():
+                for product in products:
+                    cursor = self.conn.execute(
+                        'UPDATE urls SET category = ?, sku = ?, product_name = ? WHERE url = ?',
+                        (category.upper(), product.get('sku'), product.get('product_name'), product['url']))
+                    if cursor.rowcount:
+                        updated += 1
+                    else:
+                        unknown += 1
+        return updated, unknown
+
+    def apply_categories_from_json(self, categorized_file=CATEGORIZED_JSON):
+        """Attach categories from categorized_sitemap.json to the existing rows (statuses untouched)"""
+        with open(categorized_file, 'r', encoding='utf-8') as f:
+            categorized = json.load(f)
+        updated, unknown = self.apply_categories(categorized.get('categorized_products', {}))
+        print(f"✓ Applied categories to {updated:,} URLs from {os.path.basename(categorized_file)}")
+        if unknown:
+            print(f"  ⚠️ {unknown:,} categorized URLs are not in the sitemap and were skipped")
+        return updated, unknown
+
+    def migrate_from_json(self, sitemap_file=SITEMAP_JSON, categorized_file=CATEGORIZED_JSON, force=False):
+        """One-time import of tileshop_sitemap.json (with statuses) and categorized_sitemap.json
+
+        The frontier owns scrape status after the first import, so migrating
+        over a populated frontier would discard crawl progress, retry
+        schedules and dead-letter state; that needs force=True.
+        """
+        if not force and not self.is_empty():
+            raise RuntimeError(f"Frontier {self.db_path} already holds URLs - migrating would reset their "
+                               "scrape status (use apply-categories to refresh categories, or force=True)")
+
+        with open(sitemap_file, 'r', encoding='utf-8') as f:
+            sitemap_data = json.load(f)
+
+        total = self.replace_sitemap(sitemap_data.get('urls', []),
+                                     downloaded_at=sitemap_data.get('downloaded_at'),
+                                     source_url=sitemap_data.get('source_url'))
+        print(f"✓ Migrated {total:,} URLs from {os.path.basename(sitemap_file)}")
+
+        if categorized_file and os.path.exists(categorized_file):
+            self.apply_categories_from_json(categorized_file)
+
+        self.set_meta('migrated_at', datetime.now().isoformat())
+        return total
+
+    # --- Status updates -------------------------------------------------
+
+    def update_status(self, url, status, error_msg=None):
+        """Set the status of one URL (primary-key update)
+
+        failure_count tracks consecutive failures and resets on success.
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                'UPDATE urls SET scrape_status = ?, scraped_at = ?, error = COALESCE(?, error), next_retry_at = NULL, '
+                "failure_count = CASE WHEN ? = 'failed' THEN failure_count + 1 "
+                "WHEN ? = 'completed' THEN 0 ELSE failure_count END WHERE url = ?",
+                (status, datetime.now().isoformat(), error_msg, status, status, url))
+        return cursor.rowcount > 0
+
+    def record_failure(self, url, error_msg, error_class=None, now=None):
+        """Mark a URL failed and schedule its retry, or dead-letter it once out of attempts
+
+        Returns (status, next_retry_at), or None for an unknown URL.
+        """
+        error_class = error_class or classify_failure(error_msg)
+        now = now or datetime.now()
+        with self._lock, self.conn:
+            row = self.conn.execute('SELECT failure_count FROM urls WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            failures = row['failure_count'] + 1
+            retry_at = plan_retry(error_class, failures, now)
+            status = 'failed' if retry_at else DEAD_LETTER
+            next_retry_at = retry_at.isoformat() if retry_at else None
+            self.conn.execute(
+                'UPDATE urls SET scrape_status = ?, scraped_at = ?, error = COALESCE(?, error), '
+                'error_class = ?, failure_count = ?, next_retry_at = ? WHERE url = ?',
+                (status, now.isoformat(), error_msg, error_class, failures, next_retry_at, url))
+        return status, next_retry_at
+
+    def reset_statuses(self, from_status=None, limit=None, category=None):
+        """Reset URLs back to never-attempted pending with fresh retry attempts; returns the number reset"""
+        query = "SELECT url FROM urls WHERE scrape_status != 'pending' OR scraped_at IS NOT NULL"
+        params = []
+        if from_status:
+            query = 'SELECT url FROM urls WHERE scrape_status = ?'
+            params.append(from_status)
+        if category:
+            query += ' AND category = ?'
+            params.append(category.upper())
+        query += ' ORDER BY original_index'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        with self._lock, self.conn:
+            urls = [row['url'] for row in self.conn.execute(query, params)]
+            self.conn.executemany(
+                "UPDATE urls SET scrape_status = 'pending', scraped_at = NULL, next_retry_at = NULL, failure_count = 0, "
+                "previous_error = COALESCE(error, previous_error), error = NULL WHERE url = ?",
+                [(url,) for url in urls])
+        return len(urls)
+
+    # --- Queries --------------------------------------------------------
+
+    def get_pending_urls(self, max_urls=None, category=None, include_retries=False):
+        """Pending URLs: never attempted first (sitemap order), then oldest attempts
+
+        include_retries=True mixes in failed URLs whose retry is due, spread
+        through the batch and capped at RETRY_SHARE of it while fresh work
+        remains.
+        """
+        pending = self._pending_urls(max_urls, category)
+        if not include_retries:
+            return pending
+        retries = self.get_due_retries(max_urls, category)
+        if not retries:
+            return pending
+        if max_urls and pending:
+            retries = retries[:max(1, int(max_urls * RETRY_SHARE))]
+            pending = pending[:max_urls - len(retries)]
+        return _interleave(pending, retries)
+
+    def get_due_retries(self, max_urls=None, category=None, now=None):
+        """Failed URLs whose scheduled retry time has passed, most overdue first"""
+        query = "SELECT url FROM urls WHERE scrape_status = 'failed' AND next_retry_at <= ?"
+        params = [(now or datetime.now()).isoformat()]
+        if category:
+            query += ' AND category = ?'
+            params.append(category.upper())
+        query += ' ORDER BY next_retry_at'
+        if max_urls:
+            query += ' LIMIT ?'
+            params.append(max_urls)
+        return [row['url'] for row in self._query(query, params)]
+
+    def retry_summary(self, now=None):
+        """Scheduled retries and dead-lettered URLs per failure class"""
+        now = (now or datetime.now()).isoformat()
+        summary = {'scheduled': 0, 'due': 0, 'dead_letter': 0, 'next_retry_at': None, 'by_class': {}}
+        for row in self._query(
+                'SELECT scrape_status, COALESCE(error_class, ?) AS error_class, COUNT(*) AS n, '
+                'SUM(next_retry_at <= ?) AS due, MIN(next_retry_at) AS next_retry_at FROM urls '
+                "WHERE scrape_status IN ('failed', ?) GROUP BY scrape_status, 2",
+                ('unclassified', now, DEAD_LETTER)):
+            by_class = summary['by_class'].setdefault(row['error_class'], {'scheduled': 0, 'dead_letter': 0})
+            if row['scrape_status'] == DEAD_LETTER:
+                summary['dead_letter'] += row['n']
+                by_class['dead_letter'] += row['n']
+            else:
+                summary['scheduled'] += row['n']
+                summary['due'] += row['due'] or 0
+                by_class['scheduled'] += row['n']
+                if row['next_retry_at'] and (summary['next_retry_at'] is None or row['next_retry_at'] < summary['next_retry_at']):
+                    summary['next_retry_at'] = row['next_retry_at']
+        return summary
+
+    def _pending_urls(self, max_urls=None, category=None):
+        query = "SELECT url FROM urls WHERE scrape_status = 'pending'"
+        params = []
+        if category:
+            query += ' AND category = ?'
+            params.append(category.upper())
+        query += ' ORDER BY scraped_at, original_index'
+        if max_urls:
+            query += ' LIMIT ?'
+            params.append(max_urls)
+        return [row['url'] for row in self._query(query, params)]
+
+    def get_urls(self, status=None, category=None, limit=None):
+        """URL records as dicts in sitemap order, optionally filtered"""
+        query = 'SELECT * FROM urls'
+        clauses, params = [], []
+        if status:
+            clauses.append('scrape_status = ?')
+            params.append(status)
+        if category:
+            clauses.append('category = ?')
+            params.append(category.upper())
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += ' ORDER BY original_index'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        return [dict(row) for row in self._query(query, params)]
+
+    def get_url(self, url):
+        rows = self._query('SELECT * FROM urls WHERE url = ?', (url,))
+        return dict(rows[0]) if rows else None
+
+    def status_counts(self):
+        return {row['status']: row['count'] for row in self._query('SELECT status, count FROM status_counts')}
+
+    def categories(self):
+        return {row['category']: row['n'] for row in self._query(
+            'SELECT category, COUNT(*) AS n FROM urls WHERE category IS NOT NULL GROUP BY category')}
+
+    def get_statistics(self):
+        """Same shape as download_sitemap.get_scraping_statistics, from maintained counters"""
+        counts = self.status_counts()
+        total = sum(v for k, v in counts.items() if k != NEVER_ATTEMPTED)
+        row = self._query(
+            "SELECT MIN(scraped_at) AS oldest, MAX(scraped_at) AS newest FROM urls WHERE scrape_status = 'completed'"
+        )[0]
+
+        stats = {
+            'total_urls': total,
+            'pending': counts.get('pending', 0),
+            'completed': counts.get('completed', 0),
+            'failed': counts.get('failed', 0),
+            'never_attempted': counts.get(NEVER_ATTEMPTED, 0),
+            'oldest_completion': row['oldest'],
+            'newest_completion': row['newest'],
+            'completion_rate': (counts.get('completed', 0) / total * 100) if total else 0
+        }
+        # Any additional statuses are reported as-is
+        for status, count in counts.items():
+            stats.setdefault(status, count)
+        return stats
+
+    def close(self):
+        self.conn.close()
+
+def _interleave(pending, retries):
+    """Spread retries evenly through the pending URLs"""
+    if not pending:
+        return list(retries)
+    step = max(1, len(pending) // len(retries))
+    merged, remaining = [], iter(retries)
+    for i, url in enumerate(pending):
+        if i % step == 0:
+            retry = next(remaining, None)
+            if retry:
+                merged.append(retry)
+        merged.append(url)
+    merged.extend(remaining)
+    return merged
+
+_frontiers = {}
+_frontiers_lock = threading.Lock()
+
+def get_frontier(db_path=FRONTIER_DB):
+    """Shared frontier per database file"""
+    with _frontiers_lock:
+        if db_path not in _frontiers:
+            _frontiers[db_path] = URLFrontier(db_path)
+        return _frontiers[db_path]
+
+def main():
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else 'stats'
+
+    if command == 'migrate':
+        frontier = URLFrontier(auto_migrate=False)
+        force = '--force' in sys.argv[2:]
+        if not force and not frontier.is_empty():
+            print(f"✗ {os.path.basename(frontier.db_path)} already holds URLs with crawl progress")
+            print("  'migrate' would reset every status, retry schedule and dead letter from the sitemap snapshot.")
+            print("  Use 'python url_frontier.py apply-categories' to refresh categories,")
+            print("  or 'python url_frontier.py migrate --force' to re-import anyway.")
+            return
+        frontier.migrate_from_json(force=force)
+    elif command == 'apply-categories':
+        frontier = URLFrontier(auto_migrate=False)
+        if not os.path.exists(CATEGORIZED_JSON):
+            print(f"✗ {os.path.basename(CATEGORIZED_JSON)} not found - run 'python categorize_sitemap.py' first")
+            return
+        frontier.apply_categories_from_json()
+    elif command == 'stats':
+        frontier = get_frontier()
+    else:
+        print("Usage:")
+        print("  python url_frontier.py migrate [--force]  - Import tileshop_sitemap.json and categorized_sitemap.json")
+        print("                                              into an empty frontier (--force overwrites crawl progress)")
+        print("  python url_frontier.py apply-categories   - Update categories from categorized_sitemap.json, keeping statuses")
+        print("  python url_frontier.py stats              - Show frontier statistics")
+        return
+
+    stats = frontier.get_statistics()
+    print(f"\n📊 Frontier: {frontier.db_path}")
+    print(f"   Total URLs: {stats['total_urls']:,}")
+    print(f"   Completed: {stats['completed']:,} ({stats['completion_rate']:.1f}%)")
+    print(f"   Failed: {stats['failed']:,}")
+    print(f"   Pending: {stats['pending']:,} (never attempted: {stats['never_attempted']:,})")
+    for category, count in sorted(frontier.categories().items()):
+        print(f"   {category}: {count:,}")
+
+if __name__ == "__main__":
+    main()